@@ -13,7 +13,17 @@ import argparse
 import json
 import sys
 import re
-from typing import List, Dict, Tuple
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+SKILLS_DIR = Path(__file__).resolve().parents[2]
+if str(SKILLS_DIR) not in sys.path:
+    sys.path.insert(0, str(SKILLS_DIR))
+from template_loader import load_template  # noqa: E402
+
+
+chunk_core = load_template(Path(__file__).parent.parent / "scripts" / "chunk-core.py")
 
 
 # Language-specific patterns
@@ -87,22 +97,55 @@ class CodeChunker:
         Returns:
             List of chunks with metadata
         """
-        if metadata is None:
-            metadata = {}
-
         # Extract imports/headers
-        imports = self._extract_imports(code)
+        imports = self._extract_imports(code.split('\n'))
 
-        # Parse code structure
-        blocks = self._parse_code_blocks(code)
+        return list(self._format_chunks(self._chunk_blocks([code], imports), metadata))
 
-        # Create chunks from blocks
-        chunks = self._create_chunks_from_blocks(blocks, imports)
+    def iter_chunks(self, stream, metadata: Dict = None,
+                    block_size: int = chunk_core.DEFAULT_BLOCK_SIZE,
+                    import_lookahead: int = 65536) -> Iterator[Dict]:
+        """
+        Chunk a source stream incrementally.
+
+        Code is split while it is read, holding only the read buffer and
+        the chunk being built. Imports are collected from the first
+        ``import_lookahead`` characters; beyond that the output matches
+        ``chunk(stream.read())`` exactly.
+
+        Args:
+            stream: Text file object or iterable of strings
+            metadata: Optional metadata
+            block_size: Characters per read
+            import_lookahead: Characters scanned for import statements
+
+        Yields:
+            Chunks with metadata
+        """
+        blocks = chunk_core.read_blocks(stream, block_size)
+        head, blocks = chunk_core.read_ahead(blocks, import_lookahead)
+
+        # Only scan complete lines unless the whole file fit in the lookahead
+        head_lines = head.split('\n')
+        if len(head) >= import_lookahead:
+            head_lines.pop()
+        imports = self._extract_imports(head_lines)
+
+        return self._format_chunks(self._chunk_blocks(blocks, imports), metadata)
+
+    def _chunk_blocks(self, text_blocks: Iterable[str], imports: str) -> Iterator[Tuple[str, Dict]]:
+        """Parse code structure and create chunks from its blocks."""
+        blocks = self._parse_code_blocks(text_blocks)
+        return self._create_chunks_from_blocks(blocks, imports)
+
+    def _format_chunks(self, chunks: Iterable[Tuple[str, Dict]],
+                       metadata: Dict = None) -> Iterator[Dict]:
+        """Format (chunk_text, chunk_meta) tuples as output chunks."""
+        if metadata is None:
+            metadata = {}
 
-        # Format output
-        result = []
         for i, (chunk_text, chunk_meta) in enumerate(chunks):
-            result.append({
+            yield {
                 "text": chunk_text.strip(),
                 "metadata": {
                     **metadata,
@@ -112,14 +155,11 @@ class CodeChunker:
                     "language": self.language,
                     "strategy": "code"
                 }
-            })
-
-        return result
+            }
 
-    def _extract_imports(self, code: str) -> str:
-        """Extract import statements."""
+    def _extract_imports(self, lines: Iterable[str]) -> str:
+        """Extract import statements from the leading lines of the code."""
         imports = []
-        lines = code.split('\n')
 
         if self.language == 'python':
             for line in lines:
@@ -161,63 +201,70 @@ class CodeChunker:
 
         return '\n'.join(imports)
 
-    def _parse_code_blocks(self, code: str) -> List[Tuple[str, str, int]]:
+    def _parse_code_blocks(self, text_blocks: Iterable[str]) -> Iterator[Tuple[str, str, int]]:
         """
         Parse code into logical blocks (classes, functions, etc.).
 
-        Returns:
-            List of (block_type, block_content, start_pos) tuples
+        Yields:
+            (block_type, block_content, start_pos) tuples
         """
-        blocks = []
-
         # Use recursive splitting with language-specific separators
         separators = self.patterns['separators']
-        chunks = self._recursive_split(code, separators)
 
-        for chunk in chunks:
+        for chunk in self._recursive_split(text_blocks, separators):
             # Identify block type
             block_type = self._identify_block_type(chunk)
-            blocks.append((block_type, chunk, 0))
+            yield (block_type, chunk, 0)
 
-        return blocks
+    def _recursive_split(self, text_blocks: Iterable[str], separators: List[str]) -> Iterator[str]:
+        """
+        Recursively split code using separator hierarchy.
+
+        The code arrives as a stream of blocks; pieces too long for one
+        chunk are split further as they are read instead of being
+        materialized first.
+        """
+        head, text_blocks = chunk_core.read_ahead(text_blocks, self.chunk_size + 1)
+        if len(head) <= self.chunk_size:
+            # Whole text fits
+            if head:
+                yield head
+            return
 
-    def _recursive_split(self, text: str, separators: List[str]) -> List[str]:
-        """Recursively split code using separator hierarchy."""
-        if not separators or len(text) <= self.chunk_size:
-            return [text] if text else []
+        if not separators:
+            yield "".join(text_blocks)
+            return
 
         separator = separators[0]
         remaining = separators[1:]
 
         if not separator:
             # Character-level split
-            return [text[i:i+self.chunk_size] for i in range(0, len(text), self.chunk_size)]
+            yield from chunk_core.iter_windows(text_blocks, self.chunk_size, self.chunk_size)
+            return
 
-        splits = text.split(separator)
-        chunks = []
         current = ""
 
-        for split in splits:
+        for split in chunk_core.StreamSplitter(text_blocks, separator, self.chunk_size):
+            if not isinstance(split, str):
+                # Split is too large - recurse
+                if current:
+                    yield current
+                yield from self._recursive_split(split, remaining)
+                current = ""
+                continue
+
             test = current + separator + split if current else split
 
             if len(test) <= self.chunk_size:
                 current = test
             else:
                 if current:
-                    chunks.append(current)
-
-                if len(split) > self.chunk_size:
-                    # Split is too large - recurse
-                    sub_chunks = self._recursive_split(split, remaining)
-                    chunks.extend(sub_chunks)
-                    current = ""
-                else:
-                    current = split
+                    yield current
+                current = split
 
         if current:
-            chunks.append(current)
-
-        return chunks
+            yield current
 
     def _identify_block_type(self, code: str) -> str:
         """Identify the type of code block."""
@@ -233,10 +280,9 @@ class CodeChunker:
 
         return 'other'
 
-    def _create_chunks_from_blocks(self, blocks: List[Tuple],
-                                    imports: str) -> List[Tuple[str, Dict]]:
+    def _create_chunks_from_blocks(self, blocks: Iterable[Tuple],
+                                    imports: str) -> Iterator[Tuple[str, Dict]]:
         """Create chunks from code blocks."""
-        chunks = []
         current_chunk = []
         current_size = 0
 
@@ -256,9 +302,9 @@ class CodeChunker:
             else:
                 # Save current chunk
                 chunk_text = self._format_chunk(current_chunk, imports)
-                chunks.append((chunk_text, {
+                yield (chunk_text, {
                     "block_types": self._get_block_types(current_chunk)
-                }))
+                })
 
                 # Start new chunk
                 current_chunk = [block_content]
@@ -267,11 +313,9 @@ class CodeChunker:
         # Add final chunk
         if current_chunk:
             chunk_text = self._format_chunk(current_chunk, imports)
-            chunks.append((chunk_text, {
+            yield (chunk_text, {
                 "block_types": self._get_block_types(current_chunk)
-            }))
-
-        return chunks
+            })
 
     def _format_chunk(self, blocks: List[str], imports: str) -> str:
         """Format a chunk with optional imports."""
@@ -329,13 +373,15 @@ def main():
         help="Don't include imports in chunks"
     )
 
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Read the input incrementally and write one JSON chunk per line"
+    )
+
     args = parser.parse_args()
 
     try:
-        # Read input
-        with open(args.input, 'r', encoding='utf-8') as f:
-            code = f.read()
-
         # Create chunker
         chunker = CodeChunker(
             language=args.language,
@@ -344,6 +390,29 @@ def main():
             include_imports=not args.no_imports
         )
 
+        if args.stream:
+            # Constant memory: chunks are written as JSON Lines as they are produced
+            out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+            try:
+                with open(args.input, 'r', encoding='utf-8') as f:
+                    count = 0
+                    for chunk in chunker.iter_chunks(f, metadata={"source": args.input}):
+                        out.write(json.dumps(chunk) + "\n")
+                        count += 1
+            finally:
+                if args.output:
+                    out.close()
+
+            if args.output:
+                print(f"✓ Created {count} chunks")
+                print(f"✓ Output written to {args.output} (JSON Lines)")
+            return
+
+        # Read input
+        with open(args.input, 'r', encoding='utf-8') as f:
+            code = f.read()
+
+
         # Chunk code
         chunks = chunker.chunk(code, metadata={"source": args.input})
 
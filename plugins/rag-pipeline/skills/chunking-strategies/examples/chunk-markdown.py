@@ -14,7 +14,18 @@ import argparse
 import json
 import sys
 import re
-from typing import List, Dict, Tuple
+from itertools import chain, groupby
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+SKILLS_DIR = Path(__file__).resolve().parents[2]
+if str(SKILLS_DIR) not in sys.path:
+    sys.path.insert(0, str(SKILLS_DIR))
+from template_loader import load_template  # noqa: E402
+
+
+chunk_core = load_template(Path(__file__).parent.parent / "scripts" / "chunk-core.py")
 
 
 class MarkdownChunker:
@@ -45,19 +56,42 @@ class MarkdownChunker:
         Returns:
             List of chunks with metadata
         """
-        if metadata is None:
-            metadata = {}
+        return list(self._format_chunks(self._chunk_lines(text.split('\n')), metadata))
+
+    def iter_chunks(self, stream, metadata: Dict = None,
+                    block_size: int = chunk_core.DEFAULT_BLOCK_SIZE) -> Iterator[Dict]:
+        """
+        Chunk a Markdown stream incrementally.
 
-        # Parse document structure
-        sections = self._parse_markdown_structure(text)
+        Yields the same chunks ``chunk(stream.read())`` would return. The
+        document is parsed line by line and sections are consumed as they
+        are read, so memory is bounded by the read buffer and the largest
+        chunk rather than by the document.
 
-        # Create chunks from sections
-        chunks = self._create_chunks_from_sections(sections)
+        Args:
+            stream: Text file object or iterable of strings
+            metadata: Optional metadata
+            block_size: Characters per read
+
+        Yields:
+            Chunks with metadata
+        """
+        lines = chunk_core.iter_lines(chunk_core.read_blocks(stream, block_size))
+        return self._format_chunks(self._chunk_lines(lines), metadata)
+
+    def _chunk_lines(self, lines: Iterable[str]) -> Iterator[Tuple[str, Dict]]:
+        """Parse document structure and create chunks from its sections."""
+        sections = self._parse_markdown_structure(lines)
+        return self._create_chunks_from_sections(sections)
+
+    def _format_chunks(self, chunks: Iterable[Tuple[str, Dict]],
+                       metadata: Dict = None) -> Iterator[Dict]:
+        """Format (chunk_text, chunk_meta) tuples as output chunks."""
+        if metadata is None:
+            metadata = {}
 
-        # Format output
-        result = []
         for i, (chunk_text, chunk_meta) in enumerate(chunks):
-            result.append({
+            yield {
                 "text": chunk_text.strip(),
                 "metadata": {
                     **metadata,
@@ -66,31 +100,25 @@ class MarkdownChunker:
                     "chunk_size": len(chunk_text),
                     "strategy": "markdown"
                 }
-            })
-
-        return result
+            }
 
-    def _parse_markdown_structure(self, text: str) -> List[Tuple[int, str, str, int]]:
+    def _parse_markdown_structure(self, lines: Iterable[str]) -> Iterator[Tuple[int, str, Iterator[str]]]:
         """
         Parse Markdown into structured sections.
 
-        Returns:
-            List of (level, header, content, start_pos) tuples
-        """
-        sections = []
-        lines = text.split('\n')
-
-        current_section = {
-            'level': 0,
-            'header': '',
-            'content': [],
-            'start_line': 0
-        }
+        Sections are produced lazily, as with itertools.groupby: a section's
+        lines must be consumed before the next section is requested.
 
+        Yields:
+            (level, header, section_lines) tuples
+        """
+        section = 0
         in_code_block = False
         code_fence = None
 
-        for i, line in enumerate(lines):
+        def section_of(line: str) -> int:
+            nonlocal section, in_code_block, code_fence
+
             # Track code blocks
             if line.strip().startswith('```') or line.strip().startswith('~~~'):
                 if not in_code_block:
@@ -99,119 +127,101 @@ class MarkdownChunker:
                 elif line.strip().startswith(code_fence):
                     in_code_block = False
 
-            # Don't parse headers inside code blocks
-            if not in_code_block:
-                # Check for ATX headers (# Header)
-                header_match = re.match(r'^(#{1,6})\s+(.+)$', line)
-                if header_match:
-                    # Save previous section
-                    if current_section['content']:
-                        sections.append((
-                            current_section['level'],
-                            current_section['header'],
-                            '\n'.join(current_section['content']),
-                            current_section['start_line']
-                        ))
-
-                    # Start new section
-                    level = len(header_match.group(1))
-                    header = header_match.group(2).strip()
-
-                    current_section = {
-                        'level': level,
-                        'header': line,
-                        'content': [line],
-                        'start_line': i
-                    }
-                    continue
-
-            # Add line to current section
-            current_section['content'].append(line)
-
-        # Add final section
-        if current_section['content']:
-            sections.append((
-                current_section['level'],
-                current_section['header'],
-                '\n'.join(current_section['content']),
-                current_section['start_line']
-            ))
-
-        return sections
-
-    def _create_chunks_from_sections(self, sections: List[Tuple]) -> List[Tuple[str, Dict]]:
+            # Don't parse headers inside code blocks; an ATX header
+            # (# Header) starts a new section
+            if not in_code_block and re.match(r'^(#{1,6})\s+(.+)$', line):
+                section += 1
+            return section
+
+        for index, section_lines in groupby(lines, key=section_of):
+            first = next(section_lines)
+            if index == 0:
+                # Content before the first header
+                level, header = 0, ''
+            else:
+                level, header = len(re.match(r'^#+', first).group()), first
+            yield level, header, chain([first], section_lines)
+
+    def _create_chunks_from_sections(self, sections: Iterable[Tuple]) -> Iterator[Tuple[str, Dict]]:
         """
         Create chunks from parsed sections.
 
-        Returns:
-            List of (chunk_text, chunk_metadata) tuples
+        A section is buffered only until it exceeds max_chunk_size; larger
+        sections are split while their remaining lines are read.
+
+        Yields:
+            (chunk_text, chunk_metadata) tuples
         """
-        chunks = []
         current_chunk = []
         current_size = 0
         header_stack = []  # Track parent headers
 
-        for level, header, content, start_line in sections:
+        for level, header, section_lines in sections:
             # Update header stack (remove headers at same or deeper level)
             header_stack = [h for h in header_stack if h[0] < level]
             if header:
                 header_stack.append((level, header))
 
-            # Prepare section text
-            section_text = content
-
             # Add parent headers if enabled
             if self.add_parent_headers and len(header_stack) > 1:
-                parent_headers = '\n'.join(h[1] for h in header_stack[:-1])
-                section_text = f"{parent_headers}\n\n{content}"
-
-            # Check if we need to start a new chunk
-            section_size = len(section_text)
-
-            if current_size + section_size <= self.max_chunk_size:
-                # Add to current chunk
-                current_chunk.append(section_text)
-                current_size += section_size
+                section_lines = chain([h[1] for h in header_stack[:-1]], [''], section_lines)
+
+            # Read the section until it is known to fit
+            buffered = []
+            section_size = -1
+            for line in section_lines:
+                buffered.append(line)
+                section_size += len(line) + 1
+                if section_size > self.max_chunk_size:
+                    break
             else:
-                # Save current chunk
-                if current_chunk:
-                    chunk_text = '\n\n'.join(current_chunk)
-                    chunks.append((chunk_text, {
-                        "header_context": [h[1] for h in header_stack[:-1]] if header_stack else [],
-                        "section_header": header
-                    }))
+                section_text = '\n'.join(buffered)
 
-                # Start new chunk
-                if section_size > self.max_chunk_size:
-                    # Section is too large - split it
-                    split_chunks = self._split_large_section(section_text, header_stack)
-                    chunks.extend(split_chunks)
-                    current_chunk = []
-                    current_size = 0
+                if current_size + section_size <= self.max_chunk_size:
+                    # Add to current chunk
+                    current_chunk.append(section_text)
+                    current_size += section_size
                 else:
+                    # Save current chunk and start a new one
+                    if current_chunk:
+                        yield self._build_chunk(current_chunk, header_stack[:-1], header)
                     current_chunk = [section_text]
                     current_size = section_size
+                continue
+
+            # Section is too large - save current chunk, then split it
+            if current_chunk:
+                yield self._build_chunk(current_chunk, header_stack[:-1], header)
+
+            yield from self._split_large_section(chain(buffered, section_lines), header_stack)
+            current_chunk = []
+            current_size = 0
 
         # Add final chunk
         if current_chunk:
-            chunk_text = '\n\n'.join(current_chunk)
-            chunks.append((chunk_text, {
-                "header_context": [h[1] for h in header_stack],
-                "section_header": header_stack[-1][1] if header_stack else ""
-            }))
-
-        return chunks
+            yield self._build_chunk(current_chunk, header_stack,
+                                    header_stack[-1][1] if header_stack else "")
+
+    def _build_chunk(self, parts: List[str], context: List, section_header: str) -> Tuple[str, Dict]:
+        """Join chunk parts and attach their header context."""
+        return '\n\n'.join(parts), {
+            "header_context": [h[1] for h in context],
+            "section_header": section_header
+        }
 
-    def _split_large_section(self, text: str, header_stack: List) -> List[Tuple[str, Dict]]:
+    def _split_large_section(self, lines: Iterable[str], header_stack: List) -> Iterator[Tuple[str, Dict]]:
         """Split a section that's too large."""
-        chunks = []
+        section_header = header_stack[-1][1] if header_stack else ""
 
         # Try to preserve code blocks
         if self.preserve_code_blocks:
-            parts = self._split_preserving_code_blocks(text)
+            parts = self._split_preserving_code_blocks(lines)
         else:
             # Simple paragraph split
-            parts = re.split(r'\n\s*\n', text)
+            segments = chunk_core.iter_segments(
+                chunk_core.join_lines(lines), chunk_core.PARAGRAPH_BOUNDARY, self.max_chunk_size
+            )
+            parts = chain.from_iterable(chunk_core.PARAGRAPH_BOUNDARY.split(s) for s in segments)
 
         current_chunk = []
         current_size = 0
@@ -225,32 +235,21 @@ class MarkdownChunker:
             else:
                 # Save current chunk
                 if current_chunk:
-                    chunk_text = '\n\n'.join(current_chunk)
-                    chunks.append((chunk_text, {
-                        "header_context": [h[1] for h in header_stack],
-                        "section_header": header_stack[-1][1] if header_stack else ""
-                    }))
+                    yield self._build_chunk(current_chunk, header_stack, section_header)
 
                 current_chunk = [part]
                 current_size = part_size
 
         # Add final chunk
         if current_chunk:
-            chunk_text = '\n\n'.join(current_chunk)
-            chunks.append((chunk_text, {
-                "header_context": [h[1] for h in header_stack],
-                "section_header": header_stack[-1][1] if header_stack else ""
-            }))
+            yield self._build_chunk(current_chunk, header_stack, section_header)
 
-        return chunks
-
-    def _split_preserving_code_blocks(self, text: str) -> List[str]:
-        """Split text while keeping code blocks intact."""
-        parts = []
+    def _split_preserving_code_blocks(self, lines: Iterable[str]) -> Iterator[str]:
+        """Split lines into parts while keeping code blocks intact."""
         current_part = []
         in_code_block = False
 
-        for line in text.split('\n'):
+        for line in lines:
             # Detect code block boundaries
             if line.strip().startswith('```') or line.strip().startswith('~~~'):
                 in_code_block = not in_code_block
@@ -258,16 +257,18 @@ class MarkdownChunker:
             if not in_code_block and not line.strip():
                 # Empty line outside code block - potential split point
                 if current_part:
-                    parts.append('\n'.join(current_part))
+                    part = '\n'.join(current_part)
+                    if part.strip():
+                        yield part
                     current_part = []
             else:
                 current_part.append(line)
 
         # Add final part
         if current_part:
-            parts.append('\n'.join(current_part))
-
-        return [p for p in parts if p.strip()]
+            part = '\n'.join(current_part)
+            if part.strip():
+                yield part
 
 
 def main():
@@ -299,13 +300,15 @@ def main():
         help="Don't include parent headers"
     )
 
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Read the input incrementally and write one JSON chunk per line"
+    )
+
     args = parser.parse_args()
 
     try:
-        # Read input
-        with open(args.input, 'r', encoding='utf-8') as f:
-            text = f.read()
-
         # Create chunker
         chunker = MarkdownChunker(
             max_chunk_size=args.max_chunk_size,
@@ -313,6 +316,29 @@ def main():
             add_parent_headers=not args.no_parent_headers
         )
 
+        if args.stream:
+            # Constant memory: chunks are written as JSON Lines as they are produced
+            out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+            try:
+                with open(args.input, 'r', encoding='utf-8') as f:
+                    count = 0
+                    for chunk in chunker.iter_chunks(f, metadata={"source": args.input}):
+                        out.write(json.dumps(chunk) + "\n")
+                        count += 1
+            finally:
+                if args.output:
+                    out.close()
+
+            if args.output:
+                print(f"✓ Created {count} chunks")
+                print(f"✓ Output written to {args.output} (JSON Lines)")
+            return
+
+        # Read input
+        with open(args.input, 'r', encoding='utf-8') as f:
+            text = f.read()
+
+
         # Chunk document
         chunks = chunker.chunk(text, metadata={"source": args.input})
 
@@ -7,12 +7,18 @@ Specialized chunking for PDF documents with:
 - Page boundary preservation
 - Multi-column layout handling
 - Metadata extraction (title, author, page numbers)
+- Page-parallel extraction: chunking starts while later pages are
+  still being extracted
 """
 
 import argparse
 import json
+import os
+import re
 import sys
-from typing import List, Dict, Optional
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional
 
 # PDF libraries
 try:
@@ -22,11 +28,42 @@ except ImportError:
     PYPDF_AVAILABLE = False
 
 
+# Pages extracted per pool task
+PAGES_PER_TASK = 8
+
+# The reader opened once per worker process by _open_worker_reader
+_worker_reader = None
+
+
+def _open_worker_reader(pdf_path: str):
+    """Pool initializer: open the PDF once per worker process"""
+    global _worker_reader
+    _worker_reader = PdfReader(pdf_path)
+
+
+def _extract_page_range(reader, start: int, end: int) -> List[Dict]:
+    """Cleaned page dicts for pages [start, end)"""
+    pages = []
+    for i in range(start, end):
+        text = PDFChunker._clean_pdf_text(reader.pages[i].extract_text())
+        pages.append({
+            "page_number": i + 1,
+            "text": text,
+            "char_count": len(text)
+        })
+    return pages
+
+
+def _extract_worker_pages(start: int, end: int) -> List[Dict]:
+    """Pool task: extract a page range from the worker's reader"""
+    return _extract_page_range(_worker_reader, start, end)
+
+
 class PDFChunker:
     """PDF document chunking with text extraction."""
 
     def __init__(self, chunk_size: int = 1500, preserve_pages: bool = True,
-                 merge_pages: bool = False):
+                 merge_pages: bool = False, workers: Optional[int] = None):
         """
         Initialize PDF chunker.
 
@@ -34,6 +71,8 @@ class PDFChunker:
             chunk_size: Maximum chunk size in characters
             preserve_pages: Keep page boundaries
             merge_pages: Merge pages into larger chunks
+            workers: Page extraction processes (None = one per core,
+                1 = extract in this process)
         """
         if not PYPDF_AVAILABLE:
             raise ImportError(
@@ -43,6 +82,7 @@ class PDFChunker:
         self.chunk_size = chunk_size
         self.preserve_pages = preserve_pages
         self.merge_pages = merge_pages
+        self.workers = workers or os.cpu_count() or 1
 
     def chunk(self, pdf_path: str, metadata: Optional[Dict] = None) -> List[Dict]:
         """
@@ -72,12 +112,13 @@ class PDFChunker:
 
         return chunks
 
-    def _extract_pdf_content(self, pdf_path: str) -> tuple[List[Dict], Dict]:
+    def _extract_pdf_content(self, pdf_path: str) -> tuple[Iterator[Dict], Dict]:
         """
         Extract text and metadata from PDF.
 
         Returns:
-            (pages, metadata) tuple
+            (pages, metadata) tuple; pages is a lazy, in-order iterator
+            (see _iter_pages)
         """
         reader = PdfReader(pdf_path)
 
@@ -97,26 +138,48 @@ class PDFChunker:
             if reader.metadata.creator:
                 metadata["pdf_metadata"]["creator"] = reader.metadata.creator
 
-        # Extract text from each page
-        pages = []
-        for i, page in enumerate(reader.pages):
-            text = page.extract_text()
+        return self._iter_pages(pdf_path, reader), metadata
 
-            # Clean up text
-            text = self._clean_pdf_text(text)
-
-            pages.append({
-                "page_number": i + 1,
-                "text": text,
-                "char_count": len(text)
-            })
-
-        return pages, metadata
+    def _iter_pages(self, pdf_path: str, reader) -> Iterator[Dict]:
+        """
+        Extract and clean pages in order.
 
-    def _clean_pdf_text(self, text: str) -> str:
+        Page ranges are extracted on a process pool (each worker opens the
+        PDF once) with at most two ranges per worker in flight, so pages
+        are yielded while later ones are still being extracted and only
+        the in-flight pages are held in memory.
+        """
+        total_pages = len(reader.pages)
+        if self.workers == 1 or total_pages <= PAGES_PER_TASK:
+            for i in range(total_pages):
+                yield from _extract_page_range(reader, i, i + 1)
+            return
+
+        ranges = [(start, min(start + PAGES_PER_TASK, total_pages))
+                  for start in range(0, total_pages, PAGES_PER_TASK)]
+        workers = min(self.workers, len(ranges))
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_open_worker_reader,
+            initargs=(pdf_path,)
+        ) as pool:
+            pending = deque()
+            try:
+                for start, end in ranges:
+                    pending.append(pool.submit(_extract_worker_pages, start, end))
+                    if len(pending) >= 2 * workers:
+                        yield from pending.popleft().result()
+                while pending:
+                    yield from pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
+    @staticmethod
+    def _clean_pdf_text(text: str) -> str:
         """Clean up extracted PDF text."""
         # Remove excessive whitespace
-        import re
         text = re.sub(r'\s+', ' ', text)
 
         # Remove page numbers (simple heuristic)
@@ -127,8 +190,8 @@ class PDFChunker:
 
         return text.strip()
 
-    def _chunk_by_pages(self, pages: List[Dict], metadata: Dict) -> List[Dict]:
-        """Chunk PDF preserving page boundaries."""
+    def _chunk_by_pages(self, pages: Iterable[Dict], metadata: Dict) -> List[Dict]:
+        """Chunk PDF preserving page boundaries (pages are consumed as they arrive)."""
         chunks = []
 
         for page in pages:
@@ -165,14 +228,16 @@ class PDFChunker:
 
         return chunks
 
-    def _chunk_merged_pages(self, pages: List[Dict], metadata: Dict) -> List[Dict]:
-        """Merge pages into larger chunks."""
+    def _chunk_merged_pages(self, pages: Iterable[Dict], metadata: Dict) -> List[Dict]:
+        """Merge pages into larger chunks (pages are consumed as they arrive)."""
         chunks = []
         current_chunk = []
         current_size = 0
         start_page = 1
+        last_page = 0
 
         for page in pages:
+            last_page = page["page_number"]
             page_text = page["text"]
             page_size = len(page_text)
 
@@ -208,7 +273,7 @@ class PDFChunker:
                 "metadata": {
                     **metadata,
                     "chunk_id": len(chunks),
-                    "page_range": f"{start_page}-{pages[-1]['page_number']}",
+                    "page_range": f"{start_page}-{last_page}",
                     "chunk_size": len(chunk_text),
                     "strategy": "pdf_merged"
                 }
@@ -218,8 +283,6 @@ class PDFChunker:
 
     def _split_large_page(self, text: str, page_number: int) -> List[str]:
         """Split a page that's too large."""
-        import re
-
         # Try to split on paragraphs
         paragraphs = re.split(r'\n\s*\n', text)
 
@@ -285,6 +348,11 @@ def main():
         action="store_true",
         help="Don't preserve page boundaries"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Page extraction processes (default: one per core; 1 = no pool)"
+    )
 
     args = parser.parse_args()
 
@@ -298,7 +366,8 @@ def main():
         chunker = PDFChunker(
             chunk_size=args.chunk_size,
             preserve_pages=not args.no_preserve_pages,
-            merge_pages=args.merge_pages
+            merge_pages=args.merge_pages,
+            workers=args.workers
         )
 
         # Chunk PDF
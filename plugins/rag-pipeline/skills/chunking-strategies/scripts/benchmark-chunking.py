@@ -4,213 +4,352 @@ Chunking Strategy Benchmark Tool
 
 Compares different chunking strategies and parameters to help
 select the optimal approach for your documents.
+
+Chunkers are imported and run in-process (no subprocess per run), so
+timings measure chunking only. Each configuration gets warmup runs and
+repeated timed trials, plus a separate tracemalloc pass for memory.
+Results can be saved as a baseline and later runs fail on regressions.
+With --stream the file is never loaded whole: chunkers read it through
+iter_chunks() and chunk statistics are accumulated on the fly, so peak
+memory reflects the streaming pipeline itself.
+With --tokenizer every chunk is also tokenized and a token-count
+histogram is reported; --token-budget makes chunk sizes token counts.
 """
 
 import argparse
+import gc
 import json
+import math
+import os
 import sys
 import time
-from typing import List, Dict, Any
+import tracemalloc
+from collections import deque
+from functools import partial
+from typing import List, Dict, Any, Callable, Iterable, Iterator, Optional
 import statistics
-import subprocess
-import tempfile
-import os
+
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_DIR = os.path.join(os.path.dirname(SCRIPT_DIR), "templates")
+
+
+SKILLS_DIR = os.path.dirname(os.path.dirname(SCRIPT_DIR))
+if SKILLS_DIR not in sys.path:
+    sys.path.insert(0, SKILLS_DIR)
+from template_loader import load_template  # noqa: E402
+
+
+_recursive = load_template(os.path.join(SCRIPT_DIR, "chunk-recursive.py"))
+FixedSizeChunker = load_template(os.path.join(SCRIPT_DIR, "chunk-fixed-size.py")).FixedSizeChunker
+SemanticChunker = load_template(os.path.join(SCRIPT_DIR, "chunk-semantic.py")).SemanticChunker
+RecursiveChunker = _recursive.RecursiveChunker
+SEPARATOR_PRESETS = _recursive.SEPARATOR_PRESETS
+_core = load_template(os.path.join(SCRIPT_DIR, "chunk-core.py"))
+DEFAULT_BLOCK_SIZE = _core.DEFAULT_BLOCK_SIZE
+CustomChunker = load_template(os.path.join(TEMPLATE_DIR, "custom-splitter.py")).CustomChunker
 
 
 class ChunkingBenchmark:
     """Benchmark different chunking strategies."""
 
-    def __init__(self, input_file: str):
+    def __init__(self, input_file: str, warmup: int = 1, repeat: int = 5,
+                 stream: bool = False, block_size: int = DEFAULT_BLOCK_SIZE,
+                 tokenizer: str = None, token_budget: bool = False,
+                 token_limit: int = None, token_bin_width: int = 64):
         """
         Initialize benchmark.
 
         Args:
             input_file: Path to document to benchmark
+            warmup: Untimed runs before measuring each configuration
+            repeat: Timed trials per configuration
+            stream: Chunk via iter_chunks() from the file instead of
+                loading it into memory
+            block_size: Characters per read in stream mode
+            tokenizer: Tokenizer spec (e.g. 'tiktoken:cl100k_base') used to
+                report per-chunk token counts
+            token_budget: Pass the tokenizer to the chunkers so chunk sizes
+                are measured in tokens
+            token_limit: Embedding model token window; chunks above it are
+                counted as over the limit
+            token_bin_width: Width of the token histogram bins
         """
         self.input_file = input_file
-
-        # Read input text
-        with open(input_file, 'r', encoding='utf-8') as f:
-            self.text = f.read()
-
-        self.text_length = len(self.text)
+        self.warmup = warmup
+        self.repeat = max(1, repeat)
+        self.stream = stream
+        self.block_size = block_size
+        self.tokenizer = tokenizer
+        self.counter = _core.get_token_counter(tokenizer)
+        self.token_budget = token_budget
+        self.token_limit = token_limit
+        self.token_bin_width = max(1, token_bin_width)
+        self.text = None
+
+        if token_budget and self.counter is None:
+            raise ValueError("token_budget needs a tokenizer")
         self.results = {}
+        self._runners: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+        if stream:
+            # Size the input without holding it
+            self.text_length = 0
+            self.text_bytes = 0
+            with open(input_file, 'r', encoding='utf-8') as f:
+                for block in iter(lambda: f.read(block_size), ''):
+                    self.text_length += len(block)
+                    self.text_bytes += len(block.encode('utf-8'))
+        else:
+            # Read input text
+            with open(input_file, 'r', encoding='utf-8') as f:
+                self.text = f.read()
+
+            self.text_length = len(self.text)
+            self.text_bytes = len(self.text.encode('utf-8'))
+
+    def _iter_stream(self, chunker) -> Iterator[Dict]:
+        """Stream chunks for the input file through the chunker's iter_chunks()."""
+        if not hasattr(chunker, "iter_chunks"):
+            raise ValueError(f"{type(chunker).__name__} does not support streaming")
+        with open(self.input_file, 'r', encoding='utf-8') as f:
+            yield from chunker.iter_chunks(f, block_size=self.block_size)
+
+    def _run(self, chunker):
+        """Chunk the input once (streamed runs drain the chunks without keeping them)."""
+        if self.stream:
+            deque(self._iter_stream(chunker), maxlen=0)
+            return None
+        return chunker.chunk(self.text)
+
+    def _measure(self, chunker, config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Time and profile one chunker configuration.
 
-    def run_fixed_size(self, chunk_size: int, overlap: int) -> Dict[str, Any]:
-        """Benchmark fixed-size chunking."""
-        start_time = time.time()
-
-        # Create temporary output file
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as tmp:
-            tmp_path = tmp.name
+        Timed trials run with the garbage collector disabled (as timeit does);
+        memory is measured in a separate tracemalloc pass because tracing
+        slows allocation-heavy code several-fold.
+        """
+        for _ in range(self.warmup):
+            self._run(chunker)
 
+        timings = []
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
         try:
-            # Get script directory
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            chunker_script = os.path.join(script_dir, "chunk-fixed-size.py")
-
-            # Run chunking script
-            subprocess.run([
-                "python3", chunker_script,
-                "--input", self.input_file,
-                "--output", tmp_path,
-                "--chunk-size", str(chunk_size),
-                "--overlap", str(overlap)
-            ], check=True, capture_output=True)
-
-            # Read results
-            with open(tmp_path, 'r') as f:
-                result = json.load(f)
-
-            elapsed = (time.time() - start_time) * 1000  # Convert to ms
-
-            # Calculate metrics
-            chunks = result["chunks"]
-            chunk_sizes = [c["metadata"]["chunk_size"] for c in chunks]
-
-            return {
-                "time_ms": round(elapsed, 2),
-                "chunk_count": len(chunks),
-                "avg_size": round(statistics.mean(chunk_sizes), 2),
-                "size_variance": round(statistics.variance(chunk_sizes), 2) if len(chunk_sizes) > 1 else 0,
-                "min_size": min(chunk_sizes),
-                "max_size": max(chunk_sizes),
-                "context_score": self._estimate_context_score(chunks),
-                "config": {
-                    "chunk_size": chunk_size,
-                    "overlap": overlap
-                }
-            }
+            for _ in range(self.repeat):
+                start = time.perf_counter()
+                chunks = self._run(chunker)
+                timings.append((time.perf_counter() - start) * 1000)
+                del chunks
+        finally:
+            if gc_was_enabled:
+                gc.enable()
 
+        gc.collect()
+        tracemalloc.start()
+        try:
+            if self.stream:
+                summary = self._summarize(self._iter_stream(chunker))
+                _, peak_bytes = tracemalloc.get_traced_memory()
+            else:
+                before = tracemalloc.take_snapshot()
+                chunks = chunker.chunk(self.text)
+                _, peak_bytes = tracemalloc.get_traced_memory()
+                after = tracemalloc.take_snapshot()
         finally:
-            # Clean up temp file
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
+            tracemalloc.stop()
+
+        # Blocks allocated by the run and still alive: the chunks and their
+        # metadata. A streamed run keeps no chunks, so there is nothing to count
+        allocs_per_chunk = None
+        if not self.stream:
+            retained_blocks = sum(
+                stat.count_diff for stat in after.compare_to(before, "filename") if stat.count_diff > 0
+            )
+            summary = self._summarize(chunks)
+            chunk_count = summary["chunk_count"]
+            allocs_per_chunk = round(retained_blocks / chunk_count, 1) if chunk_count else 0.0
+
+        return {
+            **self._timing_stats(timings),
+            "peak_memory_kb": round(peak_bytes / 1024, 1),
+            "allocs_per_chunk": allocs_per_chunk,
+            **summary,
+            "config": config
+        }
 
-    def run_semantic(self, max_chunk_size: int) -> Dict[str, Any]:
-        """Benchmark semantic chunking."""
-        start_time = time.time()
+    def _timing_stats(self, timings: List[float]) -> Dict[str, Any]:
+        """Median, min and spread of a list of trial times."""
+        median_ms = statistics.median(timings)
+        return {
+            "time_ms": round(median_ms, 3),
+            "time_ms_min": round(min(timings), 3),
+            "time_ms_stdev": round(statistics.stdev(timings), 3) if len(timings) > 1 else 0.0,
+            "trials": len(timings),
+            "timings_ms": [round(t, 3) for t in timings],
+            "throughput_mb_s": round(self.text_bytes / 1e6 / (median_ms / 1000), 2) if median_ms > 0 else 0.0
+        }
 
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as tmp:
-            tmp_path = tmp.name
+    def retime(self, names: Iterable[str]):
+        """
+        Run more timed trials for some configurations and pool them with
+        the existing ones (used to confirm suspected regressions).
+        """
+        for name in names:
+            runner = self._runners.get(name)
+            if runner is None or "error" in self.results.get(name, {"error": None}):
+                continue
+            extra = runner()
+            result = self.results[name]
+            result.update(self._timing_stats(result["timings_ms"] + extra["timings_ms"]))
+
+    def _summarize(self, chunks: Iterable[Dict]) -> Dict[str, Any]:
+        """
+        Chunk count, size statistics and context score in a single pass.
 
-        try:
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            chunker_script = os.path.join(script_dir, "chunk-semantic.py")
-
-            subprocess.run([
-                "python3", chunker_script,
-                "--input", self.input_file,
-                "--output", tmp_path,
-                "--max-chunk-size", str(max_chunk_size)
-            ], check=True, capture_output=True)
-
-            with open(tmp_path, 'r') as f:
-                result = json.load(f)
-
-            elapsed = (time.time() - start_time) * 1000
-
-            chunks = result["chunks"]
-            chunk_sizes = [c["metadata"]["chunk_size"] for c in chunks]
-
-            return {
-                "time_ms": round(elapsed, 2),
-                "chunk_count": len(chunks),
-                "avg_size": round(statistics.mean(chunk_sizes), 2),
-                "size_variance": round(statistics.variance(chunk_sizes), 2) if len(chunk_sizes) > 1 else 0,
-                "min_size": min(chunk_sizes),
-                "max_size": max(chunk_sizes),
-                "context_score": self._estimate_context_score(chunks),
-                "config": {
-                    "max_chunk_size": max_chunk_size
+        Only running sums are kept, so a streamed run is never materialized.
+        Integer sums keep the variance exact (as statistics.variance is).
+        With a tokenizer, each chunk's text is encoded in full (not summed
+        from cached segment counts) for the token histogram.
+        """
+        count = 0
+        size_sum = 0
+        size_sq_sum = 0
+        min_size = max_size = 0
+        context_points = 0.0
+        encode = self.counter.encode if self.counter is not None else None
+        token_sum = 0
+        min_tokens = max_tokens = 0
+        over_limit = 0
+        bins: Dict[int, int] = {}
+
+        for chunk in chunks:
+            size = chunk["metadata"]["chunk_size"]
+            if count == 0:
+                min_size = max_size = size
+            else:
+                min_size = min(min_size, size)
+                max_size = max(max_size, size)
+            count += 1
+            size_sum += size
+            size_sq_sum += size * size
+            context_points += self._context_points(chunk["text"])
+
+            if encode is not None:
+                tokens = len(encode(chunk["text"]))
+                min_tokens = tokens if count == 1 else min(min_tokens, tokens)
+                max_tokens = max(max_tokens, tokens)
+                token_sum += tokens
+                if self.token_limit is not None and tokens > self.token_limit:
+                    over_limit += 1
+                bin_start = tokens - tokens % self.token_bin_width
+                bins[bin_start] = bins.get(bin_start, 0) + 1
+
+        summary = {
+            "chunk_count": count,
+            "avg_size": round(size_sum / count, 2) if count else 0,
+            "size_variance": round((count * size_sq_sum - size_sum * size_sum) / (count * (count - 1)), 2)
+            if count > 1 else 0,
+            "min_size": min_size,
+            "max_size": max_size,
+            # Every chunk is checked for 2 points (see _context_points)
+            "context_score": round(context_points / (2 * count), 3) if count else 0.0
+        }
+
+        if encode is not None:
+            width = self.token_bin_width
+            summary["tokens"] = {
+                "tokenizer": self.counter.name,
+                "min": min_tokens,
+                "max": max_tokens,
+                "mean": round(token_sum / count, 2) if count else 0,
+                "limit": self.token_limit,
+                "over_limit": over_limit,
+                "histogram": {
+                    f"{start}-{start + width - 1}": bins[start] for start in sorted(bins)
                 }
             }
 
-        finally:
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
+        return summary
 
-    def run_recursive(self, chunk_size: int, overlap: int, preset: str = "text") -> Dict[str, Any]:
-        """Benchmark recursive chunking."""
-        start_time = time.time()
+    def _tokenizer_params(self) -> Dict[str, Any]:
+        """Chunker keyword arguments for token-budget runs."""
+        return {"tokenizer": self.tokenizer} if self.token_budget else {}
 
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as tmp:
-            tmp_path = tmp.name
+    def _config(self, **config) -> Dict[str, Any]:
+        """Benchmark config, tagged with the size unit."""
+        config["size_unit"] = "tokens" if self.token_budget else "characters"
+        return config
 
-        try:
-            script_dir = os.path.dirname(os.path.abspath(__file__))
-            chunker_script = os.path.join(script_dir, "chunk-recursive.py")
-
-            subprocess.run([
-                "python3", chunker_script,
-                "--input", self.input_file,
-                "--output", tmp_path,
-                "--chunk-size", str(chunk_size),
-                "--overlap", str(overlap),
-                "--preset", preset
-            ], check=True, capture_output=True)
-
-            with open(tmp_path, 'r') as f:
-                result = json.load(f)
-
-            elapsed = (time.time() - start_time) * 1000
-
-            chunks = result["chunks"]
-            chunk_sizes = [c["metadata"]["chunk_size"] for c in chunks]
-
-            return {
-                "time_ms": round(elapsed, 2),
-                "chunk_count": len(chunks),
-                "avg_size": round(statistics.mean(chunk_sizes), 2),
-                "size_variance": round(statistics.variance(chunk_sizes), 2) if len(chunk_sizes) > 1 else 0,
-                "min_size": min(chunk_sizes),
-                "max_size": max(chunk_sizes),
-                "context_score": self._estimate_context_score(chunks),
-                "config": {
-                    "chunk_size": chunk_size,
-                    "overlap": overlap,
-                    "preset": preset
-                }
-            }
+    def run_fixed_size(self, chunk_size: int, overlap: int) -> Dict[str, Any]:
+        """Benchmark fixed-size chunking."""
+        chunker = FixedSizeChunker(chunk_size=chunk_size, overlap=overlap, **self._tokenizer_params())
+        return self._measure(chunker, self._config(
+            chunk_size=chunk_size,
+            overlap=overlap
+        ))
 
-        finally:
-            if os.path.exists(tmp_path):
-                os.unlink(tmp_path)
+    def run_semantic(self, max_chunk_size: int) -> Dict[str, Any]:
+        """Benchmark semantic chunking."""
+        params = self._tokenizer_params()
+        if self.token_budget:
+            # The default 200-character minimum is roughly 50 tokens
+            params["min_chunk_size"] = min(50, max_chunk_size)
+        chunker = SemanticChunker(max_chunk_size=max_chunk_size, **params)
+        return self._measure(chunker, self._config(
+            max_chunk_size=max_chunk_size,
+            min_chunk_size=chunker.min_chunk_size
+        ))
 
-    def _estimate_context_score(self, chunks: List[Dict]) -> float:
+    def run_recursive(self, chunk_size: int, overlap: int, preset: str = "text") -> Dict[str, Any]:
+        """Benchmark recursive chunking."""
+        chunker = RecursiveChunker(
+            chunk_size=chunk_size,
+            overlap=overlap,
+            separators=SEPARATOR_PRESETS[preset],
+            **self._tokenizer_params()
+        )
+        return self._measure(chunker, self._config(
+            chunk_size=chunk_size,
+            overlap=overlap,
+            preset=preset
+        ))
+
+    def run_custom(self, chunk_size: int, overlap: int) -> Dict[str, Any]:
+        """Benchmark the custom splitter template."""
+        if self.token_budget:
+            raise ValueError("custom splitter template does not support token budgets")
+        chunker = CustomChunker(chunk_size=chunk_size, overlap=overlap)
+        return self._measure(chunker, self._config(
+            chunk_size=chunk_size,
+            overlap=overlap
+        ))
+
+    def _context_points(self, text: str) -> float:
         """
-        Estimate context preservation score (0-1).
+        Context preservation points for one chunk (0-2).
 
         Heuristic based on:
         - Paragraph completeness (fewer mid-paragraph breaks)
         - Sentence completeness
         - Chunk size consistency
         """
-        if not chunks:
-            return 0.0
-
-        score = 0.0
-        total_checks = 0
+        points = 0.0
 
-        for chunk in chunks:
-            text = chunk["text"]
+        # Check if chunk ends with sentence-ending punctuation
+        if text.rstrip().endswith(('.', '!', '?')):
+            points += 1
 
-            # Check if chunk ends with sentence-ending punctuation
-            if text.rstrip().endswith(('.', '!', '?')):
-                score += 1
-            total_checks += 1
+        # Check if chunk doesn't start/end mid-word
+        if not text.startswith(' ') or len(text.split()[0]) > 2:
+            points += 0.5
 
-            # Check if chunk doesn't start/end mid-word
-            if not text.startswith(' ') or len(text.split()[0]) > 2:
-                score += 0.5
-            total_checks += 0.5
+        # Check for paragraph boundaries
+        if '\n\n' in text:
+            points += 0.5
 
-            # Check for paragraph boundaries
-            if '\n\n' in text:
-                score += 0.5
-            total_checks += 0.5
-
-        return round(score / total_checks if total_checks > 0 else 0.0, 3)
+        return points
 
     def run_all(self, strategies: List[str], chunk_sizes: List[int],
                 overlaps: List[int] = None) -> Dict[str, Any]:
@@ -218,7 +357,7 @@ class ChunkingBenchmark:
         Run all requested benchmarks.
 
         Args:
-            strategies: List of strategies to test (fixed, semantic, recursive)
+            strategies: List of strategies to test (fixed, semantic, recursive, custom)
             chunk_sizes: List of chunk sizes to test
             overlaps: List of overlap sizes (default: 20% of chunk size)
 
@@ -241,25 +380,97 @@ class ChunkingBenchmark:
 
                 try:
                     if strategy == "fixed":
-                        result = self.run_fixed_size(chunk_size, overlap)
+                        runner = partial(self.run_fixed_size, chunk_size, overlap)
                     elif strategy == "semantic":
-                        result = self.run_semantic(chunk_size)
+                        runner = partial(self.run_semantic, chunk_size)
                     elif strategy == "recursive":
-                        result = self.run_recursive(chunk_size, overlap)
+                        runner = partial(self.run_recursive, chunk_size, overlap)
+                    elif strategy == "custom":
+                        runner = partial(self.run_custom, chunk_size, overlap)
                     else:
                         print(f"Unknown strategy: {strategy}")
                         continue
 
+                    self._runners[test_name] = runner
+                    result = runner()
                     results[test_name] = result
-                    print(f"✓ ({result['time_ms']}ms, {result['chunk_count']} chunks)")
+                    print(f"✓ ({result['time_ms']}ms ±{result['time_ms_stdev']}, "
+                          f"{result['throughput_mb_s']} MB/s, {result['chunk_count']} chunks)")
 
                 except Exception as e:
                     print(f"✗ Error: {e}")
                     results[test_name] = {"error": str(e)}
 
+        self.results = results
         return results
 
 
+def _time_regression(result: Dict[str, Any], base: Dict[str, Any], tolerance: float) -> Optional[float]:
+    """
+    Relative slowdown of the fastest trial, or None if it is within noise.
+
+    The fastest of N trials is the estimate least disturbed by scheduling
+    and frequency scaling, so it is what the tolerance applies to. A slowdown
+    past the tolerance still only counts when the medians differ by more
+    than two standard errors of the two runs' trial spread.
+    """
+    base_min = base.get("time_ms_min", base.get("time_ms"))
+    current_min = result.get("time_ms_min", result.get("time_ms"))
+    if not base_min or current_min is None:
+        return None
+    change = (current_min - base_min) / base_min
+    if change <= tolerance:
+        return None
+
+    noise = 2 * math.sqrt(
+        result.get("time_ms_stdev", 0.0) ** 2 / max(result.get("trials", 1), 1)
+        + base.get("time_ms_stdev", 0.0) ** 2 / max(base.get("trials", 1), 1)
+    )
+    if result["time_ms"] - base["time_ms"] <= noise:
+        return None
+    return change
+
+
+def compare_to_baseline(results: Dict[str, Any], baseline: Dict[str, Any],
+                        tolerance: float = 0.10) -> List[str]:
+    """
+    Compare results against a saved baseline.
+
+    A configuration regresses when its fastest trial is more than
+    ``tolerance`` (fraction) slower than the baseline's and the slowdown is
+    larger than the trial-to-trial noise (see _time_regression), or when
+    its peak memory grows by more than ``tolerance``. Configurations
+    missing from either side are ignored.
+
+    Returns:
+        List of regression descriptions (empty if none)
+    """
+    regressions = []
+    baseline_results = baseline.get("results", baseline)
+
+    for name, result in results.items():
+        base = baseline_results.get(name)
+        if not base or "error" in result or "error" in base:
+            continue
+
+        change = _time_regression(result, base, tolerance)
+        if change is not None:
+            regressions.append(
+                f"{name}: time_ms_min {base.get('time_ms_min', base['time_ms'])} -> "
+                f"{result['time_ms_min']} (+{change:.1%}; "
+                f"median {base['time_ms']} -> {result['time_ms']})"
+            )
+
+        if base.get("peak_memory_kb"):
+            change = (result["peak_memory_kb"] - base["peak_memory_kb"]) / base["peak_memory_kb"]
+            if change > tolerance:
+                regressions.append(
+                    f"{name}: peak_memory_kb {base['peak_memory_kb']} -> {result['peak_memory_kb']} (+{change:.1%})"
+                )
+
+    return regressions
+
+
 def main():
     parser = argparse.ArgumentParser(
         description="Benchmark chunking strategies and parameters"
@@ -277,7 +488,7 @@ def main():
     parser.add_argument(
         "--strategies",
         default="fixed,semantic,recursive",
-        help="Comma-separated list of strategies (default: fixed,semantic,recursive)"
+        help="Comma-separated list of strategies: fixed,semantic,recursive,custom (default: fixed,semantic,recursive)"
     )
     parser.add_argument(
         "--chunk-sizes",
@@ -288,6 +499,72 @@ def main():
         "--overlaps",
         help="Comma-separated overlap sizes (default: 20%% of chunk size)"
     )
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=1,
+        help="Untimed warmup runs per configuration (default: 1)"
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=5,
+        help="Timed trials per configuration (default: 5)"
+    )
+    parser.add_argument(
+        "--baseline",
+        help="Baseline results JSON to compare against (exit 2 on regression)"
+    )
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.10,
+        help="Allowed slowdown of the fastest trial / memory growth vs baseline "
+             "as a fraction; slowdowns within trial noise are ignored (default: 0.10)"
+    )
+    parser.add_argument(
+        "--confirm",
+        type=int,
+        default=2,
+        help="Rounds of extra trials for configurations that look regressed "
+             "before the baseline check fails (default: 2)"
+    )
+    parser.add_argument(
+        "--save-baseline",
+        help="Also write these results to this path for future comparisons"
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Stream the file through iter_chunks() instead of loading it (fixed, semantic)"
+    )
+    parser.add_argument(
+        "--block-size",
+        type=int,
+        default=DEFAULT_BLOCK_SIZE,
+        help=f"Characters per read with --stream (default: {DEFAULT_BLOCK_SIZE})"
+    )
+    parser.add_argument(
+        "--tokenizer",
+        help="Report per-chunk token counts with this tokenizer "
+             "(tiktoken:<encoding|model>, hf:<model>, whitespace)"
+    )
+    parser.add_argument(
+        "--token-budget",
+        action="store_true",
+        help="Measure chunk sizes and overlaps in tokens of --tokenizer"
+    )
+    parser.add_argument(
+        "--token-limit",
+        type=int,
+        help="Embedding model token window; chunks above it are reported"
+    )
+    parser.add_argument(
+        "--token-bin-width",
+        type=int,
+        default=64,
+        help="Token histogram bin width (default: 64)"
+    )
 
     args = parser.parse_args()
 
@@ -307,9 +584,25 @@ def main():
         print(f"Input: {args.input}")
         print(f"Strategies: {', '.join(strategies)}")
         print(f"Chunk sizes: {', '.join(map(str, chunk_sizes))}")
+        print(f"Trials: {args.warmup} warmup + {args.repeat} timed")
+        if args.stream:
+            print(f"Mode: streaming ({args.block_size} characters per read)")
+        if args.tokenizer:
+            unit = "chunk sizes in tokens" if args.token_budget else "token histogram only"
+            print(f"Tokenizer: {args.tokenizer} ({unit})")
         print(f"{'='*60}\n")
 
-        benchmark = ChunkingBenchmark(args.input)
+        benchmark = ChunkingBenchmark(
+            args.input,
+            warmup=args.warmup,
+            repeat=args.repeat,
+            stream=args.stream,
+            block_size=args.block_size,
+            tokenizer=args.tokenizer,
+            token_budget=args.token_budget,
+            token_limit=args.token_limit,
+            token_bin_width=args.token_bin_width
+        )
         results = benchmark.run_all(strategies, chunk_sizes, overlaps)
 
         # Find best strategy
@@ -319,7 +612,7 @@ def main():
         for name, result in results.items():
             if "error" not in result:
                 # Composite score: balance speed and context
-                speed_score = 1 / (result["time_ms"] / 100)  # Normalize
+                speed_score = 1 / (max(result["time_ms"], 1e-3) / 100)  # Normalize
                 context_score = result["context_score"]
                 composite = (speed_score * 0.3) + (context_score * 0.7)
 
@@ -327,10 +620,32 @@ def main():
                     best_score = composite
                     best_strategy = name
 
+        regressions = []
+        if args.baseline:
+            with open(args.baseline, 'r') as f:
+                baseline = json.load(f)
+            regressions = compare_to_baseline(results, baseline, args.tolerance)
+
+            # A slowdown must survive more trials (pooled with the first
+            # ones) to count: one noisy burst is not a regression
+            for _ in range(args.confirm):
+                suspects = [name for name in results
+                            if any(r.startswith(f"{name}: time_ms") for r in regressions)]
+                if not suspects:
+                    break
+                print(f"Re-timing {len(suspects)} suspected regression(s): {', '.join(suspects)}")
+                benchmark.retime(suspects)
+                regressions = compare_to_baseline(results, baseline, args.tolerance)
+
         # Write results
         output = {
             "input_file": args.input,
             "text_length": benchmark.text_length,
+            "text_bytes": benchmark.text_bytes,
+            "mode": "stream" if args.stream else "in_memory",
+            "tokenizer": args.tokenizer,
+            "size_unit": "tokens" if args.token_budget else "characters",
+            "python": sys.version.split()[0],
             "results": results,
             "recommendation": {
                 "best_strategy": best_strategy,
@@ -338,27 +653,59 @@ def main():
                 "reason": "Optimal balance of speed and context preservation"
             }
         }
+        if args.baseline:
+            output["baseline"] = {
+                "path": args.baseline,
+                "tolerance": args.tolerance,
+                "regressions": regressions
+            }
 
         with open(args.output, 'w') as f:
             json.dump(output, f, indent=2)
 
+        if args.save_baseline:
+            with open(args.save_baseline, 'w') as f:
+                json.dump(output, f, indent=2)
+
         # Print summary
-        print(f"\n{'='*60}")
+        print(f"\n{'='*78}")
         print("RESULTS SUMMARY")
-        print(f"{'='*60}")
-        print(f"{'Strategy':<20} {'Time':<10} {'Chunks':<8} {'Context':<10}")
-        print(f"{'-'*60}")
+        print(f"{'='*78}")
+        print(f"{'Strategy':<20} {'Time ms':<10} {'MB/s':<9} {'Peak KB':<11} {'Allocs/ch':<10} {'Chunks':<8} {'Context':<8}")
+        print(f"{'-'*78}")
 
         for name, result in sorted(results.items()):
             if "error" not in result:
-                print(f"{name:<20} {result['time_ms']:<10.1f} {result['chunk_count']:<8} {result['context_score']:<10.3f}")
-
-        print(f"{'='*60}")
+                allocs = result["allocs_per_chunk"]
+                allocs = "-" if allocs is None else f"{allocs:.1f}"
+                print(f"{name:<20} {result['time_ms']:<10.2f} {result['throughput_mb_s']:<9.2f} "
+                      f"{result['peak_memory_kb']:<11.1f} {allocs:<10} "
+                      f"{result['chunk_count']:<8} {result['context_score']:<8.3f}")
+
+        if args.tokenizer:
+            print(f"{'-'*78}")
+            print(f"{'Tokens':<20} {'Min':<10} {'Mean':<9} {'Max':<11} {'Over limit':<10}")
+            for name, result in sorted(results.items()):
+                if "error" not in result:
+                    tokens = result["tokens"]
+                    over = tokens["over_limit"] if tokens["limit"] is not None else "-"
+                    print(f"{name:<20} {tokens['min']:<10} {tokens['mean']:<9.1f} "
+                          f"{tokens['max']:<11} {over:<10}")
+
+        print(f"{'='*78}")
         print(f"\nRecommended: {best_strategy}")
         print(f"Output written to: {args.output}\n")
 
-    except FileNotFoundError:
-        print(f"Error: Input file '{args.input}' not found", file=sys.stderr)
+        if regressions:
+            print(f"✗ {len(regressions)} regression(s) vs {args.baseline}:", file=sys.stderr)
+            for regression in regressions:
+                print(f"  {regression}", file=sys.stderr)
+            sys.exit(2)
+        elif args.baseline:
+            print(f"✓ No regressions vs {args.baseline} (tolerance {args.tolerance:.0%})")
+
+    except FileNotFoundError as e:
+        print(f"Error: File '{e.filename}' not found", file=sys.stderr)
         sys.exit(1)
     except ValueError as e:
         print(f"Error: Invalid argument - {e}", file=sys.stderr)
@@ -0,0 +1,579 @@
+#!/usr/bin/env python3
+"""
+Offset-Based Chunking Core
+
+Shared building blocks for the chunkers. Text is never re-concatenated
+while a chunk grows: pieces are tracked as (start, end) offsets into the
+source string, chunk length is kept arithmetically, and the chunk string is
+built once when it is emitted. Overlap is computed from offsets (or from the
+emitted chunk) instead of re-joining word lists.
+
+All helpers reproduce the exact splitting semantics of the str/re calls
+they replace (str.split, re.split), so chunk output is unchanged while the
+cost becomes linear in the input size.
+
+The stream helpers at the end apply the same semantics to text that arrives
+in blocks (a file object read incrementally, or any iterable of strings), so
+``iter_chunks(stream)`` yields exactly what ``chunk(stream.read())`` returns
+while holding only a bounded lookahead buffer plus the chunk being built.
+
+With a TokenCounter, ChunkBuffer and WordIndex measure chunks in tokens
+instead of characters (see "Token budgets" below).
+"""
+
+import re
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from itertools import accumulate, chain
+from typing import Callable, Iterable, Iterator, List, Optional, Pattern, Sequence, Tuple, Union
+
+Span = Tuple[int, int]
+
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])\s+')
+PARAGRAPH_BOUNDARY = re.compile(r'\n\s*\n')
+WHITESPACE = re.compile(r'\s+')
+
+# Characters requested per read() when streaming
+DEFAULT_BLOCK_SIZE = 1 << 20
+
+
+def iter_pattern_spans(text: str, pattern: Pattern, start: int = 0,
+                       end: Optional[int] = None) -> Iterator[Span]:
+    """Spans of the pieces ``re.split(pattern, text[start:end])`` would return."""
+    end = len(text) if end is None else end
+    pos = start
+    for match in pattern.finditer(text, start, end):
+        yield pos, match.start()
+        pos = match.end()
+    yield pos, end
+
+
+def iter_separator_spans(text: str, separator: str, start: int = 0,
+                         end: Optional[int] = None) -> Iterator[Span]:
+    """Spans of the pieces ``text[start:end].split(separator)`` would return."""
+    end = len(text) if end is None else end
+    step = len(separator)
+    pos = start
+    while True:
+        found = text.find(separator, pos, end)
+        if found < 0:
+            yield pos, end
+            return
+        yield pos, found
+        pos = found + step
+
+
+def strip_span(text: str, start: int, end: int) -> Span:
+    """Offsets of ``text[start:end].strip()`` without copying the piece."""
+    while start < end and text[start].isspace():
+        start += 1
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+
+def tail_span(start: int, end: int, size: int) -> Span:
+    """Last ``size`` characters of a span (the whole span if it is shorter)."""
+    return (end - size if end - start > size else start), end
+
+
+class ChunkBuffer:
+    """
+    Greedy chunk accumulator.
+
+    Parts are spans into ``text`` (or literal strings, e.g. an overlap
+    prefix) joined by ``joiner``. ``len(buffer)`` equals the length of the
+    joined string, so size checks are O(1); ``build()`` materializes the
+    chunk once. An empty buffer behaves like the empty string in
+    ``current + joiner + piece if current else piece``.
+
+    With a ``counter``, ``len(buffer)`` is the chunk's token count instead,
+    kept as the sum of each part's count (taken with the joiner in front).
+    """
+
+    __slots__ = ("text", "joiner", "parts", "length", "counter")
+
+    def __init__(self, text: str, joiner: str, counter: Optional["TokenCounter"] = None):
+        self.text = text
+        self.joiner = joiner
+        self.parts: List[Union[Span, str]] = []
+        self.length = 0
+        self.counter = counter
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __bool__(self) -> bool:
+        return self.length > 0
+
+    def size_with(self, size: int) -> int:
+        """Length after appending a part of ``size`` characters."""
+        return self.length + len(self.joiner) + size if self.length else size
+
+    def size_after(self, part: Union[Span, str]) -> int:
+        """Length (characters, or tokens with a counter) after appending ``part``."""
+        if self.counter is None:
+            return self.size_with(part[1] - part[0] if isinstance(part, tuple) else len(part))
+
+        piece = self.text[part[0]:part[1]] if isinstance(part, tuple) else part
+        if not self.length:
+            return self.counter.count(piece)
+        return self.length + self.counter.count(self.joiner + piece)
+
+    def add(self, part: Union[Span, str], length: Optional[int] = None):
+        """Append a span or literal string (``length``: its size_after, if known)."""
+        if length is None:
+            length = self.size_after(part)
+        if not self.length:
+            # Mirrors ``piece if not current``: empty leftovers are dropped
+            self.parts.clear()
+        self.length = length
+        self.parts.append(part)
+
+    def rebase(self, text: str):
+        """
+        Point the buffer at a new source string (the next stream segment).
+
+        Spans into the old source are copied out first, so only the open
+        chunk's pieces are kept alive.
+        """
+        old = self.text
+        self.parts = [p if isinstance(p, str) else old[p[0]:p[1]] for p in self.parts]
+        self.text = text
+
+    def reset(self, prefix: str = ""):
+        """Start a new chunk, optionally seeded with an overlap prefix."""
+        self.parts = [prefix] if prefix else []
+        if self.counter is not None and prefix:
+            self.length = self.counter.count(prefix)
+        else:
+            self.length = len(prefix)
+
+    def build(self) -> str:
+        """Materialize the joined chunk string."""
+        text = self.text
+        pieces = [p if isinstance(p, str) else text[p[0]:p[1]] for p in self.parts]
+        return self.joiner.join(pieces)
+
+
+class WordIndex:
+    """
+    Whitespace-normalized view of a text for word-window chunking.
+
+    ``cum[i]`` is the offset of word ``i`` in ``" ".join(text.split())``
+    (equivalently, the sum of ``len(word) + 1`` for the preceding words), so
+    a window of words is one slice of the normalized string and any window's
+    size is a subtraction.
+
+    Sizes come from ``sizes``, which is ``cum`` itself unless a ``counter``
+    is given; then it holds prefix sums of each word's token count taken
+    with a leading space (repeated words are cache hits).
+    """
+
+    def __init__(self, text: str, counter: Optional["TokenCounter"] = None):
+        words = text.split()
+        self.normalized = " ".join(words)
+        self.cum = array('q', accumulate((len(w) + 1 for w in words), initial=0))
+        self.count = len(words)
+        if counter is None:
+            self.sizes = self.cum
+        else:
+            count = counter.count
+            self.sizes = array('q', accumulate((count(" " + w) for w in words), initial=0))
+
+    def size(self, start: int, end: int) -> int:
+        """Sum of len(word) + 1 (or word tokens) over words[start:end]."""
+        return self.sizes[end] - self.sizes[start]
+
+    def slice(self, start: int, end: int) -> str:
+        """``" ".join(words[start:end])``."""
+        return self.normalized[self.cum[start]:self.cum[end] - 1] if end > start else ""
+
+    def fit_end(self, start: int, end: int, limit: int) -> int:
+        """
+        Extend words[start:end] greedily while its size stays within ``limit``.
+
+        Returns the new end (``end`` itself if the next word does not fit).
+        Binary search makes this O(log n) per chunk instead of a loop per word.
+        """
+        return bisect_right(self.sizes, self.sizes[start] + limit, end + 1, self.count + 1) - 1
+
+    def overlap_start(self, start: int, end: int, overlap: int) -> int:
+        """First word of the longest suffix of words[start:end] whose size fits in ``overlap``."""
+        return bisect_left(self.sizes, self.sizes[end] - overlap, start, end)
+
+
+# =======================
+# Token budgets
+# =======================
+
+_WORD = re.compile(r'\S+')
+
+
+class TokenCounter:
+    """
+    Token counts from a pluggable tokenizer, memoized per text segment.
+
+    Chunkers size a chunk by adding up the counts of the segments it joins
+    (sentences, words, sections, each counted with the joiner in front), so
+    boundary search never re-tokenizes the growing chunk and segments that
+    recur (words, headers, boilerplate) are cache hits. For tokenizers that
+    pre-split on whitespace - tiktoken's BPE encodings, WordPiece,
+    SentencePiece - the sum equals the count of the joined text.
+
+    ``encode`` is any callable returning a token sequence. Special tokens
+    the embedding model adds ([CLS]/[SEP], BOS/EOS) are not counted, so
+    leave room for them in the budget. Only segments up to
+    ``max_cached_length`` characters are cached, so large pieces are never
+    kept alive by the cache.
+    """
+
+    def __init__(self, encode: Callable[[str], Sequence], name: str = "custom",
+                 cache_size: int = 1 << 16, max_cached_length: int = 4096):
+        self.encode = encode
+        self.name = name
+        self.max_cached_length = max_cached_length
+        self._cached_count = lru_cache(maxsize=cache_size)(self._count)
+
+    def _count(self, text: str) -> int:
+        return len(self.encode(text))
+
+    def count(self, text: str) -> int:
+        """Number of tokens in ``text``."""
+        if len(text) > self.max_cached_length:
+            return len(self.encode(text))
+        return self._cached_count(text)
+
+    def tail(self, text: str, budget: int) -> str:
+        """
+        Longest suffix of ``text`` made of whole words within ``budget`` tokens.
+
+        The per-word counts pick a candidate start; the returned suffix
+        itself (whitespace runs included, with one joining space) is then
+        counted, and leading words are dropped until it fits, so the suffix
+        still fits when it is joined in front of more text.
+        """
+        starts = [match.start() for match in _WORD.finditer(text)]
+        first = len(starts)
+        used = 0
+        for i in range(len(starts) - 1, -1, -1):
+            used += self.count(" " + text[starts[i]:_WORD.match(text, starts[i]).end()])
+            if used > budget:
+                break
+            first = i
+        while first < len(starts) and self.count(" " + text[starts[first]:]) > budget:
+            first += 1
+        return text[starts[first]:] if first < len(starts) else ""
+
+    def fit_prefix(self, text: str, start: int, end: int, budget: int) -> int:
+        """
+        End of the longest prefix of text[start:end] within ``budget`` tokens.
+
+        Used for text with no usable separator. Binary search over the
+        prefix length (at least one character is always taken); the search
+        range is capped at 32 characters per token of budget.
+        """
+        hi = min(end, start + max(1, budget) * 32)
+        if len(self.encode(text[start:hi])) <= budget:
+            return hi
+        lo = start + 1
+        hi -= 1
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if len(self.encode(text[start:mid])) <= budget:
+                lo = mid
+            else:
+                hi = mid - 1
+        return lo
+
+    def cache_info(self):
+        """Hit/miss statistics of the per-segment count cache."""
+        return self._cached_count.cache_info()
+
+
+@lru_cache(maxsize=None)
+def load_token_counter(spec: str) -> TokenCounter:
+    """
+    Build (once per spec) a counter from a spec string:
+
+    - ``tiktoken:<encoding or model>``, e.g. ``tiktoken:cl100k_base``
+    - ``hf:<model name or tokenizer.json path>`` (``tokenizers``, falling
+      back to ``transformers``)
+    - ``whitespace``: dependency-free word count, for tests and rough budgets
+    """
+    backend, _, name = spec.partition(":")
+
+    if backend == "whitespace":
+        return TokenCounter(str.split, name="whitespace")
+
+    if backend == "tiktoken":
+        try:
+            import tiktoken
+        except ImportError:
+            raise ImportError("tiktoken not installed. Run: pip install tiktoken")
+        name = name or "cl100k_base"
+        try:
+            encoding = tiktoken.get_encoding(name)
+        except ValueError:
+            encoding = tiktoken.encoding_for_model(name)
+        return TokenCounter(encoding.encode_ordinary, name=f"tiktoken:{encoding.name}")
+
+    if backend == "hf":
+        if not name:
+            raise ValueError("hf tokenizer spec needs a model name, e.g. hf:BAAI/bge-small-en-v1.5")
+        try:
+            from tokenizers import Tokenizer
+
+            if name.endswith(".json"):
+                tokenizer = Tokenizer.from_file(name)
+            else:
+                tokenizer = Tokenizer.from_pretrained(name)
+            return TokenCounter(
+                lambda text: tokenizer.encode(text, add_special_tokens=False).ids, name=f"hf:{name}"
+            )
+        except ImportError:
+            pass
+        try:
+            from transformers import AutoTokenizer
+        except ImportError:
+            raise ImportError("Hugging Face tokenizers not installed. Run: pip install tokenizers")
+        tokenizer = AutoTokenizer.from_pretrained(name)
+        return TokenCounter(
+            lambda text: tokenizer.encode(text, add_special_tokens=False), name=f"hf:{name}"
+        )
+
+    raise ValueError(f"Unknown tokenizer spec: {spec} (use tiktoken:<name>, hf:<model> or whitespace)")
+
+
+def get_token_counter(tokenizer) -> Optional[TokenCounter]:
+    """Resolve a chunker's ``tokenizer`` argument: None, a spec string, a TokenCounter or an encode callable."""
+    if tokenizer is None or isinstance(tokenizer, TokenCounter):
+        return tokenizer
+    if isinstance(tokenizer, str):
+        return load_token_counter(tokenizer)
+    if callable(tokenizer):
+        return TokenCounter(tokenizer, name=getattr(tokenizer, "__qualname__", "custom"))
+    raise TypeError(f"Unsupported tokenizer: {tokenizer!r}")
+
+
+# =======================
+# Streaming
+# =======================
+
+def read_blocks(stream, block_size: int = DEFAULT_BLOCK_SIZE) -> Iterator[str]:
+    """
+    Text blocks from a file-like object (via ``read(block_size)``) or from
+    any iterable of strings (yielded as-is).
+    """
+    read = getattr(stream, "read", None)
+    if read is None:
+        yield from stream
+        return
+    while True:
+        block = read(block_size)
+        if not block:
+            return
+        yield block
+
+
+def read_ahead(blocks: Iterable[str], size: int) -> Tuple[str, Iterator[str]]:
+    """
+    Read at least ``size`` characters from ``blocks`` (fewer only at the end).
+
+    Returns the text read and an iterator over the whole stream, the text
+    read included, so the caller can peek without losing anything.
+    """
+    blocks = iter(blocks)
+    head = []
+    total = 0
+    for block in blocks:
+        head.append(block)
+        total += len(block)
+        if total >= size:
+            break
+    text = "".join(head)
+    return text, chain([text], blocks)
+
+
+def iter_lines(blocks: Iterable[str]) -> Iterator[str]:
+    """The lines ``text.split("\\n")`` would return, read from a block stream."""
+    pending: List[str] = []
+    for block in blocks:
+        if "\n" not in block:
+            pending.append(block)
+            continue
+        lines = block.split("\n")
+        if pending:
+            pending.append(lines[0])
+            lines[0] = "".join(pending)
+        pending = [lines.pop()]
+        yield from lines
+    yield "".join(pending)
+
+
+def join_lines(lines: Iterable[str]) -> Iterator[str]:
+    """Blocks whose concatenation is ``"\\n".join(lines)`` (the inverse of iter_lines)."""
+    first = True
+    for line in lines:
+        yield line if first else "\n" + line
+        first = False
+
+
+def iter_windows(blocks: Iterable[str], size: int, step: int) -> Iterator[str]:
+    """``text[i:i + size] for i in range(0, len(text), step)`` over a block stream."""
+    buffer = ""
+    for block in blocks:
+        buffer += block
+        start = 0
+        while start + size <= len(buffer):
+            yield buffer[start:start + size]
+            start += step
+        buffer = buffer[start:]
+
+    start = 0
+    while start < len(buffer):
+        yield buffer[start:start + size]
+        start += step
+
+
+def iter_segments(blocks: Iterable[str], pattern: Pattern,
+                  min_size: int = DEFAULT_BLOCK_SIZE) -> Iterator[str]:
+    """
+    Re-cut a block stream into segments that end on a ``pattern`` match.
+
+    The match between two segments is dropped, so splitting every segment
+    with ``pattern`` gives exactly the pieces ``re.split(pattern, text)``
+    gives for the whole text. ``pattern`` must match whitespace only (as the
+    boundary patterns above do): a match is final once a non-space character
+    follows it in the buffer, because more input can then no longer extend
+    it. Segments are at least ``min_size`` characters unless the stream
+    ends; when no boundary is found the buffer doubles before the next scan,
+    keeping the total scanning work linear.
+    """
+    carry = ""
+    pending: List[str] = []
+    pending_size = 0
+    needed = min_size
+
+    for block in blocks:
+        pending.append(block)
+        pending_size += len(block)
+        if pending_size < needed:
+            continue
+
+        buffer = carry + "".join(pending)
+        pending = []
+        pending_size = 0
+
+        last = _last_boundary(buffer, pattern)
+        if last is None:
+            carry = buffer
+            needed = len(buffer)
+            continue
+
+        yield buffer[:last.start()]
+        carry = buffer[last.end():]
+        needed = min_size
+
+    yield carry + "".join(pending)
+
+
+def _last_boundary(buffer: str, pattern: Pattern) -> Optional[re.Match]:
+    """
+    Last final ``pattern`` match in ``buffer`` (see iter_segments).
+
+    Scanning starts near the end and widens until a match is found. A scan
+    only ever starts right after a non-space character, where no match can
+    be in progress, so it sees the same matches a scan from 0 would.
+    """
+    # Only matches before the last non-space character are final
+    stop = len(buffer.rstrip())
+    window = 4096
+    while True:
+        start = max(0, stop - window)
+        while start > 0 and buffer[start - 1].isspace():
+            start -= 1
+
+        last = None
+        for last in pattern.finditer(buffer, start, stop):
+            pass
+        if last is not None or start == 0:
+            return last
+        window *= 4
+
+
+class StreamSplitter:
+    """
+    Incremental ``text.split(separator)`` over a block stream.
+
+    Iterating yields every piece in order: pieces of at most ``limit``
+    characters as strings, longer pieces as an iterator over their text so
+    the caller can split them further without holding them in memory. A
+    long piece's iterator must be consumed before the next piece is
+    requested; whatever is left unread is skipped.
+    """
+
+    def __init__(self, blocks: Iterable[str], separator: str, limit: int):
+        if not separator:
+            raise ValueError("separator must be non-empty")
+        self.blocks = iter(blocks)
+        self.separator = separator
+        self.limit = limit
+        self.buffer = ""
+        self.pos = 0
+        self.exhausted = False
+        self.finished = False
+
+    def _fill(self) -> bool:
+        """Append the next block, dropping the text already consumed."""
+        for block in self.blocks:
+            if block:
+                self.buffer = self.buffer[self.pos:] + block
+                self.pos = 0
+                return True
+        self.exhausted = True
+        return False
+
+    def __iter__(self) -> Iterator[Union[str, Iterator[str]]]:
+        while not self.finished:
+            found = self.buffer.find(self.separator, self.pos)
+            if 0 <= found <= self.pos + self.limit:
+                piece = self.buffer[self.pos:found]
+                self.pos = found + len(self.separator)
+                yield piece
+            elif found >= 0 or len(self.buffer) - self.pos > self.limit:
+                long_piece = self._iter_long_piece()
+                yield long_piece
+                for _ in long_piece:
+                    pass
+            elif self.exhausted or not self._fill():
+                # Last piece (possibly empty, as with str.split)
+                self.finished = True
+                yield self.buffer[self.pos:]
+
+    def _iter_long_piece(self) -> Iterator[str]:
+        """Text of the current piece, block by block, up to the next separator."""
+        # A separator may straddle two blocks: hold back its length - 1
+        keep = len(self.separator) - 1
+        while True:
+            found = self.buffer.find(self.separator, self.pos)
+            if found >= 0:
+                piece = self.buffer[self.pos:found]
+                self.pos = found + len(self.separator)
+                yield piece
+                return
+
+            if self.exhausted:
+                self.finished = True
+                piece = self.buffer[self.pos:]
+                self.pos = len(self.buffer)
+                yield piece
+                return
+
+            cut = len(self.buffer) - keep
+            if cut > self.pos:
+                piece = self.buffer[self.pos:cut]
+                self.pos = cut
+                yield piece
+            self._fill()
@@ -9,28 +9,44 @@ Fast and predictable chunking for uniform content.
 import argparse
 import json
 import sys
-from typing import List, Dict
-import re
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List
+
+
+SKILLS_DIR = Path(__file__).resolve().parents[2]
+if str(SKILLS_DIR) not in sys.path:
+    sys.path.insert(0, str(SKILLS_DIR))
+from template_loader import load_template  # noqa: E402
+
+
+chunk_core = load_template(Path(__file__).with_name("chunk-core.py"))
 
 
 class FixedSizeChunker:
     """Fixed-size document chunking with overlap support."""
 
-    def __init__(self, chunk_size: int = 1000, overlap: int = 200, split_on: str = "sentence"):
+    def __init__(self, chunk_size: int = 1000, overlap: int = 200, split_on: str = "sentence",
+                 tokenizer=None):
         """
         Initialize fixed-size chunker.
 
         Args:
-            chunk_size: Target chunk size in characters
-            overlap: Character overlap between consecutive chunks
+            chunk_size: Target chunk size in characters (tokens with a tokenizer)
+            overlap: Character overlap between consecutive chunks (tokens with a
+                tokenizer; the overlap is then made of whole words)
             split_on: Split on 'sentence', 'word', or 'character'
+            tokenizer: Optional token budget: a spec such as 'tiktoken:cl100k_base'
+                or 'hf:<model>', a chunk_core.TokenCounter, or an encode callable
         """
         self.chunk_size = chunk_size
         self.overlap = overlap
         self.split_on = split_on
+        self.counter = chunk_core.get_token_counter(tokenizer)
 
         if overlap >= chunk_size:
             raise ValueError("Overlap must be less than chunk_size")
+        if self.counter is not None and split_on == "character":
+            raise ValueError("Token budgets need split_on='sentence' or 'word'")
 
     def chunk(self, text: str, metadata: Dict = None) -> List[Dict]:
         """
@@ -43,22 +59,49 @@ class FixedSizeChunker:
         Returns:
             List of chunks with metadata
         """
-        if metadata is None:
-            metadata = {}
+        return list(self._format_chunks(self._iter_chunk_texts([text]), metadata))
 
-        chunks = []
+    def iter_chunks(self, stream, metadata: Dict = None,
+                    block_size: int = chunk_core.DEFAULT_BLOCK_SIZE) -> Iterator[Dict]:
+        """
+        Chunk a text stream incrementally.
+
+        Yields the same chunks ``chunk(stream.read())`` would return, but
+        reads ``block_size`` characters at a time and only keeps the
+        unfinished sentence/word tail and the open chunk, so memory stays
+        flat regardless of the input size.
+
+        Args:
+            stream: Text file object or iterable of strings
+            metadata: Optional metadata to include in chunks
+            block_size: Characters per read
 
+        Yields:
+            Chunks with metadata
+        """
+        blocks = chunk_core.read_blocks(stream, block_size)
         if self.split_on == "sentence":
-            chunks = self._chunk_by_sentence(text)
+            blocks = chunk_core.iter_segments(blocks, chunk_core.SENTENCE_BOUNDARY, block_size)
         elif self.split_on == "word":
-            chunks = self._chunk_by_word(text)
+            blocks = chunk_core.iter_segments(blocks, chunk_core.WHITESPACE, block_size)
+        return self._format_chunks(self._iter_chunk_texts(blocks), metadata)
+
+    def _iter_chunk_texts(self, segments: Iterable[str]) -> Iterator[str]:
+        """Chunk strings for text given as consecutive segments."""
+        if self.split_on == "sentence":
+            return self._chunk_by_sentence(segments)
+        elif self.split_on == "word":
+            return self._chunk_by_word(segments)
         else:  # character
-            chunks = self._chunk_by_character(text)
+            return self._chunk_by_character(segments)
+
+    def _format_chunks(self, chunks: Iterable[str], metadata: Dict = None) -> Iterator[Dict]:
+        """Attach metadata to chunk strings."""
+        if metadata is None:
+            metadata = {}
 
-        # Add metadata
-        result = []
         for i, chunk_text in enumerate(chunks):
-            result.append({
+            yield {
                 "text": chunk_text.strip(),
                 "metadata": {
                     **metadata,
@@ -68,108 +111,97 @@ class FixedSizeChunker:
                     "params": {
                         "chunk_size": self.chunk_size,
                         "overlap": self.overlap,
-                        "split_on": self.split_on
+                        "split_on": self.split_on,
+                        "tokenizer": self.counter.name if self.counter else None
                     }
                 }
-            })
+            }
 
-        return result
-
-    def _chunk_by_sentence(self, text: str) -> List[str]:
+    def _chunk_by_sentence(self, segments: Iterable[str]) -> Iterator[str]:
         """Chunk by complete sentences."""
-        # Simple sentence splitting (can be improved with nltk)
-        sentences = re.split(r'(?<=[.!?])\s+', text)
-
-        chunks = []
-        current_chunk = ""
+        # Simple sentence splitting (can be improved with nltk); sentences are
+        # offsets into the current segment and each chunk string is built
+        # once when emitted
+        current_chunk = chunk_core.ChunkBuffer("", " ", self.counter)
         overlap_buffer = ""
 
-        for sentence in sentences:
-            # Add sentence to current chunk
-            test_chunk = current_chunk + " " + sentence if current_chunk else sentence
-
-            if len(test_chunk) <= self.chunk_size:
-                current_chunk = test_chunk
-            else:
-                # Current chunk is full, save it
-                if current_chunk:
-                    chunks.append(current_chunk)
-
-                    # Prepare overlap for next chunk
-                    overlap_buffer = self._get_overlap_text(current_chunk, self.overlap)
-
-                # Start new chunk with overlap + current sentence
-                current_chunk = overlap_buffer + " " + sentence if overlap_buffer else sentence
+        for segment in segments:
+            current_chunk.rebase(segment)
+
+            for sentence in chunk_core.iter_pattern_spans(segment, chunk_core.SENTENCE_BOUNDARY):
+                # Add sentence to current chunk
+                size = current_chunk.size_after(sentence)
+                if size <= self.chunk_size:
+                    current_chunk.add(sentence, size)
+                else:
+                    # Current chunk is full, save it
+                    if current_chunk:
+                        chunk_text = current_chunk.build()
+                        yield chunk_text
+
+                        # Prepare overlap for next chunk (with a token budget,
+                        # only as much as still leaves room for the sentence)
+                        overlap_size = self.overlap
+                        if self.counter is not None:
+                            sentence_tokens = self.counter.count(" " + segment[sentence[0]:sentence[1]])
+                            overlap_size = min(overlap_size, self.chunk_size - sentence_tokens)
+                        overlap_buffer = self._get_overlap_text(chunk_text, overlap_size)
+
+                    # Start new chunk with overlap + current sentence
+                    current_chunk.reset(overlap_buffer)
+                    current_chunk.add(sentence)
 
         # Add final chunk
         if current_chunk:
-            chunks.append(current_chunk)
+            yield current_chunk.build()
 
-        return chunks
-
-    def _chunk_by_word(self, text: str) -> List[str]:
+    def _chunk_by_word(self, segments: Iterable[str]) -> Iterator[str]:
         """Chunk by complete words."""
-        words = text.split()
-        chunks = []
-        current_chunk = []
-        current_size = 0
-
-        for word in words:
-            word_size = len(word) + 1  # +1 for space
-            if current_size + word_size <= self.chunk_size:
-                current_chunk.append(word)
-                current_size += word_size
-            else:
-                # Save current chunk
-                if current_chunk:
-                    chunks.append(" ".join(current_chunk))
-
-                # Calculate overlap words
-                overlap_words = self._get_overlap_words(current_chunk, self.overlap)
-
-                # Start new chunk with overlap
-                current_chunk = overlap_words + [word]
-                current_size = sum(len(w) + 1 for w in current_chunk)
+        # Chunks are [start, end) word windows; sizes come from prefix sums.
+        # The open window's words are carried into the next segment.
+        carry = ""
+        carry_count = 0
+
+        for segment in segments:
+            words = chunk_core.WordIndex(f"{carry} {segment}" if carry else segment, self.counter)
+            start, end = 0, carry_count
+
+            while True:
+                # Add every following word that still fits (word + 1 space each)
+                end = words.fit_end(start, end, self.chunk_size)
+                if end == words.count:
+                    break
+
+                # words[end] does not fit: save current chunk
+                if end > start:
+                    yield words.slice(start, end)
+
+                # Start new chunk with the overlap words + the word that did not fit
+                overlap_size = self.overlap
+                if self.counter is not None:
+                    overlap_size = min(overlap_size, self.chunk_size - words.size(end, end + 1))
+                start = words.overlap_start(start, end, overlap_size)
+                end += 1
+
+            carry = words.slice(start, end)
+            carry_count = end - start
 
         # Add final chunk
-        if current_chunk:
-            chunks.append(" ".join(current_chunk))
-
-        return chunks
+        if carry_count:
+            yield carry
 
-    def _chunk_by_character(self, text: str) -> List[str]:
+    def _chunk_by_character(self, blocks: Iterable[str]) -> Iterator[str]:
         """Chunk by fixed character count."""
-        chunks = []
-        start = 0
-
-        while start < len(text):
-            end = min(start + self.chunk_size, len(text))
-            chunks.append(text[start:end])
-            start += self.chunk_size - self.overlap
-
-        return chunks
+        return chunk_core.iter_windows(blocks, self.chunk_size, self.chunk_size - self.overlap)
 
     def _get_overlap_text(self, text: str, overlap_size: int) -> str:
         """Get overlap text from end of chunk."""
+        if self.counter is not None:
+            return self.counter.tail(text, overlap_size)
         if len(text) <= overlap_size:
             return text
         return text[-overlap_size:]
 
-    def _get_overlap_words(self, words: List[str], overlap_size: int) -> List[str]:
-        """Get overlap words based on character size."""
-        overlap_words = []
-        current_size = 0
-
-        for word in reversed(words):
-            word_size = len(word) + 1
-            if current_size + word_size <= overlap_size:
-                overlap_words.insert(0, word)
-                current_size += word_size
-            else:
-                break
-
-        return overlap_words
-
 
 def main():
     parser = argparse.ArgumentParser(
@@ -189,13 +221,13 @@ def main():
         "--chunk-size",
         type=int,
         default=1000,
-        help="Chunk size in characters (default: 1000)"
+        help="Chunk size in characters, or tokens with --tokenizer (default: 1000)"
     )
     parser.add_argument(
         "--overlap",
         type=int,
         default=200,
-        help="Overlap size in characters (default: 200)"
+        help="Overlap size in characters, or tokens with --tokenizer (default: 200)"
     )
     parser.add_argument(
         "--split-on",
@@ -203,21 +235,44 @@ def main():
         default="sentence",
         help="Split on sentences, words, or characters (default: sentence)"
     )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Read the input incrementally and write one JSON chunk per line"
+    )
+    parser.add_argument(
+        "--tokenizer",
+        help="Measure sizes in tokens: tiktoken:<encoding|model>, hf:<model> or whitespace"
+    )
 
     args = parser.parse_args()
 
     try:
-        # Read input file
-        with open(args.input, 'r', encoding='utf-8') as f:
-            text = f.read()
-
         # Initialize chunker
         chunker = FixedSizeChunker(
             chunk_size=args.chunk_size,
             overlap=args.overlap,
-            split_on=args.split_on
+            split_on=args.split_on,
+            tokenizer=args.tokenizer
         )
 
+        if args.stream:
+            # Constant memory: chunks are written as JSON Lines as they are produced
+            with open(args.input, 'r', encoding='utf-8') as f, \
+                    open(args.output, 'w', encoding='utf-8') as out:
+                count = 0
+                for chunk in chunker.iter_chunks(f, metadata={"source": args.input}):
+                    out.write(json.dumps(chunk) + "\n")
+                    count += 1
+
+            print(f"✓ Created {count} chunks")
+            print(f"✓ Output written to {args.output} (JSON Lines)")
+            return
+
+        # Read input file
+        with open(args.input, 'r', encoding='utf-8') as f:
+            text = f.read()
+
         # Chunk the document
         chunks = chunker.chunk(text, metadata={"source": args.input})
 
@@ -230,7 +285,8 @@ def main():
                 "config": {
                     "chunk_size": args.chunk_size,
                     "overlap": args.overlap,
-                    "split_on": args.split_on
+                    "split_on": args.split_on,
+                    "tokenizer": args.tokenizer
                 }
             }, f, indent=2)
 
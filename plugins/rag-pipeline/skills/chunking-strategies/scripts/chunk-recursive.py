@@ -9,25 +9,45 @@ all chunks are within the target size. Excellent for structured documents.
 import argparse
 import json
 import sys
-from typing import List, Dict
-import re
+from pathlib import Path
+from typing import List, Dict, Tuple
+
+
+SKILLS_DIR = Path(__file__).resolve().parents[2]
+if str(SKILLS_DIR) not in sys.path:
+    sys.path.insert(0, str(SKILLS_DIR))
+from template_loader import load_template  # noqa: E402
+
+
+chunk_core = load_template(Path(__file__).with_name("chunk-core.py"))
 
 
 class RecursiveChunker:
     """Recursive document chunking with hierarchical separators."""
 
     def __init__(self, chunk_size: int = 1000, overlap: int = 100,
-                 separators: List[str] = None):
+                 separators: List[str] = None, tokenizer=None):
         """
         Initialize recursive chunker.
 
         Args:
-            chunk_size: Target chunk size in characters
-            overlap: Overlap between chunks in characters
+            chunk_size: Target chunk size in characters (tokens with a tokenizer)
+            overlap: Overlap between chunks in characters (tokens with a
+                tokenizer: whole words, reserved inside chunk_size so
+                overlapped chunks still fit the budget)
             separators: List of separators in priority order
+            tokenizer: Optional token budget: a spec such as 'tiktoken:cl100k_base'
+                or 'hf:<model>', a chunk_core.TokenCounter, or an encode callable
         """
         self.chunk_size = chunk_size
         self.overlap = overlap
+        self.counter = chunk_core.get_token_counter(tokenizer)
+
+        if self.counter is not None and overlap >= chunk_size:
+            raise ValueError("Overlap must be less than chunk_size")
+
+        # Split budget: with tokens the overlap prefix must fit as well
+        self.budget = chunk_size - overlap if self.counter is not None else chunk_size
 
         # Default separators (ordered by priority)
         if separators is None:
@@ -49,11 +69,9 @@ class RecursiveChunker:
         if metadata is None:
             metadata = {}
 
-        # Perform recursive splitting
-        chunks = self._recursive_split(text, self.separators)
-
-        # Add overlap between chunks
-        chunks_with_overlap = self._add_overlap(chunks)
+        # Perform recursive splitting on offsets, then add overlap
+        spans = self._recursive_split(text, 0, len(text), self.separators)
+        chunks_with_overlap = self._add_overlap(text, spans)
 
         # Format output with metadata
         result = []
@@ -68,85 +86,127 @@ class RecursiveChunker:
                     "params": {
                         "chunk_size": self.chunk_size,
                         "overlap": self.overlap,
-                        "separators": self.separators
+                        "separators": self.separators,
+                        "tokenizer": self.counter.name if self.counter else None
                     }
                 }
             })
 
         return result
 
-    def _recursive_split(self, text: str, separators: List[str]) -> List[str]:
+    def _recursive_split(self, text: str, start: int, end: int,
+                     separators: List[str]) -> List[Tuple[int, int]]:
         """
-        Recursively split text using separator hierarchy.
+        Recursively split text[start:end] using the separator hierarchy.
 
-        Args:
-            text: Text to split
-            separators: Remaining separators to try
+        Pieces from a separator split are contiguous in the source, so a
+        chunk is always the span from its first piece to its last and no
+        intermediate strings are built. With a tokenizer, sizes are token
+        counts of each piece (taken with the separator in front) summed as
+        the chunk grows.
 
         Returns:
-            List of text chunks
+            List of (start, end) chunk offsets into text
         """
+        counter = self.counter
+
         # Base case: no more separators or text is small enough
-        if not separators or len(text) <= self.chunk_size:
-            return [text] if text else []
+        if not separators or self._fits(text, start, end):
+            return [(start, end)] if end > start else []
 
         # Get current separator
         separator = separators[0]
         remaining_separators = separators[1:]
 
-        # Split on current separator
-        if separator:
-            splits = text.split(separator)
-        else:
+        if not separator:
             # Empty separator means split by character
-            return [text[i:i+self.chunk_size]
-                    for i in range(0, len(text), self.chunk_size)]
+            if counter is not None:
+                return self._split_by_tokens(text, start, end)
+            return [(i, min(i + self.chunk_size, end))
+                    for i in range(start, end, self.chunk_size)]
 
         # Combine splits into chunks
         chunks = []
-        current_chunk = ""
+        chunk_start = chunk_end = start
+        chunk_len = 0  # 0 means no current chunk
 
-        for split in splits:
+        for split_start, split_end in chunk_core.iter_separator_spans(text, separator, start, end):
             # Test if we can add this split to current chunk
-            test_chunk = current_chunk + separator + split if current_chunk else split
+            if counter is None:
+                split_len = split_end - split_start
+                test_len = chunk_len + len(separator) + split_len if chunk_len else split_len
+            else:
+                split_len = None  # Only counted on its own when needed
+                split_text = text[split_start:split_end]
+                if chunk_len:
+                    test_len = chunk_len + counter.count(separator + split_text)
+                else:
+                    test_len = split_len = counter.count(split_text)
 
-            if len(test_chunk) <= self.chunk_size:
-                current_chunk = test_chunk
+            if test_len <= self.budget:
+                if not chunk_len:
+                    chunk_start = split_start
+                chunk_end = split_end
+                chunk_len = test_len
             else:
                 # Current chunk is complete
-                if current_chunk:
-                    chunks.append(current_chunk)
+                if chunk_len:
+                    chunks.append((chunk_start, chunk_end))
+
+                if split_len is None:
+                    split_len = counter.count(split_text)
 
                 # Check if split itself is too large
-                if len(split) > self.chunk_size:
+                if split_len > self.budget:
                     # Recursively split this piece
-                    sub_chunks = self._recursive_split(split, remaining_separators)
-                    chunks.extend(sub_chunks)
-                    current_chunk = ""
+                    chunks.extend(self._recursive_split(text, split_start, split_end, remaining_separators))
+                    chunk_len = 0
                 else:
-                    current_chunk = split
+                    chunk_start, chunk_end, chunk_len = split_start, split_end, split_len
 
         # Add final chunk
-        if current_chunk:
-            chunks.append(current_chunk)
+        if chunk_len:
+            chunks.append((chunk_start, chunk_end))
 
         return chunks
 
-    def _add_overlap(self, chunks: List[str]) -> List[str]:
-        """Add overlap between consecutive chunks."""
-        if not chunks or self.overlap == 0:
-            return chunks
-
-        overlapped = [chunks[0]]
-
-        for i in range(1, len(chunks)):
-            # Get overlap from previous chunk
-            prev_chunk = chunks[i - 1]
-            overlap_text = prev_chunk[-self.overlap:] if len(prev_chunk) > self.overlap else prev_chunk
+    def _fits(self, text: str, start: int, end: int) -> bool:
+        """
+        Whether text[start:end] fits the budget.
 
-            # Add to current chunk
-            current_chunk = overlap_text + " " + chunks[i]
-            overlapped.append(current_chunk)
+        Spans longer than 32 characters per token of budget are rejected
+        without tokenizing, so large sections are not encoded whole at
+        every level of the recursion.
+        """
+        if self.counter is None:
+            return end - start <= self.budget
+        if end - start > self.budget * 32:
+            return False
+        return self.counter.count(text[start:end]) <= self.budget
+
+    def _split_by_tokens(self, text: str, start: int, end: int) -> List[Tuple[int, int]]:
+        """Token-budget windows over text with no usable separator left."""
+        spans = []
+        while start < end:
+            stop = self.counter.fit_prefix(text, start, end, self.budget)
+            spans.append((start, stop))
+            start = stop
+        return spans
+
+    def _add_overlap(self, text: str, spans: List[Tuple[int, int]]) -> List[str]:
+        """Build chunk strings with overlap taken from the previous chunk's offsets."""
+        if not spans or self.overlap == 0:
+            return [text[start:end] for start, end in spans]
+
+        overlapped = [text[spans[0][0]:spans[0][1]]]
+
+        for (prev_start, prev_end), (start, end) in zip(spans, spans[1:]):
+            if self.counter is not None:
+                tail = self.counter.tail(text[prev_start:prev_end], self.overlap)
+            else:
+                tail_start, tail_end = chunk_core.tail_span(prev_start, prev_end, self.overlap)
+                tail = text[tail_start:tail_end]
+            overlapped.append(f"{tail} {text[start:end]}")
 
         return overlapped
 
@@ -179,13 +239,13 @@ def main():
         "--chunk-size",
         type=int,
         default=1000,
-        help="Target chunk size in characters (default: 1000)"
+        help="Target chunk size in characters, or tokens with --tokenizer (default: 1000)"
     )
     parser.add_argument(
         "--overlap",
         type=int,
         default=100,
-        help="Overlap between chunks in characters (default: 100)"
+        help="Overlap between chunks in characters, or tokens with --tokenizer (default: 100)"
     )
     parser.add_argument(
         "--separators",
@@ -197,6 +257,10 @@ def main():
         choices=list(SEPARATOR_PRESETS.keys()),
         help="Use predefined separator preset (markdown, python, javascript, text, code)"
     )
+    parser.add_argument(
+        "--tokenizer",
+        help="Measure sizes in tokens: tiktoken:<encoding|model>, hf:<model> or whitespace"
+    )
 
     args = parser.parse_args()
 
@@ -216,7 +280,8 @@ def main():
         chunker = RecursiveChunker(
             chunk_size=args.chunk_size,
             overlap=args.overlap,
-            separators=separators
+            separators=separators,
+            tokenizer=args.tokenizer
         )
 
         # Chunk the document
@@ -241,7 +306,8 @@ def main():
                     "chunk_size": args.chunk_size,
                     "overlap": args.overlap,
                     "separators": chunker.separators,
-                    "preset": args.preset
+                    "preset": args.preset,
+                    "tokenizer": args.tokenizer
                 }
             }, f, indent=2)
 
@@ -9,28 +9,42 @@ respecting maximum chunk size limits.
 import argparse
 import json
 import sys
-from typing import List, Dict, Tuple
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Tuple
 import re
 
 
+SKILLS_DIR = Path(__file__).resolve().parents[2]
+if str(SKILLS_DIR) not in sys.path:
+    sys.path.insert(0, str(SKILLS_DIR))
+from template_loader import load_template  # noqa: E402
+
+
+chunk_core = load_template(Path(__file__).with_name("chunk-core.py"))
+
+
 class SemanticChunker:
     """Semantic document chunking that preserves natural boundaries."""
 
     def __init__(self, max_chunk_size: int = 1500, min_chunk_size: int = 200,
-                 preserve_paragraphs: bool = True, add_headers: bool = True):
+                 preserve_paragraphs: bool = True, add_headers: bool = True,
+                 tokenizer=None):
         """
         Initialize semantic chunker.
 
         Args:
-            max_chunk_size: Maximum chunk size in characters
+            max_chunk_size: Maximum chunk size in characters (tokens with a tokenizer)
             min_chunk_size: Minimum chunk size (avoid tiny chunks)
             preserve_paragraphs: Keep paragraphs together when possible
             add_headers: Include section headers in chunks
+            tokenizer: Optional token budget: a spec such as 'tiktoken:cl100k_base'
+                or 'hf:<model>', a chunk_core.TokenCounter, or an encode callable
         """
         self.max_chunk_size = max_chunk_size
         self.min_chunk_size = min_chunk_size
         self.preserve_paragraphs = preserve_paragraphs
         self.add_headers = add_headers
+        self.counter = chunk_core.get_token_counter(tokenizer)
 
     def chunk(self, text: str, metadata: Dict = None) -> List[Dict]:
         """
@@ -43,15 +57,38 @@ class SemanticChunker:
         Returns:
             List of chunks with metadata
         """
-        if metadata is None:
-            metadata = {}
+        return list(self._format_chunks(self._iter_chunk_texts([text]), metadata))
+
+    def iter_chunks(self, stream, metadata: Dict = None,
+                    block_size: int = chunk_core.DEFAULT_BLOCK_SIZE) -> Iterator[Dict]:
+        """
+        Chunk a text stream incrementally.
+
+        Yields the same chunks ``chunk(stream.read())`` would return, reading
+        ``block_size`` characters at a time. Only the unfinished paragraph
+        and the open chunk are held, so memory does not grow with the input.
+
+        Args:
+            stream: Text file object or iterable of strings
+            metadata: Optional metadata to include
+            block_size: Characters per read
 
+        Yields:
+            Chunks with metadata
+        """
+        segments = chunk_core.iter_segments(
+            chunk_core.read_blocks(stream, block_size), chunk_core.PARAGRAPH_BOUNDARY, block_size
+        )
+        return self._format_chunks(self._iter_chunk_texts(segments), metadata)
+
+    def _iter_chunk_texts(self, segments: Iterable[str]) -> Iterator[str]:
+        """Chunk strings for text given as consecutive paragraph-aligned segments."""
         # Detect document structure
-        sections = self._split_into_sections(text)
+        sections = self._split_into_sections(segments)
 
-        # Create chunks from sections
-        chunks = []
-        current_chunk = ""
+        # Create chunks from sections; sections are collected as parts and
+        # each chunk string is joined once when it is emitted
+        current_chunk = chunk_core.ChunkBuffer("", "\n\n", self.counter)
         current_header = ""
 
         for section_type, section_header, section_content in sections:
@@ -65,32 +102,37 @@ class SemanticChunker:
                 chunk_text = f"{current_header}\n\n{section_content}"
 
             # Check if we can add to current chunk
-            combined = current_chunk + "\n\n" + chunk_text if current_chunk else chunk_text
-
-            if len(combined) <= self.max_chunk_size:
-                current_chunk = combined
+            size = current_chunk.size_after(chunk_text)
+            if size <= self.max_chunk_size:
+                current_chunk.add(chunk_text, size)
             else:
                 # Save current chunk if it meets minimum size
                 if current_chunk and len(current_chunk) >= self.min_chunk_size:
-                    chunks.append(current_chunk.strip())
+                    yield current_chunk.build().strip()
 
                 # Start new chunk
-                current_chunk = chunk_text
+                current_chunk.reset()
+                current_chunk.add(chunk_text)
 
                 # If single section is too large, split it
                 if len(current_chunk) > self.max_chunk_size:
-                    split_chunks = self._split_large_section(current_chunk)
-                    chunks.extend(split_chunks[:-1])
-                    current_chunk = split_chunks[-1] if split_chunks else ""
+                    split_chunks = self._split_large_section(chunk_text)
+                    yield from split_chunks[:-1]
+                    current_chunk.reset()
+                    if split_chunks:
+                        current_chunk.add(split_chunks[-1])
 
         # Add final chunk
         if current_chunk and len(current_chunk) >= self.min_chunk_size:
-            chunks.append(current_chunk.strip())
+            yield current_chunk.build().strip()
+
+    def _format_chunks(self, chunks: Iterable[str], metadata: Dict = None) -> Iterator[Dict]:
+        """Attach metadata to chunk strings."""
+        if metadata is None:
+            metadata = {}
 
-        # Format output with metadata
-        result = []
         for i, chunk_text in enumerate(chunks):
-            result.append({
+            yield {
                 "text": chunk_text,
                 "metadata": {
                     **metadata,
@@ -99,62 +141,54 @@ class SemanticChunker:
                     "strategy": "semantic",
                     "params": {
                         "max_chunk_size": self.max_chunk_size,
-                        "min_chunk_size": self.min_chunk_size
+                        "min_chunk_size": self.min_chunk_size,
+                        "tokenizer": self.counter.name if self.counter else None
                     }
                 }
-            })
-
-        return result
+            }
 
-    def _split_into_sections(self, text: str) -> List[Tuple[str, str, str]]:
+    def _split_into_sections(self, segments: Iterable[str]) -> Iterator[Tuple[str, str, str]]:
         """
         Split text into semantic sections.
 
-        Returns:
-            List of (section_type, header, content) tuples
+        Yields:
+            (section_type, header, content) tuples
         """
-        sections = []
-
-        # Split on multiple newlines (paragraph boundaries)
-        paragraphs = re.split(r'\n\s*\n', text)
-
         current_header = ""
 
-        for para in paragraphs:
-            para = para.strip()
-            if not para:
-                continue
-
-            # Check if paragraph is a header (markdown-style)
-            header_match = re.match(r'^(#{1,6})\s+(.+)$', para)
-            if header_match:
-                current_header = para
-                sections.append(("header", current_header, para))
-            else:
-                # Regular content paragraph
-                sections.append(("content", current_header, para))
-
-        return sections
+        for segment in segments:
+            # Split on multiple newlines (paragraph boundaries)
+            for para in chunk_core.PARAGRAPH_BOUNDARY.split(segment):
+                para = para.strip()
+                if not para:
+                    continue
+
+                # Check if paragraph is a header (markdown-style)
+                header_match = re.match(r'^(#{1,6})\s+(.+)$', para)
+                if header_match:
+                    current_header = para
+                    yield ("header", current_header, para)
+                else:
+                    # Regular content paragraph
+                    yield ("content", current_header, para)
 
     def _split_large_section(self, text: str) -> List[str]:
         """Split a section that exceeds max_chunk_size."""
         chunks = []
-        sentences = re.split(r'(?<=[.!?])\s+', text)
-
-        current_chunk = ""
-
-        for sentence in sentences:
-            test_chunk = current_chunk + " " + sentence if current_chunk else sentence
+        current_chunk = chunk_core.ChunkBuffer(text, " ", self.counter)
 
-            if len(test_chunk) <= self.max_chunk_size:
-                current_chunk = test_chunk
+        for sentence in chunk_core.iter_pattern_spans(text, chunk_core.SENTENCE_BOUNDARY):
+            size = current_chunk.size_after(sentence)
+            if size <= self.max_chunk_size:
+                current_chunk.add(sentence, size)
             else:
                 if current_chunk:
-                    chunks.append(current_chunk.strip())
-                current_chunk = sentence
+                    chunks.append(current_chunk.build().strip())
+                current_chunk.reset()
+                current_chunk.add(sentence)
 
         if current_chunk:
-            chunks.append(current_chunk.strip())
+            chunks.append(current_chunk.build().strip())
 
         return chunks
 
@@ -177,13 +211,13 @@ def main():
         "--max-chunk-size",
         type=int,
         default=1500,
-        help="Maximum chunk size in characters (default: 1500)"
+        help="Maximum chunk size in characters, or tokens with --tokenizer (default: 1500)"
     )
     parser.add_argument(
         "--min-chunk-size",
         type=int,
         default=200,
-        help="Minimum chunk size in characters (default: 200)"
+        help="Minimum chunk size in characters, or tokens with --tokenizer (default: 200)"
     )
     parser.add_argument(
         "--no-preserve-paragraphs",
@@ -196,21 +230,45 @@ def main():
         help="Don't include section headers in chunks"
     )
 
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Read the input incrementally and write one JSON chunk per line"
+    )
+    parser.add_argument(
+        "--tokenizer",
+        help="Measure sizes in tokens: tiktoken:<encoding|model>, hf:<model> or whitespace"
+    )
+
     args = parser.parse_args()
 
     try:
-        # Read input file
-        with open(args.input, 'r', encoding='utf-8') as f:
-            text = f.read()
-
         # Initialize chunker
         chunker = SemanticChunker(
             max_chunk_size=args.max_chunk_size,
             min_chunk_size=args.min_chunk_size,
             preserve_paragraphs=not args.no_preserve_paragraphs,
-            add_headers=not args.no_headers
+            add_headers=not args.no_headers,
+            tokenizer=args.tokenizer
         )
 
+        if args.stream:
+            # Constant memory: chunks are written as JSON Lines as they are produced
+            with open(args.input, 'r', encoding='utf-8') as f, \
+                    open(args.output, 'w', encoding='utf-8') as out:
+                count = 0
+                for chunk in chunker.iter_chunks(f, metadata={"source": args.input}):
+                    out.write(json.dumps(chunk) + "\n")
+                    count += 1
+
+            print(f"✓ Created {count} chunks")
+            print(f"✓ Output written to {args.output} (JSON Lines)")
+            return
+
+        # Read input file
+        with open(args.input, 'r', encoding='utf-8') as f:
+            text = f.read()
+
         # Chunk the document
         chunks = chunker.chunk(text, metadata={"source": args.input})
 
@@ -233,7 +291,8 @@ def main():
                     "max_chunk_size": args.max_chunk_size,
                     "min_chunk_size": args.min_chunk_size,
                     "preserve_paragraphs": not args.no_preserve_paragraphs,
-                    "add_headers": not args.no_headers
+                    "add_headers": not args.no_headers,
+                    "tokenizer": args.tokenizer
                 }
             }, f, indent=2)
 
@@ -6,10 +6,21 @@ Use this template to create your own custom chunking logic tailored
 to your specific document types and requirements.
 """
 
+import sys
+from pathlib import Path
 from typing import List, Dict, Optional, Tuple
 import re
 
 
+SKILLS_DIR = Path(__file__).resolve().parents[2]
+if str(SKILLS_DIR) not in sys.path:
+    sys.path.insert(0, str(SKILLS_DIR))
+from template_loader import load_template  # noqa: E402
+
+
+chunk_core = load_template(Path(__file__).parent.parent / "scripts" / "chunk-core.py")
+
+
 class CustomChunker:
     """
     Template for implementing custom chunking strategies.
@@ -118,29 +129,30 @@ class CustomChunker:
 
     def _simple_paragraph_split(self, text: str) -> List[str]:
         """Example: Simple paragraph-based splitting."""
-        paragraphs = re.split(r'\n\s*\n', text)
+        # Paragraphs are offsets into text; chunk strings are built once
         chunks = []
-        current_chunk = ""
+        current_chunk = chunk_core.ChunkBuffer(text, "\n\n")
 
-        for para in paragraphs:
-            para = para.strip()
-            if not para:
+        for start, end in chunk_core.iter_pattern_spans(text, chunk_core.PARAGRAPH_BOUNDARY):
+            para = chunk_core.strip_span(text, start, end)
+            if para[0] == para[1]:
                 continue
 
-            test_chunk = current_chunk + "\n\n" + para if current_chunk else para
-
-            if len(test_chunk) <= self.chunk_size:
-                current_chunk = test_chunk
+            if current_chunk.size_with(para[1] - para[0]) <= self.chunk_size:
+                current_chunk.add(para)
             else:
+                overlap_text = ""
                 if current_chunk:
-                    chunks.append(current_chunk)
+                    chunk_text = current_chunk.build()
+                    chunks.append(chunk_text)
+                    overlap_text = self._get_overlap(chunk_text)
 
                 # Start new chunk with overlap
-                overlap_text = self._get_overlap(current_chunk)
-                current_chunk = overlap_text + "\n\n" + para if overlap_text else para
+                current_chunk.reset(overlap_text)
+                current_chunk.add(para)
 
         if current_chunk:
-            chunks.append(current_chunk)
+            chunks.append(current_chunk.build())
 
         return chunks
 
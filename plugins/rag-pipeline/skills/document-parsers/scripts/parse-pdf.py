@@ -2,22 +2,83 @@
 """
 Functional PDF parser with multiple backend support
 Supports: PyPDF2, PDFPlumber, LlamaParse
+
+Local backends extract pages on a process pool (page ranges per task) and
+hand them back in order, so large PDFs use every core.
 """
 
 import argparse
 import json
 import os
 import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterator, List, Optional, Any, Tuple
+
+
+# Pages extracted per pool task
+PAGES_PER_TASK = 8
+
+# The document opened once per worker process by _open_worker_document
+_worker_document = None
+
+
+def _open_document(backend: str, filepath: str):
+    """Open a PDF with a local backend"""
+    if backend == "pypdf2":
+        from PyPDF2 import PdfReader
+        return PdfReader(filepath)
+
+    import pdfplumber
+    return pdfplumber.open(filepath)
+
+
+def _extract_pages(
+    backend: str,
+    document,
+    start: int,
+    end: int,
+    extract_tables: bool
+) -> List[Tuple[int, str, List]]:
+    """(page_number, text, tables) for pages [start, end) of an open document"""
+    pages = []
+    for i in range(start, end):
+        page = document.pages[i]
+        if backend == "pypdf2":
+            pages.append((i + 1, page.extract_text(), []))
+        else:
+            tables = page.extract_tables() if extract_tables else []
+            pages.append((i + 1, page.extract_text() or "", tables or []))
+    return pages
+
+
+def _open_worker_document(backend: str, filepath: str):
+    """Pool initializer: open the PDF once per worker process"""
+    global _worker_document
+    _worker_document = _open_document(backend, filepath)
+
+
+def _extract_worker_pages(backend: str, start: int, end: int, extract_tables: bool):
+    """Pool task: extract a page range from the worker's document"""
+    return _extract_pages(backend, _worker_document, start, end, extract_tables)
 
 
 class PDFParser:
     """Multi-backend PDF parser"""
 
-    def __init__(self, backend: str = "pypdf2", api_key: Optional[str] = None):
+    def __init__(self, backend: str = "pypdf2", api_key: Optional[str] = None,
+                 workers: Optional[int] = None):
+        """
+        Args:
+            backend: pypdf2, pdfplumber or llamaparse
+            api_key: LlamaParse API key
+            workers: Page extraction processes for local backends
+                (None = one per core, 1 = extract in this process)
+        """
         self.backend = backend.lower()
         self.api_key = api_key or os.getenv("LLAMA_CLOUD_API_KEY")
+        self.workers = workers or os.cpu_count() or 1
         self._validate_backend()
 
     def _validate_backend(self):
@@ -82,6 +143,73 @@ class PDFParser:
         elif self.backend == "llamaparse":
             return self._parse_llamaparse(filepath, extract_metadata)
 
+    def iter_pages(
+        self,
+        filepath: str,
+        extract_tables: bool = False,
+        page_range: Optional[tuple] = None,
+        document=None
+    ) -> Iterator[Tuple[int, str, List]]:
+        """
+        Extract pages lazily, in order (pypdf2 and pdfplumber backends)
+
+        With more than one worker and more than one task's worth of pages,
+        page ranges are extracted on a process pool; each worker opens the
+        PDF once. At most two ranges per worker are in flight, so only
+        those pages are held in memory while the caller consumes earlier
+        ones.
+
+        Args:
+            filepath: Path to PDF file
+            extract_tables: Extract tables (pdfplumber only)
+            page_range: Tuple of (start_page, end_page) or None for all pages
+            document: Already-open document to read the page count from
+
+        Yields:
+            (page_number, text, tables) tuples
+        """
+        if self.backend not in ("pypdf2", "pdfplumber"):
+            raise ValueError(f"Page iteration is not supported by the {self.backend} backend")
+
+        owns_document = document is None
+        if owns_document:
+            document = _open_document(self.backend, filepath)
+
+        try:
+            total_pages = len(document.pages)
+            start_page = page_range[0] if page_range else 0
+            end_page = page_range[1] if page_range and page_range[1] is not None else total_pages
+            end_page = min(end_page, total_pages)
+
+            if self.workers == 1 or end_page - start_page <= PAGES_PER_TASK:
+                for start in range(start_page, end_page):
+                    yield from _extract_pages(self.backend, document, start, start + 1, extract_tables)
+                return
+        finally:
+            if owns_document and self.backend == "pdfplumber":
+                document.close()
+
+        ranges = [(start, min(start + PAGES_PER_TASK, end_page))
+                  for start in range(start_page, end_page, PAGES_PER_TASK)]
+        workers = min(self.workers, len(ranges))
+
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_open_worker_document,
+            initargs=(self.backend, filepath)
+        ) as pool:
+            pending = deque()
+            try:
+                for start, end in ranges:
+                    pending.append(pool.submit(_extract_worker_pages, self.backend, start, end, extract_tables))
+                    if len(pending) >= 2 * workers:
+                        yield from pending.popleft().result()
+                while pending:
+                    yield from pending.popleft().result()
+            finally:
+                for future in pending:
+                    future.cancel()
+
     def _parse_pypdf2(
         self,
         filepath: str,
@@ -112,20 +240,16 @@ class PDFParser:
                 "creation_date": str(reader.metadata.get("/CreationDate", "")),
             }
 
-        # Determine page range
-        start_page = page_range[0] if page_range else 0
-        end_page = page_range[1] if page_range else len(reader.pages)
-
         # Extract text from pages
-        for i in range(start_page, min(end_page, len(reader.pages))):
-            page = reader.pages[i]
-            page_text = page.extract_text()
+        text_parts = []
+        for page_number, page_text, _ in self.iter_pages(filepath, page_range=page_range, document=reader):
             result["pages"].append({
-                "page_number": i + 1,
+                "page_number": page_number,
                 "text": page_text
             })
-            result["text"] += page_text + "\n\n"
+            text_parts.append(page_text + "\n\n")
 
+        result["text"] = "".join(text_parts)
         result["total_pages"] = len(reader.pages)
         return result
 
@@ -155,37 +279,31 @@ class PDFParser:
                     k.replace("/", ""): v for k, v in pdf.metadata.items()
                 }
 
-            # Determine page range
-            start_page = page_range[0] if page_range else 0
-            end_page = page_range[1] if page_range else len(pdf.pages)
-
             # Extract text and tables from pages
-            for i in range(start_page, min(end_page, len(pdf.pages))):
-                page = pdf.pages[i]
-                page_text = page.extract_text() or ""
-
+            text_parts = []
+            pages = self.iter_pages(filepath, extract_tables, page_range, document=pdf)
+            for page_number, page_text, tables in pages:
                 page_data = {
-                    "page_number": i + 1,
+                    "page_number": page_number,
                     "text": page_text
                 }
 
-                # Extract tables if requested
-                if extract_tables:
-                    tables = page.extract_tables()
-                    if tables:
-                        page_data["tables"] = tables
-                        result["tables"].extend([
-                            {
-                                "page": i + 1,
-                                "table_index": idx,
-                                "data": table
-                            }
-                            for idx, table in enumerate(tables)
-                        ])
+                # Tables are only extracted if requested
+                if tables:
+                    page_data["tables"] = tables
+                    result["tables"].extend([
+                        {
+                            "page": page_number,
+                            "table_index": idx,
+                            "data": table
+                        }
+                        for idx, table in enumerate(tables)
+                    ])
 
                 result["pages"].append(page_data)
-                result["text"] += page_text + "\n\n"
+                text_parts.append(page_text + "\n\n")
 
+            result["text"] = "".join(text_parts)
             result["total_pages"] = len(pdf.pages)
 
         return result
@@ -264,6 +382,11 @@ def main():
         "--pages",
         help="Page range to extract (e.g., '1-5' or '3-')"
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        help="Page extraction processes (default: one per core; 1 = no pool)"
+    )
     parser.add_argument(
         "--output",
         help="Output file path (default: stdout)"
@@ -291,7 +414,7 @@ def main():
 
     # Parse PDF
     try:
-        pdf_parser = PDFParser(backend=args.backend, api_key=args.api_key)
+        pdf_parser = PDFParser(backend=args.backend, api_key=args.api_key, workers=args.workers)
         result = pdf_parser.parse(
             args.filepath,
             extract_tables=args.tables or args.tables_only,
@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Incremental Ingestion Manifest
+SQLite record of ingested files, so re-ingestion only touches what changed
+
+Each row is keyed by path and holds the file's size, mtime, content hash,
+the parser version that produced it and the chunk ids it was stored as.
+A nightly re-ingest then:
+- skips files whose size and mtime are unchanged (no read at all)
+- hashes files whose size or mtime changed, and skips them if the content
+  is the same (e.g. after a copy or checkout)
+- re-parses new and changed files, tombstoning the changed files' old chunks
+- emits tombstones for files that were deleted
+- re-parses everything when the parser version changes
+"""
+
+import os
+import json
+import time
+import sqlite3
+import hashlib
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Union
+from dataclasses import dataclass, field
+
+
+HASH_BLOCK_SIZE = 1 << 20
+
+
+@dataclass
+class FileState:
+    """A file as seen on disk"""
+    path: str
+    size: int
+    mtime_ns: int
+    digest: Optional[str] = None  # Filled in when the content is hashed
+
+
+@dataclass
+class Tombstone:
+    """Chunks to delete from the store: a deleted file, or the old version of a changed one"""
+    path: str
+    chunk_ids: List[str]
+    reason: str  # 'deleted' or 'changed'
+
+
+@dataclass
+class IngestPlan:
+    """What a re-ingest has to do"""
+    added: List[FileState] = field(default_factory=list)
+    changed: List[FileState] = field(default_factory=list)
+    unchanged: List[str] = field(default_factory=list)
+    deleted: List[Tombstone] = field(default_factory=list)
+    replaced: List[Tombstone] = field(default_factory=list)
+
+    @property
+    def to_ingest(self) -> List[FileState]:
+        """Files to parse and store (new, then changed)"""
+        return self.added + self.changed
+
+    @property
+    def tombstones(self) -> List[Tombstone]:
+        """Chunks to delete from the store before storing the new ones"""
+        return self.deleted + self.replaced
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "added": len(self.added),
+            "changed": len(self.changed),
+            "unchanged": len(self.unchanged),
+            "deleted": len(self.deleted)
+        }
+
+
+def file_digest(path: Union[str, Path]) -> str:
+    """BLAKE2b content hash, read in blocks so large PDFs are never loaded whole"""
+    digest = hashlib.blake2b(digest_size=20)
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(HASH_BLOCK_SIZE), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class IngestManifest:
+    """
+    Content-hash manifest of ingested files
+
+    Usage:
+        with IngestManifest("ingest.sqlite", parser_version="pdf-v2:512:50") as manifest:
+            plan = manifest.plan(paths)
+            for tombstone in plan.tombstones:
+                store.delete(tombstone.chunk_ids)
+            for state in plan.to_ingest:
+                store.add(chunks_for(state.path))
+                manifest.record(state, chunk_ids)
+            manifest.forget_deleted(plan)
+            store.save()
+            manifest.commit()
+
+    Nothing is written until commit(), so commit only after the store has
+    been persisted; an interrupted run is simply redone next time.
+    """
+
+    def __init__(self, path: Union[str, Path], parser_version: str = ""):
+        """
+        Open (or create) a manifest
+
+        Args:
+            path: SQLite file
+            parser_version: Identifies everything that shapes the stored
+                chunks (parser, chunk size, embedding model); files recorded
+                under another version are re-ingested
+        """
+        self.path = Path(path)
+        self.parser_version = parser_version
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.path))
+        self.conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS files (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                digest TEXT NOT NULL,
+                parser_version TEXT NOT NULL,
+                chunk_ids TEXT NOT NULL,
+                ingested_at REAL NOT NULL
+            )
+            """
+        )
+        self.conn.commit()
+
+    def __enter__(self) -> "IngestManifest":
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def close(self):
+        """Close without committing pending records"""
+        self.conn.close()
+
+    def commit(self):
+        self.conn.commit()
+
+    def plan(
+        self,
+        paths: Iterable[Union[str, Path]],
+        scope: Optional[Union[str, Path]] = None,
+        match: Optional[Callable[[str], bool]] = None
+    ) -> IngestPlan:
+        """
+        Compare files on disk with the manifest
+
+        Args:
+            paths: Every file that should be ingested now
+            scope: Directory the paths were collected from; only manifest
+                entries under it can be reported deleted (default: all)
+            match: The filter the paths were selected with; entries it
+                rejects are out of this run's view and are kept, not
+                reported deleted (so narrowing the extensions or turning
+                off recursion does not tombstone files that still exist)
+
+        Returns:
+            IngestPlan (added and changed states carry their content digest)
+        """
+        plan = IngestPlan()
+        records = {
+            row[0]: row[1:]
+            for row in self.conn.execute(
+                "SELECT path, size, mtime_ns, digest, parser_version, chunk_ids FROM files"
+            )
+        }
+        seen = set()
+
+        for path in paths:
+            path = str(path)
+            if path in seen:
+                continue
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue  # Vanished while scanning: reported as deleted below
+            seen.add(path)
+            state = FileState(path=path, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+
+            record = records.get(path)
+            if record is None:
+                # Hashed now, next to the stat: if the file is edited before
+                # it is parsed, the next plan() sees the stat and hash change
+                state.digest = file_digest(path)
+                plan.added.append(state)
+                continue
+
+            size, mtime_ns, digest, parser_version, chunk_ids = record
+            if parser_version == self.parser_version:
+                if size == state.size and mtime_ns == state.mtime_ns:
+                    plan.unchanged.append(path)
+                    continue
+                state.digest = file_digest(path)
+                if state.digest == digest:
+                    # Touched but identical: refresh the stat so it is skipped next time
+                    self.conn.execute(
+                        "UPDATE files SET size = ?, mtime_ns = ? WHERE path = ?",
+                        (state.size, state.mtime_ns, path)
+                    )
+                    plan.unchanged.append(path)
+                    continue
+            else:
+                state.digest = file_digest(path)
+
+            plan.changed.append(state)
+            plan.replaced.append(Tombstone(path=path, chunk_ids=json.loads(chunk_ids), reason="changed"))
+
+        scope = None if scope is None else os.path.join(os.path.abspath(scope), "")
+        for path, record in records.items():
+            if path in seen or (scope is not None and not os.path.abspath(path).startswith(scope)):
+                continue
+            if match is not None and not match(path):
+                continue
+            plan.deleted.append(Tombstone(path=path, chunk_ids=json.loads(record[4]), reason="deleted"))
+
+        return plan
+
+    def record(self, state: FileState, chunk_ids: List[str]):
+        """
+        Record a file as ingested with the given chunk ids
+
+        Stores the digest taken by plan(), not the file's current content,
+        so an edit made while the file was being parsed is re-ingested.
+        """
+        digest = state.digest or file_digest(state.path)
+        self.conn.execute(
+            "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (state.path, state.size, state.mtime_ns, digest, self.parser_version,
+             json.dumps(chunk_ids), time.time())
+        )
+
+    def forget(self, path: Union[str, Path]):
+        """Drop a file's entry (after its chunks were deleted)"""
+        self.conn.execute("DELETE FROM files WHERE path = ?", (str(path),))
+
+    def forget_deleted(self, plan: IngestPlan):
+        """Drop the entries of every deleted file in a plan"""
+        self.conn.executemany("DELETE FROM files WHERE path = ?", [(t.path,) for t in plan.deleted])
+
+    def chunk_ids(self, path: Union[str, Path]) -> List[str]:
+        """Chunk ids recorded for a file (empty if not ingested)"""
+        row = self.conn.execute("SELECT chunk_ids FROM files WHERE path = ?", (str(path),)).fetchone()
+        return json.loads(row[0]) if row else []
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def __iter__(self) -> Iterator[str]:
+        return (row[0] for row in self.conn.execute("SELECT path FROM files ORDER BY path"))
+
+
+# Example usage
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Show what an incremental re-ingest would do")
+    parser.add_argument("directory", help="Documents directory")
+    parser.add_argument("--manifest", default="ingest-manifest.sqlite", help="Manifest path")
+    parser.add_argument("--parser-version", default="", help="Parser/chunking version string")
+    args = parser.parse_args()
+
+    with IngestManifest(args.manifest, args.parser_version) as manifest:
+        files = (p for p in Path(args.directory).glob("**/*") if p.is_file())
+        plan = manifest.plan(files, scope=args.directory)
+        print(json.dumps(plan.summary(), indent=2))
+        for tombstone in plan.tombstones:
+            print(f"✗ {tombstone.path}: {len(tombstone.chunk_ids)} chunks ({tombstone.reason})")
+        for state in plan.to_ingest:
+            print(f"+ {state.path}")
@@ -4,13 +4,28 @@ Multi-Format Document Parser Template
 Universal parser for PDF, DOCX, HTML, Markdown, and TXT files
 """
 
+import sys
 import os
+import time
 import mimetypes
+import multiprocessing
+from multiprocessing.connection import wait
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Tuple, Union
 from dataclasses import dataclass, field
 
 
+SKILLS_DIR = Path(__file__).resolve().parents[2]
+if str(SKILLS_DIR) not in sys.path:
+    sys.path.insert(0, str(SKILLS_DIR))
+from template_loader import load_template  # noqa: E402
+
+
+ingest_manifest = load_template(Path(__file__).with_name("ingest-manifest.py"))
+
+DEFAULT_EXTENSIONS = ['.pdf', '.docx', '.html', '.htm', '.md', '.txt']
+
+
 @dataclass
 class ParseResult:
     """Result from parsing a document"""
@@ -21,6 +36,16 @@ class ParseResult:
     tables: List[Dict] = field(default_factory=list)
     metadata: Dict[str, Any] = field(default_factory=dict)
     error: Optional[str] = None
+    # Incremental ingestion (see iter_directory's manifest): chunk ids this
+    # file was stored under before, to delete from the store; a deleted
+    # file comes back with deleted=True and no text
+    deleted: bool = False
+    replaced_chunk_ids: List[str] = field(default_factory=list)
+
+    @property
+    def chunk_ids(self) -> List[str]:
+        """Store-wide chunk ids ("<filepath>#<chunk id>"), as recorded in the manifest"""
+        return [f"{self.filepath}#{chunk.id}" for chunk in self.chunks]
 
 
 @dataclass
@@ -49,8 +74,12 @@ class MultiFormatParser:
     - Table extraction
     - Metadata extraction
     - Error handling with fallbacks
+    - Parallel, incremental directory ingestion
     """
 
+    # Bump when parsing/chunking output changes so manifests re-ingest everything
+    PARSER_VERSION = "1"
+
     def __init__(
         self,
         llamaparse_api_key: Optional[str] = None,
@@ -80,6 +109,12 @@ class MultiFormatParser:
         self._docx_parser = None
         self._html_parser = None
 
+    @property
+    def version(self) -> str:
+        """Parser version plus every setting that changes the output (manifest key)"""
+        return (f"multi-format/{self.PARSER_VERSION}:{self.chunk_size}:{self.chunk_overlap}"
+                f":ocr={int(self.use_ocr)}:llamaparse={int(bool(self.prefer_llamaparse))}")
+
     def parse_file(self, filepath: Union[str, Path]) -> ParseResult:
         """
         Parse a file with automatic format detection
@@ -141,7 +176,10 @@ class MultiFormatParser:
         self,
         directory: Union[str, Path],
         recursive: bool = True,
-        extensions: Optional[List[str]] = None
+        extensions: Optional[List[str]] = None,
+        workers: Optional[int] = 1,
+        timeout: Optional[float] = None,
+        manifest=None
     ) -> Dict[str, ParseResult]:
         """
         Parse all documents in a directory
@@ -150,24 +188,156 @@ class MultiFormatParser:
             directory: Path to directory
             recursive: Search subdirectories
             extensions: Filter by extensions (e.g., ['.pdf', '.docx'])
+            workers: Parser processes (1 = parse in this process, None = one per core)
+            timeout: Per-file time limit in seconds (see iter_directory)
+            manifest: Only parse new/changed files (see iter_directory)
 
         Returns:
             Dictionary mapping filepath to ParseResult
         """
+        return dict(self.iter_directory(directory, recursive, extensions, workers, timeout,
+                                        manifest=manifest))
+
+    def iter_directory(
+        self,
+        directory: Union[str, Path],
+        recursive: bool = True,
+        extensions: Optional[List[str]] = None,
+        workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_in_flight: Optional[int] = None,
+        max_in_flight_bytes: Optional[int] = None,
+        ordered: bool = False,
+        manifest=None
+    ) -> Iterator[Tuple[str, ParseResult]]:
+        """
+        Parse all documents in a directory, yielding results as they finish
+
+        Files are discovered lazily and parsed on a ParsePool, so CPU-bound
+        PDF parsing uses every core and only the files in flight are held
+        in memory. With workers=1 and no timeout, files are parsed in this
+        process instead.
+
+        Args:
+            directory: Path to directory
+            recursive: Search subdirectories
+            extensions: Filter by extensions (e.g., ['.pdf', '.docx'])
+            workers: Parser processes (None = one per core)
+            timeout: Per-file time limit in seconds; a file that exceeds it
+                has its worker killed and comes back with an error
+            max_in_flight: Files dispatched but not yet yielded (default: 2 per worker)
+            max_in_flight_bytes: Cap on the total size of those files
+            ordered: Yield in directory order instead of completion order
+            manifest: IngestManifest, or a path to open one (keyed by
+                self.version and committed when iteration completes).
+                Unchanged files are skipped without being read; deleted
+                files are yielded with deleted=True, and results for
+                changed files carry the chunk ids they replace. Parsed
+                files are recorded once the caller asks for the next result.
+
+        Yields:
+            (filepath, ParseResult) tuples
+        """
+        filepaths = self._iter_files(directory, recursive, extensions)
+        pool_options = (workers, timeout, max_in_flight, max_in_flight_bytes, ordered)
+
+        if manifest is None:
+            yield from self._parse_files(filepaths, *pool_options)
+            return
+
+        owns_manifest = isinstance(manifest, (str, Path))
+        if owns_manifest:
+            manifest = ingest_manifest.IngestManifest(manifest, self.version)
+
+        try:
+            plan = manifest.plan(
+                filepaths,
+                scope=directory,
+                match=lambda path: self._matches(path, directory, recursive, extensions)
+            )
+
+            for tombstone in plan.deleted:
+                yield tombstone.path, ParseResult(
+                    filepath=tombstone.path,
+                    format=self._detect_format(tombstone.path),
+                    text="",
+                    deleted=True,
+                    replaced_chunk_ids=tombstone.chunk_ids
+                )
+            manifest.forget_deleted(plan)
+
+            states = {state.path: state for state in plan.to_ingest}
+            replaced = {tombstone.path: tombstone.chunk_ids for tombstone in plan.replaced}
+            for filepath, result in self._parse_files(states, *pool_options):
+                result.replaced_chunk_ids = replaced.get(filepath, [])
+                yield filepath, result
+                # Failures are not recorded, so they are retried next time
+                if result.error is None:
+                    manifest.record(states[filepath], result.chunk_ids)
+
+            if owns_manifest:
+                manifest.commit()
+        finally:
+            if owns_manifest:
+                manifest.close()
+
+    def _parse_files(
+        self,
+        filepaths: Iterable[Union[str, Path]],
+        workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_in_flight: Optional[int] = None,
+        max_in_flight_bytes: Optional[int] = None,
+        ordered: bool = False
+    ) -> Iterator[Tuple[str, ParseResult]]:
+        """Parse files in this process or on a ParsePool (see iter_directory)"""
+        if workers == 1 and timeout is None:
+            for filepath in filepaths:
+                yield str(filepath), self.parse_file(filepath)
+            return
+
+        pool = ParsePool(
+            self,
+            workers=workers,
+            timeout=timeout,
+            max_in_flight=max_in_flight,
+            max_in_flight_bytes=max_in_flight_bytes
+        )
+        yield from pool.imap(filepaths, ordered=ordered)
+
+    def _iter_files(
+        self,
+        directory: Union[str, Path],
+        recursive: bool = True,
+        extensions: Optional[List[str]] = None
+    ) -> Iterator[Path]:
+        """Lazily find the files parse_directory would parse"""
         directory = Path(directory)
-        results = {}
 
         # Default extensions
         if extensions is None:
-            extensions = ['.pdf', '.docx', '.html', '.htm', '.md', '.txt']
+            extensions = DEFAULT_EXTENSIONS
 
         # Find files
         pattern = "**/*" if recursive else "*"
         for filepath in directory.glob(pattern):
             if filepath.is_file() and filepath.suffix.lower() in extensions:
-                results[str(filepath)] = self.parse_file(filepath)
+                yield filepath
 
-        return results
+    def _matches(
+        self,
+        filepath: Union[str, Path],
+        directory: Union[str, Path],
+        recursive: bool = True,
+        extensions: Optional[List[str]] = None
+    ) -> bool:
+        """Whether _iter_files would select this path (whether or not it still exists)"""
+        filepath = Path(os.path.abspath(filepath))
+        if extensions is None:
+            extensions = DEFAULT_EXTENSIONS
+        if filepath.suffix.lower() not in extensions:
+            return False
+        return recursive or filepath.parent == Path(os.path.abspath(directory))
 
     def _detect_format(self, filepath: str) -> str:
         """Detect file format from extension and MIME type"""
@@ -378,14 +548,23 @@ class MultiFormatParser:
         chunks = []
         words = text.split()
 
-        # Simple word-based chunking
+        # Simple word-based chunking. Windows are sliced from the
+        # whitespace-normalized text by word offsets instead of re-joining
+        # word lists; offsets[i] is where word i starts in normalized.
+        normalized = " ".join(words)
+        offsets = [0] * (len(words) + 1)
+        for i, word in enumerate(words):
+            offsets[i + 1] = offsets[i] + len(word) + 1
+        del words
+
+        num_words = len(offsets) - 1
+        step = max(1, self.chunk_size - self.chunk_overlap)
         chunk_id = 0
         start_idx = 0
 
-        while start_idx < len(words):
-            end_idx = min(start_idx + self.chunk_size, len(words))
-            chunk_words = words[start_idx:end_idx]
-            chunk_text = " ".join(chunk_words)
+        while start_idx < num_words:
+            end_idx = min(start_idx + self.chunk_size, num_words)
+            chunk_text = normalized[offsets[start_idx]:offsets[end_idx] - 1]
 
             chunks.append(TextChunk(
                 id=f"chunk_{chunk_id}",
@@ -396,11 +575,216 @@ class MultiFormatParser:
             ))
 
             chunk_id += 1
-            start_idx = end_idx - self.chunk_overlap
+            if end_idx == num_words:
+                break
+            start_idx += step
 
         return chunks
 
 
+def _parse_worker(parser: MultiFormatParser, conn) -> None:
+    """ParsePool worker loop: parse each filepath received until None"""
+    while True:
+        filepath = conn.recv()
+        if filepath is None:
+            break
+        conn.send(parser.parse_file(filepath))
+
+
+class _PoolWorker:
+    """A ParsePool worker process and the file it is parsing"""
+
+    __slots__ = ("process", "conn", "seq", "filepath", "deadline")
+
+    def __init__(self, context, parser: MultiFormatParser):
+        self.conn, child_conn = context.Pipe()
+        self.process = context.Process(target=_parse_worker, args=(parser, child_conn), daemon=True)
+        self.process.start()
+        # Only the worker holds its end, so a crash shows up as EOF
+        child_conn.close()
+        self.seq = None
+        self.filepath = None
+        self.deadline = None
+
+    def submit(self, seq: int, filepath: str, timeout: Optional[float]) -> None:
+        self.seq = seq
+        self.filepath = filepath
+        self.deadline = None if timeout is None else time.monotonic() + timeout
+        self.conn.send(filepath)
+
+    def stop(self) -> None:
+        """Ask an idle worker to exit; kill a busy one"""
+        try:
+            if self.seq is None:
+                self.conn.send(None)
+            else:
+                self.process.terminate()
+        except (BrokenPipeError, OSError):
+            pass
+        self.process.join(timeout=1)
+        if self.process.is_alive():
+            self.process.kill()
+            self.process.join()
+        self.conn.close()
+
+
+class ParsePool:
+    """
+    Process pool for MultiFormatParser with per-file timeouts
+
+    Unlike ProcessPoolExecutor, each worker process has its own pipe and
+    parses one file at a time, so a file that runs past the timeout (a
+    hung PDF) is stopped by killing only its worker, which is then
+    replaced, and a worker that crashes only fails its own file.
+
+    Memory is bounded by max_in_flight (files dispatched but not yet
+    yielded, including finished results held back for ordered output) and
+    max_in_flight_bytes (their total size on disk; a single larger file is
+    still parsed, alone).
+
+    With the spawn/forkserver start methods the module must be importable
+    in the workers (e.g. copied into your project as multi_format_parser.py).
+    """
+
+    def __init__(
+        self,
+        parser: MultiFormatParser,
+        workers: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_in_flight: Optional[int] = None,
+        max_in_flight_bytes: Optional[int] = None
+    ):
+        """
+        Initialize pool
+
+        Args:
+            parser: Configured parser, copied into each worker
+            workers: Worker processes (None = one per core)
+            timeout: Per-file time limit in seconds (None = no limit)
+            max_in_flight: Files dispatched but not yet yielded (default: 2 per worker)
+            max_in_flight_bytes: Cap on the total size of those files (None = no cap)
+        """
+        self.parser = parser
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self.timeout = timeout
+        self.max_in_flight = max(1, max_in_flight or 2 * self.workers)
+        self.max_in_flight_bytes = max_in_flight_bytes
+        self.context = multiprocessing.get_context()
+
+    def imap(
+        self,
+        filepaths: Iterable[Union[str, Path]],
+        ordered: bool = False
+    ) -> Iterator[Tuple[str, ParseResult]]:
+        """
+        Parse files in parallel
+
+        Args:
+            filepaths: Files to parse (consumed lazily)
+            ordered: Yield in input order instead of completion order
+
+        Yields:
+            (filepath, ParseResult) tuples
+        """
+        filepaths = iter(filepaths)
+        workers: List[_PoolWorker] = []
+        sizes: Dict[int, int] = {}  # seq -> bytes, for every file in flight
+        finished: Dict[int, Tuple[str, ParseResult]] = {}  # held back for ordered output
+        in_flight_bytes = 0
+        next_seq = 0
+        next_out = 0
+        pending = None  # next file, once its size is known
+        exhausted = False
+
+        try:
+            while True:
+                # Dispatch while a worker is free and the caps allow
+                while not exhausted and len(sizes) < self.max_in_flight:
+                    if pending is None:
+                        filepath = next(filepaths, None)
+                        if filepath is None:
+                            exhausted = True
+                            break
+                        filepath = str(filepath)
+                        try:
+                            pending = (filepath, os.path.getsize(filepath))
+                        except OSError:
+                            pending = (filepath, 0)  # parse_file reports it
+
+                    filepath, size = pending
+                    if (sizes and self.max_in_flight_bytes is not None
+                            and in_flight_bytes + size > self.max_in_flight_bytes):
+                        break
+
+                    worker = next((w for w in workers if w.seq is None), None)
+                    if worker is None:
+                        if len(workers) == self.workers:
+                            break
+                        worker = _PoolWorker(self.context, self.parser)
+                        workers.append(worker)
+
+                    worker.submit(next_seq, filepath, self.timeout)
+                    sizes[next_seq] = size
+                    in_flight_bytes += size
+                    next_seq += 1
+                    pending = None
+
+                busy = [w for w in workers if w.seq is not None]
+                if not busy:
+                    break
+
+                # Wait for a result, a crash, or the earliest deadline
+                wait_for = None
+                if self.timeout is not None:
+                    wait_for = max(0.0, min(w.deadline for w in busy) - time.monotonic())
+                ready = set(wait([w.conn for w in busy] + [w.process.sentinel for w in busy], wait_for))
+                now = time.monotonic()
+
+                for worker in busy:
+                    if worker.conn in ready:
+                        try:
+                            result = worker.conn.recv()
+                        except (EOFError, OSError):
+                            result = self._failed(worker)
+                    elif worker.process.sentinel in ready:
+                        result = self._failed(worker)
+                    elif worker.deadline is not None and now >= worker.deadline:
+                        result = self._failed(worker, f"Timed out after {self.timeout}s")
+                    else:
+                        continue
+
+                    finished[worker.seq] = (worker.filepath, result)
+                    worker.seq = None
+                    if worker.process.exitcode is not None:
+                        # Killed or crashed: a replacement is started on the next dispatch
+                        workers.remove(worker)
+                        worker.stop()
+
+                # Yield what is ready and release its share of the caps
+                while finished:
+                    seq = next_out if ordered else next(iter(finished))
+                    if seq not in finished:
+                        break
+                    in_flight_bytes -= sizes.pop(seq)
+                    if ordered:
+                        next_out += 1
+                    yield finished.pop(seq)
+        finally:
+            for worker in workers:
+                worker.stop()
+
+    def _failed(self, worker: _PoolWorker, error: Optional[str] = None) -> ParseResult:
+        """Kill the worker (if still running) and return an error result for its file"""
+        worker.process.terminate()
+        worker.process.join()
+        return ParseResult(
+            filepath=worker.filepath,
+            format=self.parser._detect_format(worker.filepath),
+            text="",
+            error=error or f"Parser process exited with code {worker.process.exitcode}"
+        )
+
+
 # Example usage
 if __name__ == "__main__":
     # Initialize parser
@@ -421,9 +805,8 @@ if __name__ == "__main__":
         print(f"Tables: {len(result.tables)}")
         print(f"Metadata: {result.metadata}")
 
-    # Parse directory
-    results = parser.parse_directory("./documents/", recursive=True)
-    for filepath, result in results.items():
+    # Parse directory on all cores, streaming results as files finish
+    for filepath, result in parser.iter_directory("./documents/", recursive=True, timeout=120):
         if result.error:
             print(f"✗ {filepath}: {result.error}")
         else:
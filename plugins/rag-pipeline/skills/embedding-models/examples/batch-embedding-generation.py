@@ -8,11 +8,213 @@ progress tracking, and error recovery.
 import os
 import json
 import time
-from typing import List, Dict, Any, Optional
+import asyncio
+from itertools import islice
+from typing import List, Dict, Any, Optional, Tuple
 from pathlib import Path
 import numpy as np
 
 
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token for English text)."""
+    return len(text) // 4 + 1
+
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """Detect HTTP 429 / rate-limit errors across provider SDKs."""
+    for attr in ('status_code', 'status', 'http_status'):
+        if getattr(error, attr, None) == 429:
+            return True
+    response = getattr(error, 'response', None)
+    if response is not None and getattr(response, 'status_code', None) == 429:
+        return True
+    return 'RateLimit' in type(error).__name__ or '429' in str(error)
+
+
+def retry_after_seconds(error: Exception) -> Optional[float]:
+    """Read a Retry-After hint from the provider response, if present."""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    value = headers.get('retry-after') or headers.get('Retry-After')
+    try:
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """
+    Async token bucket for per-minute quotas (requests or tokens).
+
+    Refills continuously at ``rate_per_minute / 60`` units per second up to
+    ``capacity``. Requests larger than the capacity are clamped so a single
+    oversized batch cannot deadlock the bucket.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: Optional[float] = None):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = capacity if capacity is not None else rate_per_minute
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    async def acquire(self, amount: float = 1.0):
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
+
+
+class AdaptiveConcurrency:
+    """
+    AIMD concurrency limiter.
+
+    The in-flight limit is halved on every rate-limit response and grows by
+    one after a full window of successful requests, converging on the
+    provider's real quota.
+    """
+
+    def __init__(self, max_concurrency: int, min_concurrency: int = 1):
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.limit = max_concurrency
+        self.in_flight = 0
+        self.throttled = 0
+        self._successes = 0
+        self._cond = asyncio.Condition()
+
+    async def acquire(self):
+        async with self._cond:
+            await self._cond.wait_for(lambda: self.in_flight < self.limit)
+            self.in_flight += 1
+
+    async def release(self):
+        async with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    def on_success(self):
+        self._successes += 1
+        if self._successes >= self.limit and self.limit < self.max_concurrency:
+            self.limit += 1
+            self._successes = 0
+
+    def on_throttle(self):
+        self.throttled += 1
+        self.limit = max(self.min_concurrency, self.limit // 2)
+        self._successes = 0
+
+
+class CheckpointLog:
+    """
+    Append-only binary checkpoint log.
+
+    Each checkpoint appends one segment holding only the rows produced
+    since the previous checkpoint:
+    - ``segment-000000.f32``: raw float32 rows
+    - ``segment-000000.ids``: one JSON-encoded doc_id per line
+
+    Both files are fsync'd before ``position.json`` (the resume marker) is
+    atomically replaced, so a crash mid-segment leaves the last committed
+    checkpoint intact. Checkpoint cost is proportional to new rows only.
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        self.marker_path = self.directory / "position.json"
+        self.position = 0
+        self.rows = 0
+        self.dim: Optional[int] = None
+        self.segments: List[str] = []
+        self._read_marker()
+
+    def _read_marker(self):
+        if not self.marker_path.exists():
+            return
+        with open(self.marker_path, 'r') as f:
+            marker = json.load(f)
+        self.position = marker['position']
+        self.rows = marker['rows']
+        self.dim = marker['dim']
+        self.segments = marker['segments']
+
+    def _write_marker(self):
+        tmp_path = self.marker_path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({
+                'position': self.position,
+                'rows': self.rows,
+                'dim': self.dim,
+                'segments': self.segments,
+                'timestamp': time.time()
+            }, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.marker_path)
+
+    @staticmethod
+    def _write_synced(path: Path, data: bytes):
+        with open(path, 'wb') as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+    def append(self, items: List[Tuple[str, List[float]]], position: int):
+        """
+        Append a segment of (doc_id, embedding) rows and advance the marker.
+
+        Args:
+            items: Rows produced since the last checkpoint
+            position: Number of documents processed so far
+        """
+        if items:
+            matrix = np.asarray([embedding for _, embedding in items], dtype=np.float32)
+            if self.dim is None:
+                self.dim = int(matrix.shape[1])
+
+            name = f"segment-{len(self.segments):06d}"
+            self._write_synced(self.directory / f"{name}.f32", matrix.tobytes())
+            ids = "".join(json.dumps(doc_id) + "\n" for doc_id, _ in items)
+            self._write_synced(self.directory / f"{name}.ids", ids.encode('utf-8'))
+
+            self.segments.append(name)
+            self.rows += len(items)
+
+        self.position = position
+        self._write_marker()
+
+    def iter_segments(self):
+        """Yield (doc_ids, float32 matrix) per committed segment, memory-mapped."""
+        for name in self.segments:
+            with open(self.directory / f"{name}.ids", 'r', encoding='utf-8') as f:
+                doc_ids = [json.loads(line) for line in f]
+            matrix = np.memmap(
+                self.directory / f"{name}.f32", dtype=np.float32, mode='r',
+                shape=(len(doc_ids), self.dim)
+            )
+            yield doc_ids, matrix
+
+    def reset(self):
+        """Discard all segments and the resume marker."""
+        for path in self.directory.glob("segment-*"):
+            path.unlink()
+        if self.marker_path.exists():
+            self.marker_path.unlink()
+        self.position = 0
+        self.rows = 0
+        self.dim = None
+        self.segments = []
+
+
 class BatchEmbeddingGenerator:
     """
     Generate embeddings for large document collections efficiently.
@@ -23,6 +225,7 @@ class BatchEmbeddingGenerator:
     - Error recovery and retry
     - Checkpoint saving
     - Memory-efficient processing
+    - Async mode with concurrent batches under RPM/TPM quotas
     """
 
     def __init__(
@@ -46,8 +249,10 @@ class BatchEmbeddingGenerator:
         self.checkpoint_dir = Path(checkpoint_dir) if checkpoint_dir else None
         self.save_interval = save_interval
 
+        self.checkpoint_log: Optional[CheckpointLog] = None
         if self.checkpoint_dir:
             self.checkpoint_dir.mkdir(parents=True, exist_ok=True)
+            self.checkpoint_log = CheckpointLog(self.checkpoint_dir)
 
     def generate(
         self,
@@ -82,6 +287,8 @@ class BatchEmbeddingGenerator:
             embeddings, start_idx = self._load_checkpoint()
             if start_idx > 0 and show_progress:
                 print(f"Resuming from document {start_idx}/{len(documents)}")
+        elif self.checkpoint_log:
+            self.checkpoint_log.reset()
 
         # Process remaining documents
         total = len(documents)
@@ -128,21 +335,186 @@ class BatchEmbeddingGenerator:
 
         return embeddings
 
-    def _save_checkpoint(self, embeddings: Dict[str, List[float]], position: int):
-        """Save checkpoint to disk."""
-        checkpoint_file = self.checkpoint_dir / "checkpoint.json"
+    async def generate_async(
+        self,
+        documents: List[str],
+        doc_ids: Optional[List[str]] = None,
+        max_concurrency: int = 8,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        max_retries: int = 6,
+        resume_from_checkpoint: bool = True,
+        show_progress: bool = True
+    ) -> Dict[str, List[float]]:
+        """
+        Generate embeddings with several batches in flight at once.
 
-        checkpoint = {
-            'position': position,
-            'embeddings': embeddings,
-            'timestamp': time.time()
-        }
+        Batches are admitted under requests-per-minute and tokens-per-minute
+        budgets. Concurrency backs off on 429s and recovers on success.
+        Completed batches are reordered so the result (and checkpoints) follow
+        ``doc_ids`` order.
 
-        with open(checkpoint_file, 'w') as f:
-            json.dump(checkpoint, f)
+        Uses ``embedder.aembed`` when available, otherwise runs
+        ``embedder.embed`` in a worker thread.
+
+        Args:
+            documents: List of text documents
+            doc_ids: Optional list of document IDs (uses indices if None)
+            max_concurrency: Upper bound on batches in flight
+            requests_per_minute: Provider request quota (None = unlimited)
+            tokens_per_minute: Provider token quota (None = unlimited)
+            max_retries: Retries per batch on rate-limit errors
+            resume_from_checkpoint: Whether to resume from saved checkpoint
+            show_progress: Show progress information
+
+        Returns:
+            Dictionary mapping doc_id to embedding vector
+        """
+        if doc_ids is None:
+            doc_ids = [str(i) for i in range(len(documents))]
+
+        if len(documents) != len(doc_ids):
+            raise ValueError("documents and doc_ids must have same length")
+
+        embeddings = {}
+        start_idx = 0
+
+        if resume_from_checkpoint and self.checkpoint_dir:
+            embeddings, start_idx = self._load_checkpoint()
+            if start_idx > 0 and show_progress:
+                print(f"Resuming from document {start_idx}/{len(documents)}")
+        elif self.checkpoint_log:
+            self.checkpoint_log.reset()
+
+        total = len(documents)
+        batches = [
+            (i, min(i + self.batch_size, total))
+            for i in range(start_idx, total, self.batch_size)
+        ]
+
+        rpm = TokenBucket(requests_per_minute) if requests_per_minute else None
+        tpm = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        limiter = AdaptiveConcurrency(max_concurrency)
+
+        async def run_batch(batch_start: int, batch_end: int) -> Tuple[int, List]:
+            batch_docs = documents[batch_start:batch_end]
+            batch_tokens = sum(estimate_tokens(doc) for doc in batch_docs)
+
+            for attempt in range(max_retries + 1):
+                await limiter.acquire()
+                try:
+                    if rpm:
+                        await rpm.acquire(1)
+                    if tpm:
+                        await tpm.acquire(batch_tokens)
+                    result = await self._embed_async(batch_docs)
+                    limiter.on_success()
+                    return batch_start, result
+                except Exception as e:
+                    if not is_rate_limit_error(e) or attempt == max_retries:
+                        raise
+                    limiter.on_throttle()
+                    delay = retry_after_seconds(e) or min(60.0, 2.0 ** attempt)
+                finally:
+                    await limiter.release()
+
+                if show_progress:
+                    print(f"Rate limited on {batch_start}-{batch_end}, "
+                          f"concurrency -> {limiter.limit}, retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+
+        # Completed batches wait here until every earlier batch has landed
+        completed: Dict[int, Tuple[int, List]] = {}
+        processed = start_idx
+        last_saved = start_idx
+        # Cap how far ahead of the oldest unfinished batch we schedule
+        window = max_concurrency * 4
+
+        in_flight = set()
+        next_batch = 0
+        started = time.time()
+
+        try:
+            while next_batch < len(batches) or in_flight:
+                while (next_batch < len(batches) and len(in_flight) < max_concurrency
+                       and batches[next_batch][0] - processed < window * self.batch_size):
+                    batch_start, batch_end = batches[next_batch]
+                    in_flight.add(asyncio.ensure_future(run_batch(batch_start, batch_end)))
+                    next_batch += 1
+
+                done, in_flight = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    batch_start, batch_embeddings = task.result()
+                    completed[batch_start] = (batch_start + len(batch_embeddings), batch_embeddings)
+
+                # Drain the contiguous prefix in doc_ids order
+                while processed in completed:
+                    batch_end, batch_embeddings = completed.pop(processed)
+                    for doc_id, embedding in zip(doc_ids[processed:batch_end], batch_embeddings):
+                        embeddings[doc_id] = embedding
+                    processed = batch_end
+
+                if show_progress and done:
+                    rate = (processed - start_idx) / max(time.time() - started, 1e-9)
+                    print(f"Processed {processed}/{total} ({processed / total * 100:.1f}%) "
+                          f"- {rate:.0f} docs/s, concurrency {limiter.limit}")
+
+                if self.checkpoint_dir and processed // self.save_interval > last_saved // self.save_interval:
+                    self._save_checkpoint(embeddings, processed)
+                    last_saved = processed
+                    if show_progress:
+                        print(f"Checkpoint saved at {processed} documents")
+
+        except Exception as e:
+            for task in in_flight:
+                task.cancel()
+            print(f"Error processing batches after document {processed}: {e}")
+            if self.checkpoint_dir:
+                self._save_checkpoint(embeddings, processed)
+            raise
+
+        if self.checkpoint_dir:
+            self._save_checkpoint(embeddings, total)
+
+        if show_progress:
+            print(f"Complete: {len(embeddings)} embeddings generated "
+                  f"({limiter.throttled} rate-limit retries)")
+
+        return embeddings
+
+    async def _embed_async(self, texts: List[str]) -> List[List[float]]:
+        """Call the embedder's async API, or the sync one in a thread."""
+        if hasattr(self.embedder, 'aembed'):
+            return await self.embedder.aembed(texts)
+        return await asyncio.to_thread(self.embedder.embed, texts)
+
+    def _save_checkpoint(self, embeddings: Dict[str, List[float]], position: int):
+        """Append embeddings added since the last checkpoint to the log."""
+        logged = self.checkpoint_log.rows
+        new_items = list(islice(embeddings.items(), logged, None))
+        self.checkpoint_log.append(new_items, position)
+
+        # Drop a legacy JSON checkpoint once its rows live in the log
+        legacy_file = self.checkpoint_dir / "checkpoint.json"
+        if legacy_file.exists():
+            legacy_file.unlink()
 
     def _load_checkpoint(self) -> tuple:
         """Load checkpoint from disk."""
+        log = self.checkpoint_log
+        if log.segments or log.position:
+            try:
+                embeddings = {}
+                for doc_ids, matrix in log.iter_segments():
+                    for doc_id, row in zip(doc_ids, matrix):
+                        embeddings[doc_id] = row.tolist()
+                return embeddings, log.position
+
+            except Exception as e:
+                print(f"Error loading checkpoint: {e}")
+                return {}, 0
+
+        # Fall back to a checkpoint written by the older JSON format
         checkpoint_file = self.checkpoint_dir / "checkpoint.json"
 
         if not checkpoint_file.exists():
@@ -173,7 +545,12 @@ class BatchEmbeddingGenerator:
         Args:
             embeddings: Dictionary of embeddings
             output_file: Output file path
-            format: 'json' or 'npy' or 'npz'
+            format: 'json', 'npy', 'npz' or 'mmap'
+
+        The 'mmap' format writes a float32 ``.npy`` through
+        ``np.lib.format.open_memmap`` one row at a time (no intermediate
+        in-memory matrix) plus a ``.ids`` sidecar with one JSON doc_id per
+        line. Reopen it with ``np.load(path, mmap_mode='r')``.
         """
         output_path = Path(output_file)
         output_path.parent.mkdir(parents=True, exist_ok=True)
@@ -193,6 +570,20 @@ class BatchEmbeddingGenerator:
             vectors = np.array(list(embeddings.values()))
             np.savez(output_path, doc_ids=doc_ids, embeddings=vectors)
 
+        elif format == 'mmap':
+            dim = len(next(iter(embeddings.values()))) if embeddings else 0
+            vectors = np.lib.format.open_memmap(
+                output_path, mode='w+', dtype=np.float32,
+                shape=(len(embeddings), dim)
+            )
+            ids_path = output_path.with_suffix('.ids')
+            with open(ids_path, 'w', encoding='utf-8') as f:
+                for row, (doc_id, embedding) in enumerate(embeddings.items()):
+                    vectors[row] = embedding
+                    f.write(json.dumps(doc_id) + "\n")
+            vectors.flush()
+            del vectors
+
         else:
             raise ValueError(f"Unsupported format: {format}")
 
@@ -240,6 +631,15 @@ if __name__ == "__main__":
         show_progress=True
     )
 
+    # Or keep several batches in flight under the provider quota
+    # embeddings = asyncio.run(generator.generate_async(
+    #     documents=documents,
+    #     doc_ids=doc_ids,
+    #     max_concurrency=8,
+    #     requests_per_minute=3000,
+    #     tokens_per_minute=1_000_000
+    # ))
+
     # Save results
     generator.save_embeddings(
         embeddings,
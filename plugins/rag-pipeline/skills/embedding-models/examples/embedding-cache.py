@@ -5,21 +5,643 @@ Avoid redundant API calls by caching embeddings with LRU and persistent storage.
 """
 
 import hashlib
+import heapq
 import json
+import os
 import pickle
+import sys
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, Dict, Optional, Any
+from typing import List, Dict, Optional, Any, Tuple, Union
 from functools import lru_cache
 import time
 
+import numpy as np
+
+
+class ShardedVectorStore:
+    """
+    On-disk vector store backed by memory-mapped float32 shards and an append-only index.
+
+    Layout inside ``cache_dir``:
+    - ``meta.json``: embedding dimension and rows per shard
+    - ``shard-00000.f32`` ...: fixed-width float32 rows read via ``np.memmap``
+    - ``index.bin``: fixed-width records mapping sha256 digest -> (shard, row, timestamp)
+
+    A lookup is a dict probe plus a single row read from the page cache, with
+    no per-entry file or deserialization. Entry counts are O(1).
+
+    Writes are buffered until ``flush()``, which syncs the shards before
+    appending their index records, so a record never points at a row that
+    did not reach disk. Overwrites go to a fresh row; the old row (like a
+    deleted one) is reused once the new record is written. The index file is
+    rewritten with only live records when superseded ones outnumber them.
+    """
+
+    INDEX_DTYPE = np.dtype([
+        ('digest', 'S32'),
+        ('shard', '<u4'),
+        ('row', '<u4'),
+        ('timestamp', '<f8'),
+    ])
+    TOMBSTONE = 0xFFFFFFFF
+    # Rewrite index.bin once it holds this many times more records than live entries
+    COMPACT_RATIO = 2
+    COMPACT_MIN_RECORDS = 1024
+
+    def __init__(self, cache_dir: Path, rows_per_shard: int = 65536):
+        """
+        Open (or create) a sharded store.
+
+        Args:
+            cache_dir: Directory holding shards and the index file
+            rows_per_shard: Number of vectors per shard file
+        """
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self.meta_path = self.cache_dir / "meta.json"
+        self.index_path = self.cache_dir / "index.bin"
+
+        self.rows_per_shard = rows_per_shard
+        self.dim: Optional[int] = None
+        self.next_slot = 0
+
+        # digest -> (shard, row, timestamp)
+        self.index: Dict[bytes, Tuple[int, int, float]] = {}
+        self._shards: Dict[int, np.memmap] = {}
+        # Records in index.bin, and records / released slots waiting for flush()
+        self._index_records = 0
+        self._pending: List[Tuple[bytes, int, int, float]] = []
+        self._pending_free: List[int] = []
+        self._free: List[int] = []
+
+        self._load()
+
+    def _load(self):
+        """Load metadata and replay the index file."""
+        if self.meta_path.exists():
+            with open(self.meta_path) as f:
+                meta = json.load(f)
+            self.dim = meta['dim']
+            self.rows_per_shard = meta['rows_per_shard']
+            self.next_slot = meta.get('next_slot', 0)
+
+        if self.index_path.exists():
+            records = np.fromfile(self.index_path, dtype=self.INDEX_DTYPE)
+            self._index_records = len(records)
+            for rec in records:
+                digest = bytes(rec['digest'])
+                shard = int(rec['shard'])
+                if shard == self.TOMBSTONE:
+                    self.index.pop(digest, None)
+                    continue
+                row = int(rec['row'])
+                self.index[digest] = (shard, row, float(rec['timestamp']))
+                self.next_slot = max(self.next_slot, shard * self.rows_per_shard + row + 1)
+
+        # Rows below next_slot that no live record points at can be reused
+        used = np.zeros(self.next_slot, dtype=bool)
+        for shard, row, _ in self.index.values():
+            used[shard * self.rows_per_shard + row] = True
+        self._free = np.flatnonzero(~used).tolist()
+
+    def _save_meta(self):
+        with open(self.meta_path, 'w') as f:
+            json.dump({
+                'dim': self.dim,
+                'rows_per_shard': self.rows_per_shard,
+                'next_slot': self.next_slot,
+            }, f)
+
+    def _shard_path(self, shard: int) -> Path:
+        return self.cache_dir / f"shard-{shard:05d}.f32"
+
+    def _open_shard(self, shard: int) -> np.memmap:
+        """Open a shard, preallocating it on first use."""
+        if shard not in self._shards:
+            path = self._shard_path(shard)
+            mode = 'r+' if path.exists() else 'w+'
+            self._shards[shard] = np.memmap(
+                path, dtype=np.float32, mode=mode,
+                shape=(self.rows_per_shard, self.dim)
+            )
+        return self._shards[shard]
+
+    def _append_index(self, records: List[Tuple[bytes, int, int, float]]):
+        with open(self.index_path, 'ab') as f:
+            np.array(records, dtype=self.INDEX_DTYPE).tofile(f)
+        self._index_records += len(records)
+
+    def compact(self):
+        """Rewrite index.bin with one record per live entry."""
+        self._sync()
+        self._rewrite_index()
+
+    def _rewrite_index(self):
+        records = [(digest, shard, row, ts) for digest, (shard, row, ts) in self.index.items()]
+        tmp_path = self.index_path.with_suffix('.bin.tmp')
+        with open(tmp_path, 'wb') as f:
+            np.array(records, dtype=self.INDEX_DTYPE).tofile(f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.index_path)
+        self._index_records = len(records)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __contains__(self, text_hash: str) -> bool:
+        return bytes.fromhex(text_hash) in self.index
+
+    def get(self, text_hash: str) -> Optional[Tuple[np.ndarray, float]]:
+        """
+        Read a vector by hex hash.
+
+        Returns:
+            (embedding row, timestamp) or None if absent
+        """
+        entry = self.index.get(bytes.fromhex(text_hash))
+        if entry is None:
+            return None
+        shard, row, timestamp = entry
+        return self._open_shard(shard)[row], timestamp
+
+    def put(self, text_hash: str, embedding: List[float], timestamp: float):
+        """Write a vector to a free row; its index record lands on flush()."""
+        vector = np.asarray(embedding, dtype=np.float32)
+        if self.dim is None:
+            self.dim = int(vector.shape[0])
+            self._save_meta()
+        elif vector.shape[0] != self.dim:
+            raise ValueError(f"Expected dimension {self.dim}, got {vector.shape[0]}")
+
+        digest = bytes.fromhex(text_hash)
+        if self._free:
+            slot = self._free.pop()
+        else:
+            slot = self.next_slot
+            self.next_slot += 1
+        shard, row = divmod(slot, self.rows_per_shard)
+        self._open_shard(shard)[row] = vector
+
+        # Never overwrite the row a durable record points at
+        self._release(self.index.get(digest))
+        self.index[digest] = (shard, row, timestamp)
+        self._pending.append((digest, shard, row, timestamp))
+
+    def delete(self, text_hash: str):
+        """Drop a vector; its row is reused after the tombstone is flushed."""
+        digest = bytes.fromhex(text_hash)
+        entry = self.index.pop(digest, None)
+        if entry is not None:
+            self._release(entry)
+            self._pending.append((digest, self.TOMBSTONE, 0, 0.0))
+
+    def _release(self, entry: Optional[Tuple[int, int, float]]):
+        if entry is not None:
+            shard, row, _ = entry
+            self._pending_free.append(shard * self.rows_per_shard + row)
+
+    def flush(self):
+        """Make pending writes durable, compacting the index file when it has grown."""
+        self._sync()
+        if self._index_records > max(self.COMPACT_MIN_RECORDS, self.COMPACT_RATIO * len(self.index)):
+            self._rewrite_index()
+
+    def _sync(self):
+        """Sync shard pages, then append pending index records and persist metadata."""
+        for shard in self._shards.values():
+            shard.flush()
+        if self.dim is not None:
+            self._save_meta()
+        if self._pending:
+            self._append_index(self._pending)
+            self._pending = []
+            self._free.extend(self._pending_free)
+            self._pending_free = []
+
+    def clear(self):
+        """Remove all shards and the index."""
+        self._shards.clear()
+        for path in self.cache_dir.glob('shard-*.f32'):
+            path.unlink()
+        for path in (self.index_path, self.meta_path):
+            if path.exists():
+                path.unlink()
+        self.index.clear()
+        self.dim = None
+        self.next_slot = 0
+        self._index_records = 0
+        self._pending = []
+        self._pending_free = []
+        self._free = []
+
+
+def estimate_embedding_bytes(embedding: Any) -> int:
+    """Approximate resident size of a cached embedding."""
+    if isinstance(embedding, np.ndarray):
+        return embedding.nbytes + 112
+    # list object + one boxed float (24 bytes) per element
+    return sys.getsizeof(embedding) + 24 * len(embedding)
+
+
+class EvictionPolicy:
+    """
+    Base class for memory-tier eviction policies.
+
+    Entries are stored as ``key -> (value, timestamp, size_bytes)``. Subclasses
+    maintain their own O(1) bookkeeping through the ``_on_*`` hooks and pick a
+    victim in ``_victim``. Capacity is bounded both by entry count and by an
+    optional byte budget.
+    """
+
+    def __init__(self, max_entries: int = 10000, max_bytes: Optional[int] = None):
+        """
+        Args:
+            max_entries: Maximum number of cached entries
+            max_bytes: Optional memory budget in bytes (None = count only)
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.entries: Dict[str, Tuple[Any, float, int]] = {}
+        self.current_bytes = 0
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.entries
+
+    def get(self, key: str) -> Optional[Tuple[Any, float]]:
+        """Return (value, timestamp) and record the access, or None."""
+        entry = self.entries.get(key)
+        if entry is None:
+            self._on_miss(key)
+            return None
+        self._on_access(key)
+        return entry[0], entry[1]
+
+    def put(self, key: str, value: Any, timestamp: float) -> bool:
+        """
+        Insert or refresh an entry, evicting as needed.
+
+        Returns:
+            True if the entry was admitted
+        """
+        size = estimate_embedding_bytes(value)
+        if self.max_bytes is not None and size > self.max_bytes:
+            return False
+
+        if key in self.entries:
+            self.current_bytes -= self.entries[key][2]
+            self.entries[key] = (value, timestamp, size)
+            self.current_bytes += size
+            self._on_update(key)
+            self._shrink()
+            return True
+
+        if self._is_full(size):
+            if not self._admit(key):
+                return False
+            # Make room before inserting so the new key is never its own victim
+            while self.entries and self._is_full(size):
+                self._evict_one()
+
+        self.entries[key] = (value, timestamp, size)
+        self.current_bytes += size
+        self._on_insert(key)
+        return True
+
+    def remove(self, key: str):
+        """Drop an entry if present."""
+        entry = self.entries.pop(key, None)
+        if entry is not None:
+            self.current_bytes -= entry[2]
+            self._on_remove(key)
+
+    def clear(self):
+        self.entries.clear()
+        self.current_bytes = 0
+        self._on_clear()
+
+    def set_capacity(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None):
+        """Change the entry and/or byte cap (None = keep current), evicting down to it."""
+        if max_entries is not None:
+            self.max_entries = max_entries
+        if max_bytes is not None:
+            self.max_bytes = max_bytes
+        self._shrink()
+
+    def _is_full(self, incoming_bytes: int = 0) -> bool:
+        if len(self.entries) >= self.max_entries:
+            return True
+        return self.max_bytes is not None and self.current_bytes + incoming_bytes > self.max_bytes
+
+    def _over_capacity(self) -> bool:
+        if len(self.entries) > self.max_entries:
+            return True
+        return self.max_bytes is not None and self.current_bytes > self.max_bytes
+
+    def _evict_one(self):
+        self.remove(self._victim())
+        self.evictions += 1
+
+    def _shrink(self):
+        while self.entries and self._over_capacity():
+            self._evict_one()
+
+    # Hooks for subclasses
+    def _admit(self, key: str) -> bool:
+        return True
+
+    def _victim(self) -> str:
+        raise NotImplementedError
+
+    def _on_miss(self, key: str):
+        pass
+
+    def _on_access(self, key: str):
+        pass
+
+    def _on_insert(self, key: str):
+        pass
+
+    def _on_update(self, key: str):
+        self._on_access(key)
+
+    def _on_remove(self, key: str):
+        pass
+
+    def _on_clear(self):
+        pass
+
+
+class LRUPolicy(EvictionPolicy):
+    """Least-recently-used eviction backed by an OrderedDict."""
+
+    def __init__(self, max_entries: int = 10000, max_bytes: Optional[int] = None):
+        super().__init__(max_entries, max_bytes)
+        self.order: "OrderedDict[str, None]" = OrderedDict()
+
+    def _victim(self) -> str:
+        return next(iter(self.order))
+
+    def _on_access(self, key: str):
+        self.order.move_to_end(key)
+
+    def _on_insert(self, key: str):
+        self.order[key] = None
+
+    def _on_remove(self, key: str):
+        self.order.pop(key, None)
+
+    def _on_clear(self):
+        self.order.clear()
+
+
+class LFUPolicy(EvictionPolicy):
+    """
+    Least-frequently-used eviction with O(1) frequency buckets.
+
+    Ties within a frequency are broken by recency (oldest first).
+    """
+
+    def __init__(self, max_entries: int = 10000, max_bytes: Optional[int] = None):
+        super().__init__(max_entries, max_bytes)
+        self.freq: Dict[str, int] = {}
+        self.buckets: Dict[int, "OrderedDict[str, None]"] = {}
+        self.min_freq = 0
+
+    def _bucket(self, freq: int) -> "OrderedDict[str, None]":
+        if freq not in self.buckets:
+            self.buckets[freq] = OrderedDict()
+        return self.buckets[freq]
+
+    def _victim(self) -> str:
+        while not self.buckets.get(self.min_freq):
+            self.min_freq += 1
+        return next(iter(self.buckets[self.min_freq]))
+
+    def _on_access(self, key: str):
+        freq = self.freq[key]
+        bucket = self.buckets[freq]
+        del bucket[key]
+        if not bucket:
+            del self.buckets[freq]
+            if self.min_freq == freq:
+                self.min_freq = freq + 1
+        self.freq[key] = freq + 1
+        self._bucket(freq + 1)[key] = None
+
+    def _on_insert(self, key: str):
+        self.freq[key] = 1
+        self._bucket(1)[key] = None
+        self.min_freq = 1
+
+    def _on_remove(self, key: str):
+        freq = self.freq.pop(key, None)
+        if freq is None:
+            return
+        bucket = self.buckets.get(freq)
+        if bucket is not None:
+            bucket.pop(key, None)
+            if not bucket:
+                del self.buckets[freq]
+
+    def _on_clear(self):
+        self.freq.clear()
+        self.buckets.clear()
+        self.min_freq = 0
+
+
+class CountMinSketch:
+    """
+    Approximate frequency counter used for TinyLFU admission.
+
+    Counters are halved after ``sample_size`` increments so that the
+    sketch tracks recent popularity rather than all-time counts.
+    """
+
+    def __init__(self, width: int = 4096, depth: int = 4, sample_size: Optional[int] = None):
+        self.width = width
+        self.depth = depth
+        self.table = [[0] * width for _ in range(depth)]
+        self.sample_size = sample_size or width * 10
+        self.additions = 0
+
+    def _indexes(self, key: str):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=8 * self.depth).digest()
+        for i in range(self.depth):
+            yield i, int.from_bytes(digest[i * 8:(i + 1) * 8], 'little') % self.width
+
+    def increment(self, key: str):
+        for row, col in self._indexes(key):
+            self.table[row][col] += 1
+        self.additions += 1
+        if self.additions >= self.sample_size:
+            self._age()
+
+    def estimate(self, key: str) -> int:
+        return min(self.table[row][col] for row, col in self._indexes(key))
+
+    def _age(self):
+        for row in self.table:
+            for col in range(self.width):
+                row[col] >>= 1
+        self.additions //= 2
+
+    def clear(self):
+        for row in self.table:
+            for col in range(self.width):
+                row[col] = 0
+        self.additions = 0
+
+
+class TinyLFUPolicy(LRUPolicy):
+    """
+    LRU eviction with TinyLFU admission.
+
+    When the cache is full, a new key is admitted only if its estimated
+    access frequency beats the LRU victim's. This keeps one-off keys from a
+    bulk backfill from flushing the hot working set.
+    """
+
+    def __init__(self, max_entries: int = 10000, max_bytes: Optional[int] = None):
+        super().__init__(max_entries, max_bytes)
+        width = 1 << max(8, (max(max_entries, 1) - 1).bit_length())
+        self.sketch = CountMinSketch(width=width)
+        self.rejections = 0
+
+    def _on_miss(self, key: str):
+        self.sketch.increment(key)
+
+    def _on_access(self, key: str):
+        self.sketch.increment(key)
+        super()._on_access(key)
+
+    def _admit(self, key: str) -> bool:
+        if not self.order:
+            return True
+        victim = self._victim()
+        if self.sketch.estimate(key) > self.sketch.estimate(victim):
+            return True
+        self.rejections += 1
+        return False
+
+    def _on_clear(self):
+        super()._on_clear()
+        self.sketch.clear()
+
+
+class TTLPolicy(LRUPolicy):
+    """
+    LRU eviction that prefers already-expired entries.
+
+    A min-heap on entry timestamp gives O(log n) access to the next entry to
+    expire, even when entries arrive out of timestamp order (promotions from
+    the disk tier keep their original write time). Heap items superseded by
+    an update or removal are skipped lazily. Expired entries are purged on
+    insert before any live entry is evicted.
+    """
+
+    def __init__(self, ttl_seconds: float, max_entries: int = 10000, max_bytes: Optional[int] = None):
+        super().__init__(max_entries, max_bytes)
+        self.ttl_seconds = ttl_seconds
+        self.expiry: List[Tuple[float, str]] = []
+
+    def _expired(self, key: str, now: float) -> bool:
+        return (now - self.entries[key][1]) >= self.ttl_seconds
+
+    def _oldest(self) -> Optional[str]:
+        """Key with the smallest timestamp, dropping stale heap items."""
+        while self.expiry:
+            timestamp, key = self.expiry[0]
+            entry = self.entries.get(key)
+            if entry is not None and entry[1] == timestamp:
+                return key
+            heapq.heappop(self.expiry)
+        return None
+
+    def purge_expired(self):
+        """Drop expired entries, oldest first."""
+        now = time.time()
+        while True:
+            key = self._oldest()
+            if key is None or not self._expired(key, now):
+                break
+            self.remove(key)
+
+    def put(self, key: str, value: Any, timestamp: float) -> bool:
+        self.purge_expired()
+        return super().put(key, value, timestamp)
+
+    def _victim(self) -> str:
+        oldest = self._oldest()
+        if oldest is not None and self._expired(oldest, time.time()):
+            return oldest
+        return super()._victim()
+
+    def _push(self, key: str):
+        heapq.heappush(self.expiry, (self.entries[key][1], key))
+        if len(self.expiry) > 2 * len(self.entries) + 64:
+            # Too many stale items: rebuild from the live entries
+            self.expiry = [(entry[1], k) for k, entry in self.entries.items()]
+            heapq.heapify(self.expiry)
+
+    def _on_insert(self, key: str):
+        super()._on_insert(key)
+        self._push(key)
+
+    def _on_update(self, key: str):
+        super()._on_update(key)
+        self._push(key)
+
+    def _on_clear(self):
+        super()._on_clear()
+        self.expiry.clear()
+
+
+def create_eviction_policy(
+    name: str,
+    max_entries: int = 10000,
+    max_bytes: Optional[int] = None,
+    ttl_seconds: Optional[float] = None
+) -> EvictionPolicy:
+    """
+    Build an eviction policy by name.
+
+    Args:
+        name: One of 'lru', 'lfu', 'tinylfu', 'ttl'
+        max_entries: Maximum number of cached entries
+        max_bytes: Optional memory budget in bytes
+        ttl_seconds: Entry lifetime, required for 'ttl'
+
+    Returns:
+        EvictionPolicy instance
+    """
+    name = name.lower()
+    if name == 'lru':
+        return LRUPolicy(max_entries, max_bytes)
+    if name == 'lfu':
+        return LFUPolicy(max_entries, max_bytes)
+    if name == 'tinylfu':
+        return TinyLFUPolicy(max_entries, max_bytes)
+    if name == 'ttl':
+        if ttl_seconds is None:
+            raise ValueError("ttl policy requires ttl_seconds")
+        return TTLPolicy(ttl_seconds, max_entries, max_bytes)
+    raise ValueError(f"Unknown eviction policy: {name}")
+
 
 class EmbeddingCache:
     """
     Cache embeddings to avoid redundant API calls.
 
     Features:
-    - In-memory LRU cache for fast access
-    - Persistent disk cache for long-term storage
+    - In-memory cache with pluggable O(1) eviction (LRU, LFU, TinyLFU, TTL)
+    - Memory budget by entry count and/or bytes
+    - Persistent disk cache in memory-mapped float32 shards
     - Content-based hashing for cache keys
     - Automatic cache invalidation
     - Cache statistics and monitoring
@@ -29,9 +651,12 @@ class EmbeddingCache:
         self,
         embedder,
         cache_dir: str = ".embedding_cache",
-        max_memory_size: int = 10000,
+        max_memory_size: Optional[int] = None,
         use_disk_cache: bool = True,
-        ttl_seconds: Optional[int] = None
+        ttl_seconds: Optional[int] = None,
+        rows_per_shard: int = 65536,
+        eviction_policy: Union[str, EvictionPolicy] = "lru",
+        max_memory_bytes: Optional[int] = None
     ):
         """
         Initialize embedding cache.
@@ -39,18 +664,33 @@ class EmbeddingCache:
         Args:
             embedder: Embedding model instance
             cache_dir: Directory for disk cache
-            max_memory_size: Maximum number of embeddings in memory
+            max_memory_size: Maximum number of embeddings in memory (default
+                10000, or the policy's own cap when a policy instance is given)
             use_disk_cache: Whether to use persistent disk cache
             ttl_seconds: Time-to-live for cache entries (None = no expiration)
+            rows_per_shard: Vectors per memory-mapped shard file
+            eviction_policy: 'lru', 'lfu', 'tinylfu', 'ttl' or an EvictionPolicy
+                instance (max_memory_size / max_memory_bytes, when given, are
+                applied to the instance)
+            max_memory_bytes: Memory-tier budget in bytes (None = count only)
         """
         self.embedder = embedder
         self.cache_dir = Path(cache_dir)
-        self.max_memory_size = max_memory_size
         self.use_disk_cache = use_disk_cache
         self.ttl_seconds = ttl_seconds
 
         # In-memory cache
-        self.memory_cache: Dict[str, tuple] = {}  # hash -> (embedding, timestamp)
+        if isinstance(eviction_policy, EvictionPolicy):
+            self.memory_cache = eviction_policy
+            self.memory_cache.set_capacity(max_memory_size, max_memory_bytes)
+        else:
+            self.memory_cache = create_eviction_policy(
+                eviction_policy,
+                max_entries=10000 if max_memory_size is None else max_memory_size,
+                max_bytes=max_memory_bytes,
+                ttl_seconds=ttl_seconds
+            )
+        self.max_memory_size = self.memory_cache.max_entries
 
         # Cache statistics
         self.stats = {
@@ -60,8 +700,29 @@ class EmbeddingCache:
             'total_requests': 0
         }
 
+        self.disk_store: Optional[ShardedVectorStore] = None
         if self.use_disk_cache:
-            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self.disk_store = ShardedVectorStore(self.cache_dir, rows_per_shard)
+            self._migrate_pickle_cache()
+
+    def _migrate_pickle_cache(self):
+        """Move legacy one-file-per-vector ``.pkl`` entries into the sharded store."""
+        migrated = 0
+        for cache_file in self.cache_dir.glob('*.pkl'):
+            try:
+                with open(cache_file, 'rb') as f:
+                    data = pickle.load(f)
+                text_hash = cache_file.stem
+                if text_hash not in self.disk_store and self._is_valid(data['timestamp']):
+                    self.disk_store.put(text_hash, data['embedding'], data['timestamp'])
+                cache_file.unlink()
+                migrated += 1
+            except Exception as e:
+                print(f"Error migrating cache file {cache_file.name}: {e}")
+
+        if migrated:
+            self.disk_store.flush()
+            print(f"Migrated {migrated} legacy cache files")
 
     def _hash_text(self, text: str) -> str:
         """Generate hash for text content."""
@@ -75,14 +736,15 @@ class EmbeddingCache:
 
     def _get_from_memory(self, text_hash: str) -> Optional[List[float]]:
         """Get embedding from memory cache."""
-        if text_hash in self.memory_cache:
-            embedding, timestamp = self.memory_cache[text_hash]
+        entry = self.memory_cache.get(text_hash)
+        if entry is not None:
+            embedding, timestamp = entry
             if self._is_valid(timestamp):
                 self.stats['hits'] += 1
                 return embedding
             else:
                 # Expired, remove from cache
-                del self.memory_cache[text_hash]
+                self.memory_cache.remove(text_hash)
         return None
 
     def _get_from_disk(self, text_hash: str) -> Optional[List[float]]:
@@ -90,59 +752,41 @@ class EmbeddingCache:
         if not self.use_disk_cache:
             return None
 
-        cache_file = self.cache_dir / f"{text_hash}.pkl"
-        if not cache_file.exists():
-            return None
-
         try:
-            with open(cache_file, 'rb') as f:
-                data = pickle.load(f)
-                embedding = data['embedding']
-                timestamp = data['timestamp']
-
-                if self._is_valid(timestamp):
-                    # Add to memory cache
-                    self._add_to_memory(text_hash, embedding, timestamp)
-                    self.stats['hits'] += 1
-                    return embedding
-                else:
-                    # Expired, remove from disk
-                    cache_file.unlink()
-                    return None
+            entry = self.disk_store.get(text_hash)
+            if entry is None:
+                return None
+
+            row, timestamp = entry
+            if self._is_valid(timestamp):
+                embedding = row.tolist()
+                # Promote with the stored timestamp so the TTL still runs from
+                # the original write
+                self._add_to_memory(text_hash, embedding, timestamp)
+                self.stats['hits'] += 1
+                return embedding
+            else:
+                # Expired, remove from disk
+                self.disk_store.delete(text_hash)
+                return None
 
         except Exception as e:
-            print(f"Error reading cache file: {e}")
+            print(f"Error reading disk cache: {e}")
             return None
 
     def _add_to_memory(self, text_hash: str, embedding: List[float], timestamp: float):
-        """Add embedding to memory cache with LRU eviction."""
-        # Evict oldest if at capacity
-        if len(self.memory_cache) >= self.max_memory_size:
-            # Remove oldest entry
-            oldest_hash = min(
-                self.memory_cache.keys(),
-                key=lambda h: self.memory_cache[h][1]
-            )
-            del self.memory_cache[oldest_hash]
-
-        self.memory_cache[text_hash] = (embedding, timestamp)
+        """Add embedding to memory cache; the eviction policy handles capacity."""
+        self.memory_cache.put(text_hash, embedding, timestamp)
 
     def _add_to_disk(self, text_hash: str, embedding: List[float], timestamp: float):
         """Add embedding to disk cache."""
         if not self.use_disk_cache:
             return
 
-        cache_file = self.cache_dir / f"{text_hash}.pkl"
-        data = {
-            'embedding': embedding,
-            'timestamp': timestamp
-        }
-
         try:
-            with open(cache_file, 'wb') as f:
-                pickle.dump(data, f)
+            self.disk_store.put(text_hash, embedding, timestamp)
         except Exception as e:
-            print(f"Error writing cache file: {e}")
+            print(f"Error writing disk cache: {e}")
 
     def get_embedding(self, text: str) -> List[float]:
         """
@@ -177,6 +821,8 @@ class EmbeddingCache:
         # Add to caches
         self._add_to_memory(text_hash, embedding, timestamp)
         self._add_to_disk(text_hash, embedding, timestamp)
+        if self.use_disk_cache:
+            self.disk_store.flush()
 
         return embedding
 
@@ -227,6 +873,9 @@ class EmbeddingCache:
                 self._add_to_disk(text_hash, embedding, timestamp)
                 embeddings[idx] = embedding
 
+            if self.use_disk_cache:
+                self.disk_store.flush()
+
         return embeddings
 
     def get_stats(self) -> Dict[str, Any]:
@@ -239,7 +888,9 @@ class EmbeddingCache:
             **self.stats,
             'hit_rate': hit_rate,
             'memory_cache_size': len(self.memory_cache),
-            'disk_cache_size': len(list(self.cache_dir.glob('*.pkl'))) if self.use_disk_cache else 0
+            'memory_cache_bytes': self.memory_cache.current_bytes,
+            'evictions': self.memory_cache.evictions,
+            'disk_cache_size': len(self.disk_store) if self.use_disk_cache else 0
         }
 
     def clear_cache(self, clear_disk: bool = False):
@@ -252,8 +903,7 @@ class EmbeddingCache:
         self.memory_cache.clear()
 
         if clear_disk and self.use_disk_cache:
-            for cache_file in self.cache_dir.glob('*.pkl'):
-                cache_file.unlink()
+            self.disk_store.clear()
 
         print("Cache cleared")
 
@@ -267,6 +917,8 @@ class EmbeddingCache:
         print(f"Hit Rate: {stats['hit_rate']:.1f}%")
         print(f"API Calls: {stats['api_calls']}")
         print(f"Memory Cache Size: {stats['memory_cache_size']}")
+        print(f"Memory Cache Bytes: {stats['memory_cache_bytes']:,}")
+        print(f"Evictions: {stats['evictions']}")
         print(f"Disk Cache Size: {stats['disk_cache_size']}")
 
         # Calculate savings
@@ -304,6 +956,8 @@ if __name__ == "__main__":
         embedder=embedder,
         cache_dir=".embedding_cache",
         max_memory_size=1000,
+        max_memory_bytes=64 * 1024 * 1024,  # 64MB memory tier
+        eviction_policy="tinylfu",
         use_disk_cache=True,
         ttl_seconds=86400  # 24 hours
     )
@@ -0,0 +1,226 @@
+"""
+Token-Aware Batch Packer Template
+
+Groups texts into embedding requests by estimated token length instead of
+a fixed list size. API providers get requests packed up to their per-request
+token and item limits; local models get length-sorted batches to cut padding.
+Results are always restored to the caller's original order.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token estimate (~4 characters per token for English text)."""
+    return len(text) // 4 + 1
+
+
+# Per-request limits for the hosted providers
+PROVIDER_LIMITS = {
+    'openai': {'max_tokens_per_request': 300000, 'max_items_per_request': 2048, 'max_tokens_per_item': 8191},
+    'cohere': {'max_tokens_per_request': 96 * 512, 'max_items_per_request': 96, 'max_tokens_per_item': 512},
+}
+
+
+@dataclass
+class PackingStats:
+    """Running metrics for packed requests."""
+    requests: int = 0
+    texts: int = 0
+    tokens: int = 0
+    padded_tokens: int = 0
+    oversized_texts: int = 0
+    max_request_tokens: int = 0
+
+    @property
+    def tokens_per_request(self) -> float:
+        return self.tokens / self.requests if self.requests else 0.0
+
+    @property
+    def padding_waste(self) -> float:
+        """Fraction of padded token slots that carry no real tokens."""
+        return 1 - self.tokens / self.padded_tokens if self.padded_tokens else 0.0
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            'requests': self.requests,
+            'texts': self.texts,
+            'tokens': self.tokens,
+            'tokens_per_request': round(self.tokens_per_request, 1),
+            'max_tokens_in_request': self.max_request_tokens,
+            'padding_waste': round(self.padding_waste, 4),
+            'oversized_texts': self.oversized_texts,
+        }
+
+
+class TokenBatchPacker:
+    """
+    Pack texts into requests bounded by tokens and item count.
+
+    Texts are sorted by estimated token length and filled greedily, so each
+    request holds texts of similar length (minimal padding) and stays under
+    the provider's token budget. Texts longer than ``max_tokens_per_item``
+    are counted in ``stats.oversized_texts`` and either truncated to the
+    limit (``oversized='truncate'``) or rejected with ValueError before any
+    request is sent (``oversized='error'``).
+
+    Usage:
+        packer = TokenBatchPacker.for_provider('openai')
+        embeddings = packer.run(texts, lambda batch: client_embed(batch))
+        print(packer.stats.to_dict())
+    """
+
+    def __init__(
+        self,
+        max_tokens_per_request: int,
+        max_items_per_request: int,
+        max_tokens_per_item: Optional[int] = None,
+        token_counter: Optional[Callable[[str], int]] = None,
+        oversized: str = 'truncate'
+    ):
+        """
+        Args:
+            max_tokens_per_request: Token budget per request
+            max_items_per_request: Maximum texts per request
+            max_tokens_per_item: Per-text token limit (None = no limit)
+            token_counter: Function returning token count for a text
+                (defaults to a ~4 chars/token estimate; pass a tiktoken or
+                HF tokenizer length function for exact counts)
+            oversized: 'truncate' cuts texts over max_tokens_per_item down to
+                the limit; 'error' raises ValueError instead
+        """
+        if oversized not in ('truncate', 'error'):
+            raise ValueError(f"oversized must be 'truncate' or 'error', got {oversized!r}")
+        self.max_tokens_per_request = max_tokens_per_request
+        self.max_items_per_request = max_items_per_request
+        self.max_tokens_per_item = max_tokens_per_item
+        self.count_tokens = token_counter or estimate_tokens
+        self.oversized = oversized
+        self.stats = PackingStats()
+
+    @classmethod
+    def for_provider(cls, provider: str, **overrides) -> 'TokenBatchPacker':
+        """Create a packer preconfigured with a hosted provider's limits."""
+        limits = {**PROVIDER_LIMITS[provider], **overrides}
+        return cls(**limits)
+
+    def pack(self, texts: Sequence[str]) -> List[List[int]]:
+        """
+        Group text indices into requests.
+
+        Args:
+            texts: Texts to pack
+
+        Returns:
+            List of index lists, one per request
+        """
+        return self._pack(texts)[0]
+
+    def _pack(self, texts: Sequence[str]) -> Tuple[List[List[int]], List[str]]:
+        """Pack texts; also return them with oversized ones truncated."""
+        texts = list(texts)
+        token_counts = [self.count_tokens(text) for text in texts]
+        limit = self.max_tokens_per_item
+        if limit is not None:
+            oversized = [idx for idx, tokens in enumerate(token_counts) if tokens > limit]
+            if oversized and self.oversized == 'error':
+                raise ValueError(
+                    f"{len(oversized)} text(s) exceed {limit} tokens "
+                    f"(first at index {oversized[0]}: {token_counts[oversized[0]]} tokens)"
+                )
+            for idx in oversized:
+                texts[idx] = self._truncate(texts[idx])
+                token_counts[idx] = self.count_tokens(texts[idx])
+            self.stats.oversized_texts += len(oversized)
+
+        order = sorted(range(len(texts)), key=token_counts.__getitem__)
+
+        batches: List[List[int]] = []
+        current: List[int] = []
+        current_tokens = 0
+
+        for idx in order:
+            tokens = token_counts[idx]
+            if current and (
+                len(current) >= self.max_items_per_request
+                or current_tokens + tokens > self.max_tokens_per_request
+            ):
+                batches.append(current)
+                current, current_tokens = [], 0
+
+            current.append(idx)
+            current_tokens += tokens
+
+        if current:
+            batches.append(current)
+
+        self._record(batches, token_counts)
+        return batches, texts
+
+    def _truncate(self, text: str) -> str:
+        """Longest prefix of ``text`` within ``max_tokens_per_item``."""
+        lo, hi = 0, len(text)
+        while lo < hi:
+            mid = (lo + hi + 1) // 2
+            if self.count_tokens(text[:mid]) <= self.max_tokens_per_item:
+                lo = mid
+            else:
+                hi = mid - 1
+        return text[:lo]
+
+    def _record(self, batches: List[List[int]], token_counts: List[int]):
+        for batch in batches:
+            lengths = [token_counts[idx] for idx in batch]
+            batch_tokens = sum(lengths)
+            self.stats.requests += 1
+            self.stats.texts += len(batch)
+            self.stats.tokens += batch_tokens
+            self.stats.padded_tokens += max(lengths) * len(batch)
+            self.stats.max_request_tokens = max(self.stats.max_request_tokens, batch_tokens)
+
+    def run(
+        self,
+        texts: Sequence[str],
+        embed_fn: Callable[[List[str]], Sequence],
+        show_progress: bool = False
+    ) -> list:
+        """
+        Pack texts, call ``embed_fn`` once per request, and restore order.
+
+        Oversized texts are embedded truncated (or rejected up front, per
+        ``oversized``).
+
+        Args:
+            texts: Texts to embed
+            embed_fn: Function embedding a list of texts
+            show_progress: Print progress information
+
+        Returns:
+            Embeddings aligned with ``texts``
+        """
+        batches, texts = self._pack(texts)
+        results: list = [None] * len(texts)
+
+        for n, batch in enumerate(batches, 1):
+            if show_progress:
+                print(f"Processing request {n}/{len(batches)} ({len(batch)} texts)")
+            batch_embeddings = embed_fn([texts[idx] for idx in batch])
+            for idx, embedding in zip(batch, batch_embeddings):
+                results[idx] = embedding
+
+        return results
+
+    def reset_stats(self):
+        self.stats = PackingStats()
+
+
+# Example usage
+if __name__ == "__main__":
+    texts = ["short"] * 5 + ["a much longer passage of text " * 40] * 3 + ["medium length text " * 5] * 4
+
+    packer = TokenBatchPacker(max_tokens_per_request=400, max_items_per_request=4)
+    batches = packer.pack(texts)
+    for batch in batches:
+        print(batch)
+    print(packer.stats.to_dict())
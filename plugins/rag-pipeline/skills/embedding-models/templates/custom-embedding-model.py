@@ -5,11 +5,24 @@ Unified interface for any embedding model with consistent API.
 Supports OpenAI, Cohere, HuggingFace, and custom models.
 """
 
+import sys
 from abc import ABC, abstractmethod
+from pathlib import Path
 from typing import List, Dict, Any, Optional
 from enum import Enum
 
 
+SKILLS_DIR = Path(__file__).resolve().parents[2]
+if str(SKILLS_DIR) not in sys.path:
+    sys.path.insert(0, str(SKILLS_DIR))
+from template_loader import load_template  # noqa: E402
+
+
+batch_packer = load_template(Path(__file__).with_name("batch-packer.py"))
+TokenBatchPacker = batch_packer.TokenBatchPacker
+estimate_tokens = batch_packer.estimate_tokens
+
+
 class EmbeddingProvider(Enum):
     """Supported embedding providers."""
     OPENAI = "openai"
@@ -66,6 +79,11 @@ class BaseEmbedding(ABC):
         """Get provider name."""
         return self.__class__.__name__
 
+    def get_packing_stats(self) -> Dict[str, Any]:
+        """Get request packing metrics, if this provider packs batches."""
+        packer = getattr(self, 'packer', None)
+        return packer.stats.to_dict() if packer else {}
+
 
 class OpenAIEmbedding(BaseEmbedding):
     """OpenAI embedding implementation."""
@@ -78,21 +96,22 @@ class OpenAIEmbedding(BaseEmbedding):
         api_key = kwargs.get('api_key') or os.environ.get('OPENAI_API_KEY')
         self.client = OpenAI(api_key=api_key)
         self.batch_size = kwargs.get('batch_size', 100)
+        self.packer = TokenBatchPacker.for_provider(
+            'openai',
+            max_items_per_request=self.batch_size,
+            token_counter=kwargs.get('token_counter')
+        )
 
     def embed(self, texts: List[str]) -> List[List[float]]:
         """Generate embeddings using OpenAI API."""
-        all_embeddings = []
-
-        for i in range(0, len(texts), self.batch_size):
-            batch = texts[i:i + self.batch_size]
-            response = self.client.embeddings.create(
-                model=self.model_name,
-                input=batch
-            )
-            batch_embeddings = [item.embedding for item in response.data]
-            all_embeddings.extend(batch_embeddings)
+        return self.packer.run(texts, self._embed_batch)
 
-        return all_embeddings
+    def _embed_batch(self, batch: List[str]) -> List[List[float]]:
+        response = self.client.embeddings.create(
+            model=self.model_name,
+            input=batch
+        )
+        return [item.embedding for item in response.data]
 
     def embed_single(self, text: str) -> List[float]:
         """Generate single embedding."""
@@ -119,11 +138,18 @@ class CohereEmbedding(BaseEmbedding):
         api_key = kwargs.get('api_key') or os.environ.get('COHERE_API_KEY')
         self.client = cohere.Client(api_key)
         self.input_type = kwargs.get('input_type', 'search_document')
+        self.packer = TokenBatchPacker.for_provider(
+            'cohere',
+            token_counter=kwargs.get('token_counter')
+        )
 
     def embed(self, texts: List[str]) -> List[List[float]]:
         """Generate embeddings using Cohere API."""
+        return self.packer.run(texts, self._embed_batch)
+
+    def _embed_batch(self, batch: List[str]) -> List[List[float]]:
         response = self.client.embed(
-            texts=texts,
+            texts=batch,
             model=self.model_name,
             input_type=self.input_type
         )
@@ -153,12 +179,25 @@ class HuggingFaceEmbedding(BaseEmbedding):
         device = kwargs.get('device', None)
         self.model = SentenceTransformer(model_name, device=device)
         self.batch_size = kwargs.get('batch_size', 32)
+        # Length-sorted batches keep padding low; order is restored afterwards
+        # The model truncates to max_seq_length with its own tokenizer, so the
+        # packer only batches: counts are capped there and texts never cut
+        count_tokens = kwargs.get('token_counter') or estimate_tokens
+        max_seq_length = self.model.max_seq_length
+        self.packer = TokenBatchPacker(
+            max_tokens_per_request=self.batch_size * max_seq_length,
+            max_items_per_request=self.batch_size,
+            token_counter=lambda text: min(count_tokens(text), max_seq_length)
+        )
 
     def embed(self, texts: List[str]) -> List[List[float]]:
         """Generate embeddings using HuggingFace model."""
+        return self.packer.run(texts, self._embed_batch)
+
+    def _embed_batch(self, batch: List[str]) -> List[List[float]]:
         embeddings = self.model.encode(
-            texts,
-            batch_size=self.batch_size,
+            batch,
+            batch_size=len(batch),
             normalize_embeddings=True,
             convert_to_numpy=True
         )
@@ -272,3 +311,4 @@ if __name__ == "__main__":
     print(f"Model: {embedder.model_name}")
     print(f"Dimensions: {embedder.get_dimensions()}")
     print(f"Embeddings shape: {len(embeddings)} x {len(embeddings[0])}")
+    print(f"Packing stats: {embedder.get_packing_stats()}")
@@ -5,13 +5,26 @@ Production-ready configuration for HuggingFace sentence-transformers
 with GPU support, batching, and normalization.
 """
 
+import sys
 import os
-from typing import List, Optional, Union
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Union
 import numpy as np
 from sentence_transformers import SentenceTransformer
 import torch
 
 
+SKILLS_DIR = Path(__file__).resolve().parents[2]
+if str(SKILLS_DIR) not in sys.path:
+    sys.path.insert(0, str(SKILLS_DIR))
+from template_loader import load_template  # noqa: E402
+
+
+batch_packer = load_template(Path(__file__).with_name("batch-packer.py"))
+TokenBatchPacker = batch_packer.TokenBatchPacker
+estimate_tokens = batch_packer.estimate_tokens
+
+
 class HuggingFaceEmbeddings:
     """
     HuggingFace Sentence Transformers client with GPU support.
@@ -27,7 +40,8 @@ class HuggingFaceEmbeddings:
         device: Optional[str] = None,
         batch_size: int = 32,
         normalize_embeddings: bool = True,
-        cache_folder: Optional[str] = None
+        cache_folder: Optional[str] = None,
+        token_counter: Optional[Callable[[str], int]] = None
     ):
         """
         Initialize HuggingFace embeddings.
@@ -38,6 +52,7 @@ class HuggingFaceEmbeddings:
             batch_size: Batch size for encoding
             normalize_embeddings: Whether to normalize embeddings to unit length
             cache_folder: Custom cache folder for models
+            token_counter: Length function used to sort texts (defaults to an estimate)
         """
         # Auto-detect device if not specified
         if device is None:
@@ -55,6 +70,17 @@ class HuggingFaceEmbeddings:
             cache_folder=cache_folder
         )
 
+        # Length-sorted batches keep padding low; order is restored afterwards
+        # The model truncates to max_seq_length with its own tokenizer, so the
+        # packer only batches: counts are capped there and texts never cut
+        count_tokens = token_counter or estimate_tokens
+        max_seq_length = self.model.max_seq_length
+        self.packer = TokenBatchPacker(
+            max_tokens_per_request=batch_size * max_seq_length,
+            max_items_per_request=batch_size,
+            token_counter=lambda text: min(count_tokens(text), max_seq_length)
+        )
+
         print(f"Loaded {model_name} on {device}")
         if device == 'cuda':
             print(f"GPU: {torch.cuda.get_device_name(0)}")
@@ -79,17 +105,23 @@ class HuggingFaceEmbeddings:
         if not texts:
             return np.array([]) if convert_to_numpy else []
 
-        # Encode texts
-        embeddings = self.model.encode(
-            texts,
-            batch_size=self.batch_size,
-            show_progress_bar=show_progress,
+        # Encode length-sorted batches, then restore the original order
+        vectors = self.packer.run(texts, self._encode_batch, show_progress=show_progress)
+
+        if convert_to_numpy:
+            return np.vstack(vectors)
+        return [vector.tolist() for vector in vectors]
+
+    def _encode_batch(self, batch: List[str]) -> np.ndarray:
+        """Encode one length-homogeneous batch."""
+        return self.model.encode(
+            batch,
+            batch_size=len(batch),
+            show_progress_bar=False,
             normalize_embeddings=self.normalize_embeddings,
-            convert_to_numpy=convert_to_numpy
+            convert_to_numpy=True
         )
 
-        return embeddings
-
     def embed_single(self, text: str) -> List[float]:
         """
         Generate embedding for a single text.
@@ -132,6 +164,10 @@ class HuggingFaceEmbeddings:
         """Get maximum sequence length the model can handle."""
         return self.model.max_seq_length
 
+    def get_packing_stats(self) -> Dict[str, Any]:
+        """Get batch packing metrics (tokens per batch, padding waste)."""
+        return self.packer.stats.to_dict()
+
 
 # Popular model presets
 MODELS = {
@@ -188,6 +224,7 @@ if __name__ == "__main__":
     ]
     embeddings = embedder.embed(texts, show_progress=True)
     print(f"Generated embeddings shape: {embeddings.shape}")
+    print(f"Packing stats: {embedder.get_packing_stats()}")
 
     # Similarity
     similarity = embedder.similarity("Hello world", "Hi there")
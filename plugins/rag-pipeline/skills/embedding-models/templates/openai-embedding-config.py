@@ -5,15 +5,26 @@ Production-ready configuration for OpenAI embeddings with retry logic,
 batching, and error handling.
 """
 
+import sys
 import os
 import time
-from typing import List, Optional
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
 from openai import OpenAI, RateLimitError, APIError
 
 
+SKILLS_DIR = Path(__file__).resolve().parents[2]
+if str(SKILLS_DIR) not in sys.path:
+    sys.path.insert(0, str(SKILLS_DIR))
+from template_loader import load_template  # noqa: E402
+
+
+TokenBatchPacker = load_template(Path(__file__).with_name("batch-packer.py")).TokenBatchPacker
+
+
 class OpenAIEmbeddings:
     """
-    OpenAI Embedding client with retry logic and batching.
+    OpenAI Embedding client with retry logic and token-aware batching.
 
     Usage:
         embedder = OpenAIEmbeddings(api_key="your-key")
@@ -26,7 +37,9 @@ class OpenAIEmbeddings:
         model: str = "text-embedding-3-small",
         max_retries: int = 3,
         retry_delay: float = 1.0,
-        batch_size: int = 100
+        batch_size: int = 100,
+        max_tokens_per_request: int = 300000,
+        token_counter: Optional[Callable[[str], int]] = None
     ):
         """
         Initialize OpenAI embeddings client.
@@ -37,6 +50,8 @@ class OpenAIEmbeddings:
             max_retries: Maximum retry attempts on failures
             retry_delay: Delay between retries in seconds
             batch_size: Maximum texts per API call
+            max_tokens_per_request: Token budget per API call
+            token_counter: Exact token counter (e.g. tiktoken); defaults to an estimate
         """
         self.api_key = api_key or os.environ.get('OPENAI_API_KEY')
         if not self.api_key:
@@ -47,6 +62,12 @@ class OpenAIEmbeddings:
         self.max_retries = max_retries
         self.retry_delay = retry_delay
         self.batch_size = batch_size
+        self.packer = TokenBatchPacker(
+            max_tokens_per_request=max_tokens_per_request,
+            max_items_per_request=batch_size,
+            max_tokens_per_item=8191,
+            token_counter=token_counter
+        )
 
     def embed(
         self,
@@ -66,45 +87,36 @@ class OpenAIEmbeddings:
         if not texts:
             return []
 
-        all_embeddings = []
-
-        # Process in batches
-        for i in range(0, len(texts), self.batch_size):
-            batch = texts[i:i + self.batch_size]
-
-            if show_progress:
-                print(f"Processing batch {i//self.batch_size + 1}/{(len(texts)-1)//self.batch_size + 1}")
-
-            # Retry logic
-            for attempt in range(self.max_retries):
-                try:
-                    response = self.client.embeddings.create(
-                        model=self.model,
-                        input=batch
-                    )
-
-                    # Extract embeddings in correct order
-                    batch_embeddings = [item.embedding for item in response.data]
-                    all_embeddings.extend(batch_embeddings)
-                    break
-
-                except RateLimitError as e:
-                    if attempt < self.max_retries - 1:
-                        wait_time = self.retry_delay * (2 ** attempt)
-                        print(f"Rate limit hit, retrying in {wait_time}s...")
-                        time.sleep(wait_time)
-                    else:
-                        raise
-
-                except APIError as e:
-                    if attempt < self.max_retries - 1:
-                        wait_time = self.retry_delay * (2 ** attempt)
-                        print(f"API error, retrying in {wait_time}s...")
-                        time.sleep(wait_time)
-                    else:
-                        raise
-
-        return all_embeddings
+        # Requests are packed by token length; results come back in input order
+        return self.packer.run(texts, self._embed_batch, show_progress=show_progress)
+
+    def _embed_batch(self, batch: List[str]) -> List[List[float]]:
+        """Embed one packed request with retry logic."""
+        for attempt in range(self.max_retries):
+            try:
+                response = self.client.embeddings.create(
+                    model=self.model,
+                    input=batch
+                )
+
+                # Extract embeddings in correct order
+                return [item.embedding for item in response.data]
+
+            except RateLimitError as e:
+                if attempt < self.max_retries - 1:
+                    wait_time = self.retry_delay * (2 ** attempt)
+                    print(f"Rate limit hit, retrying in {wait_time}s...")
+                    time.sleep(wait_time)
+                else:
+                    raise
+
+            except APIError as e:
+                if attempt < self.max_retries - 1:
+                    wait_time = self.retry_delay * (2 ** attempt)
+                    print(f"API error, retrying in {wait_time}s...")
+                    time.sleep(wait_time)
+                else:
+                    raise
 
     def embed_single(self, text: str) -> List[float]:
         """
@@ -128,6 +140,10 @@ class OpenAIEmbeddings:
         }
         return dimensions.get(self.model, 1536)
 
+    def get_packing_stats(self) -> Dict[str, Any]:
+        """Get request packing metrics (tokens per request, padding waste)."""
+        return self.packer.stats.to_dict()
+
 
 # Example usage
 if __name__ == "__main__":
@@ -151,3 +167,4 @@ if __name__ == "__main__":
     ]
     embeddings = embedder.embed(texts, show_progress=True)
     print(f"Generated {len(embeddings)} embeddings")
+    print(f"Packing stats: {embedder.get_packing_stats()}")
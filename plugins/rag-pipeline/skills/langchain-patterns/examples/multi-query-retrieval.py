@@ -7,7 +7,7 @@ Multi-query retrieval for better coverage.
 
 Features:
 - Query expansion from single question
-- Parallel retrieval across queries
+- Parallel retrieval across queries (one batched embed call, concurrent searches, deadline)
 - Result deduplication
 - Ranked fusion of results
 - Improved recall
@@ -15,11 +15,14 @@ Features:
 Usage:
     python multi-query-retrieval.py --docs ./docs --query "What is LangChain?"
     python multi-query-retrieval.py --docs ./docs --query "Explain RAG" --num-queries 5
+    python multi-query-retrieval.py --docs ./docs --query "Explain RAG" --timeout 2.0
 """
 
 import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeout
 from pathlib import Path
-from typing import List, Set
+from typing import List, Optional, Set
 from collections import defaultdict
 
 from langchain_community.document_loaders import DirectoryLoader, TextLoader
@@ -40,7 +43,9 @@ class MultiQueryRAG:
         vectorstore_path: str = "./vectorstore",
         model: str = "gpt-4",
         num_queries: int = 3,
-        k: int = 4
+        k: int = 4,
+        max_workers: int = 8,
+        timeout: Optional[float] = None
     ):
         """
         Initialize multi-query RAG.
@@ -51,11 +56,15 @@ class MultiQueryRAG:
             model: LLM model name
             num_queries: Number of queries to generate
             k: Number of documents to retrieve per query
+            max_workers: Concurrent per-query searches
+            timeout: Retrieval deadline in seconds (None = wait for all queries)
         """
         self.documents_path = Path(documents_path)
         self.vectorstore_path = Path(vectorstore_path)
         self.num_queries = num_queries
         self.k = k
+        self.timeout = timeout
+        self.pool = ThreadPoolExecutor(max_workers=max_workers)
 
         # Initialize embeddings
         self.embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
@@ -74,6 +83,16 @@ class MultiQueryRAG:
 
         print("✓ Multi-query RAG initialized")
 
+    def close(self):
+        """Stop the search worker threads."""
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self) -> "MultiQueryRAG":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
     def _load_vectorstore(self) -> FAISS:
         """Load or create vector store."""
         if self.vectorstore_path.exists():
@@ -162,6 +181,48 @@ Alternative questions:"""
 
         return all_queries
 
+    def search_all(self, queries: List[str]) -> List[List[Document]]:
+        """
+        Run every query's search concurrently.
+
+        All queries are embedded in one batched call, then one vector search
+        per query is submitted to the thread pool. Results are collected as
+        they complete; queries still running at the deadline are dropped,
+        so latency tracks the slowest search instead of the sum.
+
+        Args:
+            queries: List of queries
+
+        Returns:
+            Per-query result lists in the original query order
+            (empty for queries that missed the deadline)
+        """
+        start = time.perf_counter()
+        # OpenAI models embed queries and documents with the same encoder, so
+        # one embed_documents call returns exactly what embed_query would per
+        # query. Asymmetric models (e5, instructed bge) need embed_query.
+        vectors = self.embeddings.embed_documents(queries)
+
+        futures = {
+            self.pool.submit(self.vectorstore.similarity_search_by_vector, vector, k=self.k): i
+            for i, vector in enumerate(vectors)
+        }
+        results: List[List[Document]] = [[] for _ in queries]
+        remaining = None
+        if self.timeout is not None:
+            remaining = max(0.0, self.timeout - (time.perf_counter() - start))
+
+        try:
+            for future in as_completed(futures, timeout=remaining):
+                results[futures[future]] = future.result()
+        except FutureTimeout:
+            late = [queries[i] for f, i in futures.items() if not f.done()]
+            for future in futures:
+                future.cancel()
+            print(f"⚠ Deadline reached, skipped {len(late)} queries: {late}")
+
+        return results
+
     def retrieve_with_queries(self, queries: List[str]) -> List[Document]:
         """
         Retrieve documents using multiple queries.
@@ -179,10 +240,8 @@ Alternative questions:"""
         for i, query in enumerate(queries, 1):
             print(f"  {i}. {query}")
 
-            # Retrieve
-            docs = self.vectorstore.similarity_search(query, k=self.k)
-
-            # Deduplicate
+        # Retrieve concurrently, then deduplicate in query order
+        for docs in self.search_all(queries):
             for doc in docs:
                 content_hash = hash(doc.page_content)
                 if content_hash not in seen_content:
@@ -207,11 +266,8 @@ Alternative questions:"""
         Returns:
             Ranked list of documents
         """
-        # Get results for each query
-        query_results = []
-        for query in queries:
-            docs = self.vectorstore.similarity_search(query, k=self.k)
-            query_results.append(docs)
+        # Get results for all queries concurrently
+        query_results = self.search_all(queries)
 
         # Calculate RRF scores
         doc_scores = defaultdict(float)
@@ -331,6 +387,12 @@ def main():
         default=4,
         help="Number of documents to retrieve per query"
     )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=None,
+        help="Retrieval deadline in seconds across all queries"
+    )
     parser.add_argument(
         "--no-fusion",
         action="store_true",
@@ -339,26 +401,26 @@ def main():
 
     args = parser.parse_args()
 
-    # Initialize multi-query RAG
-    rag = MultiQueryRAG(
-        documents_path=args.docs,
-        vectorstore_path=args.vectorstore,
-        model=args.model,
-        num_queries=args.num_queries,
-        k=args.k
-    )
-
     # Query
     print("\n" + "=" * 60)
     print("Original Query:")
     print("=" * 60)
     print(f"\n{args.query}\n")
 
-    result = rag.query(
-        args.query,
-        use_fusion=not args.no_fusion,
-        show_queries=True
-    )
+    # Initialize multi-query RAG
+    with MultiQueryRAG(
+        documents_path=args.docs,
+        vectorstore_path=args.vectorstore,
+        model=args.model,
+        num_queries=args.num_queries,
+        k=args.k,
+        timeout=args.timeout
+    ) as rag:
+        result = rag.query(
+            args.query,
+            use_fusion=not args.no_fusion,
+            show_queries=True
+        )
 
     print("\n" + "=" * 60)
     print("Answer:")
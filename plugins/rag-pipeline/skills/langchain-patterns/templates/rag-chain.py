@@ -9,6 +9,7 @@ Features:
 - Multi-format document loading (PDF, TXT, CSV, MD)
 - Configurable text splitting
 - Vector store persistence
+- Incremental re-ingestion (content-hash manifest)
 - Basic retrieval chain
 - Optional conversation memory
 
@@ -26,11 +27,15 @@ Usage:
     # Load and index documents
     rag.load_documents()
 
+    # Later: only re-embed new/changed files, drop deleted ones
+    rag.load_documents(incremental=True)
+
     # Query
     result = rag.query("What are the main features?")
     print(result)
 """
 
+import sys
 import os
 from pathlib import Path
 from typing import List, Optional, Dict, Any
@@ -50,6 +55,19 @@ from langchain.memory import ConversationBufferMemory
 from langchain_core.documents import Document
 
 
+# Written next to the FAISS index by incremental loads
+MANIFEST_NAME = "ingest-manifest.sqlite"
+
+
+SKILLS_DIR = Path(__file__).resolve().parents[2]
+if str(SKILLS_DIR) not in sys.path:
+    sys.path.insert(0, str(SKILLS_DIR))
+from template_loader import load_template  # noqa: E402
+
+# Loaded on first incremental load only
+INGEST_MANIFEST_PATH = SKILLS_DIR / "document-parsers" / "templates" / "ingest-manifest.py"
+
+
 class RAGChain:
     """
     Basic RAG chain implementation.
@@ -86,6 +104,7 @@ class RAGChain:
         self.vectorstore_path = Path(vectorstore_path)
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
+        self.embedding_model = embedding_model
 
         # Initialize embeddings
         self.embeddings = OpenAIEmbeddings(model=embedding_model)
@@ -106,16 +125,22 @@ class RAGChain:
                 output_key="answer"
             )
 
-    def load_documents(self, force_reload: bool = False) -> int:
+    def load_documents(self, force_reload: bool = False, incremental: bool = False) -> int:
         """
         Load documents and create vector store.
 
         Args:
             force_reload: Force reload even if vectorstore exists
+            incremental: Update the vector store from a content-hash manifest:
+                only new and changed files are loaded and embedded, and the
+                chunks of changed and deleted files are removed
 
         Returns:
-            Number of documents loaded
+            Number of documents loaded (files re-ingested when incremental)
         """
+        if incremental:
+            return self._load_documents_incremental(force_reload)
+
         # Check if vectorstore already exists
         if self.vectorstore_path.exists() and not force_reload:
             print(f"Loading existing vector store from {self.vectorstore_path}")
@@ -144,11 +169,116 @@ class RAGChain:
         self.vectorstore.save_local(str(self.vectorstore_path))
         print(f"✓ Vector store saved to {self.vectorstore_path}")
 
+        # The store was rebuilt without manifest ids; the next incremental
+        # load starts over
+        (self.vectorstore_path / MANIFEST_NAME).unlink(missing_ok=True)
+
         # Create chain
         self._create_chain()
 
         return len(documents)
 
+    def _load_documents_incremental(self, force_reload: bool = False, batch_size: int = 256) -> int:
+        """
+        Re-ingest only what changed since the last incremental load.
+
+        Chunks are stored under "<path>#<n>" ids recorded in the manifest,
+        so a changed or deleted file's chunks can be deleted from FAISS.
+        Chunks of several files are embedded together in batches of about
+        batch_size. The manifest is committed after the store is saved.
+        """
+        IngestManifest = load_template(INGEST_MANIFEST_PATH).IngestManifest
+        manifest_path = self.vectorstore_path / MANIFEST_NAME
+        version = f"langchain/{self.chunk_size}:{self.chunk_overlap}:{self.embedding_model}"
+
+        # Without a manifest (or when forced) the store's ids are unknown: rebuild it
+        rebuild = force_reload or not manifest_path.exists()
+        if rebuild:
+            manifest_path.unlink(missing_ok=True)
+            self.vectorstore = None
+        else:
+            self.vectorstore = FAISS.load_local(
+                str(self.vectorstore_path),
+                self.embeddings,
+                allow_dangerous_deserialization=True
+            )
+
+        with IngestManifest(manifest_path, version) as manifest:
+            scope = self.documents_path if self.documents_path.is_dir() else None
+            plan = manifest.plan(self._iter_document_files(), scope=scope)
+            summary = plan.summary()
+            print(f"✓ {summary['added']} new, {summary['changed']} changed, "
+                  f"{summary['deleted']} deleted, {summary['unchanged']} unchanged files")
+
+            # Drop chunks of deleted files and the old versions of changed ones
+            if self.vectorstore is not None and plan.tombstones:
+                stored = set(self.vectorstore.index_to_docstore_id.values())
+                stale = [chunk_id for tombstone in plan.tombstones
+                         for chunk_id in tombstone.chunk_ids if chunk_id in stored]
+                if stale:
+                    self.vectorstore.delete(stale)
+                    print(f"✓ Removed {len(stale)} stale chunks")
+            manifest.forget_deleted(plan)
+
+            batch_chunks: List[Document] = []
+            batch_ids: List[str] = []
+            batch_files = []
+
+            def flush():
+                if batch_chunks:
+                    if self.vectorstore is None:
+                        self.vectorstore = FAISS.from_documents(batch_chunks, self.embeddings, ids=batch_ids)
+                    else:
+                        self.vectorstore.add_documents(batch_chunks, ids=batch_ids)
+                for state, chunk_ids in batch_files:
+                    manifest.record(state, chunk_ids)
+                batch_chunks.clear()
+                batch_ids.clear()
+                batch_files.clear()
+
+            loaded = 0
+            for state in plan.to_ingest:
+                try:
+                    documents = self._get_loader_for_file(Path(state.path)).load()
+                except Exception as e:
+                    # Not recorded, so it is retried next time
+                    print(f"Warning: Could not load {state.path}: {e}")
+                    continue
+
+                chunks = self._split_documents(documents)
+                chunk_ids = [f"{state.path}#{i}" for i in range(len(chunks))]
+                batch_chunks.extend(chunks)
+                batch_ids.extend(chunk_ids)
+                batch_files.append((state, chunk_ids))
+                loaded += 1
+
+                if len(batch_chunks) >= batch_size:
+                    flush()
+            flush()
+
+            if self.vectorstore is None:
+                raise ValueError("No documents loaded. Check the documents path.")
+
+            if rebuild or plan.to_ingest or plan.tombstones:
+                self.vectorstore.save_local(str(self.vectorstore_path))
+                print(f"✓ Vector store saved to {self.vectorstore_path}")
+            manifest.commit()
+
+        self._create_chain()
+
+        return loaded
+
+    def _iter_document_files(self):
+        """Files load_documents indexes (the same formats as the directory loaders)."""
+        if self.documents_path.is_file():
+            yield self.documents_path
+        elif self.documents_path.is_dir():
+            for path in sorted(self.documents_path.glob("**/*")):
+                if path.is_file() and path.suffix.lower() in {'.pdf', '.txt', '.md', '.csv'}:
+                    yield path
+        else:
+            raise ValueError(f"Invalid path: {self.documents_path}")
+
     def _load_documents_from_path(self) -> List[Document]:
         """Load documents from path (file or directory)."""
         documents = []
@@ -308,6 +438,8 @@ if __name__ == "__main__":
     parser.add_argument("--query", required=True, help="Query to ask")
     parser.add_argument("--conversational", action="store_true", help="Use conversation memory")
     parser.add_argument("--reload", action="store_true", help="Force reload documents")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only re-embed new/changed files (content-hash manifest)")
 
     args = parser.parse_args()
 
@@ -320,7 +452,7 @@ if __name__ == "__main__":
 
     # Load documents
     print("Loading documents...")
-    rag.load_documents(force_reload=args.reload)
+    rag.load_documents(force_reload=args.reload, incremental=args.incremental)
 
     # Query
     print(f"\nQuery: {args.query}")
@@ -6,8 +6,10 @@ using LlamaIndex with best practices.
 
 Usage:
     python basic-rag-pipeline.py
+    python basic-rag-pipeline.py --incremental  # only re-index changed files
 """
 
+import sys
 import os
 from pathlib import Path
 from dotenv import load_dotenv
@@ -26,6 +28,20 @@ from llama_index.embeddings.openai import OpenAIEmbedding
 from llama_index.llms.openai import OpenAI
 
 
+# Written next to the persisted index by incremental loads
+MANIFEST_NAME = "ingest-manifest.sqlite"
+REQUIRED_EXTS = [".txt", ".pdf", ".md", ".csv", ".json"]
+
+
+SKILLS_DIR = Path(__file__).resolve().parents[2]
+if str(SKILLS_DIR) not in sys.path:
+    sys.path.insert(0, str(SKILLS_DIR))
+from template_loader import load_template  # noqa: E402
+
+# Loaded on first incremental load only
+INGEST_MANIFEST_PATH = SKILLS_DIR / "document-parsers" / "templates" / "ingest-manifest.py"
+
+
 class BasicRAGPipeline:
     """
     A simple RAG pipeline implementation with document ingestion,
@@ -52,6 +68,7 @@ class BasicRAGPipeline:
         """
         self.data_dir = Path(data_dir)
         self.storage_dir = Path(storage_dir)
+        self.embed_model_name = embed_model
 
         # Configure LlamaIndex settings globally
         Settings.llm = OpenAI(model=model, temperature=temperature)
@@ -59,13 +76,21 @@ class BasicRAGPipeline:
 
         self.index = None
 
-    def load_or_create_index(self) -> VectorStoreIndex:
+    def load_or_create_index(self, incremental: bool = False) -> VectorStoreIndex:
         """
         Load existing index or create new one from documents.
 
+        Args:
+            incremental: Bring the persisted index up to date with data_dir
+                using a content-hash manifest: only new and changed files
+                are read and embedded, deleted files are removed
+
         Returns:
             VectorStoreIndex: The loaded or newly created index
         """
+        if incremental:
+            return self._update_index_incremental()
+
         # Try to load existing index
         if self.storage_dir.exists():
             try:
@@ -88,7 +113,7 @@ class BasicRAGPipeline:
         documents = SimpleDirectoryReader(
             str(self.data_dir),
             recursive=True,
-            required_exts=[".txt", ".pdf", ".md", ".csv", ".json"],
+            required_exts=REQUIRED_EXTS,
         ).load_data()
 
         if not documents:
@@ -106,6 +131,83 @@ class BasicRAGPipeline:
         self.index.storage_context.persist(persist_dir=str(self.storage_dir))
         print(f"Index persisted to {self.storage_dir}")
 
+        # Built without manifest ids: the next incremental load starts over
+        (self.storage_dir / MANIFEST_NAME).unlink(missing_ok=True)
+
+        return self.index
+
+    def _update_index_incremental(self) -> VectorStoreIndex:
+        """
+        Re-index only what changed since the last incremental load.
+
+        Each file's documents (one per page for PDFs) get "<path>#<n>" ids,
+        which the manifest records as the file's chunk ids; removing a
+        changed or deleted file is a delete_ref_doc per id, which drops all
+        of its nodes. New nodes are inserted together so they are embedded
+        in batches. The manifest is committed after the index is persisted.
+        """
+        IngestManifest = load_template(INGEST_MANIFEST_PATH).IngestManifest
+        manifest_path = self.storage_dir / MANIFEST_NAME
+        node_parser = Settings.node_parser
+        # Chunk size and overlap shape the stored nodes: changing them re-ingests
+        version = (
+            f"llamaindex/{self.embed_model_name}:{type(node_parser).__name__}"
+            f":{getattr(node_parser, 'chunk_size', '')}:{getattr(node_parser, 'chunk_overlap', '')}"
+        )
+
+        if not self.data_dir.exists():
+            raise ValueError(f"Data directory not found: {self.data_dir}")
+
+        # Without a manifest the index's ids are unknown: rebuild it
+        rebuild = not manifest_path.exists()
+        if not rebuild:
+            storage_context = StorageContext.from_defaults(persist_dir=str(self.storage_dir))
+            self.index = load_index_from_storage(storage_context)
+        else:
+            self.index = VectorStoreIndex(nodes=[])
+
+        with IngestManifest(manifest_path, version) as manifest:
+            files = sorted(
+                path for path in self.data_dir.glob("**/*")
+                if path.is_file() and path.suffix.lower() in REQUIRED_EXTS
+            )
+            plan = manifest.plan(files, scope=self.data_dir)
+            print(f"Manifest: {plan.summary()}")
+
+            for tombstone in plan.tombstones:
+                for ref_doc_id in tombstone.chunk_ids:
+                    self.index.delete_ref_doc(ref_doc_id, delete_from_docstore=True)
+            manifest.forget_deleted(plan)
+
+            documents = []
+            ingested = []
+            for state in plan.to_ingest:
+                try:
+                    file_documents = SimpleDirectoryReader(input_files=[state.path]).load_data()
+                except Exception as e:
+                    # Not recorded, so it is retried next time
+                    print(f"Could not load {state.path}: {e}")
+                    continue
+                ref_doc_ids = []
+                for i, document in enumerate(file_documents):
+                    document.id_ = f"{state.path}#{i}"
+                    ref_doc_ids.append(document.id_)
+                documents.extend(file_documents)
+                ingested.append((state, ref_doc_ids))
+
+            if documents:
+                print(f"Indexing {len(documents)} documents from {len(ingested)} files...")
+                nodes = node_parser.get_nodes_from_documents(documents, show_progress=True)
+                self.index.insert_nodes(nodes)
+            for state, ref_doc_ids in ingested:
+                manifest.record(state, ref_doc_ids)
+
+            if rebuild or documents or plan.tombstones:
+                self.storage_dir.mkdir(parents=True, exist_ok=True)
+                self.index.storage_context.persist(persist_dir=str(self.storage_dir))
+                print(f"Index persisted to {self.storage_dir}")
+            manifest.commit()
+
         return self.index
 
     def query(self, question: str, similarity_top_k: int = 3) -> str:
@@ -206,6 +308,13 @@ def main():
     """
     Example usage of the BasicRAGPipeline.
     """
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Basic RAG pipeline example")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Only re-index new/changed files (content-hash manifest)")
+    args = parser.parse_args()
+
     # Initialize pipeline
     pipeline = BasicRAGPipeline(
         data_dir="./data",
@@ -214,7 +323,7 @@ def main():
     )
 
     # Load or create index
-    pipeline.load_or_create_index()
+    pipeline.load_or_create_index(incremental=args.incremental)
 
     # Example queries
     examples = [
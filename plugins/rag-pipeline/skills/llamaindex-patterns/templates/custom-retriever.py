@@ -9,7 +9,8 @@ Usage:
 """
 
 import os
-from typing import List, Optional
+import sys
+from typing import Dict, Iterable, List, Optional
 from pathlib import Path
 from dotenv import load_dotenv
 
@@ -22,11 +23,92 @@ from llama_index.core import (
     QueryBundle,
 )
 from llama_index.core.retrievers import BaseRetriever, VectorIndexRetriever
-from llama_index.core.schema import NodeWithScore
+from llama_index.core.schema import BaseNode, NodeWithScore
 from llama_index.core.node_parser import SentenceSplitter
 from llama_index.embeddings.openai import OpenAIEmbedding
 from llama_index.llms.openai import OpenAI
 
+SKILLS_DIR = Path(__file__).resolve().parents[2]
+if str(SKILLS_DIR) not in sys.path:
+    sys.path.insert(0, str(SKILLS_DIR))
+from template_loader import load_template  # noqa: E402
+
+BM25Index = load_template(SKILLS_DIR / "retrieval-patterns" / "templates" / "bm25-index.py").BM25Index
+
+
+KEYWORD_INDEX_DIR = "keyword_index"
+
+
+class KeywordIndex:
+    """
+    BM25 keyword scores for the index's nodes, keyed by node_id.
+
+    Wraps the shared BM25Index (retrieval-patterns/templates/bm25-index.py):
+    each node is tokenized once, when the index loads (from_index) or the
+    first time a retriever sees it, and scoring a query only probes the
+    postings of the candidates instead of scanning their text.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Initialize an empty keyword index.
+
+        Args:
+            k1: BM25 term frequency saturation
+            b: BM25 document length normalization
+        """
+        self._bm25 = BM25Index(k1=k1, b=b)
+
+    @classmethod
+    def from_index(cls, index: VectorStoreIndex, **kwargs) -> "KeywordIndex":
+        """Build from every node in the index's docstore"""
+        keyword_index = cls(**kwargs)
+        nodes = list(index.docstore.docs.values())
+        keyword_index._bm25 = BM25Index.from_documents(
+            [node.node_id for node in nodes], [node.get_content() for node in nodes],
+            k1=keyword_index._bm25.k1, b=keyword_index._bm25.b
+        )
+        return keyword_index
+
+    def __len__(self) -> int:
+        return len(self._bm25)
+
+    def __contains__(self, node_id: str) -> bool:
+        return node_id in self._bm25
+
+    def add_nodes(self, nodes: Iterable[BaseNode]):
+        """Tokenize nodes not seen before (already-indexed nodes are skipped)"""
+        new = {node.node_id: node for node in nodes if node.node_id not in self}
+        self._bm25.add_documents(new.keys(), (node.get_content() for node in new.values()))
+
+    def remove_node(self, node_id: str):
+        """Drop a node (e.g. after deleting it from the index)"""
+        self._bm25.delete(node_id)
+
+    def score(self, query: str, node_ids: Iterable[str]) -> Dict[str, float]:
+        """
+        BM25 scores of the given nodes for a query.
+
+        Args:
+            query: Query text
+            node_ids: Indexed nodes to score
+
+        Returns:
+            Dict mapping node_id -> BM25 score (0.0 without matching terms)
+        """
+        return self._bm25.score(query, node_ids)
+
+    def persist(self, persist_dir: str):
+        """Save next to the index's storage (docstore.json etc.)"""
+        self._bm25.save(Path(persist_dir) / KEYWORD_INDEX_DIR)
+
+    @classmethod
+    def from_persist_dir(cls, persist_dir: str) -> "KeywordIndex":
+        """Load a keyword index saved with persist() (memory-mapped)"""
+        keyword_index = cls()
+        keyword_index._bm25 = BM25Index.load(Path(persist_dir) / KEYWORD_INDEX_DIR)
+        return keyword_index
+
 
 class MetadataFilteredRetriever(BaseRetriever):
     """
@@ -53,6 +135,10 @@ class MetadataFilteredRetriever(BaseRetriever):
         self._index = index
         self._similarity_top_k = similarity_top_k
         self._metadata_filters = metadata_filters or {}
+        self._retriever = VectorIndexRetriever(
+            index=index,
+            similarity_top_k=similarity_top_k,
+        )
 
     def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
         """
@@ -64,31 +150,18 @@ class MetadataFilteredRetriever(BaseRetriever):
         Returns:
             List of NodeWithScore objects that match filters
         """
-        # Get base retriever
-        retriever = VectorIndexRetriever(
-            index=self._index,
-            similarity_top_k=self._similarity_top_k,
-        )
-
         # Retrieve nodes
-        nodes = retriever.retrieve(query_bundle)
-
-        # Filter by metadata
-        filtered_nodes = []
-        for node in nodes:
-            matches = True
-            for key, value in self._metadata_filters.items():
-                if key not in node.node.metadata:
-                    matches = False
-                    break
-                if node.node.metadata[key] != value:
-                    matches = False
-                    break
-
-            if matches:
-                filtered_nodes.append(node)
-
-        return filtered_nodes
+        nodes = self._retriever.retrieve(query_bundle)
+
+        # Filter by metadata (missing keys never match)
+        missing = object()
+        return [
+            node for node in nodes
+            if all(
+                node.node.metadata.get(key, missing) == value
+                for key, value in self._metadata_filters.items()
+            )
+        ]
 
 
 class HybridRetriever(BaseRetriever):
@@ -96,7 +169,7 @@ class HybridRetriever(BaseRetriever):
     Hybrid retriever combining semantic search with keyword matching.
 
     Provides better results by combining vector similarity with
-    exact keyword matches.
+    BM25 keyword scores from a precomputed KeywordIndex.
     """
 
     def __init__(
@@ -104,6 +177,7 @@ class HybridRetriever(BaseRetriever):
         vector_retriever: BaseRetriever,
         similarity_top_k: int = 5,
         keyword_weight: float = 0.3,
+        keyword_index: Optional[KeywordIndex] = None,
     ):
         """
         Initialize hybrid retriever.
@@ -112,11 +186,15 @@ class HybridRetriever(BaseRetriever):
             vector_retriever: The vector-based retriever
             similarity_top_k: Number of results to return
             keyword_weight: Weight for keyword matching (0-1)
+            keyword_index: Term statistics for the corpus (KeywordIndex.from_index);
+                without one, nodes are indexed as they are retrieved and idf
+                only reflects the nodes seen so far
         """
         self._vector_retriever = vector_retriever
         self._similarity_top_k = similarity_top_k
         self._keyword_weight = keyword_weight
         self._vector_weight = 1.0 - keyword_weight
+        self._keyword_index = keyword_index if keyword_index is not None else KeywordIndex()
 
     def _retrieve(self, query_bundle: QueryBundle) -> List[NodeWithScore]:
         """
@@ -131,18 +209,18 @@ class HybridRetriever(BaseRetriever):
         # Get vector search results
         vector_nodes = self._vector_retriever.retrieve(query_bundle)
 
-        # Extract keywords from query (simple tokenization)
-        keywords = set(query_bundle.query_str.lower().split())
+        # BM25 keyword scores (nodes are only tokenized the first time)
+        self._keyword_index.add_nodes(node.node for node in vector_nodes)
+        keyword_scores = self._keyword_index.score(
+            query_bundle.query_str, [node.node.node_id for node in vector_nodes]
+        )
+        # Scale so the best keyword match among the candidates scores 1.0
+        max_keyword_score = max(keyword_scores.values(), default=0.0) or 1.0
 
         # Rerank based on keyword matching
         reranked_nodes = []
         for node in vector_nodes:
-            # Calculate keyword match score
-            node_text = node.node.text.lower()
-            keyword_matches = sum(
-                1 for keyword in keywords if keyword in node_text
-            )
-            keyword_score = keyword_matches / max(len(keywords), 1)
+            keyword_score = keyword_scores[node.node.node_id] / max_keyword_score
 
             # Combine scores
             vector_score = node.score if node.score else 0.5
@@ -270,10 +348,12 @@ def create_custom_retriever_example():
     # Example 2: Hybrid retriever
     print("\n=== Hybrid Retriever ===")
     base_retriever = VectorIndexRetriever(index=index, similarity_top_k=10)
+    keyword_index = KeywordIndex.from_index(index)  # Tokenize every node once
     hybrid_retriever = HybridRetriever(
         vector_retriever=base_retriever,
         similarity_top_k=5,
         keyword_weight=0.3,
+        keyword_index=keyword_index,
     )
 
     nodes = hybrid_retriever.retrieve(query)
@@ -5,6 +5,14 @@ Benchmark Retrieval Performance
 Measures latency, throughput, and cost for different retrieval strategies.
 Tests semantic search, hybrid search, and reranking performance.
 
+Load is generated closed-loop (N concurrent clients, optionally paced to a
+QPS target) or open-loop (requests sent on a fixed or Poisson schedule
+regardless of how fast earlier ones finish). Latencies go into HDR
+histograms and are coordinated-omission corrected: open-loop latency is
+measured from each request's scheduled send time, and paced closed-loop
+clients back-fill the requests they could not send while stalled. Every
+request also times its stages (embed, ann, keyword, fuse, rerank).
+
 Usage:
     python benchmark-retrieval.py \
         --strategies semantic,hybrid,reranking \
@@ -12,20 +20,48 @@ Usage:
         --num-runs 100 \
         --output benchmark-results.json
 
+    # Saturation curve: closed loop at 1..32 clients, reports the knee
+    python benchmark-retrieval.py --strategies hybrid --num-runs 50 --sweep 1,2,4,8,16,32
+
+    # Open loop at fixed arrival rates
+    python benchmark-retrieval.py --strategies hybrid --mode open --concurrency 32 \
+        --sweep 5,10,20,40 --poisson
+
 Requirements:
-    pip install numpy scipy openai langchain langchain-community faiss-cpu rank-bm25
+    pip install numpy scipy openai langchain langchain-community faiss-cpu
+    pip install tiktoken  # optional, exact query token counts for cost
 """
 
+import sys
 import argparse
+import itertools
 import json
+import math
+import random
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
-from dataclasses import dataclass, asdict
-import statistics
+from typing import List, Dict, Any, Callable, Optional, Sequence
+from dataclasses import dataclass, asdict, field
 import numpy as np
 
 
+SKILLS_DIR = Path(__file__).resolve().parents[2]
+if str(SKILLS_DIR) not in sys.path:
+    sys.path.insert(0, str(SKILLS_DIR))
+from template_loader import load_template  # noqa: E402
+
+
+RankFusion = load_template(Path(__file__).resolve().parents[1] / "templates" / "rank-fusion.py").RankFusion
+BM25Index = load_template(Path(__file__).resolve().parents[1] / "templates" / "bm25-index.py").BM25Index
+
+LOAD_MODES = ("closed", "open")
+
+# Per-request stage timings: stage name -> milliseconds
+Stages = Dict[str, float]
+
+
 @dataclass
 class BenchmarkResult:
     """Results from benchmarking a retrieval strategy"""
@@ -36,20 +72,347 @@ class BenchmarkResult:
     latency_p99: float
     latency_mean: float
     latency_std: float
-    throughput: float  # queries per second
+    throughput: float  # completed queries per wall-clock second
     cost_per_query: float  # USD
     total_cost: float
     success_rate: float
+    mode: str = "closed"
+    concurrency: int = 1
+    target_qps: Optional[float] = None
+    latency_p999: float = 0.0
+    latency_max: float = 0.0
+    service_p50: float = 0.0  # Time inside the strategy, without queueing
+    service_p99: float = 0.0
+    stages: Dict[str, Dict[str, float]] = field(default_factory=dict)  # Stage -> p50/p99/mean ms
+    duration_s: float = 0.0
+    token_counting: str = "estimate"  # 'tiktoken' or 'estimate' (words * 1.3)
+
+
+# =======================
+# HDR Latency Histogram
+# =======================
+
+class LatencyHistogram:
+    """
+    High dynamic range latency histogram
+
+    Values are kept in log-linear buckets (HdrHistogram layout) in
+    microseconds, so every percentile is exact to ``significant_digits``
+    over any range, memory stays constant and histograms merge by adding
+    counts. Record and report in milliseconds.
+    """
+
+    def __init__(self, significant_digits: int = 3):
+        self.sub_bucket_bits = math.ceil(math.log2(2 * 10 ** significant_digits))
+        self.sub_bucket_count = 1 << self.sub_bucket_bits
+        self.sub_bucket_half = self.sub_bucket_count >> 1
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.total_squares = 0.0
+        self.max_us = 0
+        self._lock = threading.Lock()
+
+    def _index(self, value_us: int) -> int:
+        if value_us < self.sub_bucket_count:
+            return value_us
+        shift = value_us.bit_length() - self.sub_bucket_bits
+        return (shift + 1) * self.sub_bucket_half + (value_us >> shift) - self.sub_bucket_half
+
+    def _highest_equivalent(self, index: int) -> int:
+        if index < self.sub_bucket_count:
+            return index
+        shift = (index - self.sub_bucket_count) // self.sub_bucket_half + 1
+        sub_bucket = index - shift * self.sub_bucket_half
+        return ((sub_bucket + 1) << shift) - 1
+
+    def record(self, value_ms: float, expected_interval_ms: Optional[float] = None):
+        """
+        Record a latency.
+
+        Args:
+            value_ms: Latency in milliseconds
+            expected_interval_ms: Intended time between requests of this
+                client; when the latency exceeds it, the requests that
+                should have been sent meanwhile are back-filled with their
+                would-be latencies (coordinated omission correction)
+        """
+        values = [value_ms]
+        if expected_interval_ms and expected_interval_ms > 0:
+            missing = value_ms - expected_interval_ms
+            while missing >= expected_interval_ms:
+                values.append(missing)
+                missing -= expected_interval_ms
+
+        with self._lock:
+            for value in values:
+                value_us = max(0, int(round(value * 1000)))
+                index = self._index(value_us)
+                self.counts[index] = self.counts.get(index, 0) + 1
+                self.count += 1
+                self.total += value
+                self.total_squares += value * value
+                self.max_us = max(self.max_us, value_us)
+
+    def merge(self, other: "LatencyHistogram"):
+        with self._lock:
+            for index, count in other.counts.items():
+                self.counts[index] = self.counts.get(index, 0) + count
+            self.count += other.count
+            self.total += other.total
+            self.total_squares += other.total_squares
+            self.max_us = max(self.max_us, other.max_us)
+
+    def percentile(self, q: float) -> float:
+        """Value (ms) at or below which q percent of recorded values fall"""
+        if not self.count:
+            return 0.0
+        target = max(1, math.ceil(q / 100 * self.count))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= target:
+                return min(self._highest_equivalent(index), self.max_us) / 1000
+        return self.max_us / 1000
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    @property
+    def std(self) -> float:
+        if self.count < 2:
+            return 0.0
+        variance = (self.total_squares - self.total ** 2 / self.count) / (self.count - 1)
+        return math.sqrt(max(0.0, variance))
+
+    @property
+    def max(self) -> float:
+        return self.max_us / 1000
+
+    def summary(self) -> Dict[str, float]:
+        return {
+            "count": self.count,
+            "p50": round(self.percentile(50), 3),
+            "p99": round(self.percentile(99), 3),
+            "mean": round(self.mean, 3)
+        }
+
+
+# =======================
+# Load Generator
+# =======================
+
+@dataclass
+class LoadResult:
+    """Histograms and counters of one load run"""
+    latency: LatencyHistogram  # Response time, coordinated-omission corrected
+    service: LatencyHistogram  # Time inside the strategy only
+    stages: Dict[str, LatencyHistogram]
+    completed: int
+    errors: int
+    duration_s: float
+
+
+class LoadGenerator:
+    """
+    Drive a query function with closed- or open-loop load
+
+    closed: ``concurrency`` clients each send their next query as soon as
+        the previous one returns. With ``qps`` each client is paced to
+        ``qps / concurrency`` and stalls are corrected in the histogram.
+    open: queries are sent at ``qps`` (evenly spaced, or Poisson arrivals)
+        to a pool of ``concurrency`` workers, whether or not earlier ones
+        finished; latency runs from the scheduled send time, so queueing
+        in front of a saturated system is counted.
+    """
+
+    def __init__(
+        self,
+        query_fn: Callable[[str, Stages], Any],
+        mode: str = "closed",
+        concurrency: int = 1,
+        qps: Optional[float] = None,
+        poisson: bool = False,
+        seed: int = 0
+    ):
+        """
+        Args:
+            query_fn: Called as query_fn(query, stages); fills stages with
+                per-stage milliseconds
+            mode: 'closed' or 'open'
+            concurrency: Clients (closed) or worker threads (open)
+            qps: Target request rate (required for open loop)
+            poisson: Exponential inter-arrival times in open loop
+            seed: Arrival schedule seed
+        """
+        if mode not in LOAD_MODES:
+            raise ValueError(f"Unknown load mode: {mode}")
+        if mode == "open" and not qps:
+            raise ValueError("Open-loop load needs a qps target")
+        if concurrency < 1:
+            raise ValueError("concurrency must be at least 1")
+        self.query_fn = query_fn
+        self.mode = mode
+        self.concurrency = concurrency
+        self.qps = qps
+        self.poisson = poisson
+        self.seed = seed
+
+    def run(self, queries: Sequence[str], num_requests: int, warmup: int = 0) -> LoadResult:
+        """
+        Send num_requests queries (cycling through queries) and measure them.
+
+        Args:
+            queries: Query pool
+            num_requests: Measured requests
+            warmup: Requests sent first and not recorded
+        """
+        for i in range(warmup):
+            try:
+                self.query_fn(queries[i % len(queries)], {})
+            except Exception:
+                pass
+
+        result = LoadResult(
+            latency=LatencyHistogram(), service=LatencyHistogram(), stages={},
+            completed=0, errors=0, duration_s=0.0
+        )
+        lock = threading.Lock()
+
+        def execute(query: str, scheduled: float, expected_interval_ms: Optional[float]):
+            stages: Stages = {}
+            start = time.perf_counter()
+            try:
+                self.query_fn(query, stages)
+            except Exception as e:
+                with lock:
+                    result.errors += 1
+                print(f"Error during retrieval: {e}")
+                return
+            end = time.perf_counter()
+            result.latency.record((end - scheduled) * 1000, expected_interval_ms)
+            result.service.record((end - start) * 1000)
+            with lock:
+                result.completed += 1
+                for name in stages:
+                    if name not in result.stages:
+                        result.stages[name] = LatencyHistogram()
+            for name, ms in stages.items():
+                result.stages[name].record(ms)
+
+        started = time.perf_counter()
+        if self.mode == "closed":
+            self._run_closed(queries, num_requests, execute)
+        else:
+            self._run_open(queries, num_requests, execute)
+        result.duration_s = time.perf_counter() - started
+        return result
+
+    def _run_closed(self, queries: Sequence[str], num_requests: int, execute):
+        tickets = itertools.count()  # next() on a count is atomic in CPython
+        interval = self.concurrency / self.qps if self.qps else None
+
+        def client(offset: int):
+            next_send = time.perf_counter() + (offset * interval / self.concurrency if interval else 0)
+            while True:
+                i = next(tickets)
+                if i >= num_requests:
+                    return
+                if interval:
+                    delay = next_send - time.perf_counter()
+                    if delay > 0:
+                        time.sleep(delay)
+                # Latency is measured from the actual send; a stalled paced
+                # client is corrected by back-filling at the expected interval
+                execute(queries[i % len(queries)], time.perf_counter(),
+                        interval * 1000 if interval else None)
+                if interval:
+                    next_send = max(next_send + interval, time.perf_counter())
+
+        threads = [threading.Thread(target=client, args=(c,), daemon=True) for c in range(self.concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    def _run_open(self, queries: Sequence[str], num_requests: int, execute):
+        rng = random.Random(self.seed)
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="load") as pool:
+            scheduled = time.perf_counter()
+            for i in range(num_requests):
+                delay = scheduled - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+                # Latency counts from the scheduled time, including any wait
+                # for a free worker
+                pool.submit(execute, queries[i % len(queries)], scheduled, None)
+                scheduled += rng.expovariate(self.qps) if self.poisson else 1 / self.qps
+
+
+def find_knee(
+    points: List[BenchmarkResult],
+    latency_factor: float = 2.0,
+    min_gain: float = 0.05
+) -> Optional[BenchmarkResult]:
+    """
+    Last load level before the strategy saturates.
+
+    Walking up the sweep, saturation is the first level where p99 latency
+    exceeds latency_factor x the lightest level's p99, or throughput grows
+    by less than min_gain over the previous level.
+    """
+    if not points:
+        return None
+    knee = points[0]
+    for previous, point in zip(points, points[1:]):
+        if point.latency_p99 > latency_factor * points[0].latency_p99:
+            break
+        if point.throughput < previous.throughput * (1 + min_gain):
+            break
+        knee = point
+    return knee
+
+
+def _timed(stages: Stages, name: str, fn: Callable, *args, **kwargs):
+    """Call fn and add its wall time to stages[name]"""
+    start = time.perf_counter()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        stages[name] = stages.get(name, 0.0) + (time.perf_counter() - start) * 1000
+
+
+def _load_token_counter(model: str):
+    """Exact token counter from tiktoken, or None when it is not installed"""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        encoding = tiktoken.encoding_for_model(model)
+    except KeyError:
+        encoding = tiktoken.get_encoding("cl100k_base")
+    return lambda text: len(encoding.encode(text))
 
 
 class RetrieverBenchmark:
     """Benchmark different retrieval strategies"""
 
-    def __init__(self, documents: List[str], embedding_model: str = "text-embedding-3-small"):
-        """Initialize with documents and embedding model"""
+    def __init__(
+        self,
+        documents: List[str],
+        embedding_model: str = "text-embedding-3-small",
+        bm25_index_path: Optional[Path] = None
+    ):
+        """Initialize with documents, embedding model and an optional saved BM25 index"""
         self.documents = documents
         self.embedding_model = embedding_model
+        self.bm25_index_path = bm25_index_path
         self.retrievers = {}
+        # Per-strategy query functions run as explicit, individually timed stages
+        self.pipelines: Dict[str, Callable[[str, Stages], List[Any]]] = {}
+        self.count_tokens = _load_token_counter(embedding_model)
 
         # Cost per 1M tokens (adjust based on your models)
         self.costs = {
@@ -75,6 +438,12 @@ class RetrieverBenchmark:
             self.retrievers["semantic"] = vectorstore.as_retriever(
                 search_kwargs={"k": 5}
             )
+
+            def semantic(query: str, stages: Stages) -> List[Any]:
+                embedding = _timed(stages, "embed", embeddings.embed_query, query)
+                return _timed(stages, "ann", vectorstore.similarity_search_by_vector, embedding, k=5)
+
+            self.pipelines["semantic"] = semantic
             return True
         except Exception as e:
             print(f"Error setting up semantic retriever: {e}")
@@ -85,8 +454,6 @@ class RetrieverBenchmark:
         try:
             from langchain_openai import OpenAIEmbeddings
             from langchain_community.vectorstores import FAISS
-            from langchain_community.retrievers import BM25Retriever
-            from langchain.retrievers import EnsembleRetriever
             from langchain.schema import Document
 
             docs = [Document(page_content=text) for text in self.documents]
@@ -96,15 +463,39 @@ class RetrieverBenchmark:
             vectorstore = FAISS.from_documents(docs, embeddings)
             vector_retriever = vectorstore.as_retriever(search_kwargs={"k": 10})
 
-            # BM25 retriever
-            bm25_retriever = BM25Retriever.from_documents(docs)
-            bm25_retriever.k = 10
-
-            # Ensemble with equal weights
-            self.retrievers["hybrid"] = EnsembleRetriever(
-                retrievers=[vector_retriever, bm25_retriever],
-                weights=[0.5, 0.5]
-            )
+            # BM25 index (doc ids are positions in self.documents)
+            path = self.bm25_index_path
+            if path is not None and (path / "meta.json").exists():
+                bm25_index = BM25Index.load(path)
+            else:
+                bm25_index = BM25Index.from_documents(
+                    [str(i) for i in range(len(self.documents))], self.documents
+                )
+                if path is not None:
+                    bm25_index.save(path)
+
+            self.retrievers["hybrid"] = (vector_retriever, bm25_index)
+
+            # Equal-weight RRF, with each stage timed
+            fusion = RankFusion(method="rrf", weights=[0.5, 0.5])
+
+            def hybrid(query: str, stages: Stages) -> List[Any]:
+                embedding = _timed(stages, "embed", embeddings.embed_query, query)
+                vector_docs = _timed(stages, "ann", vectorstore.similarity_search_by_vector, embedding, k=10)
+                keyword_hits = _timed(stages, "keyword", bm25_index.search, query, top_k=10)
+
+                start = time.perf_counter()
+                keyword_docs = [docs[int(doc_id)] for doc_id, _ in keyword_hits]
+                by_content = {doc.page_content: doc for doc in keyword_docs + vector_docs}
+                fused = fusion.fuse([
+                    [doc.page_content for doc in vector_docs],
+                    [doc.page_content for doc in keyword_docs]
+                ])
+                results = [by_content[content] for content, _ in fused]
+                stages["fuse"] = (time.perf_counter() - start) * 1000
+                return results
+
+            self.pipelines["hybrid"] = hybrid
             return True
         except Exception as e:
             print(f"Error setting up hybrid retriever: {e}")
@@ -128,6 +519,13 @@ class RetrieverBenchmark:
             self.llm_for_rerank = ChatOpenAI(model="gpt-3.5-turbo", temperature=0)
 
             self.retrievers["reranking"] = "custom"  # Custom implementation
+
+            def reranking(query: str, stages: Stages) -> List[Any]:
+                embedding = _timed(stages, "embed", embeddings.embed_query, query)
+                candidates = _timed(stages, "ann", vectorstore.similarity_search_by_vector, embedding, k=20)
+                return _timed(stages, "rerank", self.rerank_results, query, candidates, top_k=5)
+
+            self.pipelines["reranking"] = reranking
             return True
         except Exception as e:
             print(f"Error setting up reranking retriever: {e}")
@@ -157,104 +555,113 @@ class RetrieverBenchmark:
         overlap = len(query_words.intersection(doc_words))
         return overlap / max(len(query_words), 1)
 
+    def query_tokens(self, query: str) -> float:
+        """Billed tokens of a query (only the query is embedded at search time)"""
+        if self.count_tokens is not None:
+            return self.count_tokens(query)
+        return len(query.split()) * 1.3  # rough estimate
+
     def benchmark_strategy(
         self,
         strategy: str,
         queries: List[str],
-        num_runs: int = 1
+        num_runs: int = 1,
+        mode: str = "closed",
+        concurrency: int = 1,
+        qps: Optional[float] = None,
+        warmup: int = 0,
+        poisson: bool = False
     ) -> BenchmarkResult:
-        """Benchmark a specific retrieval strategy"""
-
-        latencies = []
-        successes = 0
-        total_tokens = 0
-
-        for run in range(num_runs):
-            for query in queries:
-                start_time = time.time()
-
-                try:
-                    # Execute retrieval
-                    if strategy == "reranking":
-                        # Special handling for reranking
-                        initial_retriever = self.vectorstore_for_rerank.as_retriever(
-                            search_kwargs={"k": 20}
-                        )
-                        initial_results = initial_retriever.get_relevant_documents(query)
-                        results = self.rerank_results(query, initial_results, top_k=5)
-                    else:
-                        retriever = self.retrievers.get(strategy)
-                        if retriever:
-                            results = retriever.get_relevant_documents(query)
-                        else:
-                            raise ValueError(f"Strategy {strategy} not initialized")
-
-                    # Record latency
-                    latency_ms = (time.time() - start_time) * 1000
-                    latencies.append(latency_ms)
-
-                    # Estimate tokens (query + results)
-                    total_tokens += len(query.split()) * 1.3  # rough estimate
-                    if hasattr(results, '__iter__'):
-                        for doc in results:
-                            if hasattr(doc, 'page_content'):
-                                total_tokens += len(doc.page_content.split()) * 1.3
-
-                    successes += 1
-
-                except Exception as e:
-                    print(f"Error during retrieval: {e}")
-                    continue
-
-        # Calculate statistics
-        num_queries = len(queries) * num_runs
+        """
+        Benchmark a specific retrieval strategy
+
+        Args:
+            strategy: Strategy set up with one of the setup_* methods
+            queries: Query pool
+            num_runs: Measured requests = len(queries) * num_runs
+            mode: 'closed' or 'open' loop (see LoadGenerator)
+            concurrency: Clients (closed) or worker threads (open)
+            qps: Target request rate (pacing for closed, arrival rate for open)
+            warmup: Unmeasured requests sent first
+            poisson: Poisson arrivals in open loop
+        """
+        pipeline = self.pipelines.get(strategy)
+        if pipeline is None:
+            raise ValueError(f"Strategy {strategy} not initialized")
 
-        if not latencies:
-            return BenchmarkResult(
-                strategy=strategy,
-                num_queries=num_queries,
-                latency_p50=0.0,
-                latency_p95=0.0,
-                latency_p99=0.0,
-                latency_mean=0.0,
-                latency_std=0.0,
-                throughput=0.0,
-                cost_per_query=0.0,
-                total_cost=0.0,
-                success_rate=0.0
-            )
-
-        latencies_sorted = sorted(latencies)
-        p50 = latencies_sorted[int(len(latencies) * 0.50)]
-        p95 = latencies_sorted[int(len(latencies) * 0.95)]
-        p99 = latencies_sorted[int(len(latencies) * 0.99)]
-
-        mean_latency = statistics.mean(latencies)
-        std_latency = statistics.stdev(latencies) if len(latencies) > 1 else 0.0
-
-        total_time_seconds = sum(latencies) / 1000
-        throughput = num_queries / total_time_seconds if total_time_seconds > 0 else 0.0
+        num_queries = len(queries) * num_runs
+        generator = LoadGenerator(pipeline, mode=mode, concurrency=concurrency, qps=qps, poisson=poisson)
+        load = generator.run(queries, num_queries, warmup=warmup)
 
+        # Cost: only the query is embedded per request; queries are cycled evenly
+        mean_tokens = sum(self.query_tokens(q) for q in queries) / len(queries) if queries else 0.0
+        total_tokens = mean_tokens * load.completed
         cost_per_token = self.costs.get(strategy, 0.0)
         total_cost = total_tokens * cost_per_token
-        cost_per_query = total_cost / num_queries if num_queries > 0 else 0.0
+        cost_per_query = total_cost / load.completed if load.completed else 0.0
 
-        success_rate = successes / num_queries if num_queries > 0 else 0.0
+        latency = load.latency
+        throughput = load.completed / load.duration_s if load.duration_s > 0 else 0.0
+        success_rate = load.completed / num_queries if num_queries > 0 else 0.0
 
         return BenchmarkResult(
             strategy=strategy,
             num_queries=num_queries,
-            latency_p50=round(p50, 2),
-            latency_p95=round(p95, 2),
-            latency_p99=round(p99, 2),
-            latency_mean=round(mean_latency, 2),
-            latency_std=round(std_latency, 2),
+            latency_p50=round(latency.percentile(50), 2),
+            latency_p95=round(latency.percentile(95), 2),
+            latency_p99=round(latency.percentile(99), 2),
+            latency_mean=round(latency.mean, 2),
+            latency_std=round(latency.std, 2),
             throughput=round(throughput, 2),
             cost_per_query=round(cost_per_query, 6),
             total_cost=round(total_cost, 4),
-            success_rate=round(success_rate, 3)
+            success_rate=round(success_rate, 3),
+            mode=mode,
+            concurrency=concurrency,
+            target_qps=qps,
+            latency_p999=round(latency.percentile(99.9), 2),
+            latency_max=round(latency.max, 2),
+            service_p50=round(load.service.percentile(50), 2),
+            service_p99=round(load.service.percentile(99), 2),
+            stages={name: hist.summary() for name, hist in load.stages.items()},
+            duration_s=round(load.duration_s, 3),
+            token_counting="tiktoken" if self.count_tokens is not None else "estimate"
         )
 
+    def sweep(
+        self,
+        strategy: str,
+        queries: List[str],
+        levels: List[float],
+        num_runs: int = 1,
+        mode: str = "closed",
+        concurrency: int = 1,
+        warmup: int = 0,
+        poisson: bool = False
+    ) -> Dict[str, Any]:
+        """
+        Saturation curve: benchmark at increasing load and locate the knee.
+
+        Levels are client counts in closed loop and arrival rates (QPS) in
+        open loop, where ``concurrency`` is the worker pool size.
+
+        Returns:
+            {'points': [BenchmarkResult dicts], 'knee': level or None}
+        """
+        points = []
+        for level in sorted(levels):
+            if mode == "closed":
+                point = self.benchmark_strategy(strategy, queries, num_runs, "closed", int(level), None, warmup)
+            else:
+                point = self.benchmark_strategy(strategy, queries, num_runs, "open", concurrency, level, warmup, poisson)
+            points.append(point)
+
+        knee = find_knee(points)
+        knee_level = None
+        if knee is not None:
+            knee_level = knee.concurrency if mode == "closed" else knee.target_qps
+        return {"points": [asdict(p) for p in points], "knee": knee_level}
+
 
 def load_queries(queries_file: Path) -> List[str]:
     """Load queries from JSONL file"""
@@ -333,6 +740,44 @@ def main():
         default="text-embedding-3-small",
         help="OpenAI embedding model to use"
     )
+    parser.add_argument(
+        "--bm25-index",
+        type=Path,
+        help="BM25 index directory for hybrid: loaded if present, otherwise built and saved there"
+    )
+    parser.add_argument(
+        "--mode",
+        choices=LOAD_MODES,
+        default="closed",
+        help="closed: clients wait for each response; open: requests arrive at --qps regardless"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=1,
+        help="Concurrent clients (closed) or worker threads (open) (default: 1)"
+    )
+    parser.add_argument(
+        "--qps",
+        type=float,
+        help="Target requests per second (required for --mode open without --sweep)"
+    )
+    parser.add_argument(
+        "--sweep",
+        type=str,
+        help="Comma-separated load levels for a saturation curve: client counts (closed) or QPS (open)"
+    )
+    parser.add_argument(
+        "--warmup",
+        type=int,
+        default=0,
+        help="Unmeasured requests before each run (default: 0)"
+    )
+    parser.add_argument(
+        "--poisson",
+        action="store_true",
+        help="Poisson arrivals in open-loop mode (default: evenly spaced)"
+    )
 
     args = parser.parse_args()
 
@@ -346,7 +791,7 @@ def main():
     print(f"Loaded {len(documents)} documents")
 
     # Initialize benchmark
-    benchmark = RetrieverBenchmark(documents, args.embedding_model)
+    benchmark = RetrieverBenchmark(documents, args.embedding_model, args.bm25_index)
 
     # Parse strategies
     strategies = [s.strip() for s in args.strategies.split(",")]
@@ -359,27 +804,59 @@ def main():
         "reranking": benchmark.setup_reranking_retriever
     }
 
+    ready = []
     for strategy in strategies:
         if strategy in setup_methods:
             print(f"  Setting up {strategy}...")
             success = setup_methods[strategy]()
             if not success:
                 print(f"  Failed to setup {strategy}, skipping...")
-                strategies.remove(strategy)
+                continue
+            ready.append(strategy)
+    strategies = ready
 
     # Run benchmarks
-    print(f"\nRunning benchmarks ({args.num_runs} runs per query)...\n")
+    print(f"\nRunning benchmarks ({args.num_runs} runs per query, {args.mode} loop)...\n")
     results = {}
 
     for strategy in strategies:
         print(f"Benchmarking {strategy}...")
-        result = benchmark.benchmark_strategy(strategy, queries, args.num_runs)
+
+        if args.sweep:
+            levels = [float(level) for level in args.sweep.split(",")]
+            curve = benchmark.sweep(
+                strategy, queries, levels, args.num_runs,
+                mode=args.mode, concurrency=args.concurrency,
+                warmup=args.warmup, poisson=args.poisson
+            )
+            results[strategy] = curve
+
+            # Print saturation curve
+            level_name = "clients" if args.mode == "closed" else "qps"
+            print(f"  {level_name:>8} {'q/s':>8} {'p50':>9} {'p99':>9} {'p99.9':>9} {'ok':>6}")
+            for point in curve["points"]:
+                level = point["concurrency"] if args.mode == "closed" else point["target_qps"]
+                print(f"  {level:>8} {point['throughput']:>8} {point['latency_p50']:>8}ms "
+                      f"{point['latency_p99']:>8}ms {point['latency_p999']:>8}ms "
+                      f"{point['success_rate'] * 100:>5.1f}%")
+            print(f"  Knee: {curve['knee']} {level_name}")
+            print()
+            continue
+
+        result = benchmark.benchmark_strategy(
+            strategy, queries, args.num_runs,
+            mode=args.mode, concurrency=args.concurrency, qps=args.qps,
+            warmup=args.warmup, poisson=args.poisson
+        )
         results[strategy] = asdict(result)
 
         # Print summary
         print(f"  Latency p50: {result.latency_p50}ms")
         print(f"  Latency p95: {result.latency_p95}ms")
+        print(f"  Latency p99: {result.latency_p99}ms")
         print(f"  Throughput: {result.throughput} q/s")
+        for stage, summary in result.stages.items():
+            print(f"  Stage {stage}: p50 {summary['p50']}ms, p99 {summary['p99']}ms")
         print(f"  Cost per query: ${result.cost_per_query}")
         print(f"  Success rate: {result.success_rate * 100}%")
         print()
@@ -12,6 +12,15 @@ Usage:
         --k-values 1,3,5,10 \
         --output quality-metrics.json
 
+    # Compare against a baseline with bootstrap CIs and paired significance tests
+    python evaluate-retrieval-quality.py \
+        --strategy reranking --baseline hybrid \
+        --test-set labeled-queries.jsonl --workers 16 --bootstrap 2000
+
+Metrics for every k come from one boolean hit matrix (queries x max_k), so a
+50k-query set is scored in a few vectorized NumPy passes; retrieval runs in
+concurrent batches on a thread pool.
+
 Test Set Format (JSONL):
     {"query": "What is ML?", "relevant_ids": ["doc1", "doc3", "doc7"]}
     {"query": "Explain RAG", "relevant_ids": ["doc2", "doc5"]}
@@ -23,10 +32,17 @@ Requirements:
 import argparse
 import json
 import math
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Set
-from dataclasses import dataclass, asdict
-import statistics
+from typing import List, Dict, Any, Optional, Sequence, Set, Tuple
+from dataclasses import dataclass, field
+
+import numpy as np
+
+
+# Elements per resampling chunk (resamples x queries), bounds memory on large sets
+RESAMPLE_CHUNK_ELEMENTS = 1 << 22
 
 
 @dataclass
@@ -39,6 +55,175 @@ class QualityMetrics:
     mrr: float                    # Mean Reciprocal Rank
     ndcg: Dict[int, float]        # NDCG@k
     hit_rate: Dict[int, float]    # Hit rate@k
+    confidence_intervals: Dict[str, Tuple[float, float]] = field(default_factory=dict)  # Bootstrap CI per metric
+    per_query: Dict[str, np.ndarray] = field(default_factory=dict, repr=False)  # Metric -> per-query values
+    retrieval_seconds: float = 0.0
+
+
+# =======================
+# Vectorized Metrics
+# =======================
+
+def build_hit_matrix(
+    retrieved: Sequence[Sequence[str]],
+    relevant: Sequence[Set[str]],
+    max_k: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Encode retrieval results as a boolean hit matrix.
+
+    hits[q, i] is True when the (i+1)-th result of query q is relevant.
+    A relevant doc retrieved twice only counts at its first position.
+
+    Returns:
+        (hits: bool [queries x max_k], num_relevant: int [queries])
+    """
+    hits = np.zeros((len(retrieved), max_k), dtype=bool)
+    for q, (doc_ids, rel) in enumerate(zip(retrieved, relevant)):
+        seen = set()
+        for i, doc_id in enumerate(doc_ids[:max_k]):
+            if doc_id in rel and doc_id not in seen:
+                seen.add(doc_id)
+                hits[q, i] = True
+    num_relevant = np.fromiter((len(rel) for rel in relevant), dtype=np.int64, count=len(relevant))
+    return hits, num_relevant
+
+
+def compute_metric_matrix(
+    hits: np.ndarray,
+    num_relevant: np.ndarray,
+    k_values: Sequence[int]
+) -> Dict[str, np.ndarray]:
+    """
+    Per-query precision/recall/NDCG/hit rate at every k, and reciprocal rank.
+
+    Cumulative hit counts and DCG are computed once across the max_k
+    columns and read off at each k. The discount and ideal-DCG tables are
+    built once per call instead of once per query and k.
+
+    Returns:
+        Metric name ('precision@5', 'mrr', ...) -> float array [queries]
+    """
+    ks = np.asarray(k_values)
+    if ks.min() < 1:
+        raise ValueError("k values must be >= 1")
+    max_k = hits.shape[1]
+    if ks.max() > max_k:
+        raise ValueError(f"k={ks.max()} exceeds the hit matrix width {max_k}")
+
+    # Discount table 1/log2(i + 1) for ranks 1..max_k, and ideal DCG of n
+    # relevant docs ranked first (binary gain 2^1 - 1 = 1)
+    discounts = 1.0 / np.log2(np.arange(2, max_k + 2))
+    ideal_dcg = np.concatenate(([0.0], np.cumsum(discounts)))
+
+    cum_hits = np.cumsum(hits, axis=1)[:, ks - 1]  # [queries x len(k_values)]
+    cum_dcg = np.cumsum(hits * discounts, axis=1)[:, ks - 1]
+    num_rel = num_relevant[:, None]
+    idcg = ideal_dcg[np.minimum(num_rel, ks)]
+
+    precision = cum_hits / ks
+    recall = np.divide(cum_hits, num_rel, out=np.zeros(cum_hits.shape), where=num_rel > 0)
+    ndcg = np.divide(cum_dcg, idcg, out=np.zeros(cum_dcg.shape), where=idcg > 0)
+    hit_rate = (cum_hits > 0).astype(float)
+    rr = np.where(hits.any(axis=1), 1.0 / (np.argmax(hits, axis=1) + 1), 0.0)
+
+    metrics = {"mrr": rr}
+    for j, k in enumerate(k_values):
+        metrics[f"precision@{k}"] = precision[:, j]
+        metrics[f"recall@{k}"] = recall[:, j]
+        metrics[f"ndcg@{k}"] = ndcg[:, j]
+        metrics[f"hit_rate@{k}"] = hit_rate[:, j]
+    return metrics
+
+
+def _resample_means(values: np.ndarray, num_resamples: int, rng: np.random.Generator) -> np.ndarray:
+    """Bootstrap means of every column of values [queries x metrics] -> [resamples x metrics]"""
+    n = values.shape[0]
+    uniform = np.full(n, 1.0 / n)
+    chunk = max(1, RESAMPLE_CHUNK_ELEMENTS // n)
+    means = []
+    for start in range(0, num_resamples, chunk):
+        # How often each query is drawn; one matmul averages all metrics at once
+        counts = rng.multinomial(n, uniform, size=min(chunk, num_resamples - start))
+        means.append(counts @ values / n)
+    return np.vstack(means)
+
+
+def bootstrap_ci(
+    per_query: Dict[str, np.ndarray],
+    num_resamples: int = 1000,
+    confidence: float = 0.95,
+    seed: Optional[int] = 0
+) -> Dict[str, Tuple[float, float]]:
+    """
+    Percentile bootstrap confidence interval of each metric's mean.
+
+    Args:
+        per_query: Metric name -> per-query values
+        num_resamples: Bootstrap resamples (0 = none)
+        confidence: Interval coverage
+        seed: RNG seed (None for a random one)
+
+    Returns:
+        Metric name -> (low, high)
+    """
+    names = list(per_query)
+    if not names or num_resamples <= 0 or len(per_query[names[0]]) == 0:
+        return {}
+    values = np.column_stack([per_query[name] for name in names])
+    means = _resample_means(values, num_resamples, np.random.default_rng(seed))
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(means, [alpha, 1 - alpha], axis=0)
+    return {name: (round(float(lo), 4), round(float(hi), 4)) for name, lo, hi in zip(names, low, high)}
+
+
+def paired_significance(
+    candidate: Dict[str, np.ndarray],
+    baseline: Dict[str, np.ndarray],
+    num_resamples: int = 10000,
+    confidence: float = 0.95,
+    seed: Optional[int] = 0
+) -> Dict[str, Dict[str, float]]:
+    """
+    Compare two strategies evaluated on the same queries.
+
+    The p-value comes from a two-sided paired randomization (sign-flip)
+    test on the per-query differences. The interval is a bootstrap CI of
+    the mean difference.
+
+    Returns:
+        Metric name -> {'delta', 'ci_low', 'ci_high', 'p_value'}
+    """
+    names = [name for name in candidate if name in baseline]
+    if not names or len(candidate[names[0]]) == 0:
+        return {}
+    if num_resamples <= 0:
+        raise ValueError("num_resamples must be positive")
+    diffs = np.column_stack([candidate[name] - baseline[name] for name in names])
+    n = diffs.shape[0]
+    rng = np.random.default_rng(seed)
+    observed = np.abs(diffs.mean(axis=0))
+
+    # Under H0 each query's difference is equally likely to have either sign
+    extreme = np.zeros(len(names))
+    chunk = max(1, RESAMPLE_CHUNK_ELEMENTS // n)
+    for start in range(0, num_resamples, chunk):
+        signs = rng.choice((-1.0, 1.0), size=(min(chunk, num_resamples - start), n))
+        extreme += (np.abs(signs @ diffs / n) >= observed - 1e-12).sum(axis=0)
+    p_values = (extreme + 1) / (num_resamples + 1)
+
+    alpha = (1 - confidence) / 2
+    low, high = np.quantile(_resample_means(diffs, num_resamples, rng), [alpha, 1 - alpha], axis=0)
+
+    return {
+        name: {
+            "delta": round(float(diffs[:, j].mean()), 4),
+            "ci_low": round(float(low[j]), 4),
+            "ci_high": round(float(high[j]), 4),
+            "p_value": round(float(p_values[j]), 4)
+        }
+        for j, name in enumerate(names)
+    }
 
 
 class RetrievalEvaluator:
@@ -267,10 +452,38 @@ class RetrievalEvaluator:
         has_relevant = len(set(retrieved_at_k).intersection(relevant)) > 0
         return 1.0 if has_relevant else 0.0
 
+    def retrieve_many(
+        self,
+        queries: List[str],
+        top_k: int = 10,
+        max_workers: int = 8,
+        batch_size: int = 64
+    ) -> List[List[str]]:
+        """
+        Retrieve documents for many queries in concurrent batches.
+
+        Each batch runs on a pool thread, so up to max_workers retrieval
+        calls are in flight. Results keep the query order.
+        """
+        batches = [queries[i:i + batch_size] for i in range(0, len(queries), batch_size)]
+        if max_workers <= 1 or len(batches) <= 1:
+            return [self.retrieve(query, top_k) for query in queries]
+
+        def run_batch(batch: List[str]) -> List[List[str]]:
+            return [self.retrieve(query, top_k) for query in batch]
+
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="eval") as pool:
+            return [doc_ids for batch in pool.map(run_batch, batches) for doc_ids in batch]
+
     def evaluate(
         self,
         test_set: List[Dict[str, Any]],
-        k_values: List[int]
+        k_values: List[int],
+        max_workers: int = 8,
+        batch_size: int = 64,
+        bootstrap: int = 1000,
+        confidence: float = 0.95,
+        seed: Optional[int] = 0
     ) -> QualityMetrics:
         """
         Evaluate retrieval quality on test set.
@@ -278,69 +491,48 @@ class RetrievalEvaluator:
         Args:
             test_set: List of dicts with 'query' and 'relevant_ids' keys
             k_values: List of k values to evaluate (e.g., [1, 3, 5, 10])
+            max_workers: Concurrent retrieval threads
+            batch_size: Queries per retrieval batch
+            bootstrap: Bootstrap resamples for confidence intervals (0 = none)
+            confidence: Confidence interval coverage
+            seed: Bootstrap RNG seed
 
         Returns:
-            QualityMetrics object with aggregated metrics
+            QualityMetrics object with aggregated metrics; per-query values
+            are kept in per_query for paired_significance()
         """
         max_k = max(k_values)
 
-        # Store metrics for each query
-        precision_scores = {k: [] for k in k_values}
-        recall_scores = {k: [] for k in k_values}
-        ndcg_scores = {k: [] for k in k_values}
-        hit_rate_scores = {k: [] for k in k_values}
-        rr_scores = []
-
-        for item in test_set:
-            query = item['query']
-            relevant = set(item['relevant_ids'])
-
-            # Retrieve documents
-            retrieved = self.retrieve(query, top_k=max_k)
-
-            # Calculate metrics for each k
-            for k in k_values:
-                precision = self.calculate_precision_at_k(retrieved, relevant, k)
-                recall = self.calculate_recall_at_k(retrieved, relevant, k)
-                ndcg = self.calculate_ndcg_at_k(retrieved, relevant, k)
-                hit_rate = self.calculate_hit_rate_at_k(retrieved, relevant, k)
-
-                precision_scores[k].append(precision)
-                recall_scores[k].append(recall)
-                ndcg_scores[k].append(ndcg)
-                hit_rate_scores[k].append(hit_rate)
+        # Retrieve documents
+        start = time.perf_counter()
+        retrieved = self.retrieve_many(
+            [item['query'] for item in test_set], max_k, max_workers, batch_size
+        )
+        retrieval_seconds = time.perf_counter() - start
 
-            # Calculate RR (only once per query)
-            rr = self.calculate_reciprocal_rank(retrieved, relevant)
-            rr_scores.append(rr)
+        # Calculate metrics for every query and k in one pass
+        hits, num_relevant = build_hit_matrix(
+            retrieved, [set(item['relevant_ids']) for item in test_set], max_k
+        )
+        per_query = compute_metric_matrix(hits, num_relevant, k_values)
 
         # Calculate mean metrics
-        precision_at_k = {
-            k: round(statistics.mean(scores), 4)
-            for k, scores in precision_scores.items()
-        }
-        recall_at_k = {
-            k: round(statistics.mean(scores), 4)
-            for k, scores in recall_scores.items()
-        }
-        ndcg_at_k = {
-            k: round(statistics.mean(scores), 4)
-            for k, scores in ndcg_scores.items()
-        }
-        hit_rate_at_k = {
-            k: round(statistics.mean(scores), 4)
-            for k, scores in hit_rate_scores.items()
+        mean = {
+            name: round(float(values.mean()), 4) if values.size else 0.0
+            for name, values in per_query.items()
         }
-        mrr = round(statistics.mean(rr_scores), 4)
 
         return QualityMetrics(
             strategy=self.retriever.__class__.__name__,
             num_queries=len(test_set),
-            precision=precision_at_k,
-            recall=recall_at_k,
-            mrr=mrr,
-            ndcg=ndcg_at_k,
-            hit_rate=hit_rate_at_k
+            precision={k: mean[f"precision@{k}"] for k in k_values},
+            recall={k: mean[f"recall@{k}"] for k in k_values},
+            mrr=mean["mrr"],
+            ndcg={k: mean[f"ndcg@{k}"] for k in k_values},
+            hit_rate={k: mean[f"hit_rate@{k}"] for k in k_values},
+            confidence_intervals=bootstrap_ci(per_query, bootstrap, confidence, seed),
+            per_query=per_query,
+            retrieval_seconds=round(retrieval_seconds, 3)
         )
 
 
@@ -450,6 +642,42 @@ def main():
         default=Path("quality-metrics.json"),
         help="Output file for metrics"
     )
+    parser.add_argument(
+        "--baseline",
+        type=str,
+        choices=["semantic", "hybrid", "reranking"],
+        help="Also evaluate this strategy and test the difference (paired, per query)"
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=8,
+        help="Concurrent retrieval threads (default: 8)"
+    )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=64,
+        help="Queries per retrieval batch (default: 64)"
+    )
+    parser.add_argument(
+        "--bootstrap",
+        type=int,
+        default=1000,
+        help="Bootstrap resamples for confidence intervals, 0 to skip (default: 1000)"
+    )
+    parser.add_argument(
+        "--confidence",
+        type=float,
+        default=0.95,
+        help="Confidence interval coverage (default: 0.95)"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=0,
+        help="Resampling seed (default: 0)"
+    )
 
     args = parser.parse_args()
 
@@ -468,29 +696,64 @@ def main():
     # Initialize evaluator
     evaluator = RetrievalEvaluator(documents)
 
-    # Setup retriever
-    print(f"\nSetting up {args.strategy} retriever...")
-    success = evaluator.setup_retriever(args.strategy)
-    if not success:
-        print(f"Failed to setup {args.strategy} retriever")
+    def run(strategy: str) -> Optional[QualityMetrics]:
+        # Setup retriever
+        print(f"\nSetting up {strategy} retriever...")
+        success = evaluator.setup_retriever(strategy)
+        if not success:
+            print(f"Failed to setup {strategy} retriever")
+            return None
+
+        # Evaluate
+        print(f"\nEvaluating {strategy} on {len(test_set)} queries...\n")
+        metrics = evaluator.evaluate(
+            test_set, k_values,
+            max_workers=args.workers,
+            batch_size=args.batch_size,
+            bootstrap=args.bootstrap,
+            confidence=args.confidence,
+            seed=args.seed
+        )
+        ci = metrics.confidence_intervals
+
+        def fmt(name: str, value: float) -> str:
+            return f"{value} [{ci[name][0]}, {ci[name][1]}]" if name in ci else f"{value}"
+
+        # Print results
+        print(f"Results for {strategy}:")
+        print(f"  Queries evaluated: {metrics.num_queries}")
+        print(f"  Retrieval time: {metrics.retrieval_seconds}s")
+        print(f"  MRR: {fmt('mrr', metrics.mrr)}")
+        print()
+
+        for k in k_values:
+            print(f"  Metrics @ {k}:")
+            print(f"    Precision: {fmt(f'precision@{k}', metrics.precision[k])}")
+            print(f"    Recall: {fmt(f'recall@{k}', metrics.recall[k])}")
+            print(f"    NDCG: {fmt(f'ndcg@{k}', metrics.ndcg[k])}")
+            print(f"    Hit Rate: {fmt(f'hit_rate@{k}', metrics.hit_rate[k])}")
+            print()
+
+        return metrics
+
+    baseline = run(args.baseline) if args.baseline else None
+    metrics = run(args.strategy)
+    if metrics is None:
         return
 
-    # Evaluate
-    print(f"\nEvaluating {args.strategy} on {len(test_set)} queries...\n")
-    metrics = evaluator.evaluate(test_set, k_values)
-
-    # Print results
-    print(f"Results for {args.strategy}:")
-    print(f"  Queries evaluated: {metrics.num_queries}")
-    print(f"  MRR: {metrics.mrr}")
-    print()
-
-    for k in k_values:
-        print(f"  Metrics @ {k}:")
-        print(f"    Precision: {metrics.precision[k]}")
-        print(f"    Recall: {metrics.recall[k]}")
-        print(f"    NDCG: {metrics.ndcg[k]}")
-        print(f"    Hit Rate: {metrics.hit_rate[k]}")
+    comparison = None
+    if baseline is not None:
+        comparison = paired_significance(
+            metrics.per_query, baseline.per_query,
+            num_resamples=max(args.bootstrap, 1000),
+            confidence=args.confidence,
+            seed=args.seed
+        )
+        print(f"{args.strategy} vs {args.baseline} (paired, {args.confidence:.0%} CI):")
+        for name, result in comparison.items():
+            marker = " *" if result["p_value"] < 1 - args.confidence else ""
+            print(f"  {name}: {result['delta']:+.4f} "
+                  f"[{result['ci_low']:+.4f}, {result['ci_high']:+.4f}] p={result['p_value']}{marker}")
         print()
 
     # Save results
@@ -503,8 +766,16 @@ def main():
         **{f"precision@{k}": v for k, v in metrics.precision.items()},
         **{f"recall@{k}": v for k, v in metrics.recall.items()},
         **{f"ndcg@{k}": v for k, v in metrics.ndcg.items()},
-        **{f"hit_rate@{k}": v for k, v in metrics.hit_rate.items()}
+        **{f"hit_rate@{k}": v for k, v in metrics.hit_rate.items()},
+        "retrieval_seconds": metrics.retrieval_seconds
     }
+    if metrics.confidence_intervals:
+        results["confidence_intervals"] = {
+            "confidence": args.confidence,
+            **{name: list(ci) for name, ci in metrics.confidence_intervals.items()}
+        }
+    if comparison is not None:
+        results["comparison"] = {"baseline": args.baseline, **comparison}
 
     with open(args.output, 'w') as f:
         json.dump(results, f, indent=2)
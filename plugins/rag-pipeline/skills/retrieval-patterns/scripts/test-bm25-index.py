@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+Test BM25Index against exhaustive BM25 scoring.
+
+Usage:
+    python test-bm25-index.py [--queries 2000] [--seed 0]
+
+Tests:
+- MaxScore search returns the same top-k as scoring every document, on
+  random corpora with small vocabularies (many ties)
+- Same with a delta segment and tombstoned deletes
+- score() of a candidate subset matches exhaustive scoring
+- Save/load round trip
+- Index whose documents are all empty
+
+Requirements:
+    pip install numpy
+"""
+
+import argparse
+import math
+import random
+import sys
+import tempfile
+import warnings
+from collections import Counter
+from pathlib import Path
+
+
+SKILLS_DIR = Path(__file__).resolve().parents[2]
+if str(SKILLS_DIR) not in sys.path:
+    sys.path.insert(0, str(SKILLS_DIR))
+from template_loader import load_template  # noqa: E402
+
+
+bm25 = load_template(Path(__file__).resolve().parents[1] / "templates" / "bm25-index.py")
+BM25Index = bm25.BM25Index
+
+
+def exhaustive_search(index, docs, query, top_k, df_docs=None):
+    """
+    Score every live document; docs is [(doc_id, text)] in ordinal order.
+
+    df_docs: texts counted for document frequency, if not just the live docs
+    (before compaction, tombstoned documents still count)
+    """
+    tokenized = [(doc_id, Counter(index.tokenizer(text))) for doc_id, text in docs]
+    df_counts = [set(index.tokenizer(t)) for t in df_docs] if df_docs is not None else [c for _, c in tokenized]
+    n = len(tokenized)
+    avgdl = (sum(sum(c.values()) for _, c in tokenized) / n) or 1.0
+    query_tf = Counter(index.tokenizer(query))
+    scored = []
+    for ordinal, (doc_id, counts) in enumerate(tokenized):
+        length = sum(counts.values())
+        score = 0.0
+        for term, qtf in query_tf.items():
+            tf = counts.get(term, 0)
+            if not tf:
+                continue
+            df = sum(1 for c in df_counts if term in c)
+            idf = max(math.log1p((n - df + 0.5) / (df + 0.5)), 0.0)
+            norm = index.k1 * (1 - index.b + index.b * length / avgdl)
+            score += qtf * idf * (index.k1 + 1) * tf / (tf + norm)
+        if score > 0:
+            scored.append((-score, ordinal, doc_id))
+    scored.sort()
+    return [(doc_id, -neg) for neg, _, doc_id in scored[:top_k]]
+
+
+def same_hits(actual, expected, all_scores):
+    """
+    Same scores position by position, and every returned id really has its
+    score. Ids tied within round-off may come back in either order.
+    """
+    if len(actual) != len(expected) or len({doc_id for doc_id, _ in actual}) != len(actual):
+        return False
+    for (a_id, a_score), (_, e_score) in zip(actual, expected):
+        if not math.isclose(a_score, e_score, rel_tol=1e-9):
+            return False
+        if not math.isclose(all_scores.get(a_id, 0.0), a_score, rel_tol=1e-9):
+            return False
+    return True
+
+
+def random_corpus(rng, num_docs):
+    vocab = [chr(ord("a") + i) * rng.randint(1, 2) for i in range(rng.randint(3, 8))]
+    docs = []
+    for i in range(num_docs):
+        if docs and rng.random() < 0.3:
+            docs.append((f"d{i}", rng.choice(docs)[1]))  # Duplicate text: exact ties
+            continue
+        length = rng.choice([0, 1, 2, 3, 5, 8])
+        docs.append((f"d{i}", " ".join(rng.choice(vocab) for _ in range(length))))
+    return vocab, docs
+
+
+def random_query(rng, vocab):
+    return " ".join(rng.choice(vocab) for _ in range(rng.randint(1, 5)))
+
+
+def test_matches_exhaustive(num_queries=2000, seed=0):
+    """Compacted index: MaxScore == exhaustive"""
+    print("Testing MaxScore search against exhaustive scoring...")
+    rng = random.Random(seed)
+    mismatches = 0
+    for _ in range(num_queries):
+        vocab, docs = random_corpus(rng, rng.randint(1, 30))
+        index = BM25Index.from_documents([d for d, _ in docs], [t for _, t in docs])
+        query = random_query(rng, vocab)
+        top_k = rng.randint(1, 6)
+        actual = index.search(query, top_k=top_k)
+        expected = exhaustive_search(index, docs, query, len(docs))
+        if not same_hits(actual, expected[:top_k], dict(expected)):
+            mismatches += 1
+            if mismatches <= 3:
+                print(f"   query={query!r} top_k={top_k}\n   got      {actual}\n   expected {expected[:top_k]}")
+    assert mismatches == 0, f"{mismatches}/{num_queries} queries differ from exhaustive scoring"
+    print(f"✅ {num_queries} queries identical")
+
+
+def test_delta_and_deletes(num_queries=2000, seed=1):
+    """Base + delta segments with tombstones: same ranking as a fresh index"""
+    print("\nTesting delta segment and deletes...")
+    rng = random.Random(seed)
+    for _ in range(num_queries):
+        vocab, docs = random_corpus(rng, rng.randint(2, 30))
+        split = rng.randint(0, len(docs))
+        index = BM25Index.from_documents([d for d, _ in docs[:split]], [t for _, t in docs[:split]])
+        index.add_documents([d for d, _ in docs[split:]], [t for _, t in docs[split:]])
+        for doc_id, _ in rng.sample(docs, rng.randint(0, len(docs) - 1)):
+            index.delete(doc_id)
+        query = random_query(rng, vocab)
+        top_k = rng.randint(1, 6)
+        live = [(d, t) for d, t in docs if d in index]
+
+        # Deleted docs count toward df until compaction; with more deletes
+        # than live docs a term's idf (and its MaxScore bound) drops to 0
+        expected = exhaustive_search(index, live, query, len(live), df_docs=[t for _, t in docs])
+        assert same_hits(index.search(query, top_k=top_k), expected[:top_k], dict(expected)), \
+            f"before compaction: query={query!r} top_k={top_k}"
+
+        index.compact()
+        expected = exhaustive_search(index, live, query, len(live))
+        assert same_hits(index.search(query, top_k=top_k), expected[:top_k], dict(expected)), \
+            f"after compaction: query={query!r} top_k={top_k}"
+    print(f"✅ {num_queries} mixed-segment queries identical")
+
+
+def test_score_candidates(num_queries=2000, seed=3):
+    """score() of a candidate subset == exhaustive scores, across segments and deletes"""
+    print("\nTesting candidate scoring...")
+    rng = random.Random(seed)
+    for _ in range(num_queries):
+        vocab, docs = random_corpus(rng, rng.randint(2, 30))
+        split = rng.randint(0, len(docs))
+        index = BM25Index.from_documents([d for d, _ in docs[:split]], [t for _, t in docs[:split]])
+        index.add_documents([d for d, _ in docs[split:]], [t for _, t in docs[split:]])
+        for doc_id, _ in rng.sample(docs, rng.randint(0, len(docs) - 1)):
+            index.delete(doc_id)
+        query = random_query(rng, vocab)
+        live = [(d, t) for d, t in docs if d in index]
+        expected = dict(exhaustive_search(index, live, query, len(live), df_docs=[t for _, t in docs]))
+
+        candidates = [d for d, _ in rng.sample(docs, rng.randint(0, len(docs)))] + ["missing"]
+        scores = index.score(query, candidates)
+        assert set(scores) == set(candidates), f"query={query!r}: ids {sorted(scores)}"
+        for doc_id in candidates:
+            assert math.isclose(scores[doc_id], expected.get(doc_id, 0.0), rel_tol=1e-9, abs_tol=1e-12), \
+                f"query={query!r} {doc_id}: {scores[doc_id]} != {expected.get(doc_id, 0.0)}"
+    print(f"✅ {num_queries} candidate scorings identical")
+
+
+def test_save_load():
+    """Round trip through save() and mmap load()"""
+    print("\nTesting save/load...")
+    rng = random.Random(2)
+    vocab, docs = random_corpus(rng, 200)
+    index = BM25Index.from_documents([d for d, _ in docs], [t for _, t in docs])
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "bm25"
+        index.save(path)
+        index.save(path)  # Overwrite an existing index
+        loaded = BM25Index.load(path)
+        for _ in range(50):
+            query = random_query(rng, vocab)
+            assert loaded.search(query, top_k=5) == index.search(query, top_k=5)
+        assert sorted(p.name for p in Path(tmp).iterdir()) == ["bm25"]
+    print("✅ Loaded index answers identically")
+
+
+def test_empty_documents():
+    """All-empty corpus: no warnings, no NaN scores"""
+    print("\nTesting empty documents...")
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        index = BM25Index.from_documents(["a", "b"], ["", "!!"])
+        assert index.search("anything", top_k=3) == []
+        index.add_documents(["c"], ["..."])
+        assert index.search("anything", top_k=3) == []
+        index.add_documents(["d"], ["anything"])
+        hits = index.search("anything", top_k=3)
+        assert [doc_id for doc_id, _ in hits] == ["d"] and math.isfinite(hits[0][1])
+
+        # Only empty documents left live: avgdl is 0
+        index.compact()
+        index.delete("d")
+        assert index.search("anything", top_k=3) == []
+        index.add_documents(["e"], ["anything"])
+        index.delete("e")
+        assert index.search("anything", top_k=3) == []
+    print("✅ Empty documents score cleanly")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test BM25Index against exhaustive scoring")
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    tests = [
+        lambda: test_matches_exhaustive(args.queries, args.seed),
+        lambda: test_delta_and_deletes(seed=args.seed + 1),
+        lambda: test_score_candidates(seed=args.seed + 3),
+        test_save_load,
+        test_empty_documents,
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {e}")
+
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Test LLMReranker's windowed strategies with an oracle ranker.
+
+Usage:
+    python test-llm-reranker.py [--trials 30] [--seed 0]
+
+The LLM call is replaced by an oracle that ranks every window perfectly,
+so any error in the result comes from the windowing strategy itself.
+
+Tests:
+- Tournament returns the exact top_n, including top_n > window_size // 2
+- Tournament rejects window_size < 2 * top_n instead of dropping documents
+- Sliding with enough passes returns the exact top_n
+"""
+
+import argparse
+import random
+import re
+import sys
+from pathlib import Path
+
+
+SKILLS_DIR = Path(__file__).resolve().parents[2]
+if str(SKILLS_DIR) not in sys.path:
+    sys.path.insert(0, str(SKILLS_DIR))
+from template_loader import load_template  # noqa: E402
+
+
+reranking = load_template(Path(__file__).resolve().parents[1] / "templates" / "reranking.py")
+LLMReranker = reranking.LLMReranker
+RetrievalResult = reranking.RetrievalResult
+
+
+class OracleReranker(LLMReranker):
+    """Ranks each window by the relevance number embedded in the document text"""
+
+    def __init__(self, **kwargs):
+        super().__init__(client=object(), cache_size=0, **kwargs)
+
+    def _call_llm(self, prompt):
+        docs = re.findall(r"^\[(\d+)\] relevance=(\d+)$", prompt, flags=re.M)
+        ranking = sorted(docs, key=lambda doc: -int(doc[1]))
+        return "[" + ", ".join(index for index, _ in ranking) + "]", 0, 0
+
+
+def random_candidates(rng, num_docs):
+    relevance = rng.sample(range(num_docs * 10), num_docs)
+    return [
+        RetrievalResult(doc_id=f"d{i}", content=f"relevance={rel}", score=0.0, metadata={})
+        for i, rel in enumerate(relevance)
+    ]
+
+
+def expected_top(results, top_n):
+    ranked = sorted(results, key=lambda r: -int(r.content.split("=")[1]))
+    return [r.doc_id for r in ranked[:top_n]]
+
+
+def test_tournament_exact(trials=30, seed=0):
+    """Oracle tournament == exact top_n, for top_n up to window_size // 2"""
+    print("Testing tournament against the exact top_n...")
+    rng = random.Random(seed)
+    reranker = OracleReranker(strategy="tournament", window_size=20)
+    try:
+        for _ in range(trials):
+            results = random_candidates(rng, rng.randint(21, 200))
+            top_n = rng.randint(1, 10)  # Includes top_n == window_size // 2
+            got = [r.doc_id for r in reranker.rerank("q", results, top_n=top_n)]
+            assert got == expected_top(results, top_n), \
+                f"{len(results)} candidates, top_n={top_n}: {got}"
+    finally:
+        reranker.pool.shutdown()
+    print(f"✅ {trials} tournaments exact")
+
+
+def test_tournament_rejects_small_window(seed=0):
+    """window_size < 2 * top_n raises instead of losing documents"""
+    print("\nTesting tournament with top_n > window_size // 2...")
+    rng = random.Random(seed)
+    reranker = OracleReranker(strategy="tournament", window_size=20)
+    try:
+        results = random_candidates(rng, 100)
+        try:
+            reranker.rerank("q", results, top_n=15)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError("window_size=20, top_n=15 should raise ValueError")
+
+        # Fits in one window: no tournament needed, still exact
+        results = random_candidates(rng, 20)
+        got = [r.doc_id for r in reranker.rerank("q", results, top_n=15)]
+        assert got == expected_top(results, 15), got
+    finally:
+        reranker.pool.shutdown()
+    print("✅ Rejected up front")
+
+
+def test_sliding_exact(trials=30, seed=0):
+    """Oracle sliding with enough passes == exact top_n, including top_n > window_size // 2"""
+    print("\nTesting sliding windows against the exact top_n...")
+    rng = random.Random(seed)
+    top_n, step = 15, 5
+    reranker = OracleReranker(strategy="sliding", window_size=20, step=step, max_passes=50)
+    try:
+        for _ in range(trials):
+            results = random_candidates(rng, rng.randint(21, 100))
+            got = [r.doc_id for r in reranker.rerank("q", results, top_n=top_n)]
+            assert got == expected_top(results, top_n), f"{len(results)} candidates: {got}"
+    finally:
+        reranker.pool.shutdown()
+    print(f"✅ {trials} sliding reranks exact")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Test LLMReranker strategies with an oracle ranker")
+    parser.add_argument("--trials", type=int, default=30)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    tests = [
+        lambda: test_tournament_exact(args.trials, args.seed),
+        lambda: test_tournament_rejects_small_window(args.seed),
+        lambda: test_sliding_exact(args.trials, args.seed),
+    ]
+    failed = 0
+    for test in tests:
+        try:
+            test()
+        except AssertionError as e:
+            failed += 1
+            print(f"❌ {e}")
+
+    print(f"\n{len(tests) - failed}/{len(tests)} tests passed")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,656 @@
+"""
+BM25 Index Template
+
+In-process BM25 keyword index for hybrid retrieval, used instead of
+rebuilding LangChain's BM25Retriever (which rescores the whole corpus per
+query) on every startup.
+
+Layout:
+- Base segment: sorted vocabulary (one UTF-8 blob + offsets), postings as
+  flat arrays (doc ordinals sorted per term, uint16 term frequencies),
+  per-term score bounds and doc lengths. Saved as .npy files and opened
+  with mmap, so loading a multi-million-chunk index reads no postings and
+  tokenizes nothing.
+- Delta segment: documents added since the last compaction, in memory.
+- Deletes are tombstones until compact() rewrites the base segment.
+
+Search is term-at-a-time MaxScore: rare (high-bound) terms are scored in
+full, and once the k-th best candidate beats what the remaining terms
+could add to an unseen document, the long postings of common terms are
+only probed (binary search) for the current candidates. Results match
+exhaustive scoring (documents tied within float round-off may swap places).
+
+Scoring is Okapi BM25 with the non-negative idf log(1 + (N - df + 0.5) / (df + 0.5)).
+
+Usage:
+    index = BM25Index()
+    index.add_documents(doc_ids, texts)
+    index.save("bm25-index")
+
+    index = BM25Index.load("bm25-index")   # mmap, instant startup
+    hits = index.search("hybrid search", top_k=10)  # [(doc_id, score), ...]
+    scores = index.score("hybrid search", candidate_ids)  # {doc_id: score}
+"""
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+from collections import Counter
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+
+FORMAT_VERSION = 1
+MAX_TF = np.iinfo(np.uint16).max
+
+_TOKEN = re.compile(r"\w+")
+
+
+def default_tokenizer(text: str) -> List[str]:
+    """Lowercased word tokens"""
+    return _TOKEN.findall(text.lower())
+
+
+def corpus_fingerprint(doc_ids: Iterable[str], texts: Iterable[str]) -> str:
+    """Order-insensitive hash of (doc_id, text) pairs, to tell whether a saved index is stale"""
+    digest = hashlib.sha256()
+    for doc_id, text in sorted(zip(doc_ids, texts)):
+        for part in (doc_id, text):
+            data = part.encode("utf-8")
+            digest.update(len(data).to_bytes(8, "little"))
+            digest.update(data)
+    return digest.hexdigest()
+
+
+def _pack_strings(strings: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """Strings -> (UTF-8 blob as uint8, int64 start offsets [len + 1])"""
+    encoded = [s.encode("utf-8") for s in strings]
+    starts = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in encoded], out=starts[1:])
+    return np.frombuffer(b"".join(encoded), dtype=np.uint8).copy(), starts
+
+
+class BM25Index:
+    """
+    BM25 inverted index with incremental add/delete and an mmap-able on-disk format
+
+    Doc ids are external strings; internally documents are ordinals: base
+    segment docs first, then delta docs in insertion order.
+    """
+
+    def __init__(
+        self,
+        k1: float = 1.5,
+        b: float = 0.75,
+        tokenizer: Optional[Callable[[str], List[str]]] = None,
+        auto_compact: int = 100_000
+    ):
+        """
+        Initialize an empty index.
+
+        Args:
+            k1: Term frequency saturation
+            b: Document length normalization
+            tokenizer: Text -> tokens (default: lowercased \\w+ words); must
+                be passed again to load() if it is not the default
+            auto_compact: Compact once this many documents are in the delta
+                segment (0 = only on compact()/save())
+        """
+        self.k1 = k1
+        self.b = b
+        self.tokenizer = tokenizer or default_tokenizer
+        self.auto_compact = auto_compact
+        # Caller-supplied corpus_fingerprint(), kept in meta.json by save()
+        self.fingerprint: Optional[str] = None
+        self._set_base(*self._empty_base())
+        self._reset_delta()
+
+    # ----- segments -----
+
+    @staticmethod
+    def _empty_base():
+        return (
+            np.zeros(0, dtype=np.uint8), np.zeros(1, dtype=np.int64),   # vocabulary
+            np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int32),   # postings offsets, docs
+            np.zeros(0, dtype=np.uint16), np.zeros(0, dtype=np.float32),  # tfs, term bounds
+            np.zeros(0, dtype=np.uint32),                                 # doc lengths
+            np.zeros(0, dtype=np.uint8), np.zeros(1, dtype=np.int64),   # doc ids
+            1.0                                                           # avgdl of the bounds
+        )
+
+    def _set_base(self, term_blob, term_starts, offsets, docs, tfs, bounds,
+                  doc_lengths, id_blob, id_starts, bound_avgdl, deleted=None):
+        self.term_blob, self.term_starts = term_blob, term_starts
+        self.offsets, self.docs, self.tfs, self.bounds = offsets, docs, tfs, bounds
+        self.doc_lengths = doc_lengths
+        self.id_blob, self.id_starts = id_blob, id_starts
+        self.bound_avgdl = float(bound_avgdl)
+        self.base_size = len(doc_lengths)
+        self.deleted = np.zeros(self.base_size, dtype=bool) if deleted is None else np.array(deleted, dtype=bool)
+        self.num_deleted = int(self.deleted.sum())
+        self.total_length = int(doc_lengths.sum(dtype=np.int64)) - int(doc_lengths[self.deleted].sum(dtype=np.int64))
+        self._id_to_ord: Optional[Dict[str, int]] = None
+        self._lookup = lru_cache(maxsize=65536)(self._find_term)
+
+    def _reset_delta(self):
+        self.delta_ids: List[str] = []
+        self.delta_lengths: List[int] = []
+        self.delta_deleted: List[bool] = []
+        self.delta_postings: Dict[str, Tuple[List[int], List[int]]] = {}
+
+    def __len__(self) -> int:
+        """Live documents"""
+        return self.base_size + len(self.delta_ids) - self.num_deleted
+
+    def __contains__(self, doc_id: str) -> bool:
+        """Whether a live document has this id"""
+        return doc_id in self._ordinals()
+
+    @property
+    def vocabulary_size(self) -> int:
+        return len(self.term_starts) - 1
+
+    @property
+    def avgdl(self) -> float:
+        """Mean live document length (0 when every live document is empty)"""
+        return self.total_length / len(self) if len(self) else 0.0
+
+    def _find_term(self, term: str) -> int:
+        """Binary search the sorted vocabulary blob; -1 if absent"""
+        key = term.encode("utf-8")
+        blob, starts = self.term_blob, self.term_starts
+        lo, hi = 0, len(starts) - 1
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if blob[starts[mid]:starts[mid + 1]].tobytes() < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < len(starts) - 1 and blob[starts[lo]:starts[lo + 1]].tobytes() == key:
+            return lo
+        return -1
+
+    def _doc_id(self, ordinal: int) -> str:
+        if ordinal < self.base_size:
+            return self.id_blob[self.id_starts[ordinal]:self.id_starts[ordinal + 1]].tobytes().decode("utf-8")
+        return self.delta_ids[ordinal - self.base_size]
+
+    def _ordinals(self) -> Dict[str, int]:
+        """External id -> live ordinal, built on first write"""
+        if self._id_to_ord is None:
+            blob = self.id_blob.tobytes()
+            starts = self.id_starts.tolist()
+            self._id_to_ord = {
+                blob[starts[i]:starts[i + 1]].decode("utf-8"): i
+                for i in range(self.base_size) if not self.deleted[i]
+            }
+            for i, doc_id in enumerate(self.delta_ids):
+                if not self.delta_deleted[i]:
+                    self._id_to_ord[doc_id] = self.base_size + i
+        return self._id_to_ord
+
+    # ----- writes -----
+
+    def add_documents(self, doc_ids: Iterable[str], texts: Iterable[str]):
+        """
+        Add (or replace) documents.
+
+        New documents go to the delta segment; an existing id is deleted
+        first, so re-adding a changed document updates it.
+        """
+        ordinals = self._ordinals()
+        for doc_id, text in zip(doc_ids, texts):
+            if doc_id in ordinals:
+                self.delete(doc_id)
+            counts = Counter(self.tokenizer(text))
+            ordinal = self.base_size + len(self.delta_ids)
+            for term, tf in counts.items():
+                docs, tfs = self.delta_postings.setdefault(term, ([], []))
+                docs.append(ordinal)
+                tfs.append(min(tf, MAX_TF))
+            length = sum(counts.values())
+            self.delta_ids.append(doc_id)
+            self.delta_lengths.append(length)
+            self.delta_deleted.append(False)
+            self.total_length += length
+            ordinals[doc_id] = ordinal
+
+        if self.auto_compact and len(self.delta_ids) >= self.auto_compact:
+            self.compact()
+
+    def delete(self, doc_id: str) -> bool:
+        """Tombstone a document; returns False if it is not in the index"""
+        ordinal = self._ordinals().pop(doc_id, None)
+        if ordinal is None:
+            return False
+        if ordinal < self.base_size:
+            if not self.deleted.flags.writeable:
+                self.deleted = self.deleted.copy()
+            self.deleted[ordinal] = True
+            self.total_length -= int(self.doc_lengths[ordinal])
+        else:
+            self.delta_deleted[ordinal - self.base_size] = True
+            self.total_length -= self.delta_lengths[ordinal - self.base_size]
+        self.num_deleted += 1
+        return True
+
+    def compact(self):
+        """
+        Merge the delta segment into a new base segment and drop deleted docs.
+
+        Vectorized over the flat postings arrays; the base vocabulary is
+        never decoded, only the delta's terms are looked up and spliced in.
+        """
+        if not self.delta_ids and not self.num_deleted:
+            return
+
+        # Vocabulary: splice delta-only terms into the sorted base blob
+        new_terms = sorted(t for t in self.delta_postings if self._lookup(t) < 0)
+        base_vocab = self.vocabulary_size
+        positions = np.array(
+            [self._insert_position(t) for t in new_terms], dtype=np.int64
+        )
+        new_bytes = [t.encode("utf-8") for t in new_terms]
+        term_lengths = np.insert(np.diff(self.term_starts), positions, [len(b) for b in new_bytes])
+        term_starts = np.zeros(len(term_lengths) + 1, dtype=np.int64)
+        np.cumsum(term_lengths, out=term_starts[1:])
+        pieces, previous = [], 0
+        for position, encoded in zip(positions.tolist(), new_bytes):
+            pieces.append(self.term_blob[self.term_starts[previous]:self.term_starts[position]])
+            pieces.append(np.frombuffer(encoded, dtype=np.uint8))
+            previous = position
+        pieces.append(self.term_blob[self.term_starts[previous]:])
+        term_blob = np.concatenate(pieces) if pieces else np.zeros(0, dtype=np.uint8)
+
+        # Old base term id -> new id; new term j lands at positions[j] + j
+        base_shift = np.searchsorted(positions, np.arange(base_vocab), side="right")
+        new_ids = {t: int(p) + j for j, (t, p) in enumerate(zip(new_terms, positions.tolist()))}
+
+        def merged_id(term: str) -> int:
+            if term in new_ids:
+                return new_ids[term]
+            old = self._lookup(term)
+            return old + int(base_shift[old])
+
+        # Postings triples from both segments
+        base_terms = np.repeat(np.arange(base_vocab, dtype=np.int64) + base_shift, np.diff(self.offsets))
+        delta_terms, delta_docs, delta_tfs = [], [], []
+        for term, (docs, tfs) in self.delta_postings.items():
+            delta_terms.append(np.full(len(docs), merged_id(term), dtype=np.int64))
+            delta_docs.append(np.asarray(docs, dtype=np.int64))
+            delta_tfs.append(np.asarray(tfs, dtype=np.uint16))
+        terms = np.concatenate([base_terms] + delta_terms)
+        docs = np.concatenate([np.asarray(self.docs, dtype=np.int64)] + delta_docs)
+        tfs = np.concatenate([np.asarray(self.tfs)] + delta_tfs)
+
+        # Drop deleted docs and renumber the survivors densely
+        deleted = np.concatenate([self.deleted, np.asarray(self.delta_deleted, dtype=bool)])
+        live = ~deleted
+        remap = np.cumsum(live) - 1
+        keep = live[docs]
+        terms, docs, tfs = terms[keep], remap[docs[keep]].astype(np.int32), tfs[keep]
+        order = np.lexsort((docs, terms))
+        terms, docs, tfs = terms[order], docs[order], tfs[order]
+
+        vocab = len(term_lengths)
+        offsets = np.zeros(vocab + 1, dtype=np.int64)
+        np.cumsum(np.bincount(terms, minlength=vocab), out=offsets[1:])
+
+        doc_lengths = np.concatenate([
+            np.asarray(self.doc_lengths, dtype=np.uint32), np.asarray(self.delta_lengths, dtype=np.uint32)
+        ])[live]
+
+        # Doc ids: mask base id bytes per doc, then append live delta ids
+        base_live = live[:self.base_size]
+        id_bytes = self.id_blob[np.repeat(base_live, np.diff(self.id_starts))]
+        delta_blob, delta_starts = _pack_strings(
+            [doc_id for doc_id, gone in zip(self.delta_ids, self.delta_deleted) if not gone]
+        )
+        id_lengths = np.concatenate([np.diff(self.id_starts)[base_live], np.diff(delta_starts)])
+        id_starts = np.zeros(len(id_lengths) + 1, dtype=np.int64)
+        np.cumsum(id_lengths, out=id_starts[1:])
+        id_blob = np.concatenate([id_bytes, delta_blob])
+
+        avgdl = (float(doc_lengths.mean()) if len(doc_lengths) else 0.0) or 1.0
+        bounds = self._term_bounds(offsets, docs, tfs, doc_lengths, avgdl)
+
+        self._set_base(term_blob, term_starts, offsets, docs, tfs.astype(np.uint16), bounds,
+                       doc_lengths, id_blob, id_starts, avgdl)
+        self._reset_delta()
+
+    def _insert_position(self, term: str) -> int:
+        """Index where a missing term would go in the sorted vocabulary"""
+        key = term.encode("utf-8")
+        lo, hi = 0, self.vocabulary_size
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self.term_blob[self.term_starts[mid]:self.term_starts[mid + 1]].tobytes() < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        return lo
+
+    def _term_bounds(self, offsets, docs, tfs, doc_lengths, avgdl) -> np.ndarray:
+        """Per term, the largest tf / (tf + k1 * norm) over its postings at this avgdl"""
+        if len(docs) == 0:
+            return np.zeros(len(offsets) - 1, dtype=np.float32)
+        tf = tfs.astype(np.float64)
+        norm = self.k1 * (1 - self.b + self.b * doc_lengths[docs] / avgdl)
+        saturation = tf / (tf + norm)
+        starts = offsets[:-1]
+        bounds = np.zeros(len(starts), dtype=np.float64)
+        nonempty = offsets[1:] > starts
+        bounds[nonempty] = np.maximum.reduceat(saturation, starts[nonempty])
+        return (bounds * (1 + 1e-6)).astype(np.float32)  # Round up: bounds must not undercut
+
+    # ----- search -----
+
+    def _idf(self, df: np.ndarray) -> np.ndarray:
+        n = len(self)
+        return np.maximum(np.log1p((n - df + 0.5) / (df + 0.5)), 0.0)
+
+    def _norms(self, ordinals: np.ndarray) -> np.ndarray:
+        return self.k1 * (1 - self.b + self.b * self.doc_lengths[ordinals] / (self.avgdl or 1.0))
+
+    def search(self, query: str, top_k: int = 10) -> List[Tuple[str, float]]:
+        """
+        Top-k documents for a query.
+
+        Returns:
+            [(doc_id, score), ...] best first (ties by insertion order)
+        """
+        if top_k <= 0 or not len(self):
+            return []
+        terms, base_ids, weights = self._query_weights(query)
+        if not terms:
+            return []
+
+        base = self._search_base(base_ids, weights, top_k)
+        delta = self._search_delta(terms, weights, top_k)
+        ordinals = np.concatenate([base[0], delta[0]])
+        scores = np.concatenate([base[1], delta[1]])
+
+        top = np.lexsort((ordinals, -scores))[:top_k]
+        return [(self._doc_id(int(ordinals[i])), float(scores[i])) for i in top if scores[i] > 0]
+
+    def score(self, query: str, doc_ids: Iterable[str]) -> Dict[str, float]:
+        """
+        Scores of the given documents only, e.g. to rerank retrieved candidates.
+
+        Base postings are probed for the candidates (binary search), so the
+        cost follows the number of candidates rather than the corpus.
+
+        Returns:
+            Dict mapping doc_id -> score (0.0 without matching terms or when
+            the id is not in the index)
+        """
+        doc_ids = list(doc_ids)
+        scores = dict.fromkeys(doc_ids, 0.0)
+        terms, base_ids, weights = self._query_weights(query)
+        if not terms or not len(self):
+            return scores
+
+        ordinals = self._ordinals()
+        base_ords = np.unique(np.array(
+            [ordinals[d] for d in doc_ids if ordinals.get(d, self.base_size) < self.base_size],
+            dtype=np.int64
+        ))
+        by_ordinal: Dict[int, float] = {}
+        if len(base_ords):
+            for term_id, weight in zip(base_ids.tolist(), weights.tolist()):
+                if term_id >= 0:
+                    docs, term_scores = self._term_scores(term_id, weight, base_ords)
+                    for doc, term_score in zip(docs.tolist(), term_scores.tolist()):
+                        by_ordinal[doc] = by_ordinal.get(doc, 0.0) + term_score
+        delta_ords, delta_scores = self._search_delta(terms, weights, 0)
+        by_ordinal.update(zip(delta_ords.tolist(), delta_scores.tolist()))
+
+        for doc_id in doc_ids:
+            ordinal = ordinals.get(doc_id)
+            if ordinal is not None:
+                scores[doc_id] = by_ordinal.get(ordinal, 0.0)
+        return scores
+
+    def _query_weights(self, query: str):
+        """
+        Query terms with their base term ids and BM25 weights.
+
+        Returns:
+            (terms, base term ids (-1 if not in the base), idf * (k1 + 1) * query tf)
+        """
+        query_tf = Counter(self.tokenizer(query))
+        terms = list(query_tf)
+        # Global document frequencies (deleted docs count until compaction)
+        base_ids = np.array([self._lookup(t) for t in terms], dtype=np.int64)
+        in_base = base_ids >= 0
+        df = np.zeros(len(terms))
+        df[in_base] = np.diff(self.offsets)[base_ids[in_base]] if in_base.any() else 0
+        df += [len(self.delta_postings.get(t, ((), ()))[0]) for t in terms]
+        weights = self._idf(df) * (self.k1 + 1) * np.array([query_tf[t] for t in terms])
+        return terms, base_ids, weights
+
+    def _term_scores(self, term_id: int, weight: float, ordinals: Optional[np.ndarray] = None):
+        """
+        Score one base term: all its postings, or only the given candidates.
+
+        Returns:
+            (ordinals, scores) of the postings found
+        """
+        start, end = self.offsets[term_id], self.offsets[term_id + 1]
+        docs = self.docs[start:end]
+        tfs = self.tfs[start:end]
+        if ordinals is not None:
+            pos = np.searchsorted(docs, ordinals)
+            found = pos < len(docs)
+            found[found] = docs[pos[found]] == ordinals[found]
+            docs, tfs = ordinals[found], tfs[pos[found]]
+        tf = tfs.astype(np.float64)
+        return docs, weight * tf / (tf + self._norms(docs))
+
+    def _search_base(self, term_ids: np.ndarray, weights: np.ndarray, top_k: int):
+        """MaxScore over the base segment"""
+        empty = (np.zeros(0, dtype=np.int64), np.zeros(0))
+        present = np.flatnonzero(term_ids >= 0)
+        if not len(present) or not self.base_size:
+            return empty
+
+        # Upper bound of each term's contribution at the current avgdl; the
+        # stored bounds are for bound_avgdl and loosen by avgdl / bound_avgdl
+        scale = max(1.0, self.avgdl / self.bound_avgdl) if self.bound_avgdl else 1.0
+        bounds = weights[present] * self.bounds[term_ids[present]] * scale
+        order = present[np.argsort(-bounds, kind="stable")]
+        remaining = float(bounds.sum())
+
+        candidates, scores = empty
+        threshold = -np.inf
+        i = 0
+
+        # Essential terms: score in full while an unseen doc could still win
+        while i < len(order) and not (threshold > remaining):
+            term = order[i]
+            docs, term_scores = self._term_scores(int(term_ids[term]), float(weights[term]))
+            candidates, inverse = np.unique(np.concatenate([candidates, docs]), return_inverse=True)
+            scores = np.bincount(inverse, weights=np.concatenate([scores, term_scores]), minlength=len(candidates))
+            live = ~self.deleted[candidates]
+            candidates, scores = candidates[live], scores[live]
+            remaining = max(remaining - float(weights[term] * self.bounds[term_ids[term]] * scale), 0.0)
+            threshold = self._kth(scores, top_k)
+            i += 1
+
+        # Non-essential terms: only probe the candidates that can still make it
+        for term in order[i:]:
+            viable = scores + remaining >= threshold
+            candidates, scores = candidates[viable], scores[viable]
+            docs, term_scores = self._term_scores(int(term_ids[term]), float(weights[term]), candidates)
+            scores[np.searchsorted(candidates, docs)] += term_scores
+            remaining = max(remaining - float(weights[term] * self.bounds[term_ids[term]] * scale), 0.0)
+            threshold = self._kth(scores, top_k)
+
+        return candidates, scores
+
+    def _search_delta(self, terms: List[str], weights: np.ndarray, top_k: int):
+        """Exhaustive scoring of the (small) delta segment"""
+        if not self.delta_ids:
+            return np.zeros(0, dtype=np.int64), np.zeros(0)
+        lengths = np.asarray(self.delta_lengths, dtype=np.float64)
+        score_by_doc: Dict[int, float] = {}
+        for term, weight in zip(terms, weights.tolist()):
+            postings = self.delta_postings.get(term)
+            if postings is None:
+                continue
+            docs = np.asarray(postings[0], dtype=np.int64)
+            tf = np.asarray(postings[1], dtype=np.float64)
+            norm = self.k1 * (1 - self.b + self.b * lengths[docs - self.base_size] / (self.avgdl or 1.0))
+            for doc, score in zip(docs.tolist(), (weight * tf / (tf + norm)).tolist()):
+                score_by_doc[doc] = score_by_doc.get(doc, 0.0) + score
+        ordinals = np.fromiter(score_by_doc, dtype=np.int64, count=len(score_by_doc))
+        scores = np.fromiter(score_by_doc.values(), dtype=np.float64, count=len(score_by_doc))
+        live = ~np.asarray(self.delta_deleted, dtype=bool)[ordinals - self.base_size]
+        return ordinals[live], scores[live]
+
+    @staticmethod
+    def _kth(scores: np.ndarray, k: int) -> float:
+        """k-th best score so far (-inf with fewer than k candidates)"""
+        if len(scores) < k:
+            return -np.inf
+        return float(np.partition(scores, len(scores) - k)[len(scores) - k])
+
+    # ----- persistence -----
+
+    _ARRAYS = ("term_blob", "term_starts", "offsets", "docs", "tfs", "bounds",
+               "doc_lengths", "id_blob", "id_starts")
+
+    def save(self, path: Union[str, Path]):
+        """
+        Compact and write the index as .npy files.
+
+        The new index is written to a temporary directory next to path; an
+        existing index is renamed aside, the new one renamed into place, and
+        only then is the old one removed, so a crash leaves either index
+        (the old one possibly under a .old suffix) rather than none.
+        """
+        self.compact()
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(prefix=f".{path.name}.", dir=path.parent))
+        try:
+            for name in self._ARRAYS:
+                np.save(tmp / f"{name}.npy", np.ascontiguousarray(getattr(self, name)))
+            meta = {
+                "version": FORMAT_VERSION,
+                "k1": self.k1,
+                "b": self.b,
+                "bound_avgdl": self.bound_avgdl,
+                "num_docs": self.base_size,
+                "vocabulary_size": self.vocabulary_size,
+                "tokenizer": getattr(self.tokenizer, "__name__", "custom"),
+                "fingerprint": self.fingerprint
+            }
+            with open(tmp / "meta.json", "w") as f:
+                json.dump(meta, f, indent=2)
+            old = None
+            if path.exists():
+                old = path.with_name(f"{path.name}.old")
+                if old.exists():
+                    shutil.rmtree(old)
+                os.replace(path, old)
+            try:
+                os.replace(tmp, path)
+            except BaseException:
+                if old is not None:
+                    os.replace(old, path)
+                raise
+        except BaseException:
+            shutil.rmtree(tmp, ignore_errors=True)
+            raise
+        if old is not None:
+            shutil.rmtree(old, ignore_errors=True)
+
+    @classmethod
+    def load(
+        cls,
+        path: Union[str, Path],
+        tokenizer: Optional[Callable[[str], List[str]]] = None,
+        mmap: bool = True,
+        auto_compact: int = 100_000
+    ) -> "BM25Index":
+        """
+        Open a saved index.
+
+        Args:
+            path: Directory written by save()
+            tokenizer: The tokenizer the index was built with (if not default)
+            mmap: Map the arrays instead of reading them (pages load on demand)
+            auto_compact: See __init__
+        """
+        path = Path(path)
+        old = path.with_name(f"{path.name}.old")
+        if not path.exists() and old.exists():
+            path = old  # save() was interrupted between its two renames
+        with open(path / "meta.json") as f:
+            meta = json.load(f)
+        if meta["version"] != FORMAT_VERSION:
+            raise ValueError(f"Unsupported BM25 index version: {meta['version']}")
+
+        index = cls(k1=meta["k1"], b=meta["b"], tokenizer=tokenizer, auto_compact=auto_compact)
+        arrays = [np.load(path / f"{name}.npy", mmap_mode="r" if mmap else None) for name in cls._ARRAYS]
+        index._set_base(*arrays, meta["bound_avgdl"])
+        index.fingerprint = meta.get("fingerprint")
+        return index
+
+    @classmethod
+    def from_documents(
+        cls,
+        doc_ids: Iterable[str],
+        texts: Iterable[str],
+        **kwargs
+    ) -> "BM25Index":
+        """Build a compacted index in one go"""
+        auto_compact = kwargs.pop("auto_compact", 100_000)
+        index = cls(auto_compact=0, **kwargs)
+        index.add_documents(doc_ids, texts)
+        index.compact()
+        index.auto_compact = auto_compact
+        return index
+
+
+# Example usage
+if __name__ == "__main__":
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Build or query a BM25 index")
+    parser.add_argument("index", help="Index directory")
+    parser.add_argument("--build", help="JSONL with 'id' and 'content' fields to index")
+    parser.add_argument("--query", help="Query to run")
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.build:
+        ids, texts = [], []
+        with open(args.build) as f:
+            for line in f:
+                doc = json.loads(line)
+                ids.append(str(doc["id"]))
+                texts.append(doc["content"])
+        start = time.perf_counter()
+        index = BM25Index.from_documents(ids, texts)
+        index.save(args.index)
+        print(f"✓ Indexed {len(index)} documents, {index.vocabulary_size} terms "
+              f"in {time.perf_counter() - start:.1f}s")
+
+    if args.query:
+        start = time.perf_counter()
+        index = BM25Index.load(args.index)
+        print(f"✓ Loaded {len(index)} documents in {(time.perf_counter() - start) * 1000:.1f}ms")
+        start = time.perf_counter()
+        hits = index.search(args.query, top_k=args.top_k)
+        print(f"✓ Search took {(time.perf_counter() - start) * 1000:.2f}ms")
+        for doc_id, score in hits:
+            print(f"  {score:8.3f}  {doc_id}")
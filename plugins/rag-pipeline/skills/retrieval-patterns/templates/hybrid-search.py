@@ -10,15 +10,58 @@ Best for:
 - When you need high recall
 - Queries with specific terms or names
 
+Keyword search runs on the in-process BM25Index (bm25-index.py); pass
+bm25_index_path to persist it, so later startups mmap the saved index
+instead of re-tokenizing the corpus.
+
 Usage:
-    retriever = HybridRetriever(documents)
+    retriever = HybridRetriever(documents, bm25_index_path="indexes/bm25")
     results = retriever.retrieve(query, top_k=5)
 """
 
+import sys
+from pathlib import Path
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
 
 
+SKILLS_DIR = Path(__file__).resolve().parents[2]
+if str(SKILLS_DIR) not in sys.path:
+    sys.path.insert(0, str(SKILLS_DIR))
+from template_loader import load_template  # noqa: E402
+
+
+RankFusion = load_template(Path(__file__).with_name("rank-fusion.py")).RankFusion
+bm25_index = load_template(Path(__file__).with_name("bm25-index.py"))
+BM25Index = bm25_index.BM25Index
+
+
+def open_bm25_index(
+    doc_ids: List[str],
+    texts: List[str],
+    index_path: Optional[str] = None
+):
+    """
+    Load the BM25 index saved at index_path, or build it from the documents.
+
+    A freshly built index is saved to index_path when one is given. A saved
+    index is reused only if its corpus fingerprint (ids and texts) matches
+    the documents; otherwise it is rebuilt and saved over.
+    """
+    fingerprint = bm25_index.corpus_fingerprint(doc_ids, texts)
+    if index_path and (Path(index_path) / "meta.json").exists():
+        index = BM25Index.load(index_path)
+        if index.fingerprint == fingerprint:
+            return index
+        print(f"BM25 index at {index_path} is stale (corpus changed); rebuilding")
+
+    index = BM25Index.from_documents(doc_ids, texts)
+    index.fingerprint = fingerprint
+    if index_path:
+        index.save(index_path)
+    return index
+
+
 @dataclass
 class RetrievalResult:
     """Single retrieval result with score"""
@@ -38,7 +81,8 @@ class HybridRetriever:
         embedding_model: str = "text-embedding-3-small",
         vector_weight: float = 0.5,
         bm25_weight: float = 0.5,
-        rrf_k: int = 60
+        rrf_k: int = 60,
+        bm25_index_path: Optional[str] = None
     ):
         """
         Initialize hybrid retriever.
@@ -49,13 +93,16 @@ class HybridRetriever:
             vector_weight: Weight for vector retriever in ensemble (0.0-1.0)
             bm25_weight: Weight for BM25 retriever in ensemble (0.0-1.0)
             rrf_k: Constant for Reciprocal Rank Fusion (default: 60)
+            bm25_index_path: Directory to load the BM25 index from, or to
+                save it to after building it (default: in memory only)
         """
         self.documents = documents
         self.embedding_model = embedding_model
         self.vector_weight = vector_weight
         self.bm25_weight = bm25_weight
         self.rrf_k = rrf_k
-        self.retriever = None
+        self.bm25_index_path = bm25_index_path
+        self.fusion = RankFusion("rrf", k=rrf_k, weights=[vector_weight, bm25_weight])
 
         self._setup_retriever()
 
@@ -63,8 +110,6 @@ class HybridRetriever:
         """Setup hybrid retriever with vector and BM25 components"""
         from langchain_openai import OpenAIEmbeddings
         from langchain_community.vectorstores import FAISS
-        from langchain_community.retrievers import BM25Retriever
-        from langchain.retrievers import EnsembleRetriever
         from langchain.schema import Document
 
         # Convert to LangChain documents
@@ -75,6 +120,7 @@ class HybridRetriever:
             )
             for i, doc in enumerate(self.documents)
         ]
+        self.docs_by_id = {str(doc.metadata['id']): doc for doc in docs}
 
         # Setup vector retriever
         embeddings = OpenAIEmbeddings(model=self.embedding_model)
@@ -84,19 +130,19 @@ class HybridRetriever:
             search_kwargs={"k": 20}
         )
 
-        # Setup BM25 retriever
-        bm25_retriever = BM25Retriever.from_documents(docs)
-        bm25_retriever.k = 20
-
-        # Create ensemble retriever with RRF
-        self.retriever = EnsembleRetriever(
-            retrievers=[vector_retriever, bm25_retriever],
-            weights=[self.vector_weight, self.bm25_weight]
+        # Setup BM25 index (loaded from disk when already built)
+        self.bm25_index = open_bm25_index(
+            list(self.docs_by_id),
+            [doc.page_content for doc in self.docs_by_id.values()],
+            self.bm25_index_path
         )
 
-        # Store individual retrievers for analysis
         self.vector_retriever = vector_retriever
-        self.bm25_retriever = bm25_retriever
+
+    def _bm25_documents(self, query: str, k: int) -> List[Any]:
+        """Top-k BM25 matches as LangChain documents (ids not in the corpus are skipped)"""
+        hits = self.bm25_index.search(query, top_k=k)
+        return [self.docs_by_id[doc_id] for doc_id, _ in hits if doc_id in self.docs_by_id]
 
     def retrieve(
         self,
@@ -115,21 +161,26 @@ class HybridRetriever:
         Returns:
             List of RetrievalResult objects
         """
-        # Update retriever top-k
-        if hasattr(self.retriever.retrievers[0], 'search_kwargs'):
-            self.retriever.retrievers[0].search_kwargs['k'] = max(top_k * 2, 20)
-        self.retriever.retrievers[1].k = max(top_k * 2, 20)
+        # Candidates from both retrievers
+        candidates = max(top_k * 2, 20)
+        self.vector_retriever.search_kwargs['k'] = candidates
+        vector_docs = self.vector_retriever.get_relevant_documents(query)
+        bm25_docs = self._bm25_documents(query, candidates)
 
-        # Retrieve with ensemble
-        docs = self.retriever.get_relevant_documents(query)
+        # Weighted RRF over the two rankings
+        fused = self.fusion.fuse([
+            [str(doc.metadata['id']) for doc in vector_docs],
+            [str(doc.metadata['id']) for doc in bm25_docs]
+        ], top_k=top_k)
 
         # Convert to results
         results = []
-        for i, doc in enumerate(docs[:top_k]):
+        for doc_id, score in fused:
+            doc = self.docs_by_id[doc_id]
             result = RetrievalResult(
-                doc_id=doc.metadata.get('id', f'doc_{i}'),
+                doc_id=doc_id,
                 content=doc.page_content,
-                score=doc.metadata.get('score', 1.0 - (i * 0.05)),
+                score=score,
                 metadata=doc.metadata,
                 source='fusion'
             )
@@ -166,7 +217,7 @@ class HybridRetriever:
         ]
 
         # BM25 results
-        bm25_docs = self.bm25_retriever.get_relevant_documents(query)
+        bm25_docs = self._bm25_documents(query, top_k)
         bm25_results = [
             RetrievalResult(
                 doc_id=doc.metadata.get('id', f'b_{i}'),
@@ -206,17 +257,27 @@ class HybridRetriever:
         Returns:
             RRF score
         """
-        score = 0.0
+        return self.compute_rrf_scores(rankings, k).get(doc_id, 0.0)
 
-        for ranking in rankings:
-            try:
-                rank = ranking.index(doc_id) + 1  # 1-indexed
-                score += 1.0 / (k + rank)
-            except ValueError:
-                # Document not in this ranking
-                continue
+    def compute_rrf_scores(
+        self,
+        rankings: List[List[str]],
+        k: int = 60
+    ) -> Dict[str, float]:
+        """
+        Compute RRF scores for every document in the rankings at once.
 
-        return score
+        Prefer this over calling compute_rrf_score per document, which
+        rescans every ranking for each lookup.
+
+        Args:
+            rankings: List of ranked document ID lists from different retrievers
+            k: RRF constant (default: 60)
+
+        Returns:
+            Dict mapping doc_id -> RRF score
+        """
+        return dict(RankFusion("rrf", k=k).fuse(rankings))
 
 
 # =======================
@@ -229,12 +290,12 @@ class CustomHybridRetriever:
     def __init__(
         self,
         documents: List[Dict[str, Any]],
-        embedding_model: str = "text-embedding-3-small"
+        embedding_model: str = "text-embedding-3-small",
+        bm25_index_path: Optional[str] = None
     ):
         """Initialize with explicit RRF fusion"""
         from langchain_openai import OpenAIEmbeddings
         from langchain_community.vectorstores import FAISS
-        from langchain_community.retrievers import BM25Retriever
         from langchain.schema import Document
 
         docs = [
@@ -250,15 +311,20 @@ class CustomHybridRetriever:
         vectorstore = FAISS.from_documents(docs, embeddings)
         self.vector_retriever = vectorstore.as_retriever(search_kwargs={"k": 20})
 
-        # BM25 retriever
-        self.bm25_retriever = BM25Retriever.from_documents(docs)
-        self.bm25_retriever.k = 20
+        # BM25 index
+        self.docs_by_id = {str(doc.metadata['id']): doc for doc in docs}
+        self.bm25_index = open_bm25_index(
+            list(self.docs_by_id),
+            [doc.page_content for doc in self.docs_by_id.values()],
+            bm25_index_path
+        )
 
     def retrieve_with_rrf(
         self,
         query: str,
         top_k: int = 5,
-        rrf_k: int = 60
+        rrf_k: int = 60,
+        weights: Optional[List[float]] = None
     ) -> List[RetrievalResult]:
         """
         Retrieve using explicit Reciprocal Rank Fusion.
@@ -267,53 +333,38 @@ class CustomHybridRetriever:
             query: Search query
             top_k: Number of final results
             rrf_k: RRF constant
+            weights: Optional [vector, bm25] weights for weighted RRF
 
         Returns:
             List of fused and ranked results
         """
         # Get vector results
         vector_docs = self.vector_retriever.get_relevant_documents(query)
-        vector_ranking = [doc.metadata.get('id', f'v_{i}') for i, doc in enumerate(vector_docs)]
+        vector_ranking = [str(doc.metadata['id']) for doc in vector_docs]
 
         # Get BM25 results
-        bm25_docs = self.bm25_retriever.get_relevant_documents(query)
-        bm25_ranking = [doc.metadata.get('id', f'b_{i}') for i, doc in enumerate(bm25_docs)]
+        bm25_hits = self.bm25_index.search(query, top_k=20)
+        bm25_ranking = [doc_id for doc_id, _ in bm25_hits if doc_id in self.docs_by_id]
+        bm25_docs = [self.docs_by_id[doc_id] for doc_id in bm25_ranking]
 
         # Collect all documents
         all_docs = {}
-        for doc in vector_docs + bm25_docs:
-            doc_id = doc.metadata.get('id', 'unknown')
+        for doc_id, doc in zip(vector_ranking + bm25_ranking, vector_docs + bm25_docs):
             if doc_id not in all_docs:
                 all_docs[doc_id] = doc
 
-        # Compute RRF scores
-        doc_scores = {}
-        for doc_id in all_docs.keys():
-            rrf_score = 0.0
-
-            # Vector ranking contribution
-            if doc_id in vector_ranking:
-                rank = vector_ranking.index(doc_id) + 1
-                rrf_score += 1.0 / (rrf_k + rank)
-
-            # BM25 ranking contribution
-            if doc_id in bm25_ranking:
-                rank = bm25_ranking.index(doc_id) + 1
-                rrf_score += 1.0 / (rrf_k + rank)
-
-            doc_scores[doc_id] = rrf_score
-
-        # Sort by RRF score
-        sorted_doc_ids = sorted(doc_scores.keys(), key=lambda x: doc_scores[x], reverse=True)
+        # Compute RRF scores and select top-k
+        fusion = RankFusion("rrf", k=rrf_k, weights=weights)
+        fused = fusion.fuse([vector_ranking, bm25_ranking], top_k=top_k)
 
         # Create results
         results = []
-        for doc_id in sorted_doc_ids[:top_k]:
+        for doc_id, score in fused:
             doc = all_docs[doc_id]
             result = RetrievalResult(
                 doc_id=doc_id,
                 content=doc.page_content,
-                score=doc_scores[doc_id],
+                score=score,
                 metadata=doc.metadata,
                 source='rrf_fusion'
             )
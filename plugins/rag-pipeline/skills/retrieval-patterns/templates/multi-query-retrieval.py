@@ -15,9 +15,22 @@ Usage:
     results = retriever.retrieve(query, num_variations=3, top_k=5)
 """
 
-from typing import List, Dict, Any, Optional, Set
-from dataclasses import dataclass
+import sys
+from typing import List, Dict, Any, Optional, Set, Callable, Iterator, Tuple
+from dataclasses import dataclass, field
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FutureTimeout
+from pathlib import Path
 import os
+import time
+
+
+SKILLS_DIR = Path(__file__).resolve().parents[2]
+if str(SKILLS_DIR) not in sys.path:
+    sys.path.insert(0, str(SKILLS_DIR))
+from template_loader import load_template  # noqa: E402
+
+
+RankFusion = load_template(Path(__file__).with_name("rank-fusion.py")).RankFusion
 
 
 @dataclass
@@ -30,6 +43,127 @@ class RetrievalResult:
     queries: List[str]  # Queries that retrieved this doc
 
 
+# =======================
+# Parallel Fan-Out
+# =======================
+
+@dataclass
+class FanOutStats:
+    """Outcome of the last fan-out call"""
+    queries: int = 0
+    completed: int = 0
+    timed_out: List[str] = field(default_factory=list)
+    errors: Dict[str, str] = field(default_factory=dict)
+    embed_ms: float = 0.0
+    total_ms: float = 0.0
+
+
+class FanOutExecutor:
+    """
+    Run all sub-queries of a request concurrently
+
+    Embeds every sub-query in one batched embed call, submits one vector
+    search per sub-query to a thread pool, and yields results in completion
+    order so callers can fold them in while slower searches are still running.
+    A per-request deadline bounds the wait: searches still pending when it
+    expires are dropped (recorded in ``stats.timed_out``) and the request
+    returns with the partial results.
+
+    Latency becomes embed + slowest search instead of the sum of searches.
+
+    Call ``shutdown()`` (or use the executor as a context manager) to stop
+    the worker threads.
+    """
+
+    def __init__(
+        self,
+        search_fn: Callable[[Any, int], List[Any]],
+        embed_fn: Optional[Callable[[List[str]], List[List[float]]]] = None,
+        max_workers: int = 8,
+        timeout: Optional[float] = None
+    ):
+        """
+        Args:
+            search_fn: Called as search_fn(embedding_or_query, k)
+            embed_fn: Batch embed function for queries. It must produce
+                query-side embeddings: embed_documents is fine for symmetric
+                models such as OpenAI's, not for asymmetric ones (e5,
+                instructed bge). If None, search_fn receives the raw
+                query strings
+            max_workers: Maximum concurrent searches
+            timeout: Default per-request deadline in seconds (None = wait for all)
+        """
+        self.search_fn = search_fn
+        self.embed_fn = embed_fn
+        self.timeout = timeout
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="fanout")
+        self.stats = FanOutStats()
+
+    def stream(
+        self,
+        queries: List[str],
+        k: int,
+        timeout: Optional[float] = None
+    ) -> Iterator[Tuple[str, List[Any]]]:
+        """
+        Yield (query, results) pairs as each search finishes.
+
+        Args:
+            queries: Sub-queries to run
+            k: Results per sub-query
+            timeout: Deadline for the whole request (overrides the default)
+        """
+        timeout = self.timeout if timeout is None else timeout
+        start = time.perf_counter()
+        stats = self.stats = FanOutStats(queries=len(queries))
+
+        inputs = queries
+        if self.embed_fn is not None:
+            inputs = self.embed_fn(list(queries))
+            stats.embed_ms = (time.perf_counter() - start) * 1000
+
+        futures = {self.pool.submit(self.search_fn, x, k): q for x, q in zip(inputs, queries)}
+        remaining = None if timeout is None else max(0.0, timeout - (time.perf_counter() - start))
+
+        try:
+            for future in as_completed(futures, timeout=remaining):
+                query = futures[future]
+                try:
+                    results = future.result()
+                except Exception as e:
+                    stats.errors[query] = str(e)
+                    continue
+                stats.completed += 1
+                yield query, results
+        except FutureTimeout:
+            pass
+        finally:
+            for future, query in futures.items():
+                if not future.done():
+                    future.cancel()
+                    stats.timed_out.append(query)
+            stats.total_ms = (time.perf_counter() - start) * 1000
+
+    def run(
+        self,
+        queries: List[str],
+        k: int,
+        timeout: Optional[float] = None
+    ) -> Dict[str, List[Any]]:
+        """Collect all results, returned in the original query order."""
+        collected = dict(self.stream(queries, k, timeout))
+        return {q: collected[q] for q in queries if q in collected}
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
+
+    def __enter__(self) -> "FanOutExecutor":
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+
+
 # =======================
 # LangChain MultiQueryRetriever
 # =======================
@@ -127,9 +261,19 @@ class CustomMultiQueryRetriever:
     def __init__(
         self,
         documents: List[Dict[str, Any]],
-        llm_model: str = "gpt-4o-mini"
+        llm_model: str = "gpt-4o-mini",
+        max_workers: int = 8,
+        timeout: Optional[float] = None
     ):
-        """Initialize custom multi-query retriever"""
+        """
+        Initialize custom multi-query retriever
+
+        Args:
+            documents: Document corpus
+            llm_model: LLM for query generation
+            max_workers: Concurrent sub-query searches
+            timeout: Per-request retrieval deadline in seconds (None = wait for all)
+        """
         from langchain_openai import OpenAIEmbeddings, ChatOpenAI
         from langchain_community.vectorstores import FAISS
         from langchain.schema import Document
@@ -149,6 +293,26 @@ class CustomMultiQueryRetriever:
         self.base_retriever = vectorstore.as_retriever(search_kwargs={"k": 10})
         self.llm = ChatOpenAI(model=llm_model, temperature=0.7)
 
+        # Sub-queries are embedded in one call and searched concurrently.
+        # OpenAI embeds queries and documents with the same encoder, so the
+        # batched embed_documents call matches embed_query per sub-query
+        self.fanout = FanOutExecutor(
+            search_fn=lambda vector, k: vectorstore.similarity_search_by_vector(vector, k=k),
+            embed_fn=embeddings.embed_documents,
+            max_workers=max_workers,
+            timeout=timeout
+        )
+
+    def close(self):
+        """Stop the fan-out worker threads."""
+        self.fanout.shutdown()
+
+    def __enter__(self) -> "CustomMultiQueryRetriever":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
     def generate_query_variations(
         self,
         query: str,
@@ -189,7 +353,10 @@ Return only the variations, one per line, without numbering or bullet points."""
     ) -> List[tuple]:
         """Retrieve for a single query, returning (doc_id, doc, score) tuples"""
         docs = self.base_retriever.get_relevant_documents(query)
+        return self._rank_docs(docs, top_k)
 
+    def _rank_docs(self, docs: List[Any], top_k: int) -> List[tuple]:
+        """Convert ranked docs to (doc_id, doc, score) tuples"""
         results = []
         for i, doc in enumerate(docs[:top_k]):
             doc_id = doc.metadata.get('id', f'doc_{i}')
@@ -208,7 +375,7 @@ Return only the variations, one per line, without numbering or bullet points."""
 
         Args:
             all_results: Dict mapping query -> [(doc_id, doc, score), ...]
-            fusion_method: 'rrf' or 'score_average'
+            fusion_method: 'rrf', 'score_average', 'combsum' or 'combmnz'
 
         Returns:
             Fused list of (doc_id, doc, fused_score) tuples
@@ -217,78 +384,44 @@ Return only the variations, one per line, without numbering or bullet points."""
             return self._fuse_rrf(all_results)
         elif fusion_method == "score_average":
             return self._fuse_score_average(all_results)
+        elif fusion_method in ("combsum", "combmnz"):
+            return self._fuse(all_results, RankFusion(fusion_method))
         else:
             raise ValueError(f"Unknown fusion method: {fusion_method}")
 
-    def _fuse_rrf(
+    def _fuse(
         self,
         all_results: Dict[str, List[tuple]],
-        k: int = 60
+        fusion: "RankFusion"
     ) -> List[tuple]:
-        """Fuse using Reciprocal Rank Fusion"""
-
-        # Collect all unique docs
+        """Fuse per-query result lists with a RankFusion instance"""
         all_docs = {}
+        rankings = []
+        scores = []
 
-        # Calculate RRF scores
-        doc_scores = {}
-
-        for query, results in all_results.items():
-            for rank, (doc_id, doc, _) in enumerate(results, start=1):
-                # Store doc
-                if doc_id not in all_docs:
-                    all_docs[doc_id] = doc
-
-                # Accumulate RRF score
-                if doc_id not in doc_scores:
-                    doc_scores[doc_id] = 0.0
+        for results in all_results.values():
+            rankings.append([doc_id for doc_id, _, _ in results])
+            scores.append([score for _, _, score in results])
+            for doc_id, doc, _ in results:
+                all_docs.setdefault(doc_id, doc)
 
-                doc_scores[doc_id] += 1.0 / (k + rank)
+        fused = fusion.fuse(rankings, scores=scores)
+        return [(doc_id, all_docs[doc_id], score) for doc_id, score in fused]
 
-        # Sort by RRF score
-        sorted_docs = sorted(
-            doc_scores.keys(),
-            key=lambda x: doc_scores[x],
-            reverse=True
-        )
-
-        # Return fused results
-        return [(doc_id, all_docs[doc_id], doc_scores[doc_id]) for doc_id in sorted_docs]
+    def _fuse_rrf(
+        self,
+        all_results: Dict[str, List[tuple]],
+        k: int = 60
+    ) -> List[tuple]:
+        """Fuse using Reciprocal Rank Fusion"""
+        return self._fuse(all_results, RankFusion("rrf", k=k))
 
     def _fuse_score_average(
         self,
         all_results: Dict[str, List[tuple]]
     ) -> List[tuple]:
-        """Fuse by averaging scores"""
-
-        all_docs = {}
-        doc_scores = {}
-        doc_counts = {}
-
-        for query, results in all_results.items():
-            for doc_id, doc, score in results:
-                if doc_id not in all_docs:
-                    all_docs[doc_id] = doc
-                    doc_scores[doc_id] = 0.0
-                    doc_counts[doc_id] = 0
-
-                doc_scores[doc_id] += score
-                doc_counts[doc_id] += 1
-
-        # Calculate averages
-        avg_scores = {
-            doc_id: doc_scores[doc_id] / doc_counts[doc_id]
-            for doc_id in doc_scores.keys()
-        }
-
-        # Sort by average score
-        sorted_docs = sorted(
-            avg_scores.keys(),
-            key=lambda x: avg_scores[x],
-            reverse=True
-        )
-
-        return [(doc_id, all_docs[doc_id], avg_scores[doc_id]) for doc_id in sorted_docs]
+        """Fuse by averaging raw scores"""
+        return self._fuse(all_results, RankFusion("mean", normalization="none"))
 
     def retrieve(
         self,
@@ -314,22 +447,21 @@ Return only the variations, one per line, without numbering or bullet points."""
 
         print(f"Generated queries: {queries}")
 
-        # Retrieve for each query
-        all_results = {}
-        for q in queries:
-            results = self.retrieve_with_query(q, top_k=10)
-            all_results[q] = results
-
-        # Fuse results
-        fused = self.fuse_results(all_results, fusion_method=fusion_method)
-
-        # Track which queries retrieved each doc
+        # Retrieve for all queries concurrently, folding results in as they arrive
+        arrived = {}
         doc_queries = {}
-        for q, results in all_results.items():
+        for q, docs in self.fanout.stream(queries, k=10):
+            results = self._rank_docs(docs, top_k=10)
+            arrived[q] = results
             for doc_id, _, _ in results:
-                if doc_id not in doc_queries:
-                    doc_queries[doc_id] = []
-                doc_queries[doc_id].append(q)
+                doc_queries.setdefault(doc_id, []).append(q)
+
+        if self.fanout.stats.timed_out:
+            print(f"Deadline hit, skipped: {self.fanout.stats.timed_out}")
+
+        # Fuse in query order so ties do not depend on arrival order
+        all_results = {q: arrived[q] for q in queries if q in arrived}
+        fused = self.fuse_results(all_results, fusion_method=fusion_method)
 
         # Convert to RetrievalResult
         final_results = []
@@ -356,9 +488,11 @@ class QueryDecompositionRetriever:
     def __init__(
         self,
         documents: List[Dict[str, Any]],
-        llm_model: str = "gpt-4o"
+        llm_model: str = "gpt-4o",
+        max_workers: int = 8,
+        timeout: Optional[float] = None
     ):
-        """Initialize query decomposition retriever"""
+        """Initialize query decomposition retriever (sub-queries run concurrently)"""
         from langchain_openai import OpenAIEmbeddings, ChatOpenAI
         from langchain_community.vectorstores import FAISS
         from langchain.schema import Document
@@ -374,9 +508,26 @@ class QueryDecompositionRetriever:
         embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
         vectorstore = FAISS.from_documents(docs, embeddings)
 
-        self.base_retriever = vectorstore.as_retriever(search_kwargs={"k": 5})
         self.llm = ChatOpenAI(model=llm_model, temperature=0)
 
+        # One batched embed call (same encoder for queries with OpenAI)
+        self.fanout = FanOutExecutor(
+            search_fn=lambda vector, k: vectorstore.similarity_search_by_vector(vector, k=k),
+            embed_fn=embeddings.embed_documents,
+            max_workers=max_workers,
+            timeout=timeout
+        )
+
+    def close(self):
+        """Stop the fan-out worker threads."""
+        self.fanout.shutdown()
+
+    def __enter__(self) -> "QueryDecompositionRetriever":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
     def decompose_query(self, query: str) -> List[str]:
         """Decompose complex query into simpler sub-queries"""
 
@@ -404,13 +555,11 @@ Return only the sub-queries, one per line."""
 
         print(f"Sub-queries: {sub_queries}")
 
-        # Retrieve for each sub-query
+        # Retrieve for all sub-queries concurrently; votes accumulate as they arrive
         all_docs = {}
         doc_queries = {}
 
-        for sub_q in sub_queries:
-            docs = self.base_retriever.get_relevant_documents(sub_q)
-
+        for sub_q, docs in self.fanout.stream(sub_queries, k=5):
             for doc in docs:
                 doc_id = doc.metadata.get('id', 'unknown')
                 if doc_id not in all_docs:
@@ -480,8 +629,9 @@ if __name__ == "__main__":
 
     # Example 2: Custom with explicit variations
     print("\n=== Custom Multi-Query with RRF ===")
-    custom = CustomMultiQueryRetriever(documents)
-    results = custom.retrieve("AI and neural networks", num_variations=2, top_k=3)
+    with CustomMultiQueryRetriever(documents) as custom:
+        results = custom.retrieve("AI and neural networks", num_variations=2, top_k=3)
+        print(f"Fan-out: {custom.fanout.stats}")
 
     for result in results:
         print(f"\n[{result.doc_id}] Score: {result.score:.3f}")
@@ -490,8 +640,8 @@ if __name__ == "__main__":
 
     # Example 3: Query decomposition
     print("\n=== Query Decomposition ===")
-    decomp = QueryDecompositionRetriever(documents)
-    results = decomp.retrieve("How do machine learning and deep learning relate to AI?", top_k=3)
+    with QueryDecompositionRetriever(documents) as decomp:
+        results = decomp.retrieve("How do machine learning and deep learning relate to AI?", top_k=3)
 
     for result in results:
         print(f"\n[{result.doc_id}] Score: {result.score}")
@@ -0,0 +1,275 @@
+"""
+Rank Fusion Template
+
+Vectorized rank fusion shared by the hybrid and multi-query retrievers.
+Rankings are mapped to integer rows once (a single doc_id -> position map),
+then every fusion method is a NumPy expression over flat rank/score arrays.
+Many queries can be fused in one call, and top-k uses argpartition instead
+of a full sort.
+
+Methods:
+- rrf:     sum(w_i / (k + rank_i(d)))  (weighted RRF when weights are given)
+- combsum: sum(w_i * norm_score_i(d))
+- combmnz: combsum * number of rankings containing d
+- mean:    average of w_i * norm_score_i(d) over rankings containing d
+
+Usage:
+    fusion = RankFusion(method="rrf", k=60)
+    fused = fusion.fuse([vector_ids, bm25_ids], top_k=5)  # [(doc_id, score), ...]
+"""
+
+from typing import List, Hashable, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+FUSION_METHODS = ("rrf", "combsum", "combmnz", "mean")
+NORMALIZATIONS = ("minmax", "zscore", "none")
+
+
+def _segment_normalize(
+    values: np.ndarray,
+    segments: np.ndarray,
+    num_segments: int,
+    method: str
+) -> np.ndarray:
+    """Normalize values independently within each segment (one segment per ranking)."""
+    if method == "none" or values.size == 0:
+        return values
+
+    if method == "minmax":
+        lo = np.full(num_segments, np.inf)
+        hi = np.full(num_segments, -np.inf)
+        np.minimum.at(lo, segments, values)
+        np.maximum.at(hi, segments, values)
+        span = (hi - lo)[segments]
+        # Constant-score rankings map to 1.0 rather than dividing by zero
+        return np.where(span > 0, (values - lo[segments]) / np.where(span > 0, span, 1), 1.0)
+
+    if method == "zscore":
+        counts = np.bincount(segments, minlength=num_segments)
+        mean = np.bincount(segments, weights=values, minlength=num_segments) / np.maximum(counts, 1)
+        centered = values - mean[segments]
+        var = np.bincount(segments, weights=centered ** 2, minlength=num_segments) / np.maximum(counts, 1)
+        std = np.sqrt(var)[segments]
+        return np.where(std > 0, centered / np.where(std > 0, std, 1), 0.0)
+
+    raise ValueError(f"Unknown normalization: {method}")
+
+
+def top_k_indices(scores: np.ndarray, top_k: Optional[int]) -> np.ndarray:
+    """
+    Indices of the top-k scores, highest first
+
+    Uses argpartition (O(n)) and only sorts the k survivors. Ties keep the
+    lower index first, so first-seen documents win like a stable sort.
+    """
+    n = scores.shape[0]
+    if top_k is None or top_k >= n:
+        candidates = np.arange(n)
+    elif top_k <= 0:
+        return np.empty(0, dtype=np.int64)
+    else:
+        candidates = np.argpartition(-scores, top_k - 1)[:top_k]
+    return candidates[np.lexsort((candidates, -scores[candidates]))]
+
+
+class RankFusion:
+    """Fuse ranked id lists from several retrievers or query variations"""
+
+    def __init__(
+        self,
+        method: str = "rrf",
+        k: int = 60,
+        weights: Optional[Sequence[float]] = None,
+        normalization: str = "minmax"
+    ):
+        """
+        Initialize rank fusion.
+
+        Args:
+            method: rrf, combsum, combmnz or mean
+            k: RRF constant (default: 60)
+            weights: Per-ranking weights (None = equal weights)
+            normalization: Score normalization per ranking for the score
+                methods: minmax, zscore or none
+        """
+        if method not in FUSION_METHODS:
+            raise ValueError(f"Unknown fusion method: {method}")
+        if normalization not in NORMALIZATIONS:
+            raise ValueError(f"Unknown normalization: {normalization}")
+        self.method = method
+        self.k = k
+        self.weights = weights
+        self.normalization = normalization
+
+    def fuse(
+        self,
+        rankings: Sequence[Sequence[Hashable]],
+        scores: Optional[Sequence[Optional[Sequence[float]]]] = None,
+        top_k: Optional[int] = None
+    ) -> List[Tuple[Hashable, float]]:
+        """
+        Fuse the rankings of a single query.
+
+        Args:
+            rankings: Ranked doc id lists, best first
+            scores: Optional retriever scores aligned with each ranking
+                (score methods fall back to a linear rank score when missing)
+            top_k: Number of fused results (None = all)
+
+        Returns:
+            List of (doc_id, fused_score), best first
+        """
+        return self.fuse_batch([rankings], [scores] if scores is not None else None, top_k)[0]
+
+    def fuse_batch(
+        self,
+        batch_rankings: Sequence[Sequence[Sequence[Hashable]]],
+        batch_scores: Optional[Sequence[Optional[Sequence[Optional[Sequence[float]]]]]] = None,
+        top_k: Optional[int] = None
+    ) -> List[List[Tuple[Hashable, float]]]:
+        """
+        Fuse rankings for many queries at once.
+
+        All queries are flattened into one set of arrays; documents get a
+        row per (query, doc_id), so a single bincount produces every fused
+        score and each query's top-k comes from one argpartition over its
+        row of a padded score matrix.
+
+        Args:
+            batch_rankings: For each query, its ranked doc id lists
+            batch_scores: For each query, optional scores aligned with its rankings
+            top_k: Number of fused results per query (None = all)
+
+        Returns:
+            For each query, a list of (doc_id, fused_score), best first
+        """
+        doc_ids: List[Hashable] = []
+        doc_query: List[int] = []
+        doc_rows: List[int] = []
+        segment_of: List[int] = []
+        ranks: List[int] = []
+        raw_scores: List[float] = []
+        has_scores: List[bool] = []
+        segment_weights: List[float] = []
+        query_offsets = [0]
+
+        for q, rankings in enumerate(batch_rankings):
+            position = {}  # doc_id -> local row, built once per query
+            query_scores = batch_scores[q] if batch_scores is not None else None
+            weights = self.weights if self.weights is not None else [1.0] * len(rankings)
+            if len(weights) != len(rankings):
+                raise ValueError(f"Got {len(weights)} weights for {len(rankings)} rankings")
+
+            for r, ranking in enumerate(rankings):
+                if not ranking:
+                    continue
+                segment = len(segment_weights)
+                segment_weights.append(weights[r])
+                ranking_scores = query_scores[r] if query_scores is not None else None
+                seen = set()
+                n = len(ranking)
+                for rank, doc_id in enumerate(ranking):
+                    if doc_id in seen:
+                        continue  # Only the best rank of a duplicate counts
+                    seen.add(doc_id)
+                    row = position.get(doc_id)
+                    if row is None:
+                        row = position[doc_id] = len(position)
+                        doc_ids.append(doc_id)
+                        doc_query.append(q)
+                    doc_rows.append(query_offsets[-1] + row)
+                    segment_of.append(segment)
+                    ranks.append(rank + 1)
+                    if ranking_scores is not None:
+                        raw_scores.append(float(ranking_scores[rank]))
+                        has_scores.append(True)
+                    else:
+                        raw_scores.append((n - rank) / n)
+                        has_scores.append(False)
+            query_offsets.append(query_offsets[-1] + len(position))
+
+        num_docs = query_offsets[-1]
+        if num_docs == 0:
+            return [[] for _ in batch_rankings]
+
+        rows = np.asarray(doc_rows, dtype=np.int64)
+        segments = np.asarray(segment_of, dtype=np.int64)
+        weights = np.asarray(segment_weights, dtype=np.float64)[segments]
+
+        if self.method == "rrf":
+            contrib = weights / (self.k + np.asarray(ranks, dtype=np.float64))
+        else:
+            values = np.asarray(raw_scores, dtype=np.float64)
+            supplied = np.asarray(has_scores)
+            # Rank-derived fallback scores are already in [0, 1]
+            normalized = _segment_normalize(values, segments, len(segment_weights), self.normalization)
+            contrib = weights * np.where(supplied, normalized, values)
+
+        fused = np.bincount(rows, weights=contrib, minlength=num_docs)
+        if self.method in ("combmnz", "mean"):
+            hits = np.bincount(rows, minlength=num_docs)
+            fused = fused * hits if self.method == "combmnz" else fused / hits
+
+        # Scatter into a padded (queries x max_docs) matrix for per-row top-k
+        offsets = np.asarray(query_offsets, dtype=np.int64)
+        sizes = np.diff(offsets)
+        padded = np.full((len(batch_rankings), max(int(sizes.max()), 1)), -np.inf)
+        doc_query_arr = np.asarray(doc_query, dtype=np.int64)
+        local = np.arange(num_docs) - offsets[doc_query_arr]
+        padded[doc_query_arr, local] = fused
+
+        results = []
+        for q in range(len(batch_rankings)):
+            order = top_k_indices(padded[q, :sizes[q]], top_k)
+            base = offsets[q]
+            results.append([(doc_ids[base + i], float(padded[q, i])) for i in order])
+        return results
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[Hashable]],
+    k: int = 60,
+    weights: Optional[Sequence[float]] = None,
+    top_k: Optional[int] = None
+) -> List[Tuple[Hashable, float]]:
+    """Convenience wrapper for (weighted) RRF over a single query."""
+    return RankFusion("rrf", k=k, weights=weights).fuse(rankings, top_k=top_k)
+
+
+# =======================
+# Usage Examples
+# =======================
+
+if __name__ == "__main__":
+    vector_ranking = ["doc3", "doc1", "doc4", "doc2"]
+    bm25_ranking = ["doc1", "doc5", "doc3"]
+
+    # Example 1: Plain and weighted RRF
+    print("=== RRF ===")
+    for doc_id, score in reciprocal_rank_fusion([vector_ranking, bm25_ranking], top_k=3):
+        print(f"  {doc_id}: {score:.4f}")
+
+    print("\n=== Weighted RRF (vector 0.7 / bm25 0.3) ===")
+    for doc_id, score in reciprocal_rank_fusion([vector_ranking, bm25_ranking], weights=[0.7, 0.3]):
+        print(f"  {doc_id}: {score:.4f}")
+
+    # Example 2: CombMNZ over raw retriever scores (min-max normalized per ranking)
+    print("\n=== CombMNZ ===")
+    fusion = RankFusion(method="combmnz")
+    fused = fusion.fuse(
+        [vector_ranking, bm25_ranking],
+        scores=[[0.91, 0.85, 0.60, 0.42], [12.3, 7.1, 6.8]]
+    )
+    for doc_id, score in fused:
+        print(f"  {doc_id}: {score:.4f}")
+
+    # Example 3: Fuse several queries in one call
+    print("\n=== Batch RRF ===")
+    batch = [
+        [vector_ranking, bm25_ranking],
+        [["doc2", "doc4"], ["doc4", "doc1"]],
+    ]
+    for q, fused in enumerate(RankFusion().fuse_batch(batch, top_k=2)):
+        print(f"  query {q}: {fused}")
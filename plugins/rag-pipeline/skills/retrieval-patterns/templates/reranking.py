@@ -17,11 +17,23 @@ Usage:
     # Rerank
     reranker = CohereReranker(api_key=api_key)
     final_results = reranker.rerank(query, initial_results, top_n=5)
+
+    # Serving: concurrent rerank() calls share cross-encoder batches
+    reranker = CrossEncoderReranker(max_batch_size=64, max_wait_ms=2.0)
+    print(reranker.stats.summary())
 """
 
-from typing import List, Dict, Any, Optional
-from dataclasses import dataclass
+from typing import List, Dict, Any, Optional, Callable, Deque, Sequence, Tuple
+from dataclasses import dataclass, field
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+import hashlib
+import json
 import os
+import queue
+import re
+import threading
+import time
 
 
 @dataclass
@@ -180,6 +192,277 @@ class LlamaIndexReranker:
         return reranked
 
 
+# =======================
+# Micro-Batching Scorer
+# =======================
+
+STATS_WINDOW = 1024  # Recent batches kept for percentiles
+
+
+def _percentile(samples: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile (0.0 for no samples)"""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    return float(ordered[min(len(ordered) - 1, int(q / 100 * len(ordered)))])
+
+
+@dataclass
+class RerankStats:
+    """Running counters of a MicroBatchScorer"""
+    requests: int = 0
+    pairs: int = 0
+    cache_hits: int = 0
+    batches: int = 0
+    scored_pairs: int = 0  # Pairs sent to the model (after cache and de-duplication)
+    errors: int = 0
+    batch_sizes: Deque[int] = field(default_factory=lambda: deque(maxlen=STATS_WINDOW))
+    wait_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=STATS_WINDOW))
+    predict_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=STATS_WINDOW))
+
+    def summary(self) -> Dict[str, float]:
+        """
+        Hit rate, batch sizes and latencies over the recent window
+
+        wait_ms is the latency the batching window added to a request (from
+        submission until its batch went to the model); predict_ms is the
+        model time of one batch.
+        """
+        batch_sizes, wait_ms, predict_ms = list(self.batch_sizes), list(self.wait_ms), list(self.predict_ms)
+        return {
+            "requests": self.requests,
+            "pairs": self.pairs,
+            "cache_hit_rate": self.cache_hits / self.pairs if self.pairs else 0.0,
+            "batches": self.batches,
+            "errors": self.errors,
+            "mean_batch_size": sum(batch_sizes) / len(batch_sizes) if batch_sizes else 0.0,
+            "max_batch_size": max(batch_sizes, default=0),
+            "wait_ms_p50": _percentile(wait_ms, 50),
+            "wait_ms_p95": _percentile(wait_ms, 95),
+            "predict_ms_p50": _percentile(predict_ms, 50),
+            "predict_ms_p95": _percentile(predict_ms, 95)
+        }
+
+
+@dataclass
+class _PendingRequest:
+    """Cache misses of one score() call, waiting for a batch"""
+    keys: List[Tuple[bytes, str]]
+    pairs: List[List[str]]
+    submitted: float
+    future: Future = field(default_factory=Future)
+
+
+class MicroBatchScorer:
+    """
+    Score (query, passage) pairs from concurrent requests in shared batches
+
+    Each score() call first looks its pairs up in an LRU cache keyed by
+    (query hash, doc id); the misses are queued for a single background
+    thread. That thread takes the first queued request, keeps collecting
+    until ``max_batch_size`` pairs are pending or ``max_wait_ms`` has passed
+    since that request arrived, and scores everything in one predict call.
+    While a batch is running new requests queue up, so under load batches
+    fill without waiting at all.
+
+    Tunables:
+        max_batch_size: Larger batches raise throughput on GPUs, up to the
+            point where predict time dominates
+        max_wait_ms: Latency a lone request may pay to share a batch
+            (0 = only batch what is already queued)
+
+    The cache assumes a doc id always names the same passage text; call
+    clear_cache() after re-indexing changed documents.
+    """
+
+    def __init__(
+        self,
+        predict_fn: Callable[[List[List[str]]], Sequence[float]],
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0,
+        cache_size: int = 10_000
+    ):
+        """
+        Args:
+            predict_fn: Scores a list of [query, passage] pairs
+                (e.g. CrossEncoder.predict)
+            max_batch_size: Pairs per batch before it is sent without waiting
+            max_wait_ms: Longest time a request waits for others to join its batch
+            cache_size: Pair scores kept (0 disables the cache)
+        """
+        if max_batch_size < 1:
+            raise ValueError("max_batch_size must be at least 1")
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait_ms = max_wait_ms
+        self.cache_size = cache_size
+        self.stats = RerankStats()
+
+        self._cache: "OrderedDict[Tuple[bytes, str], float]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[_PendingRequest]]" = queue.Queue()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name="rerank-batcher", daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def query_hash(query: str) -> bytes:
+        """Fixed-size cache key for a query, however long it is"""
+        return hashlib.blake2b(query.encode("utf-8"), digest_size=16).digest()
+
+    def score(
+        self,
+        query: str,
+        passages: Sequence[Tuple[str, str]],
+        timeout: Optional[float] = None
+    ) -> List[float]:
+        """
+        Score passages against a query, sharing the model call with concurrent requests.
+
+        Args:
+            query: Search query
+            passages: (doc_id, text) pairs
+            timeout: Seconds to wait for the batch (None = no limit)
+
+        Returns:
+            One score per passage, in input order
+        """
+        if not passages:
+            return []
+
+        qhash = self.query_hash(query)
+        scores: List[Optional[float]] = [None] * len(passages)
+        misses = []
+        request = None
+
+        # Checked and enqueued under the lock shutdown() takes, so no request
+        # lands behind the stop marker
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("MicroBatchScorer is shut down")
+            for i, (doc_id, _) in enumerate(passages):
+                cached = self._cache.get((qhash, doc_id))
+                if cached is None:
+                    misses.append(i)
+                else:
+                    self._cache.move_to_end((qhash, doc_id))
+                    scores[i] = cached
+            self.stats.requests += 1
+            self.stats.pairs += len(passages)
+            self.stats.cache_hits += len(passages) - len(misses)
+
+            if misses:
+                request = _PendingRequest(
+                    keys=[(qhash, passages[i][0]) for i in misses],
+                    pairs=[[query, passages[i][1]] for i in misses],
+                    submitted=time.perf_counter()
+                )
+                self._queue.put(request)
+
+        if request is not None:
+            for i, value in zip(misses, request.future.result(timeout=timeout)):
+                scores[i] = value
+
+        return scores
+
+    def clear_cache(self):
+        with self._lock:
+            self._cache.clear()
+
+    def shutdown(self):
+        """Score what is already queued, then stop the batching thread"""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._thread.join()
+
+        # Nothing should be left, but never leave a caller blocked on a future
+        while True:
+            try:
+                request = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if request is not None:
+                self._fail([request], RuntimeError("MicroBatchScorer is shut down"))
+
+    def _run(self):
+        """Batching loop: collect requests for one window, score, repeat"""
+        stopping = False
+        while not stopping:
+            request = self._queue.get()
+            if request is None:
+                return
+
+            batch = [request]
+            size = len(request.pairs)
+            deadline = request.submitted + self.max_wait_ms / 1000
+
+            while size < self.max_batch_size:
+                remaining = deadline - time.perf_counter()
+                try:
+                    if remaining > 0:
+                        request = self._queue.get(timeout=remaining)
+                    else:
+                        request = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if request is None:
+                    stopping = True
+                    break
+                batch.append(request)
+                size += len(request.pairs)
+
+            # Any failure is delivered to the batch's callers; the loop
+            # keeps serving later requests
+            try:
+                self._score_batch(batch)
+            except BaseException as e:
+                with self._lock:
+                    self.stats.errors += 1
+                self._fail(batch, e)
+
+    @staticmethod
+    def _fail(batch: List[_PendingRequest], error: BaseException):
+        for request in batch:
+            if not request.future.done():
+                request.future.set_exception(error)
+
+    def _score_batch(self, batch: List[_PendingRequest]):
+        """Score a batch once, with pairs repeated across requests sent only once"""
+        started = time.perf_counter()
+        positions: Dict[Tuple[bytes, str], int] = {}
+        pairs = []
+        for request in batch:
+            for key, pair in zip(request.keys, request.pairs):
+                if key not in positions:
+                    positions[key] = len(pairs)
+                    pairs.append(pair)
+
+        scores = [float(s) for s in self.predict_fn(pairs)]
+        if len(scores) != len(pairs):
+            raise ValueError(f"predict_fn returned {len(scores)} scores for {len(pairs)} pairs")
+        finished = time.perf_counter()
+
+        with self._lock:
+            if self.cache_size > 0:
+                for key, position in positions.items():
+                    self._cache[key] = scores[position]
+                    self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+            self.stats.batches += 1
+            self.stats.scored_pairs += len(pairs)
+            self.stats.batch_sizes.append(len(pairs))
+            self.stats.predict_ms.append((finished - started) * 1000)
+            self.stats.wait_ms.extend((started - r.submitted) * 1000 for r in batch)
+
+        for request in batch:
+            request.future.set_result([scores[positions[key]] for key in request.keys])
+
+
 # =======================
 # Cross-Encoder Reranker
 # =======================
@@ -189,13 +472,21 @@ class CrossEncoderReranker:
 
     def __init__(
         self,
-        model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+        model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2",
+        max_batch_size: int = 64,
+        max_wait_ms: float = 2.0,
+        cache_size: int = 10_000
     ):
         """
         Initialize cross-encoder reranker.
 
         Args:
             model_name: Hugging Face cross-encoder model name
+            max_batch_size: Pairs per model call; concurrent rerank() calls
+                are batched together up to this size
+            max_wait_ms: Longest a call waits for others to join its batch
+                (0 for single-caller use)
+            cache_size: (query, doc_id) scores kept in the LRU cache
 
         Popular models:
         - cross-encoder/ms-marco-MiniLM-L-6-v2 (fast, 80MB)
@@ -205,20 +496,34 @@ class CrossEncoderReranker:
         from sentence_transformers import CrossEncoder
 
         self.model = CrossEncoder(model_name)
+        self.scorer = MicroBatchScorer(
+            lambda pairs: self.model.predict(pairs, batch_size=max_batch_size),
+            max_batch_size=max_batch_size,
+            max_wait_ms=max_wait_ms,
+            cache_size=cache_size
+        )
+
+    @property
+    def stats(self) -> RerankStats:
+        return self.scorer.stats
 
     def rerank(
         self,
         query: str,
         results: List[RetrievalResult],
-        top_n: int = 5
+        top_n: int = 5,
+        timeout: Optional[float] = None
     ) -> List[RetrievalResult]:
         """
         Rerank using cross-encoder.
 
+        Safe to call from many threads; their pairs share model batches.
+
         Args:
             query: Search query
             results: Initial results
             top_n: Number of top results
+            timeout: Seconds to wait for scoring (None = no limit)
 
         Returns:
             Reranked results
@@ -226,17 +531,11 @@ class CrossEncoderReranker:
         if not results:
             return []
 
-        # Prepare query-document pairs
-        pairs = [[query, r.content] for r in results]
-
-        # Score with cross-encoder
-        scores = self.model.predict(pairs)
+        # Score query-document pairs (cached or batched with concurrent calls)
+        scores = self.scorer.score(query, [(r.doc_id, r.content) for r in results], timeout=timeout)
 
         # Combine results with scores
-        scored_results = [
-            (results[i], float(scores[i]))
-            for i in range(len(results))
-        ]
+        scored_results = list(zip(results, scores))
 
         # Sort by score (descending)
         scored_results.sort(key=lambda x: x[1], reverse=True)
@@ -254,18 +553,63 @@ class CrossEncoderReranker:
 
         return reranked
 
+    def close(self):
+        self.scorer.shutdown()
+
 
 # =======================
 # LLM-Based Reranker
 # =======================
 
+@dataclass
+class LLMRerankReport:
+    """Cost and latency of one LLMReranker.rerank call"""
+    strategy: str
+    candidates: int = 0
+    llm_calls: int = 0
+    cache_hits: int = 0
+    rounds: int = 0  # Tournament rounds or sliding passes
+    early_exit: bool = False  # Sliding only: stopped before max_passes
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    wall_ms: float = 0.0
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+
 class LLMReranker:
-    """Rerank using LLM (GPT-4, Claude, etc.)"""
+    """
+    Listwise rerank using LLM (GPT-4, Claude, etc.)
+
+    Candidates are ranked in windows of at most ``window_size`` documents,
+    so prompt size stays bounded however many candidates come in:
+    - 'tournament': each round splits the candidates into windows ranked
+      concurrently; each window's top_n advance until the survivors fit in
+      one final window. Needs window_size >= 2 * top_n (so every round
+      shrinks the field and no true top_n document is dropped); it always
+      runs all its rounds
+    - 'sliding': RankGPT-style passes from the bottom of the list to the
+      top with overlapping windows; windows depend on the previous one so
+      they run in order, and passes stop once the top_n no longer changes
+    - 'single': every candidate in one prompt
+
+    Window rankings are cached by (query, candidate set), and each call's
+    tokens and wall time are kept in ``last_report`` / ``summary()``.
+    """
 
     def __init__(
         self,
         model: str = "gpt-4o-mini",
-        provider: str = "openai"
+        provider: str = "openai",
+        strategy: str = "tournament",
+        window_size: int = 20,
+        step: int = 10,
+        max_passes: int = 2,
+        max_workers: int = 4,
+        cache_size: int = 1024,
+        client: Optional[Any] = None
     ):
         """
         Initialize LLM-based reranker.
@@ -273,18 +617,44 @@ class LLMReranker:
         Args:
             model: Model name
             provider: 'openai' or 'anthropic'
+            strategy: 'tournament', 'sliding' or 'single'
+            window_size: Documents per prompt
+            step: Sliding window stride (window_size - step documents overlap)
+            max_passes: Sliding passes at most (fewer once top_n is stable)
+            max_workers: Concurrent LLM calls for tournament windows
+            cache_size: Window rankings kept in the LRU cache (0 disables it)
+            client: Pre-built API client (default: created for the provider
+                from its API key environment variable)
         """
+        if strategy not in ("tournament", "sliding", "single"):
+            raise ValueError(f"Unknown strategy: {strategy}")
+        if window_size < 2 or not 0 < step < window_size:
+            raise ValueError("Need window_size >= 2 and 0 < step < window_size")
+
         self.model = model
         self.provider = provider
-
-        if provider == "openai":
+        self.strategy = strategy
+        self.window_size = window_size
+        self.step = step
+        self.max_passes = max_passes
+        self.cache_size = cache_size
+
+        self._cache: "OrderedDict[bytes, List[str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="llm-rerank")
+        self.last_report: Optional[LLMRerankReport] = None
+        self.reports: Deque[LLMRerankReport] = deque(maxlen=STATS_WINDOW)
+
+        if provider not in ("openai", "anthropic"):
+            raise ValueError(f"Unknown provider: {provider}")
+        if client is not None:
+            self.client = client
+        elif provider == "openai":
             from openai import OpenAI
             self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        elif provider == "anthropic":
+        else:
             import anthropic
             self.client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
-        else:
-            raise ValueError(f"Unknown provider: {provider}")
 
     def rerank(
         self,
@@ -302,14 +672,128 @@ class LLMReranker:
 
         Returns:
             Reranked results
+
+        Raises:
+            ValueError: tournament strategy with more than window_size
+                candidates and window_size < 2 * top_n
         """
         if not results:
             return []
 
+        start = time.perf_counter()
+        by_id: Dict[str, RetrievalResult] = {}
+        for result in results:
+            by_id.setdefault(result.doc_id, result)
+        order = list(by_id)
+        report = LLMRerankReport(strategy=self.strategy, candidates=len(order))
+
+        if self.strategy == "single" or len(order) <= self.window_size:
+            order = self._rank_window(query, order, by_id, report)
+        elif self.strategy == "tournament":
+            if self.window_size < 2 * top_n:
+                raise ValueError(
+                    f"tournament needs window_size >= 2 * top_n "
+                    f"(window_size={self.window_size}, top_n={top_n}); "
+                    f"raise window_size or use strategy='sliding'"
+                )
+            order = self._tournament(query, order, by_id, top_n, report)
+        else:
+            order = self._sliding(query, order, by_id, top_n, report)
+
+        report.wall_ms = (time.perf_counter() - start) * 1000
+        self.last_report = report
+        self.reports.append(report)
+
+        # Rerank based on LLM output
+        reranked = []
+        for rank, doc_id in enumerate(order[:top_n]):
+            result = by_id[doc_id]
+            reranked.append(RetrievalResult(
+                doc_id=result.doc_id,
+                content=result.content,
+                score=1.0 - (rank * 0.1),  # Decreasing score
+                metadata={**result.metadata, 'llm_rank': rank}
+            ))
+
+        return reranked
+
+    def _tournament(
+        self,
+        query: str,
+        order: List[str],
+        by_id: Dict[str, RetrievalResult],
+        top_n: int,
+        report: LLMRerankReport
+    ) -> List[str]:
+        """Rank windows concurrently, advance each window's top_n, repeat until one window is left"""
+        # Any true top_n document is within its window's top_n; with
+        # window_size >= 2 * top_n every round also shrinks the field
+        advance = max(1, top_n)
+        eliminated: List[str] = []  # Losers so far, later rounds first
+
+        while len(order) > self.window_size:
+            windows = [order[i:i + self.window_size] for i in range(0, len(order), self.window_size)]
+            rankings = list(self.pool.map(
+                lambda window: self._rank_window(query, window, by_id, report), windows
+            ))
+            report.rounds += 1
+            order = [doc_id for ranking in rankings for doc_id in ranking[:advance]]
+            eliminated = [doc_id for ranking in rankings for doc_id in ranking[advance:]] + eliminated
+
+        report.rounds += 1
+        return self._rank_window(query, order, by_id, report) + eliminated
+
+    def _sliding(
+        self,
+        query: str,
+        order: List[str],
+        by_id: Dict[str, RetrievalResult],
+        top_n: int,
+        report: LLMRerankReport
+    ) -> List[str]:
+        """Back-to-front sliding window passes, stopping once the top_n is stable"""
+        for _ in range(self.max_passes):
+            before = order[:top_n]
+            end = len(order)
+            while True:
+                start = max(0, end - self.window_size)
+                order[start:end] = self._rank_window(query, order[start:end], by_id, report)
+                if start == 0:
+                    break
+                end -= self.step
+            report.rounds += 1
+            if order[:top_n] == before:
+                report.early_exit = report.rounds < self.max_passes
+                break
+        return order
+
+    def _rank_window(
+        self,
+        query: str,
+        window: List[str],
+        by_id: Dict[str, RetrievalResult],
+        report: LLMRerankReport
+    ) -> List[str]:
+        """
+        Rank one window of doc ids with a single LLM call.
+
+        Returns every id of the window: ones the LLM left out follow in
+        their input order. Safe to call from pool threads.
+        """
+        key = self._cache_key(query, window)
+        if self.cache_size > 0:
+            with self._lock:
+                cached = self._cache.get(key)
+                if cached is not None:
+                    self._cache.move_to_end(key)
+                    report.cache_hits += 1
+            if cached is not None:
+                return list(cached)
+
         # Create prompt
         docs_text = "\n\n".join([
-            f"[{i}] {r.content}"
-            for i, r in enumerate(results)
+            f"[{i}] {by_id[doc_id].content}"
+            for i, doc_id in enumerate(window)
         ])
 
         prompt = f"""Given the query and documents below, rank the documents by relevance to the query.
@@ -323,7 +807,24 @@ Documents:
 Output format: [0, 3, 1, 2, ...]
 """
 
-        # Call LLM
+        ranking_text, prompt_tokens, completion_tokens = self._call_llm(prompt)
+        ranking = self._parse_ranking(ranking_text, len(window))
+        ranked = [window[i] for i in ranking]
+
+        with self._lock:
+            report.llm_calls += 1
+            report.prompt_tokens += prompt_tokens
+            report.completion_tokens += completion_tokens
+            if self.cache_size > 0:
+                self._cache[key] = ranked
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        return list(ranked)
+
+    def _call_llm(self, prompt: str) -> Tuple[str, int, int]:
+        """Returns (text, prompt tokens, completion tokens)"""
         if self.provider == "openai":
             response = self.client.chat.completions.create(
                 model=self.model,
@@ -333,40 +834,79 @@ Output format: [0, 3, 1, 2, ...]
                 ],
                 temperature=0
             )
-            ranking_text = response.choices[0].message.content
-        else:  # anthropic
-            response = self.client.messages.create(
-                model=self.model,
-                max_tokens=1024,
-                messages=[
-                    {"role": "user", "content": prompt}
-                ]
+            usage = response.usage
+            return (
+                response.choices[0].message.content,
+                getattr(usage, "prompt_tokens", 0) if usage else 0,
+                getattr(usage, "completion_tokens", 0) if usage else 0
             )
-            ranking_text = response.content[0].text
 
-        # Parse ranking
-        import json
+        # anthropic
+        response = self.client.messages.create(
+            model=self.model,
+            max_tokens=1024,
+            messages=[
+                {"role": "user", "content": prompt}
+            ]
+        )
+        usage = response.usage
+        return (
+            response.content[0].text,
+            getattr(usage, "input_tokens", 0) if usage else 0,
+            getattr(usage, "output_tokens", 0) if usage else 0
+        )
+
+    @staticmethod
+    def _parse_ranking(ranking_text: str, size: int) -> List[int]:
+        """Parse the LLM's index list into a full permutation of range(size)"""
         try:
             ranking = json.loads(ranking_text)
-        except:
+            if not isinstance(ranking, list):
+                raise ValueError(ranking_text)
+        except (ValueError, TypeError):
             # Fallback: extract numbers
-            import re
-            ranking = [int(x) for x in re.findall(r'\d+', ranking_text)]
+            ranking = re.findall(r'\d+', ranking_text)
+
+        seen = set()
+        permutation = []
+        for idx in ranking:
+            try:
+                idx = int(idx)
+            except (TypeError, ValueError):
+                continue
+            if 0 <= idx < size and idx not in seen:
+                seen.add(idx)
+                permutation.append(idx)
+        permutation.extend(i for i in range(size) if i not in seen)
+        return permutation
+
+    @staticmethod
+    def _cache_key(query: str, window: List[str]) -> bytes:
+        """Hash of the query and the window's doc id set (order-insensitive)"""
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(query.encode("utf-8"))
+        for doc_id in sorted(window):
+            digest.update(b"\0" + doc_id.encode("utf-8"))
+        return digest.digest()
+
+    def summary(self) -> Dict[str, float]:
+        """Per-rerank latency and token percentiles over recent calls"""
+        reports = list(self.reports)
+        wall_ms = [r.wall_ms for r in reports]
+        tokens = [r.total_tokens for r in reports]
+        return {
+            "reranks": len(reports),
+            "llm_calls": sum(r.llm_calls for r in reports),
+            "cache_hits": sum(r.cache_hits for r in reports),
+            "wall_ms_p50": _percentile(wall_ms, 50),
+            "wall_ms_p95": _percentile(wall_ms, 95),
+            "tokens_p50": _percentile(tokens, 50),
+            "tokens_p95": _percentile(tokens, 95),
+            "tokens_mean": sum(tokens) / len(tokens) if tokens else 0.0
+        }
 
-        # Rerank based on LLM output
-        reranked = []
-        for rank, idx in enumerate(ranking[:top_n]):
-            if 0 <= idx < len(results):
-                result = results[idx]
-                reranked_result = RetrievalResult(
-                    doc_id=result.doc_id,
-                    content=result.content,
-                    score=1.0 - (rank * 0.1),  # Decreasing score
-                    metadata={**result.metadata, 'llm_rank': rank}
-                )
-                reranked.append(reranked_result)
-
-        return reranked
+    def close(self):
+        self.pool.shutdown(wait=False, cancel_futures=True)
 
 
 # =======================
@@ -379,7 +919,8 @@ class RerankingPipeline:
     def __init__(
         self,
         documents: List[Dict[str, Any]],
-        reranker_type: str = "cohere"
+        reranker_type: str = "cohere",
+        reranker_options: Optional[Dict[str, Any]] = None
     ):
         """
         Initialize pipeline.
@@ -387,9 +928,12 @@ class RerankingPipeline:
         Args:
             documents: Document corpus
             reranker_type: 'cohere', 'cross-encoder', or 'llm'
+            reranker_options: Keyword arguments for the reranker, e.g.
+                {'max_batch_size': 64, 'max_wait_ms': 2.0} for 'cross-encoder'
         """
         self.documents = documents
         self.reranker_type = reranker_type
+        self.reranker_options = reranker_options or {}
 
         # Setup retriever (hybrid search)
         self._setup_retriever()
@@ -429,11 +973,11 @@ class RerankingPipeline:
     def _setup_reranker(self):
         """Setup reranker"""
         if self.reranker_type == "cohere":
-            self.reranker = CohereReranker()
+            self.reranker = CohereReranker(**self.reranker_options)
         elif self.reranker_type == "cross-encoder":
-            self.reranker = CrossEncoderReranker()
+            self.reranker = CrossEncoderReranker(**self.reranker_options)
         elif self.reranker_type == "llm":
-            self.reranker = LLMReranker()
+            self.reranker = LLMReranker(**self.reranker_options)
         else:
             raise ValueError(f"Unknown reranker: {self.reranker_type}")
 
@@ -446,6 +990,9 @@ class RerankingPipeline:
         """
         Full pipeline: retrieve → rerank.
 
+        With the cross-encoder reranker, concurrent calls (e.g. from a
+        threaded server) share model batches and the pair-score cache.
+
         Args:
             query: Search query
             initial_k: Number of candidates from initial retrieval
@@ -519,6 +1066,15 @@ if __name__ == "__main__":
         print(f"\n{i}. [{result.doc_id}] Score: {result.score:.3f}")
         print(f"   {result.content[:80]}...")
 
+    # Concurrent requests share cross-encoder batches
+    from concurrent.futures import ThreadPoolExecutor
+
+    queries = ["deep learning neural networks", "what is RAG", "machine learning basics"] * 4
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda q: reranker.rerank(q, initial_results, top_n=2), queries))
+    print(f"\nBatching stats: {reranker.stats.summary()}")
+    reranker.close()
+
     # Example 2: Full pipeline with Cohere (requires API key)
     # print("\n=== Full Pipeline with Cohere ===")
     # pipeline = RerankingPipeline(documents, reranker_type="cohere")
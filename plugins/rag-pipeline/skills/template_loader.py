@@ -0,0 +1,62 @@
+"""
+Template Loader
+
+Skill templates and scripts have hyphenated file names (chunk-core.py,
+rank-fusion.py, ...), which `import` cannot name. Files that build on a
+sibling or another skill's template load it through here:
+
+    import sys
+    from pathlib import Path
+    SKILLS_DIR = Path(__file__).resolve().parents[2]
+    sys.path.insert(0, str(SKILLS_DIR))
+    from template_loader import load_template
+
+    chunk_core = load_template(Path(__file__).with_name("chunk-core.py"))
+    RankFusion = load_template(SKILLS_DIR / "retrieval-patterns" / "templates" / "rank-fusion.py").RankFusion
+
+Each file is executed once per process, so every importer shares the same
+module (and the same classes, for isinstance checks).
+"""
+
+import importlib.util
+import sys
+from pathlib import Path
+from types import ModuleType
+from typing import Dict, Union
+
+
+SKILLS_DIR = Path(__file__).resolve().parent
+
+_loaded: Dict[Path, ModuleType] = {}
+
+
+def load_template(path: Union[str, Path]) -> ModuleType:
+    """
+    Import a template file by path, once per process.
+
+    The module is named after the file ("rank-fusion.py" -> "rank_fusion")
+    and registered in sys.modules while it executes, so dataclasses and
+    pickling inside it resolve their module.
+    """
+    path = Path(path).resolve()
+    module = _loaded.get(path)
+    if module is not None:
+        return module
+
+    name = path.stem.replace("-", "_")
+    spec = importlib.util.spec_from_file_location(name, path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load template {path}")
+    module = importlib.util.module_from_spec(spec)
+    previous = sys.modules.get(name)
+    sys.modules[name] = module
+    try:
+        spec.loader.exec_module(module)
+    except BaseException:
+        if previous is None:
+            sys.modules.pop(name, None)
+        else:
+            sys.modules[name] = previous
+        raise
+    _loaded[path] = module
+    return module
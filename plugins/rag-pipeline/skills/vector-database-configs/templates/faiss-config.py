@@ -6,7 +6,15 @@ High-performance vector search library from Meta
 import faiss
 import numpy as np
 import pickle
-from typing import List, Dict, Optional, Any
+import hashlib
+import json
+import os
+import operator
+import threading
+import time
+from array import array
+from dataclasses import dataclass, asdict
+from typing import List, Dict, Optional, Any, Set, Tuple
 from pathlib import Path
 
 # ============================================
@@ -100,7 +108,7 @@ class FAISSIndexFactory:
         return index
 
     @staticmethod
-    def create_from_string(dimensions: int, index_string: str):
+    def create_from_string(dimensions: int, index_string: str, metric: str = "L2"):
         """
         Create index from factory string
 
@@ -110,7 +118,692 @@ class FAISSIndexFactory:
             "IVF100,PQ8" - IVF with PQ compression
             "HNSW32" - HNSW with M=32
         """
-        return faiss.index_factory(dimensions, index_string)
+        if metric == "L2":
+            return faiss.index_factory(dimensions, index_string)
+        elif metric == "IP":
+            return faiss.index_factory(dimensions, index_string, faiss.METRIC_INNER_PRODUCT)
+        else:
+            raise ValueError(f"Unknown metric: {metric}")
+
+    @staticmethod
+    def autotune(
+        vectors: np.ndarray,
+        queries: np.ndarray,
+        recall_target: float = 0.95,
+        memory_budget_bytes: Optional[int] = None,
+        k: int = 10,
+        metric: str = "L2",
+        corpus_size: Optional[int] = None
+    ) -> "TuningReport":
+        """
+        Pick an index string and search parameters from a data sample
+
+        See FAISSIndexAutotuner for details.
+        """
+        tuner = FAISSIndexAutotuner(
+            k=k,
+            recall_target=recall_target,
+            memory_budget_bytes=memory_budget_bytes,
+            metric=metric
+        )
+        return tuner.tune(vectors, queries, corpus_size=corpus_size)
+
+
+# ============================================
+# Index Autotuning
+# ============================================
+
+@dataclass
+class TuningResult:
+    """One measured (index string, search parameters) configuration"""
+    index_string: str
+    search_params: Dict[str, int]
+    recall: float
+    p50_ms: float
+    p99_ms: float
+    memory_bytes: int
+    build_seconds: float
+    projected_memory_bytes: Optional[int] = None
+
+
+@dataclass
+class TuningReport:
+    """Autotune outcome: the chosen config, the Pareto front and all measurements"""
+    best: TuningResult
+    meets_target: bool
+    pareto: List[TuningResult]
+    results: List[TuningResult]
+    k: int
+    recall_target: float
+    memory_budget_bytes: Optional[int]
+    metric: str
+    over_budget: bool = False
+    corpus_size: Optional[int] = None
+
+    def save(self, path: str):
+        """Write the report as JSON (FAISSVectorStore.save stores it as autotune.json)."""
+        with open(path, "w") as f:
+            json.dump(asdict(self), f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "TuningReport":
+        with open(path) as f:
+            data = json.load(f)
+        data["best"] = TuningResult(**data["best"])
+        data["pareto"] = [TuningResult(**r) for r in data["pareto"]]
+        data["results"] = [TuningResult(**r) for r in data["results"]]
+        return cls(**data)
+
+
+def apply_search_params(index, params: Dict[str, int]):
+    """Set nprobe / efSearch on an index (unwrapping IndexIDMap if needed)."""
+    if isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+        index = faiss.downcast_index(index.index)
+    if "nprobe" in params:
+        faiss.extract_index_ivf(index).nprobe = params["nprobe"]
+    if "efSearch" in params:
+        faiss.downcast_index(index).hnsw.efSearch = params["efSearch"]
+
+
+class FAISSIndexAutotuner:
+    """
+    Sweep index types and search parameters against exact ground truth
+
+    For each candidate index string the index is built once on the sample,
+    then every search parameter value (nprobe for IVF, efSearch for HNSW) is
+    measured for recall@k against an exact Flat index and for p50/p99
+    single-query latency. Memory is the serialized index size, projected
+    from the sample to the full corpus: the trained-but-empty index is the
+    fixed part (centroids, codebooks), the rest scales with the vector count.
+
+    The chosen configuration is the lowest-p99 one that reaches the recall
+    target within the memory budget; if none does, the highest-recall
+    configuration within budget is returned with meets_target=False. If no
+    configuration fits the budget at all, the smallest one is returned with
+    meets_target=False and over_budget=True.
+    """
+
+    NPROBE_GRID = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+    EF_SEARCH_GRID = [16, 32, 64, 128, 256, 512]
+
+    def __init__(
+        self,
+        k: int = 10,
+        recall_target: float = 0.95,
+        memory_budget_bytes: Optional[int] = None,
+        metric: str = "L2",
+        candidates: Optional[List[str]] = None,
+        latency_queries: int = 200
+    ):
+        """
+        Args:
+            k: Recall is measured at this depth
+            recall_target: Minimum acceptable recall@k
+            memory_budget_bytes: Maximum index size for the full corpus (None = unlimited)
+            metric: L2 or IP
+            candidates: Index factory strings to try (None = derived from sample size)
+            latency_queries: Queries timed one at a time for p50/p99
+        """
+        self.k = k
+        self.recall_target = recall_target
+        self.memory_budget_bytes = memory_budget_bytes
+        self.metric = metric
+        self.candidates = candidates
+        self.latency_queries = latency_queries
+
+    def default_candidates(self, num_vectors: int, dimensions: int) -> List[str]:
+        """Flat, IVF-Flat and IVF-PQ around sqrt(N) lists, and HNSW."""
+        candidates = ["Flat"]
+
+        base = max(1, int(np.sqrt(num_vectors)))
+        # FAISS wants ~39 training points per centroid
+        nlists = sorted({
+            n for n in (base // 2, base, base * 2, base * 4)
+            if 4 <= n <= num_vectors // 39
+        })
+        pq_ms = [m for m in (8, 16, 32, 64) if m <= dimensions and dimensions % m == 0]
+
+        for nlist in nlists:
+            candidates.append(f"IVF{nlist},Flat")
+            for m in pq_ms[:2]:
+                candidates.append(f"IVF{nlist},PQ{m}")
+
+        candidates.extend(["HNSW16", "HNSW32"])
+        return candidates
+
+    def _param_grid(self, index) -> List[Dict[str, int]]:
+        try:
+            ivf = faiss.extract_index_ivf(index)
+            return [{"nprobe": p} for p in self.NPROBE_GRID if p <= ivf.nlist]
+        except RuntimeError:
+            pass
+        if isinstance(faiss.downcast_index(index), faiss.IndexHNSW):
+            return [{"efSearch": ef} for ef in self.EF_SEARCH_GRID if ef >= self.k]
+        return [{}]
+
+    def _recall(self, found: np.ndarray, truth: np.ndarray) -> float:
+        hits = sum(
+            len(np.intersect1d(f[f >= 0], t, assume_unique=True))
+            for f, t in zip(found, truth)
+        )
+        return hits / truth.size
+
+    def _latencies_ms(self, index, queries: np.ndarray) -> np.ndarray:
+        timings = []
+        for q in queries[:self.latency_queries]:
+            start = time.perf_counter()
+            index.search(q[None, :], self.k)
+            timings.append((time.perf_counter() - start) * 1000)
+        return np.array(timings)
+
+    @staticmethod
+    def pareto_front(results: List[TuningResult]) -> List[TuningResult]:
+        """Configurations not dominated on (recall up, p99 down, projected memory down)."""
+        def memory(r: TuningResult) -> int:
+            return r.memory_bytes if r.projected_memory_bytes is None else r.projected_memory_bytes
+
+        front = []
+        for r in results:
+            dominated = any(
+                o.recall >= r.recall and o.p99_ms <= r.p99_ms and memory(o) <= memory(r)
+                and (o.recall > r.recall or o.p99_ms < r.p99_ms or memory(o) < memory(r))
+                for o in results
+            )
+            if not dominated:
+                front.append(r)
+        return sorted(front, key=lambda r: (r.p99_ms, -r.recall))
+
+    def tune(
+        self,
+        vectors: np.ndarray,
+        queries: np.ndarray,
+        verbose: bool = True,
+        corpus_size: Optional[int] = None
+    ) -> TuningReport:
+        """
+        Run the sweep
+
+        Args:
+            vectors: Sample of the corpus (float32, N x d)
+            queries: Representative queries (float32, Q x d)
+            corpus_size: Vectors the real index will hold (None = the sample
+                is the corpus); memory is projected to this size before it
+                is compared with the budget
+
+        Returns:
+            TuningReport
+        """
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        queries = np.ascontiguousarray(queries, dtype=np.float32)
+        if self.metric == "IP":
+            vectors, queries = vectors.copy(), queries.copy()
+            faiss.normalize_L2(vectors)
+            faiss.normalize_L2(queries)
+
+        num_vectors, dimensions = vectors.shape
+        corpus_size = corpus_size or num_vectors
+        exact = FAISSIndexFactory.create_flat(dimensions, self.metric)
+        exact.add(vectors)
+        _, truth = exact.search(queries, self.k)
+
+        results: List[TuningResult] = []
+        for index_string in self.candidates or self.default_candidates(num_vectors, dimensions):
+            start = time.perf_counter()
+            index = FAISSIndexFactory.create_from_string(dimensions, index_string, self.metric)
+            index.train(vectors)
+            build_seconds = time.perf_counter() - start
+            fixed_bytes = int(faiss.serialize_index(index).nbytes)
+            start = time.perf_counter()
+            index.add(vectors)
+            build_seconds += time.perf_counter() - start
+            memory_bytes = int(faiss.serialize_index(index).nbytes)
+            per_vector = (memory_bytes - fixed_bytes) / num_vectors
+            projected_bytes = int(fixed_bytes + per_vector * corpus_size)
+
+            for params in self._param_grid(index):
+                apply_search_params(index, params)
+                _, found = index.search(queries, self.k)
+                latencies = self._latencies_ms(index, queries)
+                result = TuningResult(
+                    index_string=index_string,
+                    search_params=params,
+                    recall=round(self._recall(found, truth), 4),
+                    p50_ms=round(float(np.percentile(latencies, 50)), 4),
+                    p99_ms=round(float(np.percentile(latencies, 99)), 4),
+                    memory_bytes=memory_bytes,
+                    build_seconds=round(build_seconds, 3),
+                    projected_memory_bytes=projected_bytes
+                )
+                results.append(result)
+                if verbose:
+                    print(f"  {index_string:<18} {str(params):<18} recall@{self.k}={result.recall:.3f} "
+                          f"p50={result.p50_ms:.3f}ms p99={result.p99_ms:.3f}ms "
+                          f"mem={projected_bytes / 1e6:.1f}MB")
+
+        within_budget = [
+            r for r in results
+            if self.memory_budget_bytes is None or r.projected_memory_bytes <= self.memory_budget_bytes
+        ]
+        meeting = [r for r in within_budget if r.recall >= self.recall_target]
+        if meeting:
+            best = min(meeting, key=lambda r: (r.p99_ms, r.projected_memory_bytes))
+        elif within_budget:
+            best = max(within_budget, key=lambda r: (r.recall, -r.p99_ms))
+        else:
+            best = min(results, key=lambda r: (r.projected_memory_bytes, -r.recall))
+
+        report = TuningReport(
+            best=best,
+            meets_target=bool(meeting),
+            over_budget=not within_budget,
+            corpus_size=corpus_size,
+            pareto=self.pareto_front(results),
+            results=results,
+            k=self.k,
+            recall_target=self.recall_target,
+            memory_budget_bytes=self.memory_budget_bytes,
+            metric=self.metric
+        )
+        if verbose:
+            status = "meets" if report.meets_target else "MISSES"
+            print(f"Best: {best.index_string} {best.search_params} ({status} recall target "
+                  f"{self.recall_target}, recall={best.recall:.3f}, p99={best.p99_ms:.3f}ms)")
+            if report.over_budget:
+                print(f"WARNING: no configuration fits the {self.memory_budget_bytes / 1e6:.1f}MB budget "
+                      f"at {corpus_size} vectors; smallest is {best.projected_memory_bytes / 1e6:.1f}MB")
+        return report
+
+
+# ============================================
+# Columnar Metadata Store
+# ============================================
+
+def hash_external_id(external_id: str) -> int:
+    """Stable 64-bit hash of an external ID (Python's hash() is salted per process)."""
+    digest = hashlib.blake2b(external_id.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little")
+
+
+class ColumnarMetadataStore:
+    """
+    Row-aligned metadata columns where row i belongs to FAISS internal ID i
+
+    On-disk columns (all loaded with mmap, nothing is unpickled):
+        meta_offsets.npy / meta_blob.bin  - JSON metadata as offsets + bytes
+        ext_offsets.npy / ext_blob.bin    - UTF-8 external IDs as offsets + bytes
+        ext_hash.npy / ext_rows.npy       - external ID hashes (sorted) -> row
+        deleted.npy                       - per-row deleted flag
+
+    Rows appended after load live in small in-memory buffers until the next
+    save. Metadata is decoded only for rows that are actually returned.
+    """
+
+    def __init__(self):
+        self._base_rows = 0
+        self._meta_offsets = np.zeros(1, dtype=np.uint64)
+        self._meta_blob = np.zeros(0, dtype=np.uint8)
+        self._ext_offsets = np.zeros(1, dtype=np.uint64)
+        self._ext_blob = np.zeros(0, dtype=np.uint8)
+        self._hash_keys = np.zeros(0, dtype=np.uint64)
+        self._hash_rows = np.zeros(0, dtype=np.int64)
+
+        self._new_meta: List[bytes] = []
+        self._new_ext: List[str] = []
+        self._new_lookup: Dict[str, int] = {}
+
+        self.deleted = bytearray()
+        self.deleted_count = 0
+
+    def __len__(self) -> int:
+        return self._base_rows + len(self._new_meta)
+
+    def append(self, metadata: Optional[Dict], external_id: Optional[str]) -> int:
+        """Append a row and return its row number."""
+        row = len(self)
+        payload = json.dumps(metadata, separators=(",", ":")).encode("utf-8") if metadata else b""
+        self._new_meta.append(payload)
+        self._new_ext.append(external_id or "")
+        if external_id:
+            self._new_lookup[external_id] = row
+        self.deleted.append(0)
+        return row
+
+    @staticmethod
+    def _slice(offsets: np.ndarray, blob: np.ndarray, row: int) -> bytes:
+        return blob[int(offsets[row]):int(offsets[row + 1])].tobytes()
+
+    def _meta_bytes(self, row: int) -> bytes:
+        if row < self._base_rows:
+            return self._slice(self._meta_offsets, self._meta_blob, row)
+        return self._new_meta[row - self._base_rows]
+
+    def get_metadata(self, row: int) -> Dict:
+        if row < 0 or row >= len(self) or self.deleted[row]:
+            return {}
+        payload = self._meta_bytes(row)
+        return json.loads(payload) if payload else {}
+
+    def get_external_id(self, row: int) -> Optional[str]:
+        if row < self._base_rows:
+            value = self._slice(self._ext_offsets, self._ext_blob, row).decode("utf-8")
+        else:
+            value = self._new_ext[row - self._base_rows]
+        return value or None
+
+    def lookup(self, external_id: str) -> Optional[int]:
+        """Return the live row for an external ID, if any."""
+        row = self._new_lookup.get(external_id)
+        if row is not None and not self.deleted[row]:
+            return row
+
+        key = np.uint64(hash_external_id(external_id))
+        lo = int(np.searchsorted(self._hash_keys, key, side="left"))
+        hi = int(np.searchsorted(self._hash_keys, key, side="right"))
+        for i in range(lo, hi):
+            row = int(self._hash_rows[i])
+            if not self.deleted[row] and self.get_external_id(row) == external_id:
+                return row
+        return None
+
+    def mark_deleted(self, row: int):
+        if not self.deleted[row]:
+            self.deleted[row] = 1
+            self.deleted_count += 1
+            external_id = self.get_external_id(row)
+            if external_id and self._new_lookup.get(external_id) == row:
+                del self._new_lookup[external_id]
+
+    def live_mask(self) -> np.ndarray:
+        """Boolean array, True for rows that are not deleted."""
+        return np.frombuffer(bytes(self.deleted), dtype=np.uint8) == 0
+
+    @staticmethod
+    def _pack_live(offsets: np.ndarray, blob: np.ndarray, new_items: List[bytes],
+                   live: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """One offsets + bytes column with deleted rows emptied, built with array ops."""
+        base_rows = len(offsets) - 1
+        base_lengths = np.diff(np.asarray(offsets, dtype=np.int64))
+        base_bytes = np.asarray(blob)[np.repeat(live[:base_rows], base_lengths)]
+        new_bytes = b"".join(item for item, keep in zip(new_items, live[base_rows:]) if keep)
+        new_lengths = np.fromiter(map(len, new_items), dtype=np.int64, count=len(new_items))
+
+        lengths = np.concatenate([base_lengths, new_lengths]) * live
+        new_offsets = np.zeros(len(lengths) + 1, dtype=np.uint64)
+        np.cumsum(lengths, out=new_offsets[1:])
+        return new_offsets, np.concatenate([base_bytes, np.frombuffer(new_bytes, dtype=np.uint8)])
+
+    def save(self, directory: Path):
+        """Write all columns; deleted rows keep their slot but drop their payload."""
+        directory = Path(directory)
+        live = self.live_mask()
+        meta_offsets, meta_blob = self._pack_live(
+            self._meta_offsets, self._meta_blob, self._new_meta, live
+        )
+        ext_offsets, ext_blob = self._pack_live(
+            self._ext_offsets, self._ext_blob, [e.encode("utf-8") for e in self._new_ext], live
+        )
+
+        # Saved rows keep their row numbers, so their hashes are reused; only
+        # rows appended since the last save are hashed
+        base_keep = live[self._hash_rows] if len(self._hash_rows) else np.zeros(0, dtype=bool)
+        new_rows = [
+            (hash_external_id(external_id), self._base_rows + i)
+            for i, external_id in enumerate(self._new_ext)
+            if external_id and live[self._base_rows + i]
+        ]
+        keys = np.concatenate([
+            np.asarray(self._hash_keys)[base_keep],
+            np.array([key for key, _ in new_rows], dtype=np.uint64)
+        ])
+        rows = np.concatenate([
+            np.asarray(self._hash_rows)[base_keep],
+            np.array([row for _, row in new_rows], dtype=np.int64)
+        ])
+        order = np.argsort(keys, kind="stable")
+
+        columns = {
+            "meta_offsets.npy": meta_offsets,
+            "ext_offsets.npy": ext_offsets,
+            "ext_hash.npy": keys[order],
+            "ext_rows.npy": rows[order],
+            "deleted.npy": np.frombuffer(bytes(self.deleted), dtype=np.uint8),
+        }
+        for name, array in columns.items():
+            tmp = directory / (name + ".tmp")
+            with open(tmp, "wb") as f:
+                np.save(f, array)
+            os.replace(tmp, directory / name)
+        # Replacing (not rewriting) files keeps any live mmaps of the old ones valid
+        for name, blob in (("meta_blob.bin", meta_blob), ("ext_blob.bin", ext_blob)):
+            tmp = directory / (name + ".tmp")
+            with open(tmp, "wb") as f:
+                blob.tofile(f)
+            os.replace(tmp, directory / name)
+
+    @staticmethod
+    def _map_blob(path: Path) -> np.ndarray:
+        if path.stat().st_size == 0:
+            return np.zeros(0, dtype=np.uint8)
+        return np.memmap(path, dtype=np.uint8, mode="r")
+
+    @classmethod
+    def load(cls, directory: Path) -> "ColumnarMetadataStore":
+        """Memory-map all columns from a directory written by save()."""
+        directory = Path(directory)
+        store = cls()
+        store._meta_offsets = np.load(directory / "meta_offsets.npy", mmap_mode="r")
+        store._ext_offsets = np.load(directory / "ext_offsets.npy", mmap_mode="r")
+        store._hash_keys = np.load(directory / "ext_hash.npy", mmap_mode="r")
+        store._hash_rows = np.load(directory / "ext_rows.npy", mmap_mode="r")
+        store._meta_blob = cls._map_blob(directory / "meta_blob.bin")
+        store._ext_blob = cls._map_blob(directory / "ext_blob.bin")
+        store._base_rows = len(store._meta_offsets) - 1
+
+        deleted = np.load(directory / "deleted.npy")
+        store.deleted = bytearray(deleted.tobytes())
+        store.deleted_count = int(np.count_nonzero(deleted))
+        return store
+
+    @classmethod
+    def from_dicts(
+        cls,
+        num_rows: int,
+        id_to_metadata: Dict[int, Dict],
+        external_id_to_internal: Dict[str, int]
+    ) -> "ColumnarMetadataStore":
+        """Build a store from the legacy pickled dict layout."""
+        internal_to_external = {v: k for k, v in external_id_to_internal.items()}
+        store = cls()
+        for row in range(num_rows):
+            store.append(id_to_metadata.get(row), internal_to_external.get(row))
+        return store
+
+
+# ============================================
+# Metadata Filter Index
+# ============================================
+
+class MetadataBitmapIndex:
+    """
+    Inverted index from metadata (field, value) to row postings
+
+    Filter expressions are compiled into boolean bitmaps over all rows by
+    OR-ing / AND-ing postings. Scattering postings costs time proportional
+    to the rows they hold; each bitmap is still an O(N) array, combined
+    with vectorized NumPy passes. List-valued fields (e.g. tags) index
+    each element.
+
+    Values are keyed with their type, so True/1 and False/0 are distinct
+    (ints and floats still compare by value: 1 matches 1.0).
+
+    Filter syntax:
+        {"category": "ml"}                          equality
+        {"year": {"$gte": 2023, "$lt": 2025}}       range ($gt, $gte, $lt, $lte)
+        {"source": {"$in": ["docs", "blog"]}}       membership ($in, $nin)
+        {"status": {"$ne": "draft"}}                inequality
+        {"owner": {"$exists": True}}                field presence
+        {"$and": [...]}, {"$or": [...]}, {"$not": {...}}
+
+    Top-level keys are AND-ed together.
+    """
+
+    RANGE_OPS = {
+        "$gt": operator.gt,
+        "$gte": operator.ge,
+        "$lt": operator.lt,
+        "$lte": operator.le,
+    }
+
+    def __init__(self, fields: Optional[List[str]] = None):
+        """
+        Args:
+            fields: Metadata fields to index (None = every scalar field)
+        """
+        self.fields = list(fields) if fields is not None else None
+        self.postings: Dict[str, Dict[Tuple[type, Any], Any]] = {}
+
+    @staticmethod
+    def _key(value) -> Tuple[type, Any]:
+        """Postings key: (type, value), with ints and floats sharing one type."""
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return (float, value)
+        return (type(value), value)
+
+    def add(self, row: int, metadata: Optional[Dict]):
+        if not metadata:
+            return
+        for field_name, value in metadata.items():
+            if self.fields is not None and field_name not in self.fields:
+                continue
+            values = value if isinstance(value, (list, tuple, set)) else (value,)
+            field_postings = self.postings.setdefault(field_name, {})
+            for item in values:
+                if not isinstance(item, (str, int, float, bool)):
+                    continue
+                key = self._key(item)
+                posting = field_postings.get(key)
+                if not isinstance(posting, array):
+                    # Postings loaded from disk are read-only mmaps
+                    posting = array("q", [] if posting is None else posting.tolist())
+                    field_postings[key] = posting
+                posting.append(row)
+
+    @staticmethod
+    def _as_ids(posting) -> np.ndarray:
+        if isinstance(posting, array):
+            return np.frombuffer(posting, dtype=np.int64)
+        return posting
+
+    def _values_mask(self, field_name: str, values, num_rows: int) -> np.ndarray:
+        mask = np.zeros(num_rows, dtype=bool)
+        field_postings = self.postings.get(field_name, {})
+        for value in values:
+            try:
+                posting = field_postings.get(self._key(value))
+            except TypeError:  # Unhashable operand never matches
+                continue
+            if posting is not None and len(posting):
+                mask[self._as_ids(posting)] = True
+        return mask
+
+    def _field_mask(self, field_name: str, condition, num_rows: int) -> np.ndarray:
+        if self.fields is not None and field_name not in self.fields:
+            raise ValueError(f"Metadata field is not indexed for filtering: {field_name}")
+
+        if not isinstance(condition, dict):
+            return self._values_mask(field_name, (condition,), num_rows)
+
+        field_values = [value for _, value in self.postings.get(field_name, {})]
+        mask = np.ones(num_rows, dtype=bool)
+        for op, operand in condition.items():
+            if op == "$eq":
+                mask &= self._values_mask(field_name, (operand,), num_rows)
+            elif op == "$ne":
+                mask &= ~self._values_mask(field_name, (operand,), num_rows)
+            elif op == "$in":
+                mask &= self._values_mask(field_name, operand, num_rows)
+            elif op == "$nin":
+                mask &= ~self._values_mask(field_name, operand, num_rows)
+            elif op == "$exists":
+                present = self._values_mask(field_name, field_values, num_rows)
+                mask &= present if operand else ~present
+            elif op in self.RANGE_OPS:
+                compare = self.RANGE_OPS[op]
+                matching = []
+                for value in field_values:
+                    try:
+                        if compare(value, operand):
+                            matching.append(value)
+                    except TypeError:
+                        continue
+                mask &= self._values_mask(field_name, matching, num_rows)
+            else:
+                raise ValueError(f"Unknown filter operator: {op}")
+        return mask
+
+    def compile(self, expression: Dict[str, Any], num_rows: int) -> np.ndarray:
+        """
+        Compile a filter expression into a boolean bitmap over rows
+
+        Args:
+            expression: Filter expression (see class docstring)
+            num_rows: Total number of rows
+
+        Returns:
+            Boolean numpy array, True for matching rows
+        """
+        mask = np.ones(num_rows, dtype=bool)
+        for key, condition in expression.items():
+            if key == "$and":
+                for sub in condition:
+                    mask &= self.compile(sub, num_rows)
+            elif key == "$or":
+                any_mask = np.zeros(num_rows, dtype=bool)
+                for sub in condition:
+                    any_mask |= self.compile(sub, num_rows)
+                mask &= any_mask
+            elif key == "$not":
+                mask &= ~self.compile(condition, num_rows)
+            else:
+                mask &= self._field_mask(key, condition, num_rows)
+        return mask
+
+    def save(self, directory: Path):
+        """Write postings as one int64 array plus a JSON directory of (value, offset, length)."""
+        directory = Path(directory)
+        layout: Dict[str, list] = {}
+        chunks = []
+        offset = 0
+        for field_name, field_postings in self.postings.items():
+            entries = layout.setdefault(field_name, [])
+            for (_, value), posting in field_postings.items():
+                ids = self._as_ids(posting)
+                entries.append([value, offset, len(ids)])
+                chunks.append(np.asarray(ids, dtype=np.int64))
+                offset += len(ids)
+
+        postings = np.concatenate(chunks) if chunks else np.zeros(0, dtype=np.int64)
+        with open(directory / "filter_postings.npy.tmp", "wb") as f:
+            np.save(f, postings)
+        os.replace(directory / "filter_postings.npy.tmp", directory / "filter_postings.npy")
+        with open(directory / "filter_index.json", "w") as f:
+            json.dump({"fields": self.fields, "postings": layout}, f)
+
+    @classmethod
+    def load(cls, directory: Path) -> "MetadataBitmapIndex":
+        """Memory-map postings written by save()."""
+        directory = Path(directory)
+        with open(directory / "filter_index.json") as f:
+            layout = json.load(f)
+        postings = np.load(directory / "filter_postings.npy", mmap_mode="r")
+
+        index = cls(layout["fields"])
+        for field_name, entries in layout["postings"].items():
+            index.postings[field_name] = {
+                cls._key(value): postings[offset:offset + length]
+                for value, offset, length in entries
+            }
+        return index
 
 
 # ============================================
@@ -118,13 +811,23 @@ class FAISSIndexFactory:
 # ============================================
 
 class FAISSVectorStore:
-    """FAISS vector store wrapper"""
+    """
+    FAISS vector store wrapper
+
+    Internal IDs stay stable across deletes: IVF indexes store them
+    natively, other index types are wrapped in IndexIDMap2. Deleted rows
+    become tombstones that searches skip until compact() removes them from
+    the index. Metadata is kept in a ColumnarMetadataStore and saved as
+    mmap-able columns; a MetadataBitmapIndex over metadata fields turns
+    filters into IDSelectors so filtered searches only visit matching IDs.
+    """
 
     def __init__(
         self,
         dimensions: int,
         index_type: str = "Flat",
         metric: str = "L2",
+        indexed_fields: Optional[List[str]] = None,
         **kwargs
     ):
         """
@@ -132,35 +835,107 @@ class FAISSVectorStore:
 
         Args:
             dimensions: Vector dimensions
-            index_type: Index type (Flat, IVFFlat, HNSW, IVF_PQ)
+            index_type: Index type (Flat, IVFFlat, HNSW, IVF_PQ, or
+                Factory with an ``index_string`` kwarg)
             metric: Distance metric (L2, IP)
+            indexed_fields: Metadata fields usable in filters (None = all scalar fields)
             **kwargs: Additional arguments for index creation
         """
         self.dimensions = dimensions
         self.metric = metric
         self.index_type = index_type
+        self.index_kwargs = kwargs
 
         # Create index
         factory = FAISSIndexFactory()
         if index_type == "Flat":
-            self.index = factory.create_flat(dimensions, metric)
+            base_index = factory.create_flat(dimensions, metric)
         elif index_type == "IVFFlat":
             nlist = kwargs.get("nlist", 100)
-            self.index = factory.create_ivfflat(dimensions, nlist, metric)
+            base_index = factory.create_ivfflat(dimensions, nlist, metric)
         elif index_type == "HNSW":
             M = kwargs.get("M", 32)
-            self.index = factory.create_hnsw(dimensions, M, metric)
+            base_index = factory.create_hnsw(dimensions, M, metric)
         elif index_type == "IVF_PQ":
             nlist = kwargs.get("nlist", 100)
             m = kwargs.get("m", 8)
-            self.index = factory.create_ivf_pq(dimensions, nlist, m)
+            base_index = factory.create_ivf_pq(dimensions, nlist, m)
+        elif index_type == "Factory":
+            base_index = factory.create_from_string(dimensions, kwargs["index_string"], metric)
         else:
             raise ValueError(f"Unknown index type: {index_type}")
 
+        # IVF keeps explicit IDs in its inverted lists; IndexIDMap's remove_ids
+        # assumes the wrapped index renumbers on removal, so only wrap the others
+        if isinstance(base_index, faiss.IndexIVF):
+            self.index = base_index
+        else:
+            self.index = faiss.IndexIDMap2(base_index)
+        self._init_state(
+            ColumnarMetadataStore(),
+            MetadataBitmapIndex(indexed_fields),
+            next_id=0,
+            tombstones=set()
+        )
+
+    def _init_state(
+        self,
+        metadata_store: ColumnarMetadataStore,
+        filter_index: MetadataBitmapIndex,
+        next_id: int,
+        tombstones: Set[int]
+    ):
         # Metadata storage (FAISS doesn't store metadata natively)
-        self.id_to_metadata: Dict[int, Dict] = {}
-        self.external_id_to_internal: Dict[str, int] = {}
-        self.next_id = 0
+        self.metadata_store = metadata_store
+        self.filter_index = filter_index
+        self.next_id = next_id
+        # Deleted IDs still physically present in the index
+        self.tombstones = tombstones
+        self.tuning: Optional[TuningReport] = None
+        self._lock = threading.RLock()
+        self._compaction_thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def from_tuning(
+        cls,
+        report: TuningReport,
+        dimensions: int,
+        indexed_fields: Optional[List[str]] = None
+    ) -> "FAISSVectorStore":
+        """
+        Create a store using an autotuned index string and search parameters
+
+        The report is saved as autotune.json by save() and re-applied by load().
+        """
+        store = cls(
+            dimensions,
+            index_type="Factory",
+            metric=report.metric,
+            indexed_fields=indexed_fields,
+            index_string=report.best.index_string
+        )
+        store.set_tuning(report)
+        return store
+
+    def set_tuning(self, report: TuningReport):
+        """Apply a tuning report's search parameters as the defaults."""
+        self.tuning = report
+        apply_search_params(self.index, report.best.search_params)
+
+    @property
+    def is_id_mapped(self) -> bool:
+        return isinstance(self.index, (faiss.IndexIDMap, faiss.IndexIDMap2))
+
+    @property
+    def supports_ids(self) -> bool:
+        """Whether the index accepts explicit IDs (IDMap-wrapped or IVF)."""
+        return self.is_id_mapped or isinstance(self.index, faiss.IndexIVF)
+
+    def base_index(self):
+        """The underlying index (unwrapped from IndexIDMap2)."""
+        if self.is_id_mapped:
+            return faiss.downcast_index(self.index.index)
+        return self.index
 
     def train(self, vectors: np.ndarray):
         """
@@ -174,6 +949,16 @@ class FAISSVectorStore:
             self.index.train(vectors)
             print("Training complete")
 
+    def _prepare(self, vectors: np.ndarray) -> np.ndarray:
+        # Ensure vectors are float32
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+
+        # Normalize for IP metric
+        if self.metric == "IP":
+            vectors = vectors.copy()
+            faiss.normalize_L2(vectors)
+        return vectors
+
     def add(
         self,
         vectors: np.ndarray,
@@ -183,6 +968,9 @@ class FAISSVectorStore:
         """
         Add vectors to index
 
+        An external ID that already exists is treated as an upsert: the old
+        row is tombstoned and the new vector gets a fresh internal ID.
+
         Args:
             vectors: Numpy array of vectors
             ids: Optional external IDs
@@ -191,32 +979,82 @@ class FAISSVectorStore:
         Returns:
             List of internal IDs
         """
-        # Ensure vectors are float32
-        if vectors.dtype != np.float32:
-            vectors = vectors.astype('float32')
+        vectors = self._prepare(vectors)
+
+        with self._lock:
+            # Train if needed
+            if not self.index.is_trained:
+                self.train(vectors)
+
+            start_id = self.next_id
+            internal_ids = np.arange(start_id, start_id + len(vectors), dtype=np.int64)
+
+            # Add to index
+            if self.supports_ids:
+                self.index.add_with_ids(vectors, internal_ids)
+            else:
+                self.index.add(vectors)
+
+            # Store metadata; row number == internal ID
+            for i in range(len(vectors)):
+                external_id = ids[i] if ids else None
+                if external_id is not None:
+                    previous = self.metadata_store.lookup(external_id)
+                    if previous is not None:
+                        self._tombstone(previous)
+                metadata = metadatas[i] if metadatas else None
+                row = self.metadata_store.append(metadata, external_id)
+                assert row == internal_ids[i]
+                self.filter_index.add(row, metadata)
+
+            self.next_id = start_id + len(vectors)
+            return internal_ids.tolist()
+
+    def upsert(
+        self,
+        vectors: np.ndarray,
+        ids: List[str],
+        metadatas: Optional[List[Dict]] = None
+    ) -> List[int]:
+        """
+        Insert or replace vectors by external ID
 
-        # Normalize for IP metric
-        if self.metric == "IP":
-            faiss.normalize_L2(vectors)
+        Returns:
+            List of new internal IDs
+        """
+        return self.add(vectors, ids=ids, metadatas=metadatas)
 
-        # Train if needed
-        if not self.index.is_trained:
-            self.train(vectors)
+    def _tombstone(self, internal_id: int):
+        self.metadata_store.mark_deleted(internal_id)
+        self.tombstones.add(internal_id)
 
-        # Add to index
-        start_id = self.next_id
-        self.index.add(vectors)
+    def delete(self, ids: List[str]) -> int:
+        """
+        Delete vectors by external ID
 
-        # Store metadata
-        internal_ids = list(range(start_id, start_id + len(vectors)))
-        for i, internal_id in enumerate(internal_ids):
-            if metadatas:
-                self.id_to_metadata[internal_id] = metadatas[i]
-            if ids:
-                self.external_id_to_internal[ids[i]] = internal_id
+        Deleted vectors are hidden from search immediately and physically
+        removed by compact().
 
-        self.next_id = start_id + len(vectors)
-        return internal_ids
+        Returns:
+            Number of vectors deleted
+        """
+        deleted = 0
+        with self._lock:
+            for external_id in ids:
+                row = self.metadata_store.lookup(external_id)
+                if row is not None:
+                    self._tombstone(row)
+                    deleted += 1
+        return deleted
+
+    def _search_params(self, nprobe: Optional[int] = None, sel=None):
+        """Build SearchParameters of the right subclass for the base index."""
+        base = self.base_index()
+        if isinstance(base, faiss.IndexIVF):
+            return faiss.SearchParametersIVF(sel=sel, nprobe=nprobe or base.nprobe)
+        if isinstance(base, faiss.IndexHNSW):
+            return faiss.SearchParametersHNSW(sel=sel, efSearch=base.hnsw.efSearch)
+        return faiss.SearchParameters(sel=sel)
 
     def search(
         self,
@@ -235,38 +1073,144 @@ class FAISSVectorStore:
         Returns:
             Tuple of (distances, indices)
         """
-        # Ensure float32
-        if query_vectors.dtype != np.float32:
-            query_vectors = query_vectors.astype('float32')
+        query_vectors = self._prepare(query_vectors)
+
+        with self._lock:
+            if not self.tombstones:
+                # Set nprobe for IVF indices
+                base = self.base_index()
+                if nprobe and hasattr(base, 'nprobe'):
+                    base.nprobe = nprobe
+                return self.index.search(query_vectors, k)
+
+            # Skip tombstoned IDs inside the index scan
+            tombstone_ids = np.fromiter(self.tombstones, dtype=np.int64)
+            excluded = faiss.IDSelectorBatch(tombstone_ids)
+            sel = faiss.IDSelectorNot(excluded)
+            params = self._search_params(nprobe, sel)
+            distances, indices = self.index.search(query_vectors, k, params=params)
+            return distances, indices
+
+    def filtered_search(
+        self,
+        query_vectors: np.ndarray,
+        filter: Dict[str, Any],
+        k: int = 10,
+        nprobe: Optional[int] = None,
+        brute_force_threshold: int = 2048
+    ) -> tuple:
+        """
+        Search only vectors whose metadata matches a filter expression
 
-        # Normalize for IP
-        if self.metric == "IP":
-            faiss.normalize_L2(query_vectors)
+        The filter is compiled against the bitmap index into an
+        IDSelectorBitmap, so the ANN scan skips non-matching IDs instead of
+        over-fetching and post-filtering. When only a handful of rows match,
+        exact distances are computed over that subset instead.
+
+        Compiling the filter and the live mask allocates O(N) boolean arrays
+        per call (cheap vectorized passes, but not proportional to the
+        number of matches); only the postings scatter and the small-subset
+        scoring scale with the match count.
 
-        # Set nprobe for IVF indices
-        if nprobe and hasattr(self.index, 'nprobe'):
-            self.index.nprobe = nprobe
+        Args:
+            query_vectors: Query vectors (numpy array)
+            filter: Filter expression (see MetadataBitmapIndex)
+            k: Number of results
+            nprobe: Number of clusters to search (IVF only)
+            brute_force_threshold: Match count at or below which the
+                subset is scored exhaustively
+
+        Returns:
+            Tuple of (distances, indices), padded with -1 like FAISS
+        """
+        query_vectors = self._prepare(query_vectors)
 
-        # Search
-        distances, indices = self.index.search(query_vectors, k)
+        with self._lock:
+            num_rows = len(self.metadata_store)
+            mask = self.filter_index.compile(filter, num_rows)
+            mask &= self.metadata_store.live_mask()
+            matching = np.flatnonzero(mask)
+
+            if len(matching) == 0:
+                return (
+                    np.full((len(query_vectors), k), np.inf, dtype=np.float32),
+                    np.full((len(query_vectors), k), -1, dtype=np.int64)
+                )
+
+            if len(matching) <= brute_force_threshold:
+                return self._search_subset(query_vectors, matching, k)
+
+            bitmap = np.packbits(mask, bitorder="little")
+            sel = faiss.IDSelectorBitmap(num_rows, faiss.swig_ptr(bitmap))
+            params = self._search_params(nprobe, sel)
+            return self.index.search(query_vectors, k, params=params)
+
+    def _search_subset(
+        self,
+        query_vectors: np.ndarray,
+        ids: np.ndarray,
+        k: int
+    ) -> tuple:
+        """
+        Top-k over a small set of IDs, scored directly against their vectors
+
+        Vectors are reconstructed by ID, so the cost is proportional to the
+        subset, not the index. For compressed codes (PQ, SQ) the scores are
+        against the decoded vectors, so they stay approximate.
+        """
+        ivf = faiss.try_extract_index_ivf(self.base_index())
+        if ivf is not None and ivf.direct_map.no():
+            # IVF needs an ID -> list entry map to reconstruct; built once
+            # and kept up to date by later adds and removes
+            ivf.set_direct_map_type(faiss.DirectMap.Hashtable)
+
+        vectors = self._reconstruct(self.index, ids)
+        if self.metric == "IP":
+            scores = query_vectors @ vectors.T
+            order = np.argsort(-scores, axis=1)[:, :k]
+        else:
+            scores = (
+                (query_vectors ** 2).sum(axis=1, keepdims=True)
+                - 2 * query_vectors @ vectors.T
+                + (vectors ** 2).sum(axis=1)
+            )
+            order = np.argsort(scores, axis=1)[:, :k]
+
+        distances = np.full((len(query_vectors), k), np.inf, dtype=np.float32)
+        indices = np.full((len(query_vectors), k), -1, dtype=np.int64)
+        found = order.shape[1]
+        distances[:, :found] = np.take_along_axis(scores, order, axis=1)
+        indices[:, :found] = ids[order]
         return distances, indices
 
     def search_with_metadata(
         self,
         query_vectors: np.ndarray,
         k: int = 10,
-        nprobe: Optional[int] = None
+        nprobe: Optional[int] = None,
+        filter: Optional[Dict[str, Any]] = None
     ) -> List[List[Dict]]:
         """
         Search and return results with metadata
 
+        Args:
+            query_vectors: Query vectors (numpy array)
+            k: Number of results
+            nprobe: Number of clusters to search (IVF only)
+            filter: Optional metadata filter expression, applied before the
+                ANN scan (see MetadataBitmapIndex for the syntax)
+
         Returns:
             List of result lists, each containing dicts with:
                 - id: Internal ID
+                - external_id: External ID (if one was given)
                 - distance: Distance/score
                 - metadata: Associated metadata
         """
-        distances, indices = self.search(query_vectors, k, nprobe)
+        if filter:
+            distances, indices = self.filtered_search(query_vectors, filter, k, nprobe)
+        else:
+            distances, indices = self.search(query_vectors, k, nprobe)
 
         results = []
         for query_distances, query_indices in zip(distances, indices):
@@ -275,78 +1219,231 @@ class FAISSVectorStore:
                 if idx != -1:  # Valid result
                     result = {
                         "id": int(idx),
+                        "external_id": self.metadata_store.get_external_id(int(idx)),
                         "distance": float(dist),
-                        "metadata": self.id_to_metadata.get(int(idx), {})
+                        "metadata": self.metadata_store.get_metadata(int(idx))
                     }
                     query_results.append(result)
             results.append(query_results)
 
         return results
 
-    def save(self, path: str):
+    # ----------------------------------------
+    # Compaction
+    # ----------------------------------------
+
+    def compact(self, background: bool = False) -> Optional[threading.Thread]:
         """
-        Save index and metadata to disk
+        Physically remove tombstoned vectors from the index
+
+        IVF and IDMap-wrapped Flat indexes drop tombstones in place with
+        remove_ids(). HNSW (which cannot remove) and legacy Flat/HNSW
+        indexes saved without IDs are rebuilt
+        from reconstructed vectors; adds and deletes that land during the
+        rebuild are replayed before the new index is swapped in.
 
         Args:
-            path: Path to save (without extension)
+            background: Run in a daemon thread and return it
+
+        Returns:
+            The compaction thread when background=True
         """
-        path = Path(path)
-        path.parent.mkdir(parents=True, exist_ok=True)
+        if background:
+            if self._compaction_thread and self._compaction_thread.is_alive():
+                return self._compaction_thread
+            self._compaction_thread = threading.Thread(target=self.compact, daemon=True)
+            self._compaction_thread.start()
+            return self._compaction_thread
+
+        with self._lock:
+            if not self.tombstones:
+                return None
+            if self.supports_ids and not isinstance(self.base_index(), faiss.IndexHNSW):
+                purge = np.fromiter(self.tombstones, dtype=np.int64)
+                ivf = faiss.try_extract_index_ivf(self.base_index())
+                if ivf is not None and ivf.direct_map.type == faiss.DirectMap.Hashtable:
+                    # The ID hashtable (see _search_subset) only removes by ID list
+                    removed = self.index.remove_ids(faiss.IDSelectorArray(purge))
+                else:
+                    removed = self.index.remove_ids(faiss.IDSelectorBatch(purge))
+                self.tombstones.clear()
+                print(f"Compacted {removed} tombstoned vectors")
+                return None
+
+        self._rebuild()
+        return None
+
+    def _present_ids(self, index) -> np.ndarray:
+        if isinstance(index, (faiss.IndexIDMap, faiss.IndexIDMap2)):
+            return faiss.vector_to_array(index.id_map).astype(np.int64)
+        return np.arange(index.ntotal, dtype=np.int64)
+
+    def _reconstruct(self, index, ids: np.ndarray) -> np.ndarray:
+        if len(ids) == 0:
+            return np.zeros((0, self.dimensions), dtype=np.float32)
+        return index.reconstruct_batch(np.ascontiguousarray(ids, dtype=np.int64))
+
+    def _rebuild(self):
+        """Rebuild the index without tombstones (HNSW and legacy Flat layouts)."""
+        # The surviving vectors are copied out under the lock: add() mutates
+        # old_index in place, so it must not be read concurrently. Only the
+        # (expensive) build of the new index runs unlocked.
+        with self._lock:
+            old_index = self.index
+            snapshot_next_id = self.next_id
+            purge = set(self.tombstones)
+            present = self._present_ids(old_index)
+            keep = present[~np.isin(present, np.fromiter(purge, dtype=np.int64, count=len(purge)))]
+            kept_vectors = self._reconstruct(old_index, keep)
+
+        new_base = faiss.clone_index(
+            faiss.downcast_index(old_index.index)
+            if isinstance(old_index, (faiss.IndexIDMap, faiss.IndexIDMap2)) else old_index
+        )
+        new_base.reset()
+        new_index = faiss.IndexIDMap2(new_base)
+        new_index.add_with_ids(kept_vectors, keep)
+        del kept_vectors
+
+        with self._lock:
+            # Replay rows added while the rebuild ran
+            late = np.arange(snapshot_next_id, self.next_id, dtype=np.int64)
+            if len(late):
+                new_index.add_with_ids(self._reconstruct(old_index, late), late)
+            self.index = new_index
+            self.tombstones -= purge
+
+        print(f"Rebuilt index without {len(purge)} tombstoned vectors")
+
+    # ----------------------------------------
+    # Persistence
+    # ----------------------------------------
 
-        # Save index
-        faiss.write_index(self.index, str(path) + ".index")
+    def save(self, path: str):
+        """
+        Save index and metadata to a directory
 
-        # Save metadata
-        metadata = {
-            "id_to_metadata": self.id_to_metadata,
-            "external_id_to_internal": self.external_id_to_internal,
-            "next_id": self.next_id,
-            "dimensions": self.dimensions,
-            "metric": self.metric,
-            "index_type": self.index_type
-        }
-        with open(str(path) + ".meta", "wb") as f:
-            pickle.dump(metadata, f)
+        Layout:
+            index.faiss       - FAISS index (IVF or IndexIDMap2)
+            store.json        - store settings and counters
+            tombstones.npy    - deleted IDs not yet compacted
+            autotune.json     - autotune report, if the store was tuned
+            filter_*          - metadata filter postings (see MetadataBitmapIndex)
+            *.npy / *.bin     - columnar metadata (see ColumnarMetadataStore)
 
-        print(f"Saved to {path}.index and {path}.meta")
+        Args:
+            path: Directory to save into
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+
+        with self._lock:
+            # Save index
+            tmp_index = path / "index.faiss.tmp"
+            faiss.write_index(self.index, str(tmp_index))
+            os.replace(tmp_index, path / "index.faiss")
+
+            # Save metadata
+            self.metadata_store.save(path)
+            self.filter_index.save(path)
+            np.save(path / "tombstones.npy", np.fromiter(self.tombstones, dtype=np.int64))
+            if self.tuning is not None:
+                self.tuning.save(str(path / "autotune.json"))
+            with open(path / "store.json", "w") as f:
+                json.dump({
+                    "next_id": self.next_id,
+                    "dimensions": self.dimensions,
+                    "metric": self.metric,
+                    "index_type": self.index_type,
+                    "index_kwargs": self.index_kwargs
+                }, f)
+
+        print(f"Saved to {path}/")
 
     @classmethod
-    def load(cls, path: str):
+    def load(cls, path: str, mmap_index: bool = False):
         """
         Load index and metadata from disk
 
+        Metadata columns are memory-mapped, so load time does not grow with
+        the number of metadata entries. Stores written by the older
+        ``<path>.index`` + ``<path>.meta`` pickle layout are still readable
+        and are migrated to the columnar layout on the next save().
+
         Args:
-            path: Path to load (without extension)
+            path: Directory written by save() (or legacy path without extension)
+            mmap_index: Ask FAISS to mmap the index file instead of reading it
+                (only some index types support this; falls back to a full read)
 
         Returns:
             FAISSVectorStore instance
         """
         path = Path(path)
-
-        # Load index
-        index = faiss.read_index(str(path) + ".index")
-
-        # Load metadata
-        with open(str(path) + ".meta", "rb") as f:
-            metadata = pickle.load(f)
+        if (path / "store.json").exists():
+            with open(path / "store.json") as f:
+                settings = json.load(f)
+            index = cls._read_index(path / "index.faiss", mmap_index)
+            metadata_store = ColumnarMetadataStore.load(path)
+            tombstones = set(np.load(path / "tombstones.npy").tolist())
+            if (path / "filter_index.json").exists():
+                filter_index = MetadataBitmapIndex.load(path)
+            else:
+                filter_index = cls._build_filter_index(metadata_store)
+        else:
+            index, settings, metadata_store, tombstones = cls._load_legacy(path)
+            filter_index = cls._build_filter_index(metadata_store)
 
         # Create instance
         store = cls.__new__(cls)
         store.index = index
-        store.id_to_metadata = metadata["id_to_metadata"]
-        store.external_id_to_internal = metadata["external_id_to_internal"]
-        store.next_id = metadata["next_id"]
-        store.dimensions = metadata["dimensions"]
-        store.metric = metadata["metric"]
-        store.index_type = metadata["index_type"]
+        store.dimensions = settings["dimensions"]
+        store.metric = settings["metric"]
+        store.index_type = settings["index_type"]
+        store.index_kwargs = settings.get("index_kwargs", {})
+        store._init_state(metadata_store, filter_index, settings["next_id"], tombstones)
+        if (path / "autotune.json").exists():
+            store.set_tuning(TuningReport.load(str(path / "autotune.json")))
 
         print(f"Loaded from {path}")
         return store
 
+    @staticmethod
+    def _build_filter_index(metadata_store: ColumnarMetadataStore) -> MetadataBitmapIndex:
+        """Index every row's metadata (for stores saved without filter postings)."""
+        filter_index = MetadataBitmapIndex()
+        for row in range(len(metadata_store)):
+            filter_index.add(row, metadata_store.get_metadata(row))
+        return filter_index
+
+    @staticmethod
+    def _read_index(index_path: Path, mmap_index: bool):
+        if mmap_index:
+            try:
+                return faiss.read_index(str(index_path), faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY)
+            except RuntimeError as e:
+                print(f"mmap not supported for this index type, reading fully: {e}")
+        return faiss.read_index(str(index_path))
+
+    @staticmethod
+    def _load_legacy(path: Path):
+        """Read the older pickle layout (<path>.index + <path>.meta)."""
+        index = faiss.read_index(str(path) + ".index")
+        with open(str(path) + ".meta", "rb") as f:
+            metadata = pickle.load(f)
+
+        metadata_store = ColumnarMetadataStore.from_dicts(
+            metadata["next_id"],
+            metadata["id_to_metadata"],
+            metadata["external_id_to_internal"]
+        )
+        return index, metadata, metadata_store, set()
+
     def get_stats(self) -> Dict:
         """Get index statistics"""
         return {
             "total_vectors": self.index.ntotal,
+            "live_vectors": self.index.ntotal - len(self.tombstones),
+            "tombstones": len(self.tombstones),
             "is_trained": self.index.is_trained,
             "dimensions": self.dimensions,
             "metric": self.metric,
@@ -409,6 +1506,20 @@ if __name__ == "__main__":
     # Save
     store.save("./faiss_index")
 
+    # Example 1b: Filtered search (pre-filter, no over-fetch)
+    tagged = FAISSVectorStore(dimensions=128, index_type="Flat")
+    tagged.add(vectors, metadatas=[
+        {"category": ["ml", "rag", "nlp"][i % 3], "year": 2020 + i % 6}
+        for i in range(1000)
+    ])
+    filtered = tagged.search_with_metadata(
+        query, k=5,
+        filter={"category": {"$in": ["ml", "rag"]}, "year": {"$gte": 2023}}
+    )
+    print("Filtered results:")
+    for result in filtered[0]:
+        print(f"  ID: {result['id']}, Metadata: {result['metadata']}")
+
     # Example 2: IVFFlat index (approximate search)
     print("\nExample 2: IVFFlat Index")
     store2 = FAISSVectorStore(
@@ -434,11 +1545,36 @@ if __name__ == "__main__":
     )
     store3.add(vectors[:500])  # Add half the data
 
-    # Example 4: Load saved index
+    # Example 4: Load saved index (metadata is memory-mapped)
     print("\nExample 4: Load Index")
     loaded_store = FAISSVectorStore.load("./faiss_index")
     print(f"Loaded index stats: {loaded_store.get_stats()}")
 
+    # Example 4b: Incremental upsert, delete and compaction
+    print("\nExample 4b: Upsert / Delete / Compact")
+    doc_store = FAISSVectorStore(dimensions=128, index_type="Flat")
+    doc_ids = [f"doc-{i}" for i in range(1000)]
+    doc_store.add(vectors, ids=doc_ids, metadatas=metadatas)
+    doc_store.upsert(vectors[:1], ids=["doc-0"], metadatas=[{"text": "Document 0 v2"}])
+    doc_store.delete(["doc-1", "doc-2"])
+    print(f"Before compaction: {doc_store.get_stats()}")
+    doc_store.compact(background=True).join()
+    print(f"After compaction: {doc_store.get_stats()}")
+
+    # Example 4c: Autotune index type and search parameters
+    print("\nExample 4c: Autotune")
+    sample_queries = np.random.random((100, 128)).astype('float32')
+    report = FAISSIndexFactory.autotune(
+        vectors,
+        sample_queries,
+        recall_target=0.9,
+        memory_budget_bytes=64 * 1024 * 1024,
+        corpus_size=100_000  # Memory is projected from the sample to this size
+    )
+    tuned_store = FAISSVectorStore.from_tuning(report, dimensions=128)
+    tuned_store.add(vectors, metadatas=metadatas)
+    tuned_store.save("./faiss_tuned")  # writes autotune.json next to the index
+
     # Example 5: Cosine similarity (using IP with normalized vectors)
     print("\nExample 5: Cosine Similarity")
     store5 = FAISSVectorStore(
@@ -4,7 +4,10 @@ Functional documentation scraper with rate limiting and error handling
 
 Features:
 - Playwright-based scraping for JavaScript-heavy sites
-- Automatic rate limiting (respectful crawling)
+- Concurrent crawling with a pool of reused browser pages
+- Per-host rate limiting (token buckets) and concurrency caps
+- Per-host queues: workers only take URLs from hosts with a free slot
+- URL normalization with dedup at enqueue time
 - Error handling with retries
 - Content deduplication
 - Markdown conversion
@@ -17,9 +20,10 @@ import argparse
 import json
 import hashlib
 import time
+from collections import deque
 from pathlib import Path
-from typing import Set, Dict, List, Optional
-from urllib.parse import urljoin, urlparse
+from typing import Deque, Set, Dict, List, Optional, Tuple
+from urllib.parse import urljoin, urlparse, urlunparse, parse_qsl, urlencode
 from datetime import datetime
 
 from playwright.async_api import async_playwright, Page, Browser
@@ -27,6 +31,166 @@ from markdownify import markdownify as md
 from tqdm import tqdm
 
 
+DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of a URL for deduplication
+
+    Lowercases scheme and host, drops default ports and fragments, uses
+    "/" for an empty path and sorts query parameters.
+    """
+    parsed = urlparse(url)
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or "").lower()
+    if parsed.port and parsed.port != DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parsed.port}"
+    if parsed.username:
+        credentials = parsed.username + (f":{parsed.password}" if parsed.password else "")
+        host = f"{credentials}@{host}"
+    query = urlencode(sorted(parse_qsl(parsed.query, keep_blank_values=True)))
+    return urlunparse((scheme, host, parsed.path or "/", parsed.params, query, ""))
+
+
+class TokenBucket:
+    """Async token bucket: `rate` requests per second, bursts up to `capacity`"""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until a token is available and take it"""
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+
+class HostLimiter:
+    """
+    Per-host politeness: a token bucket and a concurrency cap for each host
+
+    Slots are taken without blocking (try_acquire), so the frontier can skip
+    a busy host and hand the worker a URL from another one.
+    """
+
+    def __init__(self, rate_limit: float, max_concurrent: int, burst: float = 1.0):
+        """
+        Args:
+            rate_limit: Seconds between requests to the same host (0 = unlimited)
+            max_concurrent: Requests in flight per host
+            burst: Requests a host may receive back to back after idling
+        """
+        self.rate_limit = rate_limit
+        self.max_concurrent = max_concurrent
+        self.burst = burst
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._in_flight: Dict[str, int] = {}
+
+    def has_capacity(self, host: str) -> bool:
+        return self._in_flight.get(host, 0) < self.max_concurrent
+
+    def try_acquire(self, host: str) -> bool:
+        """Take a concurrency slot for the host if one is free"""
+        if not self.has_capacity(host):
+            return False
+        self._in_flight[host] = self._in_flight.get(host, 0) + 1
+        if self.rate_limit > 0 and host not in self._buckets:
+            self._buckets[host] = TokenBucket(1.0 / self.rate_limit, self.burst)
+        return True
+
+    async def throttle(self, host: str):
+        """Wait for the host's rate limit (call while holding a slot)"""
+        bucket = self._buckets.get(host)
+        if bucket is not None:
+            await bucket.acquire()
+
+    def release(self, host: str):
+        self._in_flight[host] -= 1
+        if not self._in_flight[host]:
+            del self._in_flight[host]
+
+
+class CrawlFrontier:
+    """
+    Per-host FIFO queues (breadth-first within a host) with dedup at enqueue time.
+
+    URLs are normalized before the seen-check, so each page is queued once
+    no matter how many pages link to it. get() only dequeues from hosts
+    with a free slot in the HostLimiter, rotating between them, so one
+    busy host cannot hold up workers that could fetch from another.
+    Task accounting (task_done / join) tells the workers when the crawl
+    is finished.
+    """
+
+    def __init__(self, host_limiter: HostLimiter):
+        self.host_limiter = host_limiter
+        self._queues: Dict[str, Deque[Tuple[str, int]]] = {}
+        self._ready = asyncio.Event()
+        self._finished = asyncio.Event()
+        self._finished.set()
+        self._unfinished = 0
+        self._size = 0
+        self.seen: Set[str] = set()
+
+    def add(self, url: str, depth: int) -> bool:
+        """Queue a URL unless it was queued before; returns True if queued"""
+        url = normalize_url(url)
+        if url in self.seen:
+            return False
+        self.seen.add(url)
+        self._queues.setdefault(urlparse(url).netloc, deque()).append((url, depth))
+        self._size += 1
+        self._unfinished += 1
+        self._finished.clear()
+        self._ready.set()
+        return True
+
+    async def get(self) -> Tuple[str, int]:
+        """
+        Next URL from a host with capacity; its slot is taken for the caller
+
+        Release it with release(host) once the fetch is done.
+        """
+        while True:
+            for host in list(self._queues):
+                if self.host_limiter.try_acquire(host):
+                    queue = self._queues.pop(host)
+                    item = queue.popleft()
+                    if queue:
+                        self._queues[host] = queue  # Back of the rotation
+                    self._size -= 1
+                    return item
+            self._ready.clear()
+            await self._ready.wait()
+
+    def release(self, host: str):
+        """Free the host's slot and wake workers waiting for a host"""
+        self.host_limiter.release(host)
+        self._ready.set()
+
+    def task_done(self):
+        self._unfinished -= 1
+        if not self._unfinished:
+            self._finished.set()
+
+    async def join(self):
+        await self._finished.wait()
+
+    def __len__(self) -> int:
+        return self._size
+
+
 class DocumentationScraper:
     """Scrape documentation sites with rate limiting"""
 
@@ -37,16 +201,32 @@ class DocumentationScraper:
         max_depth: int = 3,
         rate_limit: float = 2.0,
         same_domain_only: bool = True,
+        max_concurrent: int = 4,
+        max_per_domain: int = 2,
+        burst: float = 1.0,
     ):
-        self.start_url = start_url
+        """
+        Args:
+            start_url: Page to start crawling from
+            output_dir: Where to write markdown, page JSON and the index
+            max_depth: Link depth to follow from the start page
+            rate_limit: Seconds between requests to the same host
+            same_domain_only: Only follow links on the start URL's host
+            max_concurrent: Browser pages (workers) fetching at once
+            max_per_domain: Requests in flight per host
+            burst: Requests a host may receive back to back after idling
+        """
+        self.start_url = normalize_url(start_url)
         self.output_dir = Path(output_dir)
         self.max_depth = max_depth
         self.rate_limit = rate_limit
         self.same_domain_only = same_domain_only
+        self.max_concurrent = max_concurrent
 
         # State tracking
         self.visited_urls: Set[str] = set()
-        self.url_queue: List[tuple] = [(start_url, 0)]  # (url, depth)
+        self.host_limiter = HostLimiter(rate_limit, max_per_domain, burst)
+        self.frontier = CrawlFrontier(self.host_limiter)
         self.scraped_count = 0
         self.error_count = 0
 
@@ -56,14 +236,15 @@ class DocumentationScraper:
         self.cache_dir.mkdir(exist_ok=True)
 
         # Domain filtering
-        self.start_domain = urlparse(start_url).netloc
+        self.start_domain = urlparse(self.start_url).netloc
 
     async def scrape(self):
         """Main scraping orchestrator"""
         print(f"Starting documentation scraper")
         print(f"Start URL: {self.start_url}")
         print(f"Max depth: {self.max_depth}")
-        print(f"Rate limit: {self.rate_limit}s between requests")
+        print(f"Rate limit: {self.rate_limit}s between requests per host")
+        print(f"Concurrency: {self.max_concurrent} pages, {self.host_limiter.max_concurrent} per host")
         print(f"Output: {self.output_dir}")
         print("")
 
@@ -71,7 +252,7 @@ class DocumentationScraper:
             browser = await p.chromium.launch(headless=True)
 
             try:
-                await self._scrape_recursive(browser)
+                await self._crawl(browser)
             finally:
                 await browser.close()
 
@@ -86,58 +267,78 @@ class DocumentationScraper:
         print(f"Output directory: {self.output_dir}")
         print("=" * 50)
 
-    async def _scrape_recursive(self, browser: Browser):
-        """Recursively scrape pages"""
+    def _enqueue(self, url: str, depth: int):
+        """Filter and queue a discovered link"""
+        if depth > self.max_depth:
+            return
+        url = normalize_url(url)
+        if self.same_domain_only and urlparse(url).netloc != self.start_domain:
+            return
+        self.frontier.add(url, depth)
+
+    async def _crawl(self, browser: Browser):
+        """Crawl breadth-first with a pool of workers, each reusing one page"""
         pbar = tqdm(desc="Scraping pages", unit="page")
+        context = await browser.new_context()
+        self.frontier.add(self.start_url, 0)
 
-        while self.url_queue:
-            url, depth = self.url_queue.pop(0)
-
-            # Skip if already visited
-            if url in self.visited_urls:
-                continue
-
-            # Skip if max depth exceeded
-            if depth > self.max_depth:
-                continue
-
-            # Skip if different domain (if filtering enabled)
-            if self.same_domain_only and urlparse(url).netloc != self.start_domain:
-                continue
-
-            # Mark as visited
-            self.visited_urls.add(url)
-
-            # Rate limiting
-            await asyncio.sleep(self.rate_limit)
-
-            # Scrape page
-            try:
-                page_data = await self._scrape_page(browser, url, depth)
+        workers = [
+            asyncio.create_task(self._worker(context, pbar))
+            for _ in range(self.max_concurrent)
+        ]
+        try:
+            await self.frontier.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+            await context.close()
+            pbar.close()
+
+    async def _worker(self, context, pbar: tqdm):
+        """Fetch URLs from hosts with free slots until cancelled"""
+        page = await context.new_page()
+        try:
+            while True:
+                url, depth = await self.frontier.get()
+                try:
+                    if page.is_closed():  # Crashed or closed by the site
+                        page = await context.new_page()
+                    await self._visit(page, url, depth, pbar)
+                finally:
+                    self.frontier.release(urlparse(url).netloc)
+                    self.frontier.task_done()
+        finally:
+            if not page.is_closed():
+                await page.close()
 
-                if page_data:
-                    # Save page
-                    self._save_page(page_data)
-                    self.scraped_count += 1
-                    pbar.update(1)
+    async def _visit(self, page: Page, url: str, depth: int, pbar: tqdm):
+        """Scrape one URL; the worker holds its host's slot"""
+        host = urlparse(url).netloc
+        self.visited_urls.add(url)
 
-                    # Add links to queue
-                    for link in page_data.get("links", []):
-                        if link not in self.visited_urls:
-                            self.url_queue.append((link, depth + 1))
+        try:
+            await self.host_limiter.throttle(host)
+            page_data = await self._scrape_page(page, url, depth)
+        except Exception as e:
+            print(f"\nError scraping {url}: {e}")
+            self.error_count += 1
+            return
 
-            except Exception as e:
-                print(f"\nError scraping {url}: {e}")
-                self.error_count += 1
+        if page_data:
+            # Save page
+            self._save_page(page_data)
+            self.scraped_count += 1
+            pbar.update(1)
 
-        pbar.close()
+            # Add links to queue
+            for link in page_data.get("links", []):
+                self._enqueue(link, depth + 1)
 
     async def _scrape_page(
-        self, browser: Browser, url: str, depth: int
+        self, page: Page, url: str, depth: int
     ) -> Optional[Dict]:
-        """Scrape a single page"""
-        page = await browser.new_page()
-
+        """Scrape a single page into a reused browser page"""
         try:
             # Navigate to page
             response = await page.goto(url, wait_until="networkidle", timeout=30000)
@@ -180,35 +381,28 @@ class DocumentationScraper:
             print(f"\nError processing {url}: {e}")
             return None
 
-        finally:
-            await page.close()
-
     async def _extract_metadata(self, page: Page) -> Dict:
         """Extract page metadata"""
         metadata = {}
 
         try:
-            # Open Graph tags
-            og_title = await page.locator('meta[property="og:title"]').get_attribute(
-                "content"
-            )
-            og_desc = await page.locator(
-                'meta[property="og:description"]'
-            ).get_attribute("content")
-
-            # Standard meta tags
-            description = await page.locator('meta[name="description"]').get_attribute(
-                "content"
-            )
-            keywords = await page.locator('meta[name="keywords"]').get_attribute(
-                "content"
+            # One round trip; missing tags come back as None instead of
+            # waiting out a locator timeout
+            metadata = await page.evaluate(
+                """() => {
+                    const meta = (selector) => {
+                        const element = document.querySelector(selector);
+                        return element ? element.getAttribute("content") : null;
+                    };
+                    return {
+                        og_title: meta('meta[property="og:title"]'),
+                        og_description: meta('meta[property="og:description"]'),
+                        description: meta('meta[name="description"]'),
+                        keywords: meta('meta[name="keywords"]'),
+                    };
+                }"""
             )
 
-            metadata["og_title"] = og_title
-            metadata["og_description"] = og_desc
-            metadata["description"] = description
-            metadata["keywords"] = keywords
-
         except Exception:
             pass  # Metadata is optional
 
@@ -219,11 +413,12 @@ class DocumentationScraper:
         links = []
 
         try:
-            link_elements = await page.locator("a[href]").all()
-
-            for element in link_elements:
-                href = await element.get_attribute("href")
+            # Raw hrefs of every anchor in one round trip
+            hrefs = await page.eval_on_selector_all(
+                "a[href]", "elements => elements.map(e => e.getAttribute('href'))"
+            )
 
+            for href in hrefs:
                 if href:
                     # Make absolute URL
                     absolute_url = urljoin(base_url, href)
@@ -302,7 +497,19 @@ async def main():
     )
     parser.add_argument("--max-depth", type=int, default=3, help="Maximum crawl depth")
     parser.add_argument(
-        "--rate-limit", type=float, default=2.0, help="Seconds between requests"
+        "--rate-limit", type=float, default=2.0, help="Seconds between requests per host"
+    )
+    parser.add_argument(
+        "--max-concurrent", type=int, default=4, help="Pages fetched at once"
+    )
+    parser.add_argument(
+        "--max-per-domain", type=int, default=2, help="Requests in flight per host"
+    )
+    parser.add_argument(
+        "--burst",
+        type=float,
+        default=1.0,
+        help="Requests a host may receive back to back after idling",
     )
     parser.add_argument(
         "--all-domains",
@@ -318,6 +525,9 @@ async def main():
         max_depth=args.max_depth,
         rate_limit=args.rate_limit,
         same_domain_only=not args.all_domains,
+        max_concurrent=args.max_concurrent,
+        max_per_domain=args.max_per_domain,
+        burst=args.burst,
     )
 
     await scraper.scrape()
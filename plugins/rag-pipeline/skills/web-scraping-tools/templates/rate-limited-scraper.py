@@ -3,10 +3,11 @@
 Rate-Limited Scraper Template
 
 Features:
-- Configurable request delays
+- Configurable request delays, enforced per host
+- Many hosts crawled in parallel (per-host queues)
 - Exponential backoff on errors
-- Request queue management
-- robots.txt respect
+- robots.txt respect (parsed once per host, cached with a TTL)
+- Tuned connection pool (limits, keep-alive, DNS cache)
 - User-agent rotation
 - Request logging
 """
@@ -15,8 +16,9 @@ import asyncio
 import time
 import random
 import logging
+from collections import deque
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Deque, List, Dict, Optional, Tuple
 from datetime import datetime
 from urllib.parse import urlparse, urljoin
 from urllib.robotparser import RobotFileParser
@@ -33,28 +35,37 @@ logger = logging.getLogger(__name__)
 
 
 class RateLimiter:
-    """Rate limiter with configurable delays and jitter"""
+    """Rate limiter with configurable delays and jitter (safe to share between tasks)"""
 
     def __init__(self, requests_per_second: float = 0.5, jitter: bool = True):
         self.delay = 1.0 / requests_per_second
         self.jitter = jitter
+        # True when delay is a floor we must not undercut (robots.txt Crawl-delay)
+        self.delay_is_minimum = False
         self.last_request = None
+        self._lock = asyncio.Lock()
+
+    def set_crawl_delay(self, delay: float):
+        """Use a robots.txt Crawl-delay: jitter may lengthen it but never shorten it"""
+        self.delay = delay
+        self.delay_is_minimum = True
 
     async def wait(self):
         """Wait before making next request"""
-        if self.last_request is not None:
-            elapsed = time.time() - self.last_request
-            wait_time = self.delay - elapsed
+        async with self._lock:
+            if self.last_request is not None:
+                elapsed = time.monotonic() - self.last_request
+                wait_time = self.delay - elapsed
 
-            if wait_time > 0:
-                # Add random jitter (±20%)
-                if self.jitter:
-                    jitter_factor = random.uniform(0.8, 1.2)
-                    wait_time *= jitter_factor
+                if wait_time > 0:
+                    # Add random jitter (±20%, or +0-20% for a Crawl-delay)
+                    if self.jitter:
+                        low = 1.0 if self.delay_is_minimum else 0.8
+                        wait_time *= random.uniform(low, 1.2)
 
-                await asyncio.sleep(wait_time)
+                    await asyncio.sleep(wait_time)
 
-        self.last_request = time.time()
+            self.last_request = time.monotonic()
 
 
 class ExponentialBackoff:
@@ -95,49 +106,83 @@ class ExponentialBackoff:
 class RobotsTxtChecker:
     """Check robots.txt compliance"""
 
-    def __init__(self):
-        self.parsers = {}  # Cache parsers by domain
-
-    async def can_fetch(self, url: str, user_agent: str = "*") -> bool:
-        """Check if URL can be fetched according to robots.txt"""
+    def __init__(self, ttl: float = 24 * 3600):
+        """
+        Args:
+            ttl: Seconds before a host's robots.txt is fetched again
+        """
+        self.ttl = ttl
+        # Parsed robots.txt per domain (None = no usable robots.txt, allow all)
+        self.parsers: Dict[str, Tuple[Optional[RobotFileParser], float]] = {}
+        self._locks: Dict[str, asyncio.Lock] = {}
+
+    async def get_parser(
+        self, url: str, session: Optional[aiohttp.ClientSession] = None
+    ) -> Optional[RobotFileParser]:
+        """Cached robots.txt parser for the URL's domain, fetched once per TTL"""
         parsed = urlparse(url)
         domain = f"{parsed.scheme}://{parsed.netloc}"
 
-        # Get or create parser for this domain
-        if domain not in self.parsers:
-            parser = RobotFileParser()
-            robots_url = urljoin(domain, "/robots.txt")
-
-            try:
-                # Fetch robots.txt
-                async with aiohttp.ClientSession() as session:
-                    async with session.get(robots_url, timeout=5) as response:
-                        if response.status == 200:
-                            content = await response.text()
-                            parser.parse(content.splitlines())
-                        else:
-                            # No robots.txt = allow all
-                            return True
-            except Exception as e:
-                logger.warning(f"Error fetching robots.txt for {domain}: {e}")
-                return True  # Allow on error
-
-            self.parsers[domain] = parser
-
-        # Check if allowed
-        parser = self.parsers[domain]
-        return parser.can_fetch(user_agent, url)
+        cached = self.parsers.get(domain)
+        if cached is not None and time.monotonic() - cached[1] < self.ttl:
+            return cached[0]
+
+        # One fetch per domain, even with many concurrent requests waiting on it
+        lock = self._locks.setdefault(domain, asyncio.Lock())
+        async with lock:
+            cached = self.parsers.get(domain)
+            if cached is not None and time.monotonic() - cached[1] < self.ttl:
+                return cached[0]
+
+            parser = await self._fetch(domain, session)
+            self.parsers[domain] = (parser, time.monotonic())
+            return parser
+
+    async def _fetch(
+        self, domain: str, session: Optional[aiohttp.ClientSession]
+    ) -> Optional[RobotFileParser]:
+        """Download and parse robots.txt; None if missing or unreachable"""
+        robots_url = urljoin(domain, "/robots.txt")
+
+        try:
+            if session is None:
+                async with aiohttp.ClientSession() as own_session:
+                    return await self._fetch(domain, own_session)
+
+            async with session.get(robots_url, timeout=aiohttp.ClientTimeout(total=5)) as response:
+                if response.status != 200:
+                    return None  # No robots.txt = allow all
+                content = await response.text()
+        except Exception as e:
+            logger.warning(f"Error fetching robots.txt for {domain}: {e}")
+            return None  # Allow on error
+
+        parser = RobotFileParser()
+        parser.parse(content.splitlines())
+        return parser
+
+    async def can_fetch(
+        self,
+        url: str,
+        user_agent: str = "*",
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> bool:
+        """Check if URL can be fetched according to robots.txt"""
+        parser = await self.get_parser(url, session)
+        return parser is None or parser.can_fetch(user_agent, url)
 
-    async def get_crawl_delay(self, url: str, user_agent: str = "*") -> Optional[float]:
+    async def get_crawl_delay(
+        self,
+        url: str,
+        user_agent: str = "*",
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> Optional[float]:
         """Get crawl delay from robots.txt"""
-        parsed = urlparse(url)
-        domain = f"{parsed.scheme}://{parsed.netloc}"
-
-        if domain in self.parsers:
-            parser = self.parsers[domain]
-            return parser.crawl_delay(user_agent)
-
-        return None
+        parser = await self.get_parser(url, session)
+        if parser is None:
+            return None
+        delay = parser.crawl_delay(user_agent)
+        return float(delay) if delay is not None else None
 
 
 class RateLimitedScraper:
@@ -157,35 +202,70 @@ class RateLimitedScraper:
         requests_per_second: float = 0.5,
         respect_robots: bool = True,
         max_retries: int = 3,
+        max_concurrent: int = 100,
+        max_per_host: int = 1,
+        robots_ttl: float = 24 * 3600,
+        dns_cache_ttl: int = 300,
     ):
+        """
+        Args:
+            urls: URLs to scrape, from any number of hosts
+            output_dir: Where to save extracted JSON
+            requests_per_second: Rate limit for each host (robots.txt
+                Crawl-delay wins when it is slower)
+            respect_robots: Skip disallowed URLs and honour Crawl-delay
+            max_retries: Attempts per URL on 429/5xx/network errors
+            max_concurrent: Open connections across all hosts
+            max_per_host: Requests in flight per host
+            robots_ttl: Seconds a parsed robots.txt is reused
+            dns_cache_ttl: Seconds resolved addresses are cached
+        """
         self.urls = urls
         self.output_dir = Path(output_dir)
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
-        # Rate limiting
-        self.rate_limiter = RateLimiter(requests_per_second=requests_per_second)
+        # Rate limiting (one limiter per host, created on first use)
+        self.requests_per_second = requests_per_second
+        self.host_limiters: Dict[str, RateLimiter] = {}
         self.respect_robots = respect_robots
-        self.robots_checker = RobotsTxtChecker() if respect_robots else None
+        self.robots_checker = RobotsTxtChecker(ttl=robots_ttl) if respect_robots else None
         self.max_retries = max_retries
 
+        # Concurrency
+        self.max_concurrent = max_concurrent
+        self.max_per_host = max_per_host
+        self.dns_cache_ttl = dns_cache_ttl
+
         # Stats
         self.scraped_count = 0
         self.error_count = 0
         self.skipped_count = 0
 
     async def scrape_all(self):
-        """Scrape all URLs"""
-        logger.info(f"Starting scraper - {len(self.urls)} URLs")
-        logger.info(f"Rate limit: {self.rate_limiter.delay:.2f}s between requests")
+        """Scrape all URLs, hosts in parallel, each host at its own rate"""
+        # Per-host queues, in input order
+        queues: Dict[str, Deque[str]] = {}
+        for url in self.urls:
+            queues.setdefault(urlparse(url).netloc.lower(), deque()).append(url)
+
+        logger.info(f"Starting scraper - {len(self.urls)} URLs on {len(queues)} hosts")
+        logger.info(f"Rate limit: {1.0 / self.requests_per_second:.2f}s between requests per host")
+        logger.info(f"Concurrency: {self.max_concurrent} connections, {self.max_per_host} per host")
         logger.info(f"Respect robots.txt: {self.respect_robots}")
 
-        async with aiohttp.ClientSession() as session:
-            for url in self.urls:
-                try:
-                    await self.scrape_url(session, url)
-                except Exception as e:
-                    logger.error(f"Failed to scrape {url}: {e}")
-                    self.error_count += 1
+        connector = aiohttp.TCPConnector(
+            limit=self.max_concurrent,
+            limit_per_host=self.max_per_host,
+            ttl_dns_cache=self.dns_cache_ttl,
+            keepalive_timeout=30,
+            enable_cleanup_closed=True,
+        )
+        timeout = aiohttp.ClientTimeout(total=30, connect=10)
+
+        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
+            await asyncio.gather(
+                *(self.scrape_host(session, host, queue) for host, queue in queues.items())
+            )
 
         logger.info("\n" + "=" * 50)
         logger.info(f"Scraping complete!")
@@ -194,39 +274,75 @@ class RateLimitedScraper:
         logger.info(f"Errors: {self.error_count}")
         logger.info("=" * 50)
 
+    async def scrape_host(
+        self, session: aiohttp.ClientSession, host: str, queue: Deque[str]
+    ):
+        """Drain one host's queue with up to max_per_host workers"""
+
+        async def worker():
+            while queue:
+                url = queue.popleft()
+                try:
+                    await self.scrape_url(session, url)
+                except Exception as e:
+                    logger.error(f"Failed to scrape {url}: {e}")
+                    self.error_count += 1
+
+        await asyncio.gather(*(worker() for _ in range(min(self.max_per_host, len(queue)))))
+
+    async def get_host_limiter(
+        self, session: aiohttp.ClientSession, url: str
+    ) -> RateLimiter:
+        """Rate limiter for the URL's host, slowed to its robots.txt Crawl-delay"""
+        host = urlparse(url).netloc.lower()
+        limiter = self.host_limiters.get(host)
+        if limiter is not None:
+            return limiter
+
+        # Use crawl delay from robots.txt if specified
+        crawl_delay = None
+        if self.respect_robots:
+            crawl_delay = await self.robots_checker.get_crawl_delay(url, session=session)
+
+        # Another worker may have published this host's limiter during the
+        # await; only a fully configured limiter goes into the shared dict
+        limiter = self.host_limiters.get(host)
+        if limiter is None:
+            limiter = RateLimiter(requests_per_second=self.requests_per_second)
+            if crawl_delay and crawl_delay > limiter.delay:
+                logger.info(f"Using crawl delay from robots.txt for {host}: {crawl_delay}s")
+                limiter.set_crawl_delay(crawl_delay)
+            self.host_limiters[host] = limiter
+        return limiter
+
     async def scrape_url(self, session: aiohttp.ClientSession, url: str):
         """Scrape a single URL with retries"""
-        # Check robots.txt
+        # Check robots.txt (parsed once per host)
         if self.respect_robots:
-            can_fetch = await self.robots_checker.can_fetch(url)
+            can_fetch = await self.robots_checker.can_fetch(url, session=session)
             if not can_fetch:
                 logger.warning(f"Skipping {url} (blocked by robots.txt)")
                 self.skipped_count += 1
                 return
 
-            # Use crawl delay from robots.txt if specified
-            crawl_delay = await self.robots_checker.get_crawl_delay(url)
-            if crawl_delay and crawl_delay > self.rate_limiter.delay:
-                logger.info(f"Using crawl delay from robots.txt: {crawl_delay}s")
-                await asyncio.sleep(crawl_delay)
-
-        # Rate limiting
-        await self.rate_limiter.wait()
+        limiter = await self.get_host_limiter(session, url)
 
         # Retry logic
         backoff = ExponentialBackoff(max_retries=self.max_retries)
 
         while backoff.should_retry:
             try:
+                # Rate limiting (per host, also between retries)
+                await limiter.wait()
+
                 # Fetch page
                 html = await self.fetch_page(session, url)
 
                 if html:
-                    # Parse and extract data
-                    data = self.extract_data(url, html)
-
-                    # Save data
-                    self.save_data(url, data)
+                    # Parse, extract and save off the event loop so other
+                    # hosts' requests keep flowing
+                    data = await asyncio.to_thread(self.extract_data, url, html)
+                    await asyncio.to_thread(self.save_data, url, data)
 
                     self.scraped_count += 1
                     logger.info(f"✓ Scraped: {url}")
@@ -262,7 +378,7 @@ class RateLimitedScraper:
             "Accept-Language": "en-US,en;q=0.5",
         }
 
-        async with session.get(url, headers=headers, timeout=30) as response:
+        async with session.get(url, headers=headers) as response:
             response.raise_for_status()
             return await response.text()
 
@@ -330,9 +446,11 @@ async def main():
     scraper = RateLimitedScraper(
         urls=urls,
         output_dir="./scraped-data",
-        requests_per_second=0.5,  # 2 seconds between requests
+        requests_per_second=0.5,  # 2 seconds between requests to each host
         respect_robots=True,
         max_retries=3,
+        max_concurrent=100,  # Connections across all hosts
+        max_per_host=1,
     )
 
     await scraper.scrape_all()